@@ -284,6 +284,11 @@ class Crs(BaseResqpy):
         # todo: handle and check rotation units; modularly equivalent rotations
         return False
 
+    def equivalence_key(self) -> tuple:
+        """Returns the crs type, units, z direction and axis order as the key; offsets and rotation are excluded."""
+
+        return (self.resqml_type, self.xy_units, self.z_units, self.z_inc_down, self.time_units, self.axis_order)
+
     def convert_to(self, other_crs: 'Crs', xyz: PointType) -> Tuple[float, float, float]:
         """Converts a single xyz point from this coordinate reference system to the other.
 
@@ -10,9 +10,11 @@ log = logging.getLogger(__name__)
 
 import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
 import resqpy.fault as rqf
 import resqpy.grid as grr
+import resqpy.olio.trademark as tm
 import resqpy.olio.uuid as bu
 import resqpy.olio.xml_et as rqet
 import resqpy.organize as rqo
@@ -522,6 +524,151 @@ def remove_external_faces_from_faces_df(faces, extent_kji, remove_all_k_faces =
     return faces.loc[filtered]
 
 
+def _sorted_lookup(values):
+    """Returns (sorted values, positions) for a 1D int array, for use as a lookup in _find_in_sorted()."""
+
+    order = np.argsort(values, kind = 'stable')
+    return values[order], order
+
+
+def _find_in_sorted(lookup, query):
+    """Returns int array of positions of first occurrence of each query value in the array of a lookup, -1 if absent.
+
+    arguments:
+       lookup (pair of numpy int arrays): as returned by _sorted_lookup()
+       query (numpy int array): the values to be found
+
+    returns:
+       numpy int array of same shape as query, holding positions in the array originally passed to _sorted_lookup(),
+       or -1 where the query value is not present
+    """
+
+    sorted_values, order = lookup
+    if len(sorted_values) == 0:
+        return np.full(query.shape, -1, dtype = int)
+    place = np.minimum(np.searchsorted(sorted_values, query), len(sorted_values) - 1)
+    return np.where(sorted_values[place] == query, order[place], -1)
+
+
+def _pair_keys(compact_pairs, null_value, cell_face_count):
+    """Returns int64 array of keys for compact cell face index pairs, independent of the order within each pair.
+
+    note:
+       compact_pairs is as returned by GridConnectionSet.compact_indices() and cell_face_count is 6 times the
+       number of cells in the grid; pairs including a null value are given a key of -1
+    """
+
+    assert cell_face_count < 2**31, 'too many cell faces for compact pair keys'
+    a = compact_pairs[:, 0].astype(np.int64)
+    b = compact_pairs[:, 1].astype(np.int64)
+    keys = np.minimum(a, b) * cell_face_count + np.maximum(a, b)
+    keys[np.logical_or(a == null_value, b == null_value)] = -1
+    return keys
+
+
+def _nexus_mult_runs(feature_indices, cell_kji0_pairs, axis_polarity_pairs, tmult, sides):
+    """Returns arrays describing runs of consecutive layers of cell faces, in the order to be written as Nexus MULT data.
+
+    arguments:
+       feature_indices (numpy int array of shape (N,)): the feature index for each cell face pair
+       cell_kji0_pairs (numpy int array of shape (N, 2, 3)): the paired kji0 cell indices
+       axis_polarity_pairs (numpy int array of shape (N, 2, 2)): the paired face axis and polarity
+       tmult (numpy float array of shape (N,)): transmissibility multiplier for each cell face pair
+       sides (list of int): which sides (0 or 1) of the pairs to include, in the order they are to be written
+
+    returns:
+       (feature, axis_polarity, kji0, k2, tmult) for the runs, where kji0 is the first cell of the run and k2 is
+       the k0 index of the last cell of the run
+
+    notes:
+       runs are ordered by feature, then side, then axis, polarity, j, i & k; a run is a sequence of faces with the
+       same feature, side, axis, polarity, column and multiplier value, in consecutive layers
+    """
+
+    n = len(feature_indices)
+    side_count = len(sides)
+    feature = np.tile(feature_indices, side_count)
+    side_rank = np.repeat(np.arange(side_count, dtype = int), n)
+    kji0 = np.concatenate([cell_kji0_pairs[:, side] for side in sides])
+    axis_polarity = np.concatenate([axis_polarity_pairs[:, side] for side in sides])
+    t = np.tile(tmult, side_count)
+    order = np.lexsort(
+        (t, kji0[:, 0], kji0[:, 2], kji0[:, 1], axis_polarity[:, 1], axis_polarity[:, 0], side_rank, feature))
+    feature = feature[order]
+    side_rank = side_rank[order]
+    kji0 = kji0[order]
+    axis_polarity = axis_polarity[order]
+    t = t[order]
+    start = np.ones(len(order), dtype = bool)
+    start[1:] = np.logical_or.reduce(
+        (feature[1:] != feature[:-1], side_rank[1:] != side_rank[:-1],
+         np.any(axis_polarity[1:] != axis_polarity[:-1],
+                axis = 1), np.any(kji0[1:, 1:] != kji0[:-1, 1:],
+                                  axis = 1), kji0[1:, 0] != kji0[:-1, 0] + 1, t[1:] != t[:-1]))
+    starts = np.where(start)[0]
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:] - 1
+    ends[-1:] = len(order) - 1
+    return feature[starts], axis_polarity[starts], kji0[starts], kji0[ends, 0], t[starts]
+
+
+def _nexus_mult_rows_text(kji0, k2, tmult):
+    """Returns a string holding Nexus MULT data rows for runs of cell faces, formatted in bulk."""
+
+    rows = np.empty((len(tmult), 7), dtype = object)
+    rows[:, 0] = rows[:, 1] = kji0[:, 2] + 1
+    rows[:, 2] = rows[:, 3] = kji0[:, 1] + 1
+    rows[:, 4] = kji0[:, 0] + 1
+    rows[:, 5] = k2 + 1
+    rows[:, 6] = tmult
+    return ('\t%d\t%d\t%d\t%d\t%d\t%d\t%.4f\n' * len(tmult)) % tuple(rows.ravel())
+
+
+def _write_nexus_mult(fp, feature_names, runs, grid_name = 'ROOT', processes = None):
+    """Writes Nexus MULT keywords and data for runs of cell faces, as returned by _nexus_mult_runs(), to open file.
+
+    arguments:
+       fp: file object open for writing text
+       feature_names (list of str): the Nexus fault name for each feature index
+       runs (tuple of numpy arrays): as returned by _nexus_mult_runs()
+       grid_name (str, default 'ROOT'): the Nexus grid name
+       processes (int, optional): if greater than one, the number of worker processes to use for formatting the
+          data rows
+
+    notes:
+       a new MULT keyword is written wherever the fault name, axis or polarity changes between runs
+    """
+
+    feature, axis_polarity, kji0, k2, tmult = runs
+    if len(feature) == 0:
+        return
+    name_ids = {}
+    feature_name_ids = np.array([name_ids.setdefault(name, len(name_ids)) for name in feature_names], dtype = int)
+    head_keys = np.stack((feature_name_ids[feature], axis_polarity[:, 0], axis_polarity[:, 1]), axis = -1)
+    head = np.ones(len(feature), dtype = bool)
+    head[1:] = np.any(head_keys[1:] != head_keys[:-1], axis = 1)
+    block_starts = np.where(head)[0]
+    block_ends = np.append(block_starts[1:], len(feature))
+    blocks = [(kji0[a:b], k2[a:b], tmult[a:b]) for a, b in zip(block_starts, block_ends)]
+
+    if processes is not None and processes > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers = processes) as executor:
+            texts = list(executor.map(_nexus_mult_rows_text, *zip(*blocks)))
+    else:
+        texts = [_nexus_mult_rows_text(*block) for block in blocks]
+
+    for start, text in zip(block_starts, texts):
+        axis, polarity = axis_polarity[start]
+        fault_name = feature_names[feature[start]]
+        fp.write('\nMULT\tT' + 'ZYX'[axis] + '\tALL\t' + ['MINUS', 'PLUS'][polarity] + '\tMULT\n')
+        fp.write('\tGRID\t' + grid_name + '\n')
+        fp.write('\tFNAME\t' + fault_name + '\n')
+        if len(fault_name) > 256:
+            log.warning('exported fault name longer than Nexus limit of 256 characters: ' + fault_name)
+            tm.log_nexus_tm('warning')
+        fp.write(text)
+
+
 def _make_k_gcs_from_cip_list(grid, cip_list, feature_name):
     # cip (cell index pair) list contains pairs of natural cell indices for which k connection is required
     # first of pair is layer above (lower k to be precise), second is below (higher k)
@@ -667,13 +667,10 @@ class GridConnectionSet(BaseResqpy):
         keep_list = np.unique(self.feature_indices)
         if len(keep_list) == len(self.feature_list):
             return
-        cleaned_list = []
-        for i in range(len(keep_list)):
-            assert i <= keep_list[i]
-            if i != keep_list[i]:
-                self.feature_indices[np.where(self.feature_indices == keep_list[i])[0]] = i
-            cleaned_list.append(self.feature_list[keep_list[i]])
-        self.feature_list = cleaned_list
+        index_map = np.full(len(self.feature_list), -1, dtype = int)
+        index_map[keep_list] = np.arange(len(keep_list))
+        self.feature_indices[:] = index_map[self.feature_indices]
+        self.feature_list = [self.feature_list[i] for i in keep_list]
 
     def cache_arrays(self):
         """Checks that the connection set array data is loaded and loads from hdf5 if not.
@@ -1241,43 +1238,38 @@ class GridConnectionSet(BaseResqpy):
                         simulator = 'nexus',
                         include_both_sides = False,
                         use_minus = False,
-                        trans_mult_uuid = None):
-        """Creates a Nexus include file holding MULT keywords and data. trans_mult_uuid (optional) is the uuid of a property on the gcs containing transmissibility multiplier values. If not provided values of 1.0 will be used."""
+                        trans_mult_uuid = None,
+                        processes = None):
+        """Creates a Nexus include file holding MULT keywords and data.
+
+        arguments:
+           filename (str): the path of the file to write
+           mode (str, default 'w'): the file open mode; use 'a' to append to an existing file
+           simulator (str, default 'nexus'): only 'nexus' is currently supported
+           include_both_sides (bool, default False): if True, data is written for both sides of each connection
+           use_minus (bool, default False): if True (and include_both_sides is False), data is written for the
+              second side of each connection instead of the first
+           trans_mult_uuid (UUID, optional): the uuid of a property on the gcs containing transmissibility multiplier
+              values; if not provided, values of 1.0 will be used
+           processes (int, optional): if greater than one, the data rows are formatted in parallel using this
+              number of worker processes
+
+        notes:
+           faces in consecutive layers of a column, with the same multiplier value, are combined into a single row
+        """
+
         if trans_mult_uuid is not None:
             self.extract_property_collection()
             assert self.property_collection.part_in_collection(self.model.part_for_uuid(
                 trans_mult_uuid)), f'trans_mult_uuid provided is not part of collection {trans_mult_uuid}'
             tmult_array = self.property_collection.cached_part_array_ref(self.model.part_for_uuid(trans_mult_uuid))
             assert tmult_array is not None
+            tmult_array = tmult_array.astype(float).flatten()
         else:
-            tmult_array = None
+            tmult_array = np.ones(self.count, dtype = float)
 
         assert simulator == 'nexus'
 
-        active_nexus_head = None
-        row_count = 0
-
-        def write_nexus_header_lines(fp, axis, polarity, fault_name, grid_name = 'ROOT'):
-            nonlocal active_nexus_head
-            if (axis, polarity, fault_name, grid_name) == active_nexus_head:
-                return
-            T = 'T' + 'ZYX'[axis]
-            plus_minus = ['MINUS', 'PLUS'][polarity]
-            fp.write('\nMULT\t' + T + '\tALL\t' + plus_minus + '\tMULT\n')
-            fp.write('\tGRID\t' + grid_name + '\n')
-            fp.write('\tFNAME\t' + fault_name + '\n')
-            if len(fault_name) > 256:
-                log.warning('exported fault name longer than Nexus limit of 256 characters: ' + fault_name)
-                tm.log_nexus_tm('warning')
-            active_nexus_head = (axis, polarity, fault_name, grid_name)
-
-        def write_row(gcs, fp, name, i, j, k1, k2, axis, polarity, tmult):
-            nonlocal row_count
-            write_nexus_header_lines(fp, axis, polarity, name)
-            fp.write('\t{0:1d}\t{1:1d}\t{2:1d}\t{3:1d}\t{4:1d}\t{5:1d}\t{6:.4f}\n'.format(
-                i + 1, i + 1, j + 1, j + 1, k1 + 1, k2 + 1, tmult))
-            row_count += 1
-
         log.info('writing fault data in simulator format to file: ' + filename)
 
         if include_both_sides:
@@ -1287,51 +1279,12 @@ class GridConnectionSet(BaseResqpy):
         else:
             sides = [0]
 
+        cell_index_pairs, face_index_pairs = self.list_of_cell_face_pairs_for_feature_index()[:2]
+        feature_names = [feature[2].split()[0].upper() for feature in self.feature_list]
+        runs = rqf_gf._nexus_mult_runs(self.feature_indices, cell_index_pairs, face_index_pairs, tmult_array, sides)
+
         with open(filename, mode, newline = '') as fp:
-            for feature_index in range(len(self.feature_list)):
-                feature_name = self.feature_list[feature_index][2].split()[0].upper()
-                cell_index_pairs, face_index_pairs = self.list_of_cell_face_pairs_for_feature_index(feature_index)
-                if tmult_array is not None:
-                    feature_mask = np.where(self.feature_indices == feature_index, 1, 0)
-                    feat_mult_array = np.extract(feature_mask, tmult_array)
-                else:
-                    feat_mult_array = np.ones(shape = (cell_index_pairs.shape[0],), dtype = float)
-                for side in sides:
-                    both = np.empty((cell_index_pairs.shape[0], 6), dtype = int)  # axis, polarity, k, j, i, tmult
-                    both[:, :2] = face_index_pairs[:, side, :]  # axis, polarity
-                    both[:, 2:-1] = cell_index_pairs[:, side, :]  # k, j, i
-                    both[:, -1] = feat_mult_array.flatten()
-                    df = pd.DataFrame(both, columns = ['axis', 'polarity', 'k', 'j', 'i', 'tmult'])
-                    df = df.sort_values(by = ['axis', 'polarity', 'j', 'i', 'k', 'tmult'])
-                    both_sorted = np.empty(both.shape, dtype = int)
-                    both_sorted[:] = df
-                    cell_indices = both_sorted[:, 2:-1]
-                    face_indices = np.empty((both_sorted.shape[0], 2), dtype = int)
-                    face_indices[:, :] = both_sorted[:, :2]
-                    tmult_values = both_sorted[:, -1]
-                    del both_sorted
-                    del both
-                    del df
-                    k = None
-                    i = j = k2 = axis = polarity = None  # only needed to placate flake8 which whinges incorrectly otherwise
-                    for row in range(cell_indices.shape[0]):
-                        kp, jp, ip = cell_indices[row]
-                        axis_p, polarity_p = face_indices[row]
-                        tmult = tmult_values[row]
-                        if k is not None:
-                            if axis_p != axis or polarity_p != polarity or ip != i or jp != j or kp != k2 + 1:
-                                write_row(self, fp, feature_name, i, j, k, k2, axis, polarity, tmult)
-                                k = None
-                            else:
-                                k2 = kp
-                        if k is None:
-                            i = ip
-                            j = jp
-                            k = k2 = kp
-                            axis = axis_p
-                            polarity = polarity_p
-                    if k is not None:
-                        write_row(self, fp, feature_name, i, j, k, k2, axis, polarity, tmult)
+            rqf_gf._write_nexus_mult(fp, feature_names, runs, processes = processes)
 
     def get_column_edge_list_for_feature(self, feature, gridindex = 0, min_k = 0, max_k = 0):
         """Extracts a list of cell faces for a given feature index, over a given range of layers in the grid.
@@ -1670,31 +1623,6 @@ class GridConnectionSet(BaseResqpy):
            with named features; currently restricted to single grid connection sets
         """
 
-        def sorted_paired_cell_face_index_position(cell_face_index, a_or_b):
-            # pair one side (a_or_b) of cell_face_index with its position, then sort
-            count = len(cell_face_index)
-            sp = np.empty((count, 2), dtype = int)
-            sp[:, 0] = cell_face_index[:, a_or_b]
-            sp[:, 1] = np.arange(count)
-            t = [tuple(r) for r in sp]  # could use numpy fields based sort instead of tuple list?
-            t.sort()
-            return np.array(t)
-
-        def find_in_sorted(paired, v):
-
-            def fis(p, v, a, b):  # recursive binary search
-                if a >= b:
-                    return None
-                m = (a + b) // 2
-                s = p[m, 0]
-                if s == v:
-                    return p[m, 1]
-                if s > v:
-                    return fis(p, v, a, m)
-                return fis(p, v, m + 1, b)
-
-            return fis(paired, v, 0, len(paired))
-
         assert len(self.grid_list) == 1 and len(featured.grid_list) == 1
         assert tuple(self.grid_list[0].extent_kji) == tuple(featured.grid_list[0].extent_kji)
 
@@ -1706,7 +1634,7 @@ class GridConnectionSet(BaseResqpy):
         for featured_triplet in featured.feature_list:
             featured_uuid = bu.uuid_from_string(featured_triplet[1])  # bu call probably not needed
             if featured_uuid in feature_uuid_list:
-                featured_index_map.append(feature_uuid_list.index[featured_uuid])
+                featured_index_map.append(feature_uuid_list.index(featured_uuid))
             else:
                 featured_index_map.append(len(self.feature_list))
                 self.feature_list.append(featured_triplet)
@@ -1717,45 +1645,58 @@ class GridConnectionSet(BaseResqpy):
         cell_face_index_self = self.compact_indices()
         cell_face_index_featured = featured.compact_indices()
 
-        # sort all 4 (2 sides in each of 2 sets) cell_face index data, keeping track of positions in original lists
-        cfp_a_self = sorted_paired_cell_face_index_position(cell_face_index_self, 0)
-        cfp_b_self = sorted_paired_cell_face_index_position(cell_face_index_self, 1)
-        cfp_a_featured = sorted_paired_cell_face_index_position(cell_face_index_featured, 0)
-        cfp_b_featured = sorted_paired_cell_face_index_position(cell_face_index_featured, 1)
+        # sort both sides of the featured cell face data, keeping track of positions in original arrays
+        lookup_a_featured = rqf_gf._sorted_lookup(cell_face_index_featured[:, 0])
+        lookup_b_featured = rqf_gf._sorted_lookup(cell_face_index_featured[:, 1])
+        featured_index_map = np.array(featured_index_map, dtype = int)
 
         # for each cell face in self, look for same in featured and inherit feature index if found
-        previous_cell_face_index = previous_feature_index = None
-        for (a_or_b, cfp_self) in [(0, cfp_a_self), (1, cfp_b_self)]:  # could risk being lazy and only using one side?
-            for (cell_face_index, place) in cfp_self:
-                if self.feature_indices[place] >= original_feature_count:
-                    continue  # already been updated
-                if cell_face_index == previous_cell_face_index:
-                    if previous_feature_index is not None:
-                        self.feature_indices[place] = previous_feature_index
-                elif cell_face_index == self.face_index_pairs_null_value:
-                    continue
-                else:
-                    featured_place = find_in_sorted(cfp_a_featured, cell_face_index)
-                    if featured_place is None:
-                        featured_place = find_in_sorted(cfp_b_featured, cell_face_index)
-                    if featured_place is None:
-                        previous_feature_index = None
-                    else:
-                        featured_index = featured.feature_indices[featured_place]
-                        self.feature_indices[place] = previous_feature_index = featured_index_map[featured_index]
-                    previous_cell_face_index = cell_face_index
+        for a_or_b in (0, 1):  # could risk being lazy and only using one side?
+            values = cell_face_index_self[:, a_or_b]
+            places = np.where(
+                np.logical_and(self.feature_indices < original_feature_count,
+                               values != self.face_index_pairs_null_value))[0]
+            featured_places = rqf_gf._find_in_sorted(lookup_a_featured, values[places])
+            missing = np.where(featured_places < 0)[0]
+            featured_places[missing] = rqf_gf._find_in_sorted(lookup_b_featured, values[places[missing]])
+            found = np.where(featured_places >= 0)[0]
+            self.feature_indices[places[found]] = featured_index_map[featured.feature_indices[featured_places[found]]]
 
         # clean up by removing any original features no longer in use
-        removals = []
-        for fi in range(original_feature_count):
-            if fi not in self.feature_indices:
-                removals.append(fi)
-        reduction = len(removals)
-        if reduction > 0:
-            while len(removals) > 0:
-                self.feature_list.pop(removals[-1])
-                removals.pop()
-            self.feature_indices[:] -= reduction
+        in_use = np.zeros(len(self.feature_list), dtype = bool)
+        in_use[np.unique(self.feature_indices)] = True
+        in_use[original_feature_count:] = True
+        if not np.all(in_use):
+            self.feature_list = [triplet for triplet, keep in zip(self.feature_list, in_use) if keep]
+            self.feature_indices[:] = (np.cumsum(in_use) - 1)[self.feature_indices]
+
+    def matched_indices(self, other):
+        """Returns int array holding, for each cell face pair in this set, the index of the same pair in other.
+
+        arguments:
+           other (GridConnectionSet): another single grid connection set for a grid of the same extent
+
+        returns:
+           numpy int array of shape (count,) holding indices into the main arrays of other, or -1 where this set's
+           cell face pair is not present in other
+
+        notes:
+           pairs are matched regardless of the order of the two cell faces within the pair; where a pair appears
+           more than once in other, the first occurrence is used; the result may be used to sample properties of
+           other for the matched connections, eg. with inherit_properties_for_selected_indices() after filtering
+           out the -1 values
+        """
+
+        assert len(self.grid_list) == 1 and len(other.grid_list) == 1
+        assert tuple(self.grid_list[0].extent_kji) == tuple(other.grid_list[0].extent_kji)
+        self.cache_arrays()
+        other.cache_arrays()
+        cell_face_count = 6 * self.grid_list[0].cell_count()
+        keys_self = rqf_gf._pair_keys(self.compact_indices(), self.face_index_pairs_null_value, cell_face_count)
+        keys_other = rqf_gf._pair_keys(other.compact_indices(), other.face_index_pairs_null_value, cell_face_count)
+        matched = rqf_gf._find_in_sorted(rqf_gf._sorted_lookup(keys_other), keys_self)
+        matched[keys_self < 0] = -1
+        return matched
 
     def compact_indices(self):
         """Returns numpy int array of shape (count, 2) combining each cell index, face index into a single integer."""
@@ -1870,6 +1811,7 @@ class GridConnectionSet(BaseResqpy):
         if fi_root is not None and fault_const_mult and fault_mult_value is not None:
             #patch extra_metadata into xml for new fault interpretation object
             rqet.create_metadata_xml(fi_root, {"Transmissibility multiplier": str(fault_mult_value)})
+            self.model.invalidate_catalogue_index(self.model.part_for_uuid(rqet.uuid_for_part_root(fi_root)))
         return True, const_mult
 
     def face_surface_normal_vectors(self,
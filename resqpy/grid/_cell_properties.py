@@ -12,6 +12,7 @@ import resqpy.weights_and_measures as wam
 
 import resqpy.grid
 import resqpy.grid._defined_geometry as grr_dg
+import resqpy.grid._points_functions as grr_pf
 
 
 def thickness(grid,
@@ -20,7 +21,8 @@ def thickness(grid,
               cache_resqml_array = True,
               cache_cp_array = False,
               cache_thickness_array = True,
-              property_collection = None):
+              property_collection = None,
+              layer_block_size = None):
     """Returns vertical (z) thickness of cell and/or caches thicknesses for all cells.
 
     arguments:
@@ -37,6 +39,9 @@ def thickness(grid,
                              is probed for a suitable thickness or cell length property which is used
                              preferentially to calculating thickness; if no suitable property is found,
                              the calculation is made as if the collection were None
+       layer_block_size (int, optional): if present and thicknesses are being generated for all cells, the
+                             points are read and processed this many layers at a time, without caching
+                             the points or corner points, so that peak memory is bounded
 
     returns:
        float, being the thickness of cell identified by cell_kji0; or numpy float array if cell_kji0 is None
@@ -89,6 +94,15 @@ def thickness(grid,
 
     points_root = grid.resolve_geometry_child('Points', child_node = points_root)
     if cache_thickness_array:
+        if layer_block_size is not None and not hasattr(grid, 'array_corner_points'):
+            thick = np.empty(tuple(grid.extent_kji))
+            if not layer_blocked_cell_geometry(
+                    grid, thickness_out = thick, layer_block_size = layer_block_size, points_root = points_root):
+                return None  # geometry not present
+            grid.array_thickness = thick
+            if cell_kji0 is None:
+                return grid.array_thickness
+            return grid.array_thickness[tuple(cell_kji0)]
         if cache_cp_array:
             grid.corner_points(points_root = points_root, cache_cp_array = True)
         if hasattr(grid, 'array_corner_points'):
@@ -136,7 +150,8 @@ def volume(grid,
            cache_centre_array = False,
            cache_volume_array = True,
            property_collection = None,
-           required_uom = None):
+           required_uom = None,
+           layer_block_size = None):
     """Returns bulk rock volume of cell or numpy array of bulk rock volumes for all cells.
 
     arguments:
@@ -156,6 +171,9 @@ def volume(grid,
        required_uom (str, optional): if present, the RESQML unit of measure (for quantity volume) that
                              the volumes will be returned (and cached) in; if None, the grid's CRS
                              z units cubed will be used
+       layer_block_size (int, optional): if present and volumes are being generated for all cells, the
+                             points are read and processed this many layers at a time, without caching
+                             the points or corner points, so that peak memory is bounded
 
     returns:
        float, being the volume of cell identified by cell_kji0;
@@ -222,6 +240,19 @@ def volume(grid,
     if points_root is None:
         return None  # geometry not present
     centre_array = None
+    if cache_volume_array and layer_block_size is not None and not hasattr(grid, 'array_corner_points'):
+        vol_array = np.empty(tuple(grid.extent_kji))
+        if not layer_blocked_cell_geometry(grid,
+                                           volume_out = vol_array,
+                                           layer_block_size = layer_block_size,
+                                           required_uom = required_uom,
+                                           points_root = points_root):
+            return None  # geometry not present
+        grid.array_volume = vol_array
+        grid.array_volume_uom = required_uom
+        if cell_kji0 is None:
+            return vol_array
+        return vol_array[tuple(cell_kji0)]
     if cache_volume_array:
         grid.corner_points(points_root = points_root, cache_cp_array = True)
         if cache_centre_array:
@@ -247,6 +278,59 @@ def volume(grid,
     return v if conversion_factor is None else conversion_factor * v
 
 
+def layer_blocked_cell_geometry(grid,
+                                volume_out = None,
+                                thickness_out = None,
+                                centre_out = None,
+                                layer_block_size = 16,
+                                required_uom = None,
+                                points_root = None):
+    """Computes cell volumes, thicknesses and/or centre points for all cells, working through blocks of layers.
+
+    arguments:
+       volume_out (array like of shape (nk, nj, ni), optional): if present, cell volumes are written to this array
+       thickness_out (array like of shape (nk, nj, ni), optional): if present, cell thicknesses are written to
+          this array
+       centre_out (array like of shape (nk, nj, ni, 3), optional): if present, cell centre points are written to
+          this array
+       layer_block_size (int, default 16): the number of layers to process at a time
+       required_uom (str, optional): the RESQML unit of measure for volumes; if None, the grid's CRS z units cubed
+          will be used
+       points_root (optional): the xml node holding the points data
+
+    returns:
+       True if the values have been computed; False if the grid geometry is not present
+
+    notes:
+       each output may be a numpy array, a numpy memmap or an h5py dataset: anything supporting assignment to a
+       slice on the K axis; if the points are not already cached, they are read from hdf5 one slab of layers at a
+       time and are not cached; nor is the full corner points array generated; peak memory use is therefore bounded
+       by the layer block size; volumes are calculated as for volume(); thickness as the z difference between centre
+       points of top and base faces (TVT), as for thickness(); centre points are the mean of the eight corner points
+    """
+
+    assert volume_out is not None or thickness_out is not None or centre_out is not None
+    assert layer_block_size is not None and layer_block_size > 0
+    if volume_out is not None:
+        off_hand = grid.off_handed()
+        conversion_factor = _get_volume_conversion_factor(grid, _get_volume_uom(grid, required_uom))
+    for k0 in range(0, grid.nk, layer_block_size):
+        k0_end = min(k0 + layer_block_size, grid.nk)
+        cp = grr_pf.corner_points_for_layers(grid, k0, k0_end, points_root = points_root)
+        if cp is None:
+            return False  # geometry not present
+        if volume_out is not None:
+            v = vol.tetra_volumes(cp, off_hand = off_hand)
+            if conversion_factor is not None:
+                v *= conversion_factor
+            volume_out[k0:k0_end] = v
+        if thickness_out is not None:
+            thickness_out[k0:k0_end] = np.abs(np.mean(cp[:, :, :, 1, :, :, 2] - cp[:, :, :, 0, :, :, 2], axis = (3, 4)))
+        if centre_out is not None:
+            centre_out[k0:k0_end] = 0.125 * np.sum(cp, axis = (3, 4, 5))
+    return True
+
+
 def _get_volume_uom(grid, required_uom):
     if required_uom:
         assert required_uom in wam.valid_uoms(quantity = 'volume'), f'invalid volume unit of measure: {required_uom}'
@@ -22,7 +22,7 @@ import resqpy.olio.xml_et as rqet
 import resqpy.crs as rqc
 from resqpy.olio.base import BaseResqpy
 
-from ._transmissibility import transmissibility, half_cell_transmissibility
+from ._transmissibility import transmissibility, half_cell_transmissibility, layer_blocked_transmissibility
 from ._extract_functions import extract_grid_parent, extract_extent_kji, extract_grid_is_right_handed, \
     extract_k_direction_is_down, extract_geometry_time_index, extract_crs_uuid, extract_k_gaps, \
     extract_pillar_shape, extract_has_split_coordinate_lines, extract_children, extract_stratigraphy, \
@@ -37,15 +37,17 @@ from ._faults import find_faults, fault_throws, fault_throws_per_edge_per_column
 from ._face_functions import clear_face_sets, make_face_sets_from_pillar_lists, make_face_set_from_dataframe, \
     set_face_set_gcs_list_from_dict, is_split_column_face, split_column_faces, face_centre, face_centres_kji_01
 from ._points_functions import point_areally, point, points_ref, point_raw, unsplit_points_ref, corner_points, \
-    invalidate_corner_points, interpolated_points, x_section_corner_points, split_x_section_points, \
-    unsplit_x_section_points, uncache_points, horizon_points, split_horizon_points, \
+    corner_points_for_layers, invalidate_corner_points, interpolated_points, x_section_corner_points, \
+    split_x_section_points, unsplit_x_section_points, uncache_points, horizon_points, split_horizon_points, \
     centre_point_list, interpolated_point, split_gap_x_section_points, \
     centre_point, z_corner_point_depths, coordinate_line_end_points, set_cached_points_from_property, \
     find_cell_for_point_xy, split_horizons_points
 from ._create_grid_xml import _create_grid_xml, _add_pillar_points_xml
+from ._spatial_index import xy_cell_index, find_cells_for_points_xy, find_cells_for_points_xyz
 from ._pillars import create_column_pillar_mapping, pillar_foursome, pillar_distances_sqr, nearest_pillar, nearest_rod
 from ._cell_properties import thickness, volume, _get_volume_uom, _get_volume_conversion_factor, pinched_out, \
-    cell_inactive, interface_length, interface_vector, interface_lengths_kji, interface_vectors_kji, poly_line_for_cell
+    layer_blocked_cell_geometry, cell_inactive, interface_length, interface_vector, interface_lengths_kji, \
+    interface_vectors_kji, poly_line_for_cell
 from ._connection_sets import fault_connection_set, pinchout_connection_set, k_gap_connection_set
 from ._xyz import xyz_box, xyz_box_centre, bounding_box, composite_bounding_box, z_inc_down, \
     check_top_and_base_cell_edge_directions, _local_to_global_crs, _global_to_local_crs
@@ -403,6 +405,11 @@ class Grid(BaseResqpy):
         cell_geometry_is_defined(self, cache_array = True)
         pillar_geometry_is_defined(self, cache_array = True)
         self.point(cache_array = True)
+        self._cache_split_pillar_arrays()
+
+    def _cache_split_pillar_arrays(self):
+        """Loads from hdf5 into memory the split pillar arrays, if the grid has split coordinate lines."""
+
         if self.has_split_coordinate_lines:
             split_root = None
             if not hasattr(self, 'split_pillar_indices_cached'):
@@ -1176,13 +1183,15 @@ class Grid(BaseResqpy):
                                                active_property_uuid = active_property_uuid,
                                                active_collection = active_collection)
 
-    def point_raw(self, index = None, points_root = None, cache_array = True):
+    def point_raw(self, index = None, points_root = None, cache_array = True, memmap = False):
         """Returns element from points data, indexed as in the hdf5 file; can optionally be used to cache points data.
 
         arguments:
            index (2 or 3 integers, optional): if not None, the index into the raw points data for the point of interest
            points_root (optional): the xml node holding the points data
            cache_array (boolean, default True): if True, the raw points data is cached in memory as a side effect
+           memmap (boolean, default False): if True and cache_array is True, the cached points data is a read only
+              memmap onto the hdf5 file, if the dataset is stored contiguously
 
         returns:
            (x, y, z) of selected point as a 3 element numpy vector, or None if index is None
@@ -1195,7 +1204,7 @@ class Grid(BaseResqpy):
            index is passed, the k0 element must already have been mapped to the raw index value taking into consideration
            any k gaps; if the grid object does not include geometry then None is returned
         """
-        return point_raw(self, index = index, points_root = points_root, cache_array = cache_array)
+        return point_raw(self, index = index, points_root = points_root, cache_array = cache_array, memmap = memmap)
 
     def point(self,
               cell_kji0 = None,
@@ -1223,12 +1232,14 @@ class Grid(BaseResqpy):
                      points_root = points_root,
                      cache_array = cache_array)
 
-    def points_ref(self, masked = True):
+    def points_ref(self, masked = True, memmap = False):
         """Returns an in-memory numpy array containing the xyz data for points used in the grid geometry.
 
-        argument:
+        arguments:
            masked (boolean, default True): if True, a masked array is returned with NaN points masked out;
               if False, a simple (unmasked) numpy array is returned
+           memmap (boolean, default False): if True and the points are not already cached, they are cached as a
+              read only memmap onto the hdf5 file, if the dataset is stored contiguously
 
         returns:
            numpy array or masked array of float, of shape (nk + k_gaps + 1, nj + 1, ni + 1, 3) or (nk + k_gaps + 1, np, 3)
@@ -1243,7 +1254,7 @@ class Grid(BaseResqpy):
 
         :meta common:
         """
-        return points_ref(self, masked = masked)
+        return points_ref(self, masked = masked, memmap = memmap)
 
     def uncache_points(self):
         """Frees up memory by removing the cached copy of the grid's points data.
@@ -1460,9 +1471,18 @@ class Grid(BaseResqpy):
         """
         return z_corner_point_depths(self, order = order)
 
-    def corner_points(self, cell_kji0 = None, points_root = None, cache_resqml_array = True, cache_cp_array = False):
+    def corner_points(self,
+                      cell_kji0 = None,
+                      points_root = None,
+                      cache_resqml_array = True,
+                      cache_cp_array = False,
+                      dtype = None):
         """Returns a numpy array of corner points for a single cell or the whole grid.
 
+        arguments:
+           dtype (numpy float dtype, optional): if present, the element type used when the full corner points array
+              is generated and cached, eg. np.float32 to halve memory use; ignored if the array is already cached
+
         notes:
            if cell_kji0 is not None, a 4D array of shape (2, 2, 2, 3) holding single cell corner points in logical order
            [kp, jp, ip, xyz] is returned; if cell_kji0 is None, a pagoda style 7D array [k, j, i, kp, jp, ip, xyz] is
@@ -1470,7 +1490,8 @@ class Grid(BaseResqpy):
            the ordering of the corner points is in the logical order, which is not the same as that used by Nexus CORP data;
            olio.grid_functions.resequence_nexus_corp() can be used to switch back and forth between this pagoda ordering
            and Nexus corp ordering;
-           this is the usual way to access full corner points for cells where working with native resqml data is undesirable
+           this is the usual way to access full corner points for cells where working with native resqml data is undesirable;
+           see also corner_points_for_layers() for generating corner points for a range of layers without caching
 
         :meta common:
         """
@@ -1478,16 +1499,30 @@ class Grid(BaseResqpy):
                              cell_kji0 = cell_kji0,
                              points_root = points_root,
                              cache_resqml_array = cache_resqml_array,
-                             cache_cp_array = cache_cp_array)
+                             cache_cp_array = cache_cp_array,
+                             dtype = dtype)
+
+    def corner_points_for_layers(self, k0_start = 0, k0_end = None, dtype = None):
+        """Returns a numpy array of corner points for a range of layers, without caching the full corner points array.
+
+        arguments:
+           k0_start (int, default 0): the first layer for which corner points are required
+           k0_end (int, optional): one more than the last layer for which corner points are required; defaults to nk
+           dtype (numpy float dtype, optional): the element type of the returned array; defaults to float
+
+        returns:
+           numpy float array of shape (k0_end - k0_start, nj, ni, 2, 2, 2, 3) in the same pagoda ordering as corner_points()
+        """
+        return corner_points_for_layers(self, k0_start = k0_start, k0_end = k0_end, dtype = dtype)
 
     def invalidate_corner_points(self):
         """Deletes cached copy of corner points, if present.
 
-        Use if any pillar geometry changes, or to reclaim memory.
+        Use if any pillar geometry changes, or to reclaim memory; also discards any cached xy cell indices.
         """
         return invalidate_corner_points(self)
 
-    def centre_point(self, cell_kji0 = None, cache_centre_array = False):
+    def centre_point(self, cell_kji0 = None, cache_centre_array = False, layer_block_size = None):
         """Returns centre point of a cell or array of centre points of all cells.
 
         Optionally cache centre points for all cells.
@@ -1497,6 +1532,8 @@ class Grid(BaseResqpy):
               centre point is required; zero based indexing
            cache_centre_array (boolean, default False): If True, or cell_kji0 is None, an array of centre points
               is generated and added as an attribute of the grid, with attribute name array_centre_point
+           layer_block_size (int, optional): if present and centre points are being generated for all cells, the
+              points are read and processed this many layers at a time, without caching the points
 
         returns:
            (x, y, z) 3 element numpy array of floats holding centre point of cell;
@@ -1507,7 +1544,10 @@ class Grid(BaseResqpy):
 
         :meta common:
         """
-        return centre_point(self, cell_kji0 = cell_kji0, cache_centre_array = cache_centre_array)
+        return centre_point(self,
+                            cell_kji0 = cell_kji0,
+                            cache_centre_array = cache_centre_array,
+                            layer_block_size = layer_block_size)
 
     def centre_point_list(self, cell_kji0s):
         """Returns centre points for a list of cells; caches centre points for all cells.
@@ -1598,6 +1638,55 @@ class Grid(BaseResqpy):
         """Searches in 2D for a cell containing point x,y in layer k0; return (j0, i0) or (None, None)."""
         return find_cell_for_point_xy(self, x, y, k0, vertical_ref = vertical_ref, local_coords = local_coords)
 
+    def find_cells_for_points_xy(self, points, k0 = 0, vertical_ref = 'top', local_coords = True):
+        """Finds the columns of cells in layer k0 containing each of an array of points, in 2D.
+
+        arguments:
+           points (numpy float array of shape (..., 2 or 3)): the points to be located; any z values are ignored
+           k0 (int, default 0): the layer in which to search
+           vertical_ref (str, default 'top'): 'top', 'base' or 'mid', determining which cell faces are searched
+           local_coords (bool, default True): if False, the points are in the grid's parent crs and are converted
+              to the grid's local crs
+
+        returns:
+           numpy int array of shape (..., 2) holding (j0, i0) for each point; -1 where a point is not within any cell
+
+        notes:
+           this is a vectorised equivalent of find_cell_for_point_xy(), for large numbers of points; a spatial index
+           is built for the layer and cached on the grid, so that subsequent searches in the layer are fast
+        """
+        return find_cells_for_points_xy(self, points, k0 = k0, vertical_ref = vertical_ref, local_coords = local_coords)
+
+    def find_cells_for_points_xyz(self, points, local_coords = True):
+        """Finds the cells containing each of an array of points, in 3D.
+
+        arguments:
+           points (numpy float array of shape (..., 3)): the points to be located
+           local_coords (bool, default True): if False, the points are in the grid's parent crs and are converted
+              to the grid's local crs
+
+        returns:
+           numpy int array of shape (..., 3) holding (k0, j0, i0) for each point; -1 where a point is not within
+           any cell
+
+        note:
+           see find_cells_for_points_xyz() in the grid._spatial_index submodule for details of the method
+        """
+        return find_cells_for_points_xyz(self, points, local_coords = local_coords)
+
+    def xy_cell_index(self, k0 = 0, vertical_ref = 'top'):
+        """Returns a bucketed xy spatial index for a layer of the grid, caching it as an attribute of the grid.
+
+        arguments:
+           k0 (int, default 0): the layer for which the index is required
+           vertical_ref (str, default 'top'): 'top', 'base' or 'mid', determining whether the cell polygons are the
+              top or base faces of the cells, or the mean of the two
+
+        note:
+           the cached indices are discarded by invalidate_corner_points()
+        """
+        return xy_cell_index(self, k0 = k0, vertical_ref = vertical_ref)
+
     def half_cell_transmissibility(grid, use_property = True, realization = None, tolerance = 1.0e-6):
         """Returns (and caches if realization is None) half cell transmissibilities for this grid.
 
@@ -1626,6 +1715,63 @@ class Grid(BaseResqpy):
                                           realization = realization,
                                           tolerance = tolerance)
 
+    def layer_blocked_transmissibility(self,
+                                       layer_block_size = 16,
+                                       realization = None,
+                                       perm_k = None,
+                                       perm_j = None,
+                                       perm_i = None,
+                                       ntg = None,
+                                       darcy_constant = None,
+                                       tolerance = 1.0e-6,
+                                       half_axis_tolerance = 1.0e-6,
+                                       dtype = np.float64,
+                                       include_half_cell_t = False,
+                                       ext_uuid = None):
+        """Computes transmissibilities a block of layers at a time, writing them directly to hdf5 as new properties.
+
+        arguments:
+           layer_block_size (int, default 16): the number of layers to process at a time
+           realization (int, optional): if present, the realization number for the new properties, and the
+              realization of the permeability and net to gross properties to use when those arrays are not passed
+           perm_k, perm_j, perm_i (array like of shape (nk, nj, ni), or float, optional): cell permeability values,
+              in mD; any which are None are found in the grid's property collection
+           ntg (array like of shape (nk, nj, ni), or float, optional): net to gross values to apply to I & J half
+              cell transmissibilities; if None, a net to gross ratio property is used if present
+           darcy_constant (float, optional): if present, the value to use for the Darcy constant; if None, the
+              grid's length units will determine the value as expected by Nexus
+           tolerance (float, default 1.0e-6): the minimum half cell transmissibility below which zero inter-cell
+              transmissibility will be set
+           half_axis_tolerance (float, default 1.0e-6): minimum half axis length below which the half cell
+              transmissibility will be deemed uncomputable
+           dtype (numpy float type, default np.float64): the element type of the hdf5 datasets
+           include_half_cell_t (bool, default False): if True, a half cell transmissibility property with
+              indexable element 'faces per cell' is also written
+           ext_uuid (uuid.UUID, optional): the uuid of the hdf5 external part to write to
+
+        returns:
+           list of uuids of the new transmissibility properties, for K, J & I faces respectively, followed by the
+           uuid of the half cell transmissibility property if include_half_cell_t is True
+
+        notes:
+           the results match those of transmissibility() with no modifier mode; input arrays may be numpy arrays,
+           memmaps or h5py datasets; properties and points are read from hdf5 one slab of layers at a time and are
+           not cached; peak memory use is therefore bounded by the layer block size
+        """
+        return layer_blocked_transmissibility(self,
+                                              layer_block_size = layer_block_size,
+                                              realization = realization,
+                                              perm_k = perm_k,
+                                              perm_j = perm_j,
+                                              perm_i = perm_i,
+                                              ntg = ntg,
+                                              darcy_constant = darcy_constant,
+                                              tolerance = tolerance,
+                                              half_axis_tolerance = half_axis_tolerance,
+                                              dtype = dtype,
+                                              include_half_cell_t = include_half_cell_t,
+                                              ext_uuid = ext_uuid)
+
     def create_column_pillar_mapping(self):
         """Creates an array attribute holding set of 4 pillar indices for each I, J column of cells.
 
@@ -1794,7 +1940,8 @@ class Grid(BaseResqpy):
                cache_centre_array = False,
                cache_volume_array = True,
                property_collection = None,
-               required_uom = None):
+               required_uom = None,
+               layer_block_size = None):
         """Returns bulk rock volume of cell or numpy array of bulk rock volumes for all cells.
 
         arguments:
@@ -1814,6 +1961,9 @@ class Grid(BaseResqpy):
            required_uom (str, optional): if present, the RESQML unit of measure (for quantity volume) that
                                  the volumes will be returned (and cached) in; if None, the grid's CRS
                                  z units cubed will be used
+           layer_block_size (int, optional): if present and volumes are being generated for all cells, the
+                                 points are read and processed this many layers at a time, without caching
+                                 the points or corner points, so that peak memory is bounded
 
         returns:
            float, being the volume of cell identified by cell_kji0;
@@ -1834,7 +1984,8 @@ class Grid(BaseResqpy):
                       cache_centre_array = cache_centre_array,
                       cache_volume_array = cache_volume_array,
                       property_collection = property_collection,
-                      required_uom = required_uom)
+                      required_uom = required_uom,
+                      layer_block_size = layer_block_size)
 
     def get_volume_uom(self, required_uom):
         """Returns a RESQML unit of measure string to use for volume quantities for the grid.
@@ -1858,7 +2009,8 @@ class Grid(BaseResqpy):
                   cache_resqml_array = True,
                   cache_cp_array = False,
                   cache_thickness_array = True,
-                  property_collection = None):
+                  property_collection = None,
+                  layer_block_size = None):
         """Returns vertical (z) thickness of cell and/or caches thicknesses for all cells.
 
         arguments:
@@ -1875,6 +2027,9 @@ class Grid(BaseResqpy):
                                  is probed for a suitable thickness or cell length property which is used
                                  preferentially to calculating thickness; if no suitable property is found,
                                  the calculation is made as if the collection were None
+           layer_block_size (int, optional): if present and thicknesses are being generated for all cells, the
+                                 points are read and processed this many layers at a time, without caching
+                                 the points or corner points, so that peak memory is bounded
 
         returns:
            float, being the thickness of cell identified by cell_kji0; or numpy float array if cell_kji0 is None
@@ -1895,7 +2050,42 @@ class Grid(BaseResqpy):
                          cache_resqml_array = cache_resqml_array,
                          cache_cp_array = cache_cp_array,
                          cache_thickness_array = cache_thickness_array,
-                         property_collection = property_collection)
+                         property_collection = property_collection,
+                         layer_block_size = layer_block_size)
+
+    def layer_blocked_cell_geometry(self,
+                                    volume_out = None,
+                                    thickness_out = None,
+                                    centre_out = None,
+                                    layer_block_size = 16,
+                                    required_uom = None):
+        """Computes cell volumes, thicknesses and/or centre points for all cells, working through blocks of layers.
+
+        arguments:
+           volume_out (array like of shape (nk, nj, ni), optional): if present, cell volumes are written to this array
+           thickness_out (array like of shape (nk, nj, ni), optional): if present, cell thicknesses are written to
+              this array
+           centre_out (array like of shape (nk, nj, ni, 3), optional): if present, cell centre points are written to
+              this array
+           layer_block_size (int, default 16): the number of layers to process at a time
+           required_uom (str, optional): the RESQML unit of measure for volumes; if None, the grid's CRS z units
+              cubed will be used
+
+        returns:
+           True if the values have been computed; False if the grid geometry is not present
+
+        notes:
+           each output may be a numpy array, a numpy memmap or an h5py dataset: anything supporting assignment to a
+           slice on the K axis; if the points are not already cached, they are read from hdf5 one slab of layers at
+           a time and are not cached; nor is the full corner points array generated; peak memory use is therefore
+           bounded by the layer block size
+        """
+        return layer_blocked_cell_geometry(self,
+                                           volume_out = volume_out,
+                                           thickness_out = thickness_out,
+                                           centre_out = centre_out,
+                                           layer_block_size = layer_block_size,
+                                           required_uom = required_uom)
 
     def fault_connection_set(self,
                              skip_inactive = True,
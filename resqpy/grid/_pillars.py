@@ -34,6 +34,11 @@ def create_column_pillar_mapping(grid):
         return grid.pillars_for_column
 
     grid.cache_all_geometry_arrays()
+    return _create_column_pillar_mapping(grid)
+
+
+def _create_column_pillar_mapping(grid):
+    """Creates the column to pillar mapping, assuming any split pillar arrays are already cached."""
 
     grid.pillars_for_column = np.empty((grid.nj, grid.ni, 2, 2), dtype = int)
     ni_plus_1 = grid.ni + 1
@@ -15,6 +15,7 @@ import resqpy.olio.xml_et as rqet
 import resqpy.property as rprop
 import resqpy.weights_and_measures as wam
 import resqpy.grid._defined_geometry as grr_dg
+import resqpy.grid._pillars as grr_p
 
 
 def set_cached_points_from_property(grid,
@@ -133,13 +134,15 @@ def set_cached_points_from_property(grid,
         grid.active_property_uuid = active_property_uuid
 
 
-def point_raw(grid, index = None, points_root = None, cache_array = True):
+def point_raw(grid, index = None, points_root = None, cache_array = True, memmap = False):
     """Returns element from points data, indexed as in the hdf5 file; can optionally be used to cache points data.
 
     arguments:
        index (2 or 3 integers, optional): if not None, the index into the raw points data for the point of interest
        points_root (optional): the xml node holding the points data
        cache_array (boolean, default True): if True, the raw points data is cached in memory as a side effect
+       memmap (boolean, default False): if True and cache_array is True, the cached points data is a read only
+          memmap onto the hdf5 file, if the dataset is stored contiguously
 
     returns:
        (x, y, z) of selected point as a 3 element numpy vector, or None if index is None
@@ -183,7 +186,8 @@ def point_raw(grid, index = None, points_root = None, cache_array = True):
                                             cache_array = cache_array,
                                             object = grid,
                                             array_attribute = 'points_cached',
-                                            required_shape = required_shape)
+                                            required_shape = required_shape,
+                                            memmap = memmap)
     except Exception:
         log.error('hdf5 points failure for index: ' + str(index))
         raise
@@ -234,12 +238,14 @@ def point(grid, cell_kji0 = None, corner_index = np.zeros(3, dtype = 'int'), poi
         return grid.point_raw(index = index, points_root = p_root, cache_array = cache_array)
 
 
-def points_ref(grid, masked = True):
+def points_ref(grid, masked = True, memmap = False):
     """Returns an in-memory numpy array containing the xyz data for points used in the grid geometry.
 
-    argument:
+    arguments:
        masked (boolean, default True): if True, a masked array is returned with NaN points masked out;
           if False, a simple (unmasked) numpy array is returned
+       memmap (boolean, default False): if True and the points are not already cached, they are cached as a
+          read only memmap onto the hdf5 file, if the dataset is stored contiguously
 
     returns:
        numpy array or masked array of float, of shape (nk + k_gaps + 1, nj + 1, ni + 1, 3) or (nk + k_gaps + 1, np, 3)
@@ -256,7 +262,7 @@ def points_ref(grid, masked = True):
     """
 
     if grid.points_cached is None:
-        grid.point_raw(cache_array = True)
+        grid.point_raw(cache_array = True, memmap = memmap)
         if grid.points_cached is None:
             return None
     if not masked:
@@ -695,9 +701,18 @@ def z_corner_point_depths(grid, order = 'cellular'):
     return z_cp
 
 
-def corner_points(grid, cell_kji0 = None, points_root = None, cache_resqml_array = True, cache_cp_array = False):
+def corner_points(grid,
+                  cell_kji0 = None,
+                  points_root = None,
+                  cache_resqml_array = True,
+                  cache_cp_array = False,
+                  dtype = None):
     """Returns a numpy array of corner points for a single cell or the whole grid.
 
+    arguments:
+       dtype (numpy float dtype, optional): if present, the element type used when the full corner points array
+          is generated and cached, eg. np.float32 to halve memory use; ignored if the array is already cached
+
     notes:
        if cell_kji0 is not None, a 4D array of shape (2, 2, 2, 3) holding single cell corner points in logical order
        [kp, jp, ip, xyz] is returned; if cell_kji0 is None, a pagoda style 7D array [k, j, i, kp, jp, ip, xyz] is
@@ -705,7 +720,8 @@ def corner_points(grid, cell_kji0 = None, points_root = None, cache_resqml_array
        the ordering of the corner points is in the logical order, which is not the same as that used by Nexus CORP data;
        olio.grid_functions.resequence_nexus_corp() can be used to switch back and forth between this pagoda ordering
        and Nexus corp ordering;
-       this is the usual way to access full corner points for cells where working with native resqml data is undesirable
+       this is the usual way to access full corner points for cells where working with native resqml data is undesirable;
+       see also corner_points_for_layers() for generating corner points for a range of layers without caching
 
     :meta common:
     """
@@ -743,70 +759,16 @@ def corner_points(grid, cell_kji0 = None, points_root = None, cache_resqml_array
     if cache_resqml_array:
         grid.point_raw(points_root = points_root, cache_array = True)
     if cache_cp_array:
-        grid.array_corner_points = np.zeros((grid.nk, grid.nj, grid.ni, 2, 2, 2, 3))
-        points = grid.points_ref()
+        points = grid.points_ref(masked = False)
         if points is None:
             return None  # geometry not present
-        if grid.has_split_coordinate_lines:
-            grid.create_column_pillar_mapping()
-            # todo: replace j,i for loops with numpy broadcasting
-            if grid.k_gaps:
-                for j in range(grid.nj):
-                    for i in range(grid.ni):
-                        grid.array_corner_points[:, j, i, 0, 0, 0, :] = points[grid.k_raw_index_array,
-                                                                               grid.pillars_for_column[j, i, 0, 0], :]
-                        grid.array_corner_points[:, j, i, 1, 0, 0, :] = points[grid.k_raw_index_array + 1,
-                                                                               grid.pillars_for_column[j, i, 0, 0], :]
-                        grid.array_corner_points[:, j, i, 0, 1, 0, :] = points[grid.k_raw_index_array,
-                                                                               grid.pillars_for_column[j, i, 1, 0], :]
-                        grid.array_corner_points[:, j, i, 1, 1, 0, :] = points[grid.k_raw_index_array + 1,
-                                                                               grid.pillars_for_column[j, i, 1, 0], :]
-                        grid.array_corner_points[:, j, i, 0, 0, 1, :] = points[grid.k_raw_index_array,
-                                                                               grid.pillars_for_column[j, i, 0, 1], :]
-                        grid.array_corner_points[:, j, i, 1, 0, 1, :] = points[grid.k_raw_index_array + 1,
-                                                                               grid.pillars_for_column[j, i, 0, 1], :]
-                        grid.array_corner_points[:, j, i, 0, 1, 1, :] = points[grid.k_raw_index_array,
-                                                                               grid.pillars_for_column[j, i, 1, 1], :]
-                        grid.array_corner_points[:, j, i, 1, 1, 1, :] = points[grid.k_raw_index_array + 1,
-                                                                               grid.pillars_for_column[j, i, 1, 1], :]
-            else:
-                for j in range(grid.nj):
-                    for i in range(grid.ni):
-                        grid.array_corner_points[:, j, i, 0, 0, 0, :] = points[:-1, grid.pillars_for_column[j, i, 0,
-                                                                                                            0], :]
-                        grid.array_corner_points[:, j, i, 1, 0, 0, :] = points[1:, grid.pillars_for_column[j, i, 0,
-                                                                                                           0], :]
-                        grid.array_corner_points[:, j, i, 0, 1, 0, :] = points[:-1, grid.pillars_for_column[j, i, 1,
-                                                                                                            0], :]
-                        grid.array_corner_points[:, j, i, 1, 1, 0, :] = points[1:, grid.pillars_for_column[j, i, 1,
-                                                                                                           0], :]
-                        grid.array_corner_points[:, j, i, 0, 0, 1, :] = points[:-1, grid.pillars_for_column[j, i, 0,
-                                                                                                            1], :]
-                        grid.array_corner_points[:, j, i, 1, 0, 1, :] = points[1:, grid.pillars_for_column[j, i, 0,
-                                                                                                           1], :]
-                        grid.array_corner_points[:, j, i, 0, 1, 1, :] = points[:-1, grid.pillars_for_column[j, i, 1,
-                                                                                                            1], :]
-                        grid.array_corner_points[:, j, i, 1, 1, 1, :] = points[1:, grid.pillars_for_column[j, i, 1,
-                                                                                                           1], :]
-        else:
-            if grid.k_gaps:
-                grid.array_corner_points[:, :, :, 0, 0, 0, :] = points[grid.k_raw_index_array, :-1, :-1, :]
-                grid.array_corner_points[:, :, :, 1, 0, 0, :] = points[grid.k_raw_index_array + 1, :-1, :-1, :]
-                grid.array_corner_points[:, :, :, 0, 1, 0, :] = points[grid.k_raw_index_array, 1:, :-1, :]
-                grid.array_corner_points[:, :, :, 1, 1, 0, :] = points[grid.k_raw_index_array + 1, 1:, :-1, :]
-                grid.array_corner_points[:, :, :, 0, 0, 1, :] = points[grid.k_raw_index_array, :-1, 1:, :]
-                grid.array_corner_points[:, :, :, 1, 0, 1, :] = points[grid.k_raw_index_array + 1, :-1, 1:, :]
-                grid.array_corner_points[:, :, :, 0, 1, 1, :] = points[grid.k_raw_index_array, 1:, 1:, :]
-                grid.array_corner_points[:, :, :, 1, 1, 1, :] = points[grid.k_raw_index_array + 1, 1:, 1:, :]
-            else:
-                grid.array_corner_points[:, :, :, 0, 0, 0, :] = points[:-1, :-1, :-1, :]
-                grid.array_corner_points[:, :, :, 1, 0, 0, :] = points[1:, :-1, :-1, :]
-                grid.array_corner_points[:, :, :, 0, 1, 0, :] = points[:-1, 1:, :-1, :]
-                grid.array_corner_points[:, :, :, 1, 1, 0, :] = points[1:, 1:, :-1, :]
-                grid.array_corner_points[:, :, :, 0, 0, 1, :] = points[:-1, :-1, 1:, :]
-                grid.array_corner_points[:, :, :, 1, 0, 1, :] = points[1:, :-1, 1:, :]
-                grid.array_corner_points[:, :, :, 0, 1, 1, :] = points[:-1, 1:, 1:, :]
-                grid.array_corner_points[:, :, :, 1, 1, 1, :] = points[1:, 1:, 1:, :]
+        acp = np.empty((grid.nk, grid.nj, grid.ni, 2, 2, 2, 3), dtype = float if dtype is None else dtype)
+        # fill in blocks of layers to avoid full size temporary arrays
+        k_block = max(1, 1000000 // (grid.nj * grid.ni))
+        for k0 in range(0, grid.nk, k_block):
+            k0_end = min(k0 + k_block, grid.nk)
+            _fill_corner_points_for_layers(grid, points, k0, k0_end, acp[k0:k0_end])
+        grid.array_corner_points = acp
     if cell_kji0 is None:
         return grid.array_corner_points
     if not grr_dg.geometry_defined_for_all_cells(grid):
@@ -818,16 +780,112 @@ def corner_points(grid, cell_kji0 = None, points_root = None, cache_resqml_array
     return cp
 
 
+def corner_points_for_layers(grid, k0_start = 0, k0_end = None, dtype = None, points_root = None):
+    """Returns a numpy array of corner points for a range of layers, without caching the full corner points array.
+
+    arguments:
+       k0_start (int, default 0): the first layer for which corner points are required
+       k0_end (int, optional): one more than the last layer for which corner points are required; defaults to nk
+       dtype (numpy float dtype, optional): the element type of the returned array; defaults to float
+       points_root (optional): the xml node holding the points data
+
+    returns:
+       numpy float array of shape (k0_end - k0_start, nj, ni, 2, 2, 2, 3) in the same pagoda ordering as corner_points()
+
+    notes:
+       if the grid points are not already cached, only the points for the range of layers are read from hdf5,
+       and they are not cached; if the full corner points array is already cached, the returned array is a slice
+       of it (or a copy, if dtype differs); this function allows large grids to be processed in blocks of layers
+    """
+
+    if k0_end is None:
+        k0_end = grid.nk
+    assert 0 <= k0_start < k0_end <= grid.nk
+    if hasattr(grid, 'array_corner_points'):
+        cp = grid.array_corner_points[k0_start:k0_end]
+        return cp if dtype is None else cp.astype(dtype, copy = False)
+    points, k_raw_offset = _points_for_layers(grid, k0_start, k0_end, points_root = points_root)
+    if points is None:
+        return None  # geometry not present
+    cp = np.empty((k0_end - k0_start, grid.nj, grid.ni, 2, 2, 2, 3), dtype = float if dtype is None else dtype)
+    _fill_corner_points_for_layers(grid, points, k0_start, k0_end, cp, k_raw_offset = k_raw_offset)
+    return cp
+
+
+def _points_for_layers(grid, k0_start, k0_end, points_root = None):
+    """Returns the slab of raw points covering a range of layers, and the raw k index of the first layer of the slab.
+
+    note:
+       if the points are not cached, the slab is read from hdf5 and the full points array is not cached
+    """
+
+    if grid.k_gaps:
+        k_raw_start = grid.k_raw_index_array[k0_start]
+        k_raw_end = grid.k_raw_index_array[k0_end - 1] + 2
+    else:
+        k_raw_start = k0_start
+        k_raw_end = k0_end + 1
+    if grid.points_cached is None:
+        p_root = grid.resolve_geometry_child('Points', child_node = points_root)
+        h5_key_pair = None if p_root is None else grid.model.h5_uuid_and_path_for_node(p_root, tag = 'Coordinates')
+        if h5_key_pair is not None:
+            slab = grid.model.h5_array_slice(h5_key_pair, (slice(k_raw_start, k_raw_end),))
+            if grid.has_split_coordinate_lines:
+                return slab.reshape((k_raw_end - k_raw_start, -1, 3)), k_raw_start
+            return slab.reshape((k_raw_end - k_raw_start, grid.nj + 1, grid.ni + 1, 3)), k_raw_start
+    points = grid.points_ref(masked = False)
+    if points is None:
+        return None, None  # geometry not present
+    return points[k_raw_start:k_raw_end], k_raw_start
+
+
+def _pillars_for_column(grid):
+    """Returns the column to pillar mapping, creating it if needed without caching the full points array."""
+
+    if grid.points_cached is None and getattr(grid, 'pillars_for_column', None) is None:
+        # avoid caching the full points array as a side effect of creating the column to pillar mapping
+        grid._cache_split_pillar_arrays()
+        grr_p._create_column_pillar_mapping(grid)
+    else:
+        grid.create_column_pillar_mapping()
+    return grid.pillars_for_column
+
+
+def _fill_corner_points_for_layers(grid, points, k0_start, k0_end, cp, k_raw_offset = 0):
+    """Populates cp, of shape (k0_end - k0_start, nj, ni, 2, 2, 2, 3), with corner points from the points array.
+
+    note:
+       k_raw_offset is the raw k index of the first layer in points, when points is a slab of the full points array
+    """
+
+    if grid.k_gaps:
+        k_top = grid.k_raw_index_array[k0_start:k0_end] - k_raw_offset
+    else:
+        k_top = np.arange(k0_start - k_raw_offset, k0_end - k_raw_offset, dtype = int)
+    if grid.has_split_coordinate_lines:
+        # pillars_for_column has shape (nj, ni, 2, 2) with the last two axes being jp, ip
+        pfc = _pillars_for_column(grid)
+        for kp in range(2):
+            cp[:, :, :, kp] = points[k_top + kp][:, pfc]
+    else:
+        for kp in range(2):
+            for jp in range(2):
+                for ip in range(2):
+                    cp[:, :, :, kp, jp, ip] = points[k_top + kp, jp:grid.nj + jp, ip:grid.ni + ip]
+
+
 def invalidate_corner_points(grid):
     """Deletes cached copy of corner points, if present.
 
-    Use if any pillar geometry changes, or to reclaim memory.
+    Use if any pillar geometry changes, or to reclaim memory; also discards any cached xy cell indices.
     """
     if hasattr(grid, 'array_corner_points'):
         delattr(grid, 'array_corner_points')
+    if hasattr(grid, 'xy_cell_index_cache'):
+        delattr(grid, 'xy_cell_index_cache')
 
 
-def centre_point(grid, cell_kji0 = None, cache_centre_array = False):
+def centre_point(grid, cell_kji0 = None, cache_centre_array = False, layer_block_size = None):
     """Returns centre point of a cell or array of centre points of all cells.
 
     Optionally cache centre points for all cells.
@@ -837,6 +895,8 @@ def centre_point(grid, cell_kji0 = None, cache_centre_array = False):
           centre point is required; zero based indexing
        cache_centre_array (boolean, default False): If True, or cell_kji0 is None, an array of centre points
           is generated and added as an attribute of the grid, with attribute name array_centre_point
+       layer_block_size (int, optional): if present and centre points are being generated for all cells, the
+          points are read and processed this many layers at a time, without caching the points
 
     returns:
        (x, y, z) 3 element numpy array of floats holding centre point of cell;
@@ -859,6 +919,17 @@ def centre_point(grid, cell_kji0 = None, cache_centre_array = False):
     if cache_centre_array:
         # todo: turn off nan warnings
         grid.array_centre_point = np.empty((grid.nk, grid.nj, grid.ni, 3))
+        if layer_block_size is not None and not hasattr(grid, 'array_corner_points'):
+            for k0 in range(0, grid.nk, layer_block_size):
+                k0_end = min(k0 + layer_block_size, grid.nk)
+                cp = corner_points_for_layers(grid, k0, k0_end)
+                if cp is None:
+                    delattr(grid, 'array_centre_point')
+                    return None  # geometry not present
+                grid.array_centre_point[k0:k0_end] = 0.125 * np.sum(cp, axis = (3, 4, 5))
+            if cell_kji0 is None:
+                return grid.array_centre_point
+            return grid.array_centre_point[tuple(cell_kji0)]
         points = grid.points_ref(masked = False)  # todo: think about masking
         if hasattr(grid, 'array_corner_points'):
             grid.array_centre_point = 0.125 * np.sum(grid.array_corner_points,
@@ -315,7 +315,7 @@ class RegularGrid(grr_g.Grid):
 
     # override of Grid methods
 
-    def point_raw(self, index = None, points_root = None, cache_array = True):
+    def point_raw(self, index = None, points_root = None, cache_array = True, memmap = False):
         """Returns element from points data, indexed as corner point (k0, j0, i0).
 
         Can optionally be used to cache points data.
@@ -324,6 +324,7 @@ class RegularGrid(grr_g.Grid):
            index (3 integers, optional): if not None, the index into the raw points data for the point of interest
            points_root (ignored)
            cache_array (boolean, default True): if True, the raw points data is cached in memory as a side effect
+           memmap (ignored): regular grid points are generated in memory
 
         returns:
            (x, y, z) of selected point as a 3 element numpy vector, or None if index is None
@@ -386,7 +387,12 @@ class RegularGrid(grr_g.Grid):
 
         return half_t
 
-    def corner_points(self, cell_kji0 = None, points_root = None, cache_resqml_array = None, cache_cp_array = False):
+    def corner_points(self,
+                      cell_kji0 = None,
+                      points_root = None,
+                      cache_resqml_array = None,
+                      cache_cp_array = False,
+                      dtype = None):
         """Returns a numpy array of corner points for a single cell or the whole grid.
 
         arguments:
@@ -396,6 +402,7 @@ class RegularGrid(grr_g.Grid):
             cache_resqml_array (ignored): not used; exists for signature compatibility with parent class method
             cache_cp_array (bool, default False): if True (or cell_kji0 is None), the full corner point array is
                 cached as an attribute of the grid
+            dtype (numpy float dtype, optional): if present, the element type of the cached full corner point array
 
         notes:
            if cell_kji0 is not None, a 4D array of shape (2, 2, 2, 3) holding single cell corner points in logical order
@@ -420,7 +427,8 @@ class RegularGrid(grr_g.Grid):
             return super().corner_points(cell_kji0 = cell_kji0,
                                          points_root = points_root,
                                          cache_resqml_array = cache_resqml_array,
-                                         cache_cp_array = cache_cp_array)
+                                         cache_cp_array = cache_cp_array,
+                                         dtype = dtype)
 
         if cache_cp_array:
             acp = np.zeros((self.nk, self.nj, self.ni, 2, 2, 2, 3), dtype = float)
@@ -450,6 +458,8 @@ class RegularGrid(grr_g.Grid):
             acp[:, :, :, :, 1, :, 2] = acp[:, :, :, :, 0, :, 2]
             # translate by regular grid origin
             acp[:] += np.array(self.block_origin, dtype = float).reshape((1, 1, 1, 1, 1, 1, 3))
+            if dtype is not None:
+                acp = acp.astype(dtype, copy = False)
             self.array_corner_points = acp
             if cell_kji0 is None:
                 return acp
@@ -0,0 +1,287 @@
+"""Submodule containing a bucketed xy spatial index of grid cells, for fast batched point in cell lookups."""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+import numpy as np
+
+import resqpy.olio.point_inclusion as pip
+
+# order of (jp, ip) corners around the perimeter of a cell face, used for the xy polygons
+_perimeter_jp = np.array((0, 0, 1, 1), dtype = int)
+_perimeter_ip = np.array((0, 1, 1, 0), dtype = int)
+
+
+class _XyCellIndex():
+    """Bucketed xy spatial index of the cells of one layer of a grid."""
+
+    def __init__(self, cp_layer, vertical_ref):
+        """Builds the index from corner points for a single layer, of shape (nj, ni, 2, 2, 2, 3).
+
+        note:
+           vertical_ref may be 'top', 'base' or 'mid' for cell polygons used in 2D searches, or 'all' in which case
+           the buckets are populated using the xy bounding box of all eight corners of each cell
+        """
+
+        self.nj, self.ni = cp_layer.shape[:2]
+        if vertical_ref == 'all':
+            self.quads = None
+            cell_xy = cp_layer[..., :2].reshape((-1, 8, 2))
+        else:
+            if vertical_ref == 'mid':
+                face = 0.5 * (cp_layer[:, :, 0] + cp_layer[:, :, 1])
+            else:
+                face = cp_layer[:, :, 1 if vertical_ref == 'base' else 0]
+            # xy polygons of shape (nj * ni, 4, 2)
+            self.quads = face[:, :, _perimeter_jp, _perimeter_ip, :2].reshape((-1, 4, 2))
+            cell_xy = self.quads
+        valid = np.logical_not(np.any(np.isnan(cell_xy), axis = (1, 2)))
+        cells = np.where(valid)[0]
+        self.bucket_size = 1.0
+        self.origin = np.zeros(2)
+        self.n_buckets_xy = np.ones(2, dtype = int)
+        self.bucket_start = np.zeros(2, dtype = int)
+        self.bucket_cells = np.zeros(0, dtype = int)
+        if len(cells) == 0:
+            return
+        c_min = np.min(cell_xy[cells], axis = 1)
+        c_max = np.max(cell_xy[cells], axis = 1)
+        self.origin = np.min(c_min, axis = 0)
+        extent = np.max(c_max, axis = 0) - self.origin
+        # aim for buckets of about the typical cell size, whilst limiting the total number of buckets
+        size = float(np.median(np.max(c_max - c_min, axis = 1)))
+        min_size = np.sqrt(extent[0] * extent[1] / (4.0 * len(cells)))
+        self.bucket_size = max(size, min_size, 1.0e-6 * max(1.0, float(np.max(extent))))
+        self.n_buckets_xy = (extent / self.bucket_size).astype(int) + 1
+        b_min = self._bucket_xy(c_min)
+        b_max = self._bucket_xy(c_max)
+        # expand each cell into the buckets overlapped by its bounding box
+        nx = b_max[:, 0] - b_min[:, 0] + 1
+        ny = b_max[:, 1] - b_min[:, 1] + 1
+        counts = nx * ny
+        cell_rep = np.repeat(np.arange(len(cells)), counts)
+        local = np.arange(len(cell_rep)) - np.repeat(np.cumsum(counts) - counts, counts)
+        by, bx = divmod(local, nx[cell_rep])
+        buckets = (b_min[cell_rep, 1] + by) * self.n_buckets_xy[0] + b_min[cell_rep, 0] + bx
+        order = np.argsort(buckets, kind = 'stable')
+        self.bucket_cells = cells[cell_rep[order]]
+        self.bucket_start = np.searchsorted(buckets[order], np.arange(self.n_buckets_xy[0] * self.n_buckets_xy[1] + 1))
+
+    def _bucket_xy(self, xy):
+        """Returns int array of bucket (x, y) indices for xy points, which must be within the indexed extent."""
+        b = np.floor((xy - self.origin) / self.bucket_size).astype(int)
+        return np.clip(b, 0, self.n_buckets_xy - 1)
+
+    def candidates(self, xy):
+        """Returns a pair of int arrays: point indices and flat cell indices of cells in the buckets of the points."""
+
+        with np.errstate(invalid = 'ignore'):
+            b = np.floor((xy - self.origin) / self.bucket_size)
+            in_extent = np.all(np.logical_and(b >= 0, b < self.n_buckets_xy), axis = 1)
+        p_index = np.where(in_extent)[0]
+        b = b[p_index].astype(int)
+        buckets = b[:, 1] * self.n_buckets_xy[0] + b[:, 0]
+        starts = self.bucket_start[buckets]
+        counts = self.bucket_start[buckets + 1] - starts
+        p_rep = np.repeat(p_index, counts)
+        local = np.arange(len(p_rep)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return p_rep, self.bucket_cells[np.repeat(starts, counts) + local]
+
+    def find(self, xy, chunk_size = 1000000):
+        """Returns int array of flat cell indices (j * ni + i) containing each xy point, -1 where none found."""
+
+        assert self.quads is not None
+        n = len(xy)
+        result = np.full(n, -1, dtype = int)
+        for start in range(0, n, chunk_size):
+            end = min(start + chunk_size, n)
+            p_rep, candidates = self.candidates(xy[start:end])
+            inside = pip.pip_paired_cn(xy[start:end][p_rep], self.quads[candidates])
+            result[start:end] = _first_hits(end - start, p_rep[inside], candidates[inside])
+        return result
+
+
+def xy_cell_index(grid, k0 = 0, vertical_ref = 'top'):
+    """Returns a bucketed xy spatial index for a layer of the grid, caching it as an attribute of the grid.
+
+    arguments:
+       k0 (int, default 0): the layer for which the index is required
+       vertical_ref (str, default 'top'): 'top', 'base' or 'mid', determining whether the cell polygons are the
+          top or base faces of the cells, or the mean of the two
+
+    returns:
+       an index object, which is cached in the grid attribute dictionary xy_cell_index_cache
+
+    notes:
+       the index is derived from the corner points of the layer, in the grid's local crs; the cached indices are
+       discarded by invalidate_corner_points()
+    """
+
+    assert vertical_ref in ('top', 'base', 'mid')
+    if not hasattr(grid, 'xy_cell_index_cache'):
+        grid.xy_cell_index_cache = {}
+    key = (k0, vertical_ref)
+    index = grid.xy_cell_index_cache.get(key)
+    if index is None:
+        cp = grid.corner_points_for_layers(k0, k0 + 1)
+        if cp is None:
+            return None  # geometry not present
+        index = _XyCellIndex(cp[0], vertical_ref)
+        grid.xy_cell_index_cache[key] = index
+    return index
+
+
+def find_cells_for_points_xy(grid, points, k0 = 0, vertical_ref = 'top', local_coords = True):
+    """Finds the columns of cells in layer k0 containing each of an array of points, in 2D.
+
+    arguments:
+       points (numpy float array of shape (..., 2 or 3)): the points to be located; any z values are ignored
+       k0 (int, default 0): the layer in which to search
+       vertical_ref (str, default 'top'): 'top', 'base' or 'mid', determining which cell faces are searched
+       local_coords (bool, default True): if False, the points are in the grid's parent crs and are converted
+          to the grid's local crs
+
+    returns:
+       numpy int array of shape (..., 2) holding (j0, i0) for each point; -1 where a point is not within any cell
+
+    notes:
+       this is a vectorised equivalent of find_cell_for_point_xy(), for large numbers of points; a spatial index
+       is built for the layer and cached on the grid, so that subsequent searches in the layer are fast
+    """
+
+    points = np.asarray(points, dtype = float)
+    assert points.shape[-1] in (2, 3)
+    result_shape = points.shape[:-1] + (2,)
+    xy = _local_xy(grid, points, local_coords)
+    index = xy_cell_index(grid, k0 = k0, vertical_ref = vertical_ref)
+    if index is None:
+        return np.full(result_shape, -1, dtype = int)
+    found = index.find(xy)
+    return _ji_from_flat(found, grid.ni).reshape(result_shape)
+
+
+def find_cells_for_points_xyz(grid, points, local_coords = True):
+    """Finds the cells containing each of an array of points, in 3D.
+
+    arguments:
+       points (numpy float array of shape (..., 3)): the points to be located
+       local_coords (bool, default True): if False, the points are in the grid's parent crs and are converted
+          to the grid's local crs
+
+    returns:
+       numpy int array of shape (..., 3) holding (k0, j0, i0) for each point; -1 where a point is not within any cell
+
+    notes:
+       each layer is searched in turn, for those points not already located and within the z range of the layer;
+       candidate cells are found from a bucketed index of the xy bounding boxes of the cells, then the point is tested
+       for inclusion in the 24 tetrahedra formed between the cell centre and triangles of its faces, the same
+       decomposition as is used for cell volumes; the per layer spatial indices are not cached; where a point is on
+       a face shared by two cells, the first found is returned
+    """
+
+    points = np.asarray(points, dtype = float)
+    assert points.shape[-1] == 3
+    result_shape = points.shape
+    p = points.reshape((-1, 3)).copy()
+    if not local_coords:
+        grid.global_to_local_crs(p, crs_uuid = grid.crs_uuid)
+    result = np.full((len(p), 3), -1, dtype = int)
+    for k0 in range(grid.nk):
+        cp = grid.corner_points_for_layers(k0, k0 + 1)
+        if cp is None:
+            break  # geometry not present
+        cp = cp[0]
+        with np.errstate(invalid = 'ignore'):
+            z_min = np.nanmin(cp[..., 2])
+            z_max = np.nanmax(cp[..., 2])
+            remaining = np.where(np.logical_and(result[:, 0] < 0, np.logical_and(p[:, 2] >= z_min,
+                                                                                 p[:, 2] <= z_max)))[0]
+        if len(remaining) == 0:
+            continue
+        index = _XyCellIndex(cp, 'all')
+        flat_cp = cp.reshape((-1, 2, 2, 2, 3))
+        p_rep, candidates = index.candidates(p[remaining, :2])
+        # discard candidates where the point is outside the cell's bounding box
+        c_cp = flat_cp[candidates].reshape((-1, 8, 3))
+        pc = p[remaining][p_rep]
+        with np.errstate(invalid = 'ignore'):
+            in_box = np.all(np.logical_and(pc >= np.min(c_cp, axis = 1), pc <= np.max(c_cp, axis = 1)), axis = 1)
+        p_rep = p_rep[in_box]
+        candidates = candidates[in_box]
+        inside = _points_in_cells(pc[in_box], flat_cp[candidates])
+        found = _first_hits(len(remaining), p_rep[inside], candidates[inside])
+        located = found >= 0
+        hit = remaining[located]
+        result[hit, 0] = k0
+        result[hit, 1], result[hit, 2] = divmod(found[located], grid.ni)
+    return result.reshape(result_shape)
+
+
+def _local_xy(grid, points, local_coords):
+    """Returns a 2D float array of shape (N, 2) of xy values in the grid's local crs."""
+
+    if local_coords:
+        return points.reshape((-1, points.shape[-1]))[:, :2]
+    p = np.zeros((int(np.prod(points.shape[:-1])), 3))
+    p[:, :points.shape[-1]] = points.reshape((-1, points.shape[-1]))
+    grid.global_to_local_crs(p, crs_uuid = grid.crs_uuid)
+    return p[:, :2]
+
+
+def _ji_from_flat(flat, ni):
+    """Returns an int array of shape (N, 2) of (j0, i0) from flat column indices, retaining -1 for not found."""
+
+    ji = np.full((len(flat), 2), -1, dtype = int)
+    found = flat >= 0
+    ji[found, 0], ji[found, 1] = divmod(flat[found], ni)
+    return ji
+
+
+def _first_hits(n, p_hit, c_hit):
+    """Returns int array of length n holding the first cell hit for each point, or -1 where there is none."""
+
+    result = np.full(n, -1, dtype = int)
+    p_first, first = np.unique(p_hit, return_index = True)
+    result[p_first] = c_hit[first]
+    return result
+
+
+# the six faces of a cell, each as (kp, jp, ip) index arrays for the four corners in perimeter order
+_face_corners = ((np.zeros(4, dtype = int), _perimeter_jp, _perimeter_ip), (np.ones(4, dtype = int), _perimeter_jp,
+                                                                            _perimeter_ip),
+                 (_perimeter_jp, np.zeros(4, dtype = int), _perimeter_ip), (_perimeter_jp, np.ones(4, dtype = int),
+                                                                            _perimeter_ip),
+                 (_perimeter_jp, _perimeter_ip, np.zeros(4, dtype = int)), (_perimeter_jp, _perimeter_ip,
+                                                                            np.ones(4, dtype = int)))
+
+
+def _points_in_cells(p, cp):
+    """Returns bool array, True where point p (N, 3) is within paired cell with corner points cp (N, 2, 2, 2, 3)."""
+
+    inside = np.zeros(len(p), dtype = bool)
+    if len(p) == 0:
+        return inside
+    centre = np.mean(cp, axis = (1, 2, 3))
+    for kp, jp, ip in _face_corners:
+        face = cp[:, kp, jp, ip]
+        face_centre = np.mean(face, axis = 1)
+        for edge in range(4):
+            inside = np.logical_or(inside, _points_in_tetras(p, centre, face_centre, face[:, edge - 1], face[:, edge]))
+    return inside
+
+
+def _points_in_tetras(p, t0, t1, t2, t3):
+    """Returns bool array, True where each point is within (or on the surface of) its paired tetrahedron."""
+
+    def vol6(a, b, c, d):
+        return np.sum((b - a) * np.cross(c - a, d - a), axis = -1)
+
+    v = vol6(t0, t1, t2, t3)
+    tolerance = -1.0e-9 * np.abs(v)
+    with np.errstate(invalid = 'ignore'):
+        s = np.sign(v)
+        inside = v != 0.0
+        for sub_v in (vol6(p, t1, t2, t3), vol6(t0, p, t2, t3), vol6(t0, t1, p, t3), vol6(t0, t1, t2, p)):
+            inside = np.logical_and(inside, s * sub_v >= tolerance)
+    return inside
@@ -10,6 +10,11 @@ log = logging.getLogger(__name__)
 import numpy as np
 
 import resqpy.olio.transmission as rqtr
+import resqpy.olio.uuid as bu
+import resqpy.olio.write_hdf5 as rwh5
+import resqpy.property as rprop
+
+import resqpy.grid._points_functions as grr_pf
 
 always_write_pillar_geometry_is_defined_array = False
 always_write_cell_geometry_is_defined_array = False
@@ -65,6 +70,7 @@ def transmissibility(grid, tolerance = 1.0e-6, use_tr_properties = True, realiza
     # todo: improve handling of units: check uom for half cell transmissibility property and for absolute modifiers
 
     k_tr = j_tr = i_tr = None
+    pc = None
 
     if realization is None:
         if hasattr(grid, 'array_k_transmissibility') and grid.array_k_transmissibility is not None:
@@ -181,10 +187,7 @@ def __set_i_transmissibility(grid, half_t, i_tr, modifier_mode, pc, realization,
     i_tr = np.zeros((grid.nk, grid.nj, grid.ni + 1))
     slice_a = half_t[:, :, :-1, 2, 1]  # note: internal faces only
     slice_b = half_t[:, :, 1:, 2, 0]
-    internal_zero_mask = np.logical_or(np.logical_or(np.isnan(slice_a), slice_a < tolerance),
-                                       np.logical_or(np.isnan(slice_b), slice_b < tolerance))
-    if split_column_edges_i is not None:
-        internal_zero_mask[:, split_column_edges_i] = True
+    internal_zero_mask = __internal_zero_mask(slice_a, slice_b, tolerance, column_mask = split_column_edges_i)
     tr_mult = None
     if modifier_mode == 'faces multiplier':
         tr_mult = pc.single_array_ref(property_kind = 'transmissibility multiplier',
@@ -225,7 +228,7 @@ def __set_i_transmissibility(grid, half_t, i_tr, modifier_mode, pc, realization,
             assert tr_abs.shape == (grid.nk, grid.nj, grid.ni + 1)
             internal_zero_mask = np.logical_or(internal_zero_mask, tr_abs[:, :, 1:-1] <= 0.0)
             tr_abs_r = np.where(np.logical_or(np.isinf(tr_abs), np.isnan(tr_abs)), 0.0, 1.0 / tr_abs)
-    i_tr[:, :, 1:-1] = np.where(internal_zero_mask, 0.0, tr_mult / ((1.0 / slice_a) + tr_abs_r + (1.0 / slice_b)))
+    i_tr[:, :, 1:-1] = __combined_transmissibility(slice_a, slice_b, internal_zero_mask, tr_mult, tr_abs_r)
     return i_tr
 
 
@@ -233,10 +236,7 @@ def __set_j_transmissibility(grid, half_t, j_tr, modifier_mode, pc, realization,
     j_tr = np.zeros((grid.nk, grid.nj + 1, grid.ni))
     slice_a = half_t[:, :-1, :, 1, 1]  # note: internal faces only
     slice_b = half_t[:, 1:, :, 1, 0]
-    internal_zero_mask = np.logical_or(np.logical_or(np.isnan(slice_a), slice_a < tolerance),
-                                       np.logical_or(np.isnan(slice_b), slice_b < tolerance))
-    if split_column_edges_j is not None:
-        internal_zero_mask[:, split_column_edges_j] = True
+    internal_zero_mask = __internal_zero_mask(slice_a, slice_b, tolerance, column_mask = split_column_edges_j)
     tr_mult = None
     if modifier_mode == 'faces multiplier':
         tr_mult = pc.single_array_ref(property_kind = 'transmissibility multiplier',
@@ -278,7 +278,7 @@ def __set_j_transmissibility(grid, half_t, j_tr, modifier_mode, pc, realization,
             assert tr_abs.shape == (grid.nk, grid.nj + 1, grid.ni)
             internal_zero_mask = np.logical_or(internal_zero_mask, tr_abs[:, 1:-1, :] <= 0.0)
             tr_abs_r = np.where(np.logical_or(np.isinf(tr_abs), np.isnan(tr_abs)), 0.0, 1.0 / tr_abs)
-    j_tr[:, 1:-1, :] = np.where(internal_zero_mask, 0.0, tr_mult / ((1.0 / slice_a) + tr_abs_r + (1.0 / slice_b)))
+    j_tr[:, 1:-1, :] = __combined_transmissibility(slice_a, slice_b, internal_zero_mask, tr_mult, tr_abs_r)
     if realization is None:
         grid.array_j_transmissibility = j_tr
     return j_tr
@@ -288,10 +288,11 @@ def __set_k_transmissibility(grid, half_t, k_tr, modifier_mode, pc, realization,
     k_tr = np.zeros((grid.nk + 1, grid.nj, grid.ni))
     slice_a = half_t[:-1, :, :, 0, 1]  # note: internal faces only
     slice_b = half_t[1:, :, :, 0, 0]
-    internal_zero_mask = np.logical_or(np.logical_or(np.isnan(slice_a), slice_a < tolerance),
-                                       np.logical_or(np.isnan(slice_b), slice_b < tolerance))
-    if grid.k_gaps:  # todo: scan K gaps for zero thickness gaps and allow transmission there
-        internal_zero_mask[grid.k_gap_after_array, :, :] = True
+    # todo: scan K gaps for zero thickness gaps and allow transmission there
+    internal_zero_mask = __internal_zero_mask(slice_a,
+                                              slice_b,
+                                              tolerance,
+                                              layer_mask = grid.k_gap_after_array if grid.k_gaps else None)
     tr_mult = None
     if modifier_mode == 'faces multiplier':
         tr_mult = pc.single_array_ref(property_kind = 'transmissibility multiplier',
@@ -344,7 +345,7 @@ def __set_k_transmissibility(grid, half_t, k_tr, modifier_mode, pc, realization,
             assert tr_abs.shape == (grid.nk + 1, grid.nj, grid.ni)
             internal_zero_mask = np.logical_or(internal_zero_mask, tr_abs[1:-1, :, :] <= 0.0)
             tr_abs_r = np.where(np.logical_or(np.isinf(tr_abs), np.isnan(tr_abs)), 0.0, 1.0 / tr_abs)
-    k_tr[1:-1, :, :] = np.where(internal_zero_mask, 0.0, tr_mult / ((1.0 / slice_a) + tr_abs_r + (1.0 / slice_b)))
+    k_tr[1:-1, :, :] = __combined_transmissibility(slice_a, slice_b, internal_zero_mask, tr_mult, tr_abs_r)
     if realization is None:
         grid.array_k_transmissibility = k_tr
     return k_tr
@@ -388,9 +389,9 @@ def half_cell_transmissibility(grid, use_property = True, realization = None, to
                                             continuous = True,
                                             count = 1,
                                             indexable = 'faces per cell')
-        if half_t_resqml:
+        if half_t_resqml is not None:
             assert half_t_resqml.shape == (grid.nk, grid.nj, grid.ni, 6)
-            half_t = pc.combobulate(half_t_resqml)
+            half_t = pc.combobulated_face_array(half_t_resqml)
 
     if half_t is None:
         # note: properties must be identifiable in property_collection
@@ -400,3 +401,204 @@ def half_cell_transmissibility(grid, use_property = True, realization = None, to
         grid.array_half_cell_t = half_t
 
     return half_t
+
+
+def layer_blocked_transmissibility(grid,
+                                   layer_block_size = 16,
+                                   realization = None,
+                                   perm_k = None,
+                                   perm_j = None,
+                                   perm_i = None,
+                                   ntg = None,
+                                   darcy_constant = None,
+                                   tolerance = 1.0e-6,
+                                   half_axis_tolerance = 1.0e-6,
+                                   dtype = np.float64,
+                                   include_half_cell_t = False,
+                                   ext_uuid = None,
+                                   points_root = None):
+    """Computes transmissibilities a block of layers at a time, writing them directly to hdf5 as new properties.
+
+    arguments:
+       layer_block_size (int, default 16): the number of layers to process at a time
+       realization (int, optional): if present, the realization number for the new properties, and the realization
+          of the permeability and net to gross properties to use when those arrays are not passed
+       perm_k, perm_j, perm_i (array like of shape (nk, nj, ni), or float, optional): cell permeability values, in mD;
+          any which are None are found in the grid's property collection
+       ntg (array like of shape (nk, nj, ni), or float, optional): net to gross values to apply to I & J half cell
+          transmissibilities; if None, a net to gross ratio property is used if present in the property collection
+       darcy_constant (float, optional): if present, the value to use for the Darcy constant; if None, the grid's
+          length units will determine the value as expected by Nexus
+       tolerance (float, default 1.0e-6): the minimum half cell transmissibility below which zero inter-cell
+          transmissibility will be set
+       half_axis_tolerance (float, default 1.0e-6): minimum half axis length below which the half cell
+          transmissibility will be deemed uncomputable, as for half_cell_transmissibility(); units are implicitly
+          those of the grid's crs length units
+       dtype (numpy float type, default np.float64): the element type of the hdf5 datasets; use np.float32 to halve
+          the storage requirement
+       include_half_cell_t (bool, default False): if True, a half cell transmissibility property with indexable
+          element 'faces per cell' is also written
+       ext_uuid (uuid.UUID, optional): the uuid of the hdf5 external part to write to; if None, the model's
+          default hdf5 file is used
+       points_root (optional): the xml node holding the points data
+
+    returns:
+       list of uuids of the new transmissibility properties, for K, J & I faces respectively, followed by the
+       uuid of the half cell transmissibility property if include_half_cell_t is True
+
+    notes:
+       the results match those of transmissibility() with no modifier mode, and of half_cell_transmissibility();
+       any of the arrays passed may be a numpy array, a numpy memmap or an h5py dataset: anything supporting
+       reading a slice on the K axis; properties found in the property collection are read from hdf5 a slab of
+       layers at a time; if the points are not already cached, they are also read one slab at a time and are not
+       cached; peak memory use is therefore bounded by the layer block size, making this function suitable for
+       grids whose full arrays would not fit in memory; the directional properties have indexable element 'faces'
+       and titles TK, TJ & TI; values are zero for outer faces, pinchouts, K gap faces and column faces with a
+       split pillar (which should be handled with a fault connection set); no arrays are cached in the grid object
+    """
+
+    assert layer_block_size is not None and layer_block_size > 0
+    assert np.dtype(dtype).kind == 'f'
+
+    nk, nj, ni = grid.nk, grid.nj, grid.ni
+    if darcy_constant is None:
+        darcy_constant = rqtr._darcy_constant(grid)
+
+    in_pc = None
+    if perm_k is None or perm_j is None or perm_i is None or ntg is None:
+        in_pc = grid.extract_property_collection()
+        basic_5_parts = in_pc.basic_static_property_parts(realization = realization, share_perm_parts = True)
+        if ntg is None:
+            ntg = basic_5_parts[0]
+        if perm_k is None:
+            perm_k = basic_5_parts[4]
+        if perm_j is None:
+            perm_j = basic_5_parts[3]
+        if perm_i is None:
+            perm_i = basic_5_parts[2]
+    assert perm_k is not None and perm_j is not None and perm_i is not None
+
+    pfc = grr_pf._pillars_for_column(grid) if grid.has_split_coordinate_lines else None
+    split_column_edges_j, split_column_edges_i = grid.split_column_faces()
+
+    if ext_uuid is None:
+        ext_uuid = grid.model.h5_uuid()
+    out_pc = rprop.GridPropertyCollection()
+    out_pc.set_grid(grid)
+    facets = ['K', 'J', 'I']
+    shapes = [(nk + 1, nj, ni), (nk, nj + 1, ni), (nk, nj, ni + 1)]
+    if include_half_cell_t:
+        facets.append(None)
+        shapes.append((nk, nj, ni, 6))
+    uuids = [bu.new_uuid() for _ in facets]
+    paths = [rwh5.resqml_path_head + str(uuid) + '/values_patch0' for uuid in uuids]
+    min_values = [np.inf] * len(uuids)
+    max_values = [-np.inf] * len(uuids)
+
+    fp = grid.model.h5_access(uuid = ext_uuid, mode = 'a')
+    for path, shape in zip(paths, shapes):
+        fp.create_dataset(path, shape = shape, dtype = dtype)
+
+    previous_plus_k_t = None  # K+ face half cell transmissibilities for the last layer of the previous slab
+    for k0 in range(0, nk, layer_block_size):
+        k0_end = min(k0 + layer_block_size, nk)
+        p, k_raw_start = grr_pf._points_for_layers(grid, k0, k0_end, points_root = points_root)
+        assert p is not None, 'grid geometry not present when computing transmissibilities'
+        km = grid.k_raw_index_array[k0:k0_end] - k_raw_start if grid.k_gaps else None
+        half_t = rqtr._half_cell_t_irregular_points(p, (k0_end - k0, nj, ni),
+                                                    __layers_slab(in_pc, perm_k, k0, k0_end),
+                                                    __layers_slab(in_pc, perm_j, k0, k0_end),
+                                                    __layers_slab(in_pc, perm_i, k0, k0_end),
+                                                    __layers_slab(in_pc, ntg, k0, k0_end),
+                                                    darcy_constant,
+                                                    half_axis_tolerance,
+                                                    pfc = pfc,
+                                                    km = km)
+        del p
+
+        k_tr = np.zeros((k0_end - k0, nj, ni))  # faces above each layer in the slab
+        if k0 > 0:
+            slice_a = np.concatenate((previous_plus_k_t, half_t[:-1, :, :, 0, 1]), axis = 0)
+            slice_b = half_t[:, :, :, 0, 0]
+        else:
+            slice_a = half_t[:-1, :, :, 0, 1]
+            slice_b = half_t[1:, :, :, 0, 0]
+        k_gap_after = grid.k_gap_after_array[max(k0, 1) - 1:k0_end - 1] if grid.k_gaps else None
+        k_mask = __internal_zero_mask(slice_a, slice_b, tolerance, layer_mask = k_gap_after)
+        k_tr[k_tr.shape[0] - slice_a.shape[0]:] = __combined_transmissibility(slice_a, slice_b, k_mask)
+        previous_plus_k_t = half_t[-1:, :, :, 0, 1]
+
+        j_tr = np.zeros((k0_end - k0, nj + 1, ni))
+        slice_a, slice_b = half_t[:, :-1, :, 1, 1], half_t[:, 1:, :, 1, 0]
+        j_mask = __internal_zero_mask(slice_a, slice_b, tolerance, column_mask = split_column_edges_j)
+        j_tr[:, 1:-1] = __combined_transmissibility(slice_a, slice_b, j_mask)
+        i_tr = np.zeros((k0_end - k0, nj, ni + 1))
+        slice_a, slice_b = half_t[:, :, :-1, 2, 1], half_t[:, :, 1:, 2, 0]
+        i_mask = __internal_zero_mask(slice_a, slice_b, tolerance, column_mask = split_column_edges_i)
+        i_tr[:, :, 1:-1] = __combined_transmissibility(slice_a, slice_b, i_mask)
+
+        slabs = [k_tr, j_tr, i_tr]
+        if include_half_cell_t:
+            slabs.append(out_pc.discombobulated_face_array(half_t))
+        fp = grid.model.h5_access(uuid = ext_uuid, mode = 'a')
+        for index, (path, slab) in enumerate(zip(paths, slabs)):
+            fp[path][k0:k0_end] = slab.astype(dtype, copy = False)
+            if not np.all(np.isnan(slab)):
+                min_values[index] = min(min_values[index], np.nanmin(slab))
+                max_values[index] = max(max_values[index], np.nanmax(slab))
+
+    fp = grid.model.h5_access(uuid = ext_uuid, mode = 'a')
+    fp[paths[0]][nk] = 0.0  # outer faces below the bottom layer
+    grid.model.h5_release(uuid = ext_uuid)
+
+    uom = 'm3.cP/(kPa.d)' if grid.xy_units() == 'm' else 'bbl.cP/(psi.d)'
+    for uuid, facet, min_value, max_value in zip(uuids, facets, min_values, max_values):
+        out_pc.create_xml(ext_uuid,
+                          None,
+                          'T' + facet if facet else 'HALF_T',
+                          'transmissibility',
+                          support_uuid = grid.uuid,
+                          p_uuid = uuid,
+                          facet_type = 'direction' if facet else None,
+                          facet = facet,
+                          uom = uom,
+                          source = 'computed by layer blocks',
+                          min_value = min_value if min_value <= max_value else None,
+                          max_value = max_value if min_value <= max_value else None,
+                          add_min_max = bool(min_value <= max_value),
+                          realization = realization,
+                          indexable_element = 'faces' if facet else 'faces per cell')
+
+    return uuids
+
+
+def __layers_slab(pc, source, k0, k0_end):
+    """Returns a slab of layers from a part name, an array like or a constant, or None."""
+
+    if source is None or isinstance(source, (int, float)):
+        return source
+    if isinstance(source, str):
+        const_value = pc.constant_value_for_part(source)
+        if const_value is not None:
+            return float(const_value)
+        return pc.h5_slice(source, (slice(k0, k0_end),))
+    return np.asarray(source[k0:k0_end], dtype = float)
+
+
+def __internal_zero_mask(slice_a, slice_b, tolerance, layer_mask = None, column_mask = None):
+    """Returns boolean mask of internal faces to be given zero transmissibility, from half cell values and masks."""
+
+    internal_zero_mask = np.logical_or(np.logical_or(np.isnan(slice_a), slice_a < tolerance),
+                                       np.logical_or(np.isnan(slice_b), slice_b < tolerance))
+    if layer_mask is not None:
+        internal_zero_mask[layer_mask, :, :] = True
+    if column_mask is not None:
+        internal_zero_mask[:, column_mask] = True
+    return internal_zero_mask
+
+
+def __combined_transmissibility(slice_a, slice_b, internal_zero_mask, tr_mult = 1.0, tr_abs_r = 0.0):
+    """Returns the harmonic combination of two half cell transmissibility slabs, with zero where masked."""
+
+    with np.errstate(divide = 'ignore'):
+        return np.where(internal_zero_mask, 0.0, tr_mult / ((1.0 / slice_a) + tr_abs_r + (1.0 / slice_b)))
@@ -16,6 +16,7 @@ __all__ = [
     "find_intersection_of_trajectory_interval_with_column_face",
     "trajectory_grid_overlap",
     "populate_blocked_well_from_trajectory",
+    "blocked_wells_from_trajectories",
     "generate_surface_for_blocked_well_cells",
     "find_faces_to_represent_surface_staffa",
     "find_faces_to_represent_surface_regular",
@@ -50,6 +51,7 @@ from ._trajectory_intersects import (
 )
 from ._blocked_well_populate import (
     populate_blocked_well_from_trajectory,
+    blocked_wells_from_trajectories,
     generate_surface_for_blocked_well_cells,
 )
 from ._find_faces import (
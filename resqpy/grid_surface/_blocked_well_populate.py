@@ -1,16 +1,20 @@
-"""Function for populating an empty blocked well from its trajectory and a grid."""
+"""Functions for populating empty blocked wells from their trajectories and a grid."""
 
 import logging
 
 log = logging.getLogger(__name__)
 
+import time
+
 import numpy as np
+import pandas as pd
 
 import resqpy.crs as rqc
 import resqpy.grid as grr
 import resqpy.surface as rqs
 import resqpy.well as rqw
 import resqpy.grid_surface as rqgs
+import resqpy.olio.box_utilities as bx
 import resqpy.olio.uuid as bu
 import resqpy.olio.vector_utilities as vec
 
@@ -60,6 +64,103 @@ def populate_blocked_well_from_trajectory(blocked_well,
     assert isinstance(blocked_well.trajectory, rqw.Trajectory)
     assert grid is not None
 
+    context = __blocking_context(grid, use_single_layer_tactics, column_prefilter = False)
+    return __populate_with_context(blocked_well,
+                                   grid,
+                                   context,
+                                   active_only = active_only,
+                                   quad_triangles = quad_triangles,
+                                   lazy = lazy,
+                                   check_for_reentry = check_for_reentry)
+
+
+def blocked_wells_from_trajectories(grid,
+                                    trajectories,
+                                    active_only = False,
+                                    quad_triangles = True,
+                                    use_single_layer_tactics = True,
+                                    check_for_reentry = True,
+                                    column_prefilter = True):
+    """Creates blocked wells for a list of trajectories against a single grid, sharing the grid preparation.
+
+    arguments:
+       grid (resqpy.grid.Grid object): the grid to intersect the well trajectories with
+       trajectories (list of resqpy.well.Trajectory): the trajectories to be blocked
+       active_only (boolean, default False): as for populate_blocked_well_from_trajectory()
+       quad_triangles (boolean, default True): as for populate_blocked_well_from_trajectory()
+       use_single_layer_tactics (boolean, default True): as for populate_blocked_well_from_trajectory()
+       check_for_reentry (boolean, default True): as for populate_blocked_well_from_trajectory()
+       column_prefilter (boolean, default True): if True, trajectories with no segment passing over any column
+          of the grid (based on bucketed xy bounding boxes of the columns over all layers) are rejected without
+          attempting the full blocking process
+
+    returns:
+       (list of resqpy.well.BlockedWell or None, pandas.DataFrame) being the blocked wells, in the same order as
+       the trajectories and with None for any trajectory which failed to block, and a report with one row per
+       trajectory having columns: WELL, UUID, SUCCESS, CELLS, SECONDS, MESSAGE
+
+    notes:
+       the grid crs, xyz box, skin and column index are established once and shared by all the wells;
+       the blocked wells are not written to hdf5 nor have xml created by this function;
+       an exception raised whilst blocking one well is recorded in the report MESSAGE column and does not
+       prevent the remaining wells from being blocked;
+       for multiprocessing across a cluster or a local process pool, see
+       resqpy.multi_processing.blocked_well_from_trajectory_batch()
+    """
+
+    assert grid is not None
+    flavour = grr.grid_flavour(grid.root)
+    if not flavour.startswith('Ijk'):
+        raise NotImplementedError('well blocking only implemented for IjkGridRepresentation')
+    is_regular = (flavour == 'IjkBlockGrid') and hasattr(grid, 'is_aligned') and grid.is_aligned
+    if not is_regular and np.any(np.isnan(grid.points_ref(masked = False))):
+        log.warning('grid does not have geometry defined everywhere: attempting fill')
+        import resqpy.derived_model as rqdm
+        grid = rqdm.copy_grid(grid)
+        grid.set_geometry_is_defined(nullify_partial_pillars = True, complete_all = True)
+
+    context = __blocking_context(grid, use_single_layer_tactics, column_prefilter = column_prefilter)
+    blocked_wells = []
+    report = {'WELL': [], 'UUID': [], 'SUCCESS': [], 'CELLS': [], 'SECONDS': [], 'MESSAGE': []}
+    for trajectory in trajectories:
+        start_time = time.time()
+        well_name = rqw.well_name(trajectory)
+        blocked_well = None
+        message = ''
+        try:
+            bw = rqw.BlockedWell(trajectory.model, well_name = well_name)
+            bw.trajectory = trajectory
+            blocked_well = __populate_with_context(bw,
+                                                   grid,
+                                                   context,
+                                                   active_only = active_only,
+                                                   quad_triangles = quad_triangles,
+                                                   lazy = False,
+                                                   check_for_reentry = check_for_reentry)
+            if blocked_well is None:
+                message = 'failed to block well'
+        except Exception as e:
+            log.exception(f'exception whilst blocking trajectory with uuid: {trajectory.uuid}')
+            message = f'{type(e).__name__}: {e}'
+            blocked_well = None
+        blocked_wells.append(blocked_well)
+        report['WELL'].append(well_name)
+        report['UUID'].append(trajectory.uuid)
+        report['SUCCESS'].append(blocked_well is not None)
+        report['CELLS'].append(0 if blocked_well is None else blocked_well.cell_count)
+        report['SECONDS'].append(time.time() - start_time)
+        report['MESSAGE'].append(message)
+
+    report_df = pd.DataFrame(report)
+    log.info(f'{np.count_nonzero(report_df["SUCCESS"])} of {len(report_df)} trajectories blocked in '
+             f'{report_df["SECONDS"].sum():.3f} seconds')
+
+    return blocked_wells, report_df
+
+
+def __blocking_context(grid, use_single_layer_tactics, column_prefilter = True):
+    """Returns a dictionary of grid based items shared by the blocking of any number of wells."""
+
     flavour = grr.grid_flavour(grid.root)
     if not flavour.startswith('Ijk'):
         raise NotImplementedError('well blocking only implemented for IjkGridRepresentation')
@@ -71,12 +172,6 @@ def populate_blocked_well_from_trajectory(blocked_well,
         log.debug('skin single layer tactics disabled')
 
     grid_crs = rqc.Crs(grid.model, uuid = grid.crs_uuid)
-    trajectory = __trajectory_init(blocked_well, grid, grid_crs)
-    traj_xyz = trajectory.control_points
-
-    if not rqgs.trajectory_grid_overlap(trajectory, grid):
-        log.error(f'no overlap of trajectory xyz box with grid for trajectory uuid: {trajectory.uuid}')
-        return None
     grid_box = grid.xyz_box(lazy = False, local = True).copy()
     if grid_crs.z_inc_down:
         z_sign = 1.0
@@ -85,6 +180,99 @@ def populate_blocked_well_from_trajectory(blocked_well,
         z_sign = -1.0
         grid_top_z = -grid_box[1, 2]  # maximum is least negative, ie. shallowest
 
+    column_table = __column_occupancy_table(grid) if column_prefilter else None
+
+    return {
+        'is_regular': is_regular,
+        'use_single_layer_tactics': use_single_layer_tactics,
+        'grid_crs': grid_crs,
+        'grid_box': grid_box,
+        'z_sign': z_sign,
+        'grid_top_z': grid_top_z,
+        'column_table': column_table
+    }
+
+
+def __column_occupancy_table(grid, max_buckets = 1000, k_block_cells = 1000000):
+    """Returns (origin, bucket size, bucket counts, summed area table of occupied buckets) for the grid columns, or None.
+
+    note:
+       a bucket is occupied if it overlaps the xy bounding box of any column, taken over all the corner points of
+       all the layers, so that sloping, bulging and faulted columns are fully covered
+    """
+
+    nk, nj, ni = grid.nk, grid.nj, grid.ni
+    col_min = np.full((nj, ni, 2), np.inf)
+    col_max = np.full((nj, ni, 2), -np.inf)
+    k_block = max(1, k_block_cells // (nj * ni))
+    for k0 in range(0, nk, k_block):
+        cp = grid.corner_points_for_layers(k0, min(k0 + k_block, nk))
+        if cp is None:
+            return None
+        xy = np.moveaxis(cp[..., :2].reshape((-1, nj, ni, 8, 2)), 3, 1).reshape((-1, nj, ni, 2))
+        col_min = np.fmin(col_min, np.fmin.reduce(xy, axis = 0))
+        col_max = np.fmax(col_max, np.fmax.reduce(xy, axis = 0))
+    valid = np.all(np.logical_and(np.isfinite(col_min), np.isfinite(col_max)), axis = -1)
+    if not np.any(valid):
+        return None
+    col_min = col_min[valid]
+    col_max = col_max[valid]
+    origin = np.amin(col_min, axis = 0)
+    n_buckets_xy = np.array((min(ni, max_buckets), min(nj, max_buckets)), dtype = int)
+    bucket_size = (np.amax(col_max, axis = 0) - origin) / n_buckets_xy
+    bucket_size[bucket_size <= 0.0] = 1.0
+    b_min = np.clip(np.floor((col_min - origin) / bucket_size).astype(int), 0, n_buckets_xy - 1)
+    b_max = np.clip(np.floor((col_max - origin) / bucket_size).astype(int), 0, n_buckets_xy - 1) + 1
+    nx, ny = n_buckets_xy
+    coverage = np.zeros((ny + 1, nx + 1), dtype = int)
+    np.add.at(coverage, (b_min[:, 1], b_min[:, 0]), 1)
+    np.add.at(coverage, (b_min[:, 1], b_max[:, 0]), -1)
+    np.add.at(coverage, (b_max[:, 1], b_min[:, 0]), -1)
+    np.add.at(coverage, (b_max[:, 1], b_max[:, 0]), 1)
+    occupied = np.cumsum(np.cumsum(coverage, axis = 0), axis = 1)[:ny, :nx] > 0
+    sat = np.zeros((ny + 1, nx + 1), dtype = int)
+    sat[1:, 1:] = np.cumsum(np.cumsum(occupied, axis = 0), axis = 1)
+    return origin, bucket_size, n_buckets_xy, sat
+
+
+def __trajectory_over_columns(traj_xyz, column_table):
+    """Returns True if any segment of the trajectory passes over a bucket holding a grid column, False otherwise."""
+
+    origin, bucket_size, n_buckets_xy, sat = column_table
+    seg_min = np.minimum(traj_xyz[:-1, :2], traj_xyz[1:, :2])
+    seg_max = np.maximum(traj_xyz[:-1, :2], traj_xyz[1:, :2])
+    b_min = np.floor((seg_min - origin) / bucket_size).astype(int)
+    b_max = np.floor((seg_max - origin) / bucket_size).astype(int)
+    overlap = np.all(np.logical_and(b_max >= 0, b_min < n_buckets_xy), axis = 1)
+    if not np.any(overlap):
+        return False
+    b_min = np.clip(b_min[overlap], 0, n_buckets_xy - 1)
+    b_max = np.clip(b_max[overlap], 0, n_buckets_xy - 1) + 1
+    counts = (sat[b_max[:, 1], b_max[:, 0]] - sat[b_min[:, 1], b_max[:, 0]] - sat[b_max[:, 1], b_min[:, 0]] +
+              sat[b_min[:, 1], b_min[:, 0]])
+    return bool(np.any(counts > 0))
+
+
+def __populate_with_context(blocked_well, grid, context, active_only, quad_triangles, lazy, check_for_reentry):
+    """Populates an empty blocked well from its trajectory, using grid based items shared between wells."""
+
+    is_regular = context['is_regular']
+    use_single_layer_tactics = context['use_single_layer_tactics']
+    grid_crs = context['grid_crs']
+    z_sign = context['z_sign']
+    grid_top_z = context['grid_top_z']
+
+    trajectory = __trajectory_init(blocked_well, grid, grid_crs)
+    traj_xyz = trajectory.control_points
+
+    traj_box = np.stack((np.amin(traj_xyz, axis = 0), np.amax(traj_xyz, axis = 0)))
+    if not bx.boxes_overlap(traj_box, context['grid_box']):
+        log.error(f'no overlap of trajectory xyz box with grid for trajectory uuid: {trajectory.uuid}')
+        return None
+    if context['column_table'] is not None and not __trajectory_over_columns(traj_xyz, context['column_table']):
+        log.error(f'trajectory does not pass over any grid column for trajectory uuid: {trajectory.uuid}')
+        return None
+
     assert z_sign * traj_xyz[0, 2] < grid_top_z, 'trajectory does not start above top of grid'  # min z
     if z_sign * traj_xyz[-1, 2] < grid_top_z:
         log.warning('end of trajectory (TD) is above top of grid')
@@ -155,8 +343,8 @@ def populate_blocked_well_from_trajectory(blocked_well,
     cell_count = 0
     cell_indices_list = []
     face_pairs_list = []
-    kissed = np.zeros(grid.extent_kji, dtype = bool)
-    sample_test = np.zeros(grid.extent_kji, dtype = bool)
+    kissed = set()  # cells (as kji0 tuples) excluded from kiss and tell tactics
+    sample_test = set()  # cells (as kji0 tuples) already tested for inclusion of a sample point
 
     while next_cell_info is not None:
         entry_shared, kji0, entry_axis, entry_polarity, entry_knot, entry_fraction, entry_xyz = next_cell_info
@@ -169,8 +357,8 @@ def populate_blocked_well_from_trajectory(blocked_well,
             node_mds_list.append(__back_calculated_md(trajectory, entry_knot, entry_fraction))
             node_count += 1
             grid_indices_list.append(-1)
-            kissed[:] = False
-            sample_test[:] = False
+            kissed.clear()
+            sample_test.clear()
 
         exit_xyz, exit_knot, exit_axis, exit_polarity = rqgs.find_first_intersection_of_trajectory_with_cell_surface(
             trajectory, grid, kji0, entry_knot, start_xyz = entry_xyz, nudge = 0.01, quad_triangles = True)
@@ -225,8 +413,8 @@ def populate_blocked_well_from_trajectory(blocked_well,
                                               treat_skin_as_fault = use_single_layer_tactics,
                                               lazy = lazy,
                                               use_single_layer_tactics = use_single_layer_tactics)
-            kissed[:] = False
-            sample_test[:] = False
+            kissed.clear()
+            sample_test.clear()
 
     if node_count < 2:
         log.warning('no nodes found during attempt to block well')
@@ -450,9 +638,9 @@ def __forward_nudge(axis, entry_axis, entry_knot, entry_polarity, entry_xyz, gri
     # trajectory has kissed corner or edge of cell and nudge has gone outside cell
     # nudge forward and look for point inclusion in possible neighbours
     log.debug(f"kiss detected at cell kji0 {kji0} {'KJI'[entry_axis]}{'-+'[entry_polarity]}")
-    kissed[tuple(kji0)] = True
+    kissed.add(tuple(kji0))
     if np.all(previous_kji0 >= 0) and np.all(previous_kji0 < grid.extent_kji):
-        kissed[tuple(previous_kji0)] = True  # stops immediate revisit for kiss and tell tactics
+        kissed.add(tuple(previous_kji0))  # stops immediate revisit for kiss and tell tactics
     # setup kji offsets of neighbouring cells likely to contain sample point (could check for split
     # column faces)
     axis_a = (entry_axis + 1) % 3
@@ -489,7 +677,7 @@ def __forward_nudge(axis, entry_axis, entry_knot, entry_polarity, entry_xyz, gri
             sample_point = entry_xyz + 0.9 * remaining
         else:
             sample_point = entry_xyz + nudge * vec.unit_vector(remaining)
-        sample_test[:] = False
+        sample_test.clear()
         log.debug(f'sample point is {sample_point}')
         for try_index in range(len(offsets_kji)):
             try_kji0 = np.array(kji0, dtype = int) + offsets_kji[try_index]
@@ -499,7 +687,7 @@ def __forward_nudge(axis, entry_axis, entry_knot, entry_polarity, entry_xyz, gri
             if np.any(try_kji0 < 0) or np.any(try_kji0 >= grid.extent_kji):
                 continue
             #                 log.debug(f'tentatively trying: {try_kji0}')
-            sample_test[tuple(try_kji0)] = True
+            sample_test.add(tuple(try_kji0))
             if rqgs.point_is_within_cell(sample_point, grid, try_kji0):
                 log.debug(f'sample point is in cell {try_kji0}')
                 try_entry_xyz, try_entry_knot, try_entry_axis, try_entry_polarity = \
@@ -523,9 +711,10 @@ def __forward_nudge(axis, entry_axis, entry_knot, entry_polarity, entry_xyz, gri
                 for j_offset in [0, -1, 1]:
                     for i_offset in [0, -1, 1]:
                         try_kji0 = kji0 + np.array((k_offset * k_plus_minus, j_offset, i_offset))
-                        if np.any(try_kji0 < 0) or np.any(try_kji0 >= grid.extent_kji) or sample_test[tuple(try_kji0)]:
+                        if np.any(try_kji0 < 0) or np.any(
+                                try_kji0 >= grid.extent_kji) or tuple(try_kji0) in sample_test:
                             continue
-                        sample_test[tuple(try_kji0)] = True
+                        sample_test.add(tuple(try_kji0))
                         if rqgs.point_is_within_cell(sample_point, grid, try_kji0):
                             log.debug(f'sample point is in cell {try_kji0}')
                             try_entry_xyz, try_entry_knot, try_entry_axis, try_entry_polarity = \
@@ -569,7 +758,7 @@ def __try_cell_entry(entry_knot, entry_xyz, grid, kissed, kji0, next_cell_info,
         try_kji0 = kji0 + offsets_kji[try_index]
         while np.all(try_kji0 >= 0) and np.all(try_kji0 < grid.extent_kji) and grid.pinched_out(cell_kji0 = try_kji0):
             try_kji0[0] += pinchout_skip_sign
-        if np.any(try_kji0 < 0) or np.any(try_kji0 >= grid.extent_kji) or kissed[tuple(try_kji0)]:
+        if np.any(try_kji0 < 0) or np.any(try_kji0 >= grid.extent_kji) or tuple(try_kji0) in kissed:
             continue
         # use tiny negative nudge to look for entry into try cell with current segment; check that entry
         # point is close
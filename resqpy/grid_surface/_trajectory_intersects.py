@@ -39,19 +39,31 @@ def find_intersections_of_trajectory_with_surface(trajectory, surface):
         trajectory_list = trajectory
     else:
         trajectory_list = [trajectory]
-
-    t, p = surface.triangles_and_points()
-    triangles = p[t]
-    #   log.debug('finding intersections of wellbore trajectory(ies) with layer: ' + str(k0) + ' ' + ref_k_faces)
+    if len(trajectory_list) == 0:
+        return []
+
+    # all trajectory segments are intersected with the surface in one batch, using the surface's spatial index;
+    # trajectories with fewer than 2 knots have no segments and are left out of the batch
+    segment_counts = [max(traj.knot_count - 1, 0) for traj in trajectory_list]
+    batch_list = [traj for traj, count in zip(trajectory_list, segment_counts) if count > 0]
+    if len(batch_list) == 0:
+        results_list = [(None, None)] * len(trajectory_list)
+        return results_list if isinstance(trajectory, list) else results_list[0]
+    line_ps = np.concatenate([traj.control_points[:-1] for traj in batch_list]).reshape((-1, 3))
+    line_vs = np.concatenate([traj.control_points[1:] - traj.control_points[:-1] for traj in batch_list]).reshape(
+        (-1, 3))
+    lines, all_triangle_indices, all_intersect_points = surface.line_set_intersections(line_ps,
+                                                                                       line_vs,
+                                                                                       line_segment = True)
+    segment_starts = np.cumsum([0] + segment_counts)
+    splits = np.searchsorted(lines, segment_starts)
     results_list = []
-    for traj in trajectory_list:
-        all_intersects = meet.poly_line_triangles_intersects(traj.control_points, triangles)
-        _, triangle_indices, intersect_points = meet.distilled_intersects(
-            all_intersects)  # discard trajectory segment info
+    for i in range(len(trajectory_list)):
+        triangle_indices = all_triangle_indices[splits[i]:splits[i + 1]]  # discard trajectory segment info
         if len(triangle_indices) == 0:
             results_list.append((None, None))
         else:
-            results_list.append((triangle_indices, intersect_points))
+            results_list.append((triangle_indices, all_intersect_points[splits[i]:splits[i + 1]]))
 
     if isinstance(trajectory, list):
         return results_list
@@ -163,8 +175,7 @@ def find_first_intersection_of_trajectory_with_surface(trajectory,
             return None, None, None, None, None, None
         return None, None, None
 
-    t, p = surface.triangles_and_points()
-    triangles = p[t]
+    index = surface.xy_triangle_index()
 
     xyz = None
     tri = None
@@ -187,7 +198,8 @@ def find_first_intersection_of_trajectory_with_surface(trajectory,
             line_p = start_xyz
         start_xyz = None
         line_v = trajectory.control_points[knot + 1] - line_p
-        intersects = meet.line_triangles_intersects(line_p, line_v, triangles, line_segment = True)
+        candidates = index.candidates(line_p, line_v, line_segment = True)
+        intersects = meet.line_triangles_intersects(line_p, line_v, index.triangles[candidates], line_segment = True)
         if not np.all(np.isnan(intersects)):
             intersects_indices = meet.intersects_indices(intersects)
             tri = intersects_indices[0]
@@ -211,6 +223,9 @@ def find_first_intersection_of_trajectory_with_surface(trajectory,
                         tri_2 = other_tri
                         xyz_2 = other_xyz
                         runner_up = other_manhattan
+            tri = candidates[tri]  # convert local index to surface triangle index
+            if tri_2 is not None:
+                tri_2 = candidates[tri_2]
             break
         knot += 1
     if knot == trajectory.knot_count - 1:
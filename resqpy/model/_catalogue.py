@@ -4,6 +4,8 @@ import logging
 
 log = logging.getLogger(__name__)
 
+import json
+import os
 import zipfile as zf
 
 import resqpy.olio.uuid as bu
@@ -270,7 +272,8 @@ def _titles(model,
                 sort_by = sort_by)
     title_list = []
     for part in pl:
-        title_list.append(_citation_title_for_part(model, part))
+        title = _catalogue_entry(model, part)[0]
+        title_list.append('' if title is None else title)
     return title_list
 
 
@@ -396,6 +399,9 @@ def _parts_list_filtered_by_related_uuid(model, parts_list, uuid, uuid_is_source
     if not model.rels_present or parts_list is None or uuid is None:
         return None
 
+    if model.lazy_load_pending:
+        return _lazily_filtered_by_related_uuid(model, parts_list, uuid, related_mode)
+
     relations = model.uuid_rels_dict.get(bu.uuid_from_string(uuid).int)
     if relations is None:
         return []
@@ -413,6 +419,38 @@ def _parts_list_filtered_by_related_uuid(model, parts_list, uuid, uuid_is_source
     return filtered_list
 
 
+def _lazily_filtered_by_related_uuid(model, parts_list, uuid, related_mode):
+    """Filters parts list by relationship with uuid for a lazily loaded model, parsing only the parts involved."""
+
+    uuid_int = bu.uuid_from_string(uuid).int
+    part = model.uuid_part_dict.get(uuid_int)
+    if part is None or _tree_for_part(model, part, is_rels = False) is None:
+        return []
+    for candidate in parts_list:  # parsing a part adds its references to the uuid relations dictionary
+        _tree_for_part(model, candidate, is_rels = False)
+    relations = model.uuid_rels_dict.get(uuid_int, (set(), set(), set()))
+    soft_relations = set()
+    if related_mode is None or related_mode == 2:
+        rels_root = _root_for_part(model, rqet.rels_part_name_for_part(part), is_rels = True)
+        if rels_root is not None:
+            for relation_node in rels_root:
+                if rqet.stripped_of_prefix(relation_node.tag) != 'Relationship':
+                    continue
+                relation_uuid = rqet.uuid_in_part_name(relation_node.attrib.get('Target', ''))
+                if relation_uuid is None or relation_uuid.int in relations[0] or relation_uuid.int in relations[1]:
+                    continue
+                soft_relations.add(relation_uuid.int)
+        soft_relations |= relations[2]
+    if related_mode is None:
+        all_relations = relations[0] | relations[1] | soft_relations
+    elif related_mode == 2:
+        all_relations = soft_relations
+    else:
+        all_relations = relations[related_mode]
+
+    return [p for p in parts_list if model.uuid_for_part(p).int in all_relations]
+
+
 def _supporting_representation_for_part(model, part):
     """Returns the uuid of the supporting representation for the part, if found, otherwise None."""
 
@@ -427,15 +465,15 @@ def _parts_list_filtered_by_supporting_uuid(model, parts_list, uuid):
         return []
 
     relations = model.uuid_rels_dict.get(bu.uuid_from_string(uuid).int)
-    if relations is None:
+    if relations is None and not model.lazy_load_pending:
         return []
 
     filtered_list = []
     for part in parts_list:
         part_uuid_int = model.uuid_for_part(part).int
-        if part_uuid_int not in relations[1]:
+        if not model.lazy_load_pending and part_uuid_int not in relations[1]:
             continue
-        support_ref_uuid = _supporting_representation_for_part(model, part)
+        support_ref_uuid = bu.uuid_from_string(_catalogue_entry(model, part)[4])
         if support_ref_uuid is None:
             continue
         if bu.matching_uuids(support_ref_uuid, uuid):
@@ -500,39 +538,38 @@ def _tree_for_part(model, part_name, is_rels = None):
             return None
         (_, tree) = model.rels_forest[part_name]
         if tree is None:
-            if not model.epc_file:
+            if not _load_part_on_demand(model, part_name, is_rels = True):
                 return None
-            with zf.ZipFile(model.epc_file) as epc:
-                load_success = model.load_part(epc, part_name, is_rels = True)
-                if not load_success:
-                    return None
         return model.rels_forest[part_name][1]
     elif is_other:
         if part_name not in model.other_forest:
             return None
         (_, tree) = model.other_forest[part_name]
         if tree is None:
-            if not model.epc_file:
+            if not _load_part_on_demand(model, part_name, is_rels = False):
                 return None
-            with zf.ZipFile(model.epc_file) as epc:
-                load_success = model.load_part(epc, part_name, is_rels = False)
-                if not load_success:
-                    return None
         return model.other_forest[part_name][1]
     else:
         if part_name not in model.parts_forest:
             return None
         (_, _, tree) = model.parts_forest[part_name]
         if tree is None:
-            if not model.epc_file:
+            if not _load_part_on_demand(model, part_name, is_rels = False):
                 return None
-            with zf.ZipFile(model.epc_file) as epc:
-                load_success = model.load_part(epc, part_name, is_rels = False)
-                if not load_success:
-                    return None
         return model.parts_forest[part_name][2]
 
 
+def _load_part_on_demand(model, part_name, is_rels):
+    """Loads the xml for a part not yet parsed, using the open epc of a lazily loaded model if available."""
+
+    if model.epc_zip is not None:
+        return model.load_part(model.epc_zip, part_name, is_rels = is_rels)
+    if not model.epc_file:
+        return False
+    with zf.ZipFile(model.epc_file) as epc:
+        return model.load_part(epc, part_name, is_rels = is_rels)
+
+
 def _root_for_part(model, part_name, is_rels = None):
     """Returns root of parsed xml tree for the named part."""
 
@@ -669,7 +706,7 @@ def _sort_parts_list_by_timestamp(model, parts_list):
         return []
     sort_list = []
     for index, part in enumerate(parts_list):
-        timestamp = rqet.find_nested_tags_text(_root_for_part(model, part), ['Citation', 'Creation'])
+        timestamp = _catalogue_entry(model, part)[2]
         sort_list.append((timestamp, index))
     sort_list.sort()
     results = []
@@ -717,6 +754,81 @@ def _filtered_by_epc_subdir(model, parts_list, epc_subdir):
         return parts_list
 
 
+def _catalogue_entry(model, part):
+    """Returns catalogue index entry for part, extracting from xml and adding to the index if not already present."""
+
+    entry = model.catalogue_index.get(part)
+    if entry is None:
+        root = _root_for_part(model, part)
+        if root is None:
+            return (None, None, None, None, None, {})
+        entry = (rqet.citation_title_for_node(root), rqet.find_nested_tags_text(root, ['Citation', 'Originator']),
+                 rqet.creation_date_for_node(root), rqet.find_tag_text(root, 'RealizationIndex'),
+                 rqet.find_nested_tags_text(root,
+                                            ['SupportingRepresentation', 'UUID']), rqet.load_metadata_from_xml(root))
+        model.catalogue_index[part] = entry
+    return entry
+
+
+def _invalidate_catalogue_entry(model, part = None):
+    """Discards the catalogue index entry for part, or the whole index if part is None."""
+
+    if part is None:
+        model.catalogue_index = {}
+    else:
+        model.catalogue_index.pop(part, None)
+
+
+def _build_catalogue_index(model):
+    """Ensures that the catalogue index has an entry for every part in the model."""
+
+    for part in _list_of_parts(model):
+        _catalogue_entry(model, part)
+
+
+def _catalogue_index_file_name(epc_file):
+    """Returns the file name of the catalogue index sidecar file for an epc file."""
+
+    return epc_file[:-4] + '_catalogue.json'
+
+
+def _store_catalogue_index(model, epc_file):
+    """Writes the catalogue index as a json sidecar file, tied to the current size and timestamp of the epc."""
+
+    _build_catalogue_index(model)
+    epc_stat = os.stat(epc_file)
+    index_dict = {
+        'epc_size': epc_stat.st_size,
+        'epc_mtime_ns': epc_stat.st_mtime_ns,
+        'parts': {part: model.catalogue_index[part] for part in _list_of_parts(model)}
+    }
+    with open(_catalogue_index_file_name(epc_file), 'w') as fp:
+        json.dump(index_dict, fp)
+
+
+def _load_catalogue_index(model, epc_file):
+    """Populates the catalogue index from a json sidecar file, if present and matching the epc file."""
+
+    index_file = _catalogue_index_file_name(epc_file)
+    if not os.path.exists(index_file):
+        return False
+    try:
+        with open(index_file, 'r') as fp:
+            index_dict = json.load(fp)
+        epc_stat = os.stat(epc_file)
+        if index_dict['epc_size'] != epc_stat.st_size or index_dict['epc_mtime_ns'] != epc_stat.st_mtime_ns:
+            log.debug(f'ignoring out of date catalogue index file: {index_file}')
+            return False
+        for part, entry in index_dict['parts'].items():
+            if part in model.parts_forest:
+                model.catalogue_index[part] = tuple(entry)
+    except Exception:
+        log.exception(f'failed to load catalogue index file: {index_file}')
+        model.catalogue_index = {}
+        return False
+    return True
+
+
 def _filtered_by_title(model, parts_list, title, title_mode, title_case_sensitive):
     assert title_mode in [
         'is', 'starts', 'ends', 'contains', 'is not', 'does not start', 'does not end', 'does not contain'
@@ -726,7 +838,8 @@ def _filtered_by_title(model, parts_list, title, title_mode, title_case_sensitiv
         title = title.upper()
     filtered_list = []
     for part in parts_list:
-        part_title = _citation_title_for_part(model, part).strip()
+        part_title = _catalogue_entry(model, part)[0]
+        part_title = '' if part_title is None else part_title.strip()
         if not title_case_sensitive:
             part_title = part_title.upper()
         if title_mode == 'is':
@@ -757,6 +870,9 @@ def _filtered_by_title(model, parts_list, title, title_mode, title_case_sensitiv
 
 
 def _filtered_by_metadata(model, parts_list, metadata):
+    if all(str(key) == 'RealizationIndex' for key in metadata.keys()):
+        value = str(metadata.get('RealizationIndex'))
+        return [part for part in parts_list if _catalogue_entry(model, part)[3] == value]
     filtered_list = []
     for part in parts_list:
         root = _root_for_part(model, part)
@@ -774,7 +890,7 @@ def _filtered_by_metadata(model, parts_list, metadata):
 def _filtered_by_extra(model, parts_list, extra):
     filtered_list = []
     for part in parts_list:
-        part_extra = rqet.load_metadata_from_xml(_root_for_part(model, part))
+        part_extra = _catalogue_entry(model, part)[5]
         if not part_extra:
             continue
         match = True
@@ -800,7 +916,7 @@ def _sorted_parts_list(model, parts_list, sort_by):
             if sort_by == 'uuid':
                 key = str(_uuid_for_part(model, part))
             else:
-                key = _citation_title_for_part(model, part)
+                key = _catalogue_entry(model, part)[0] or ''
             sort_list.append((key, index))
         sort_list.sort()
         sorted_list = []
@@ -813,6 +929,7 @@ def _uuids_as_int_related_to_uuid(model, uuid):
     if uuid is None:
         return None
     uuid_int = bu.uuid_as_int(uuid)
+    model.complete_lazy_load()
     relatives = model.uuid_rels_dict.get(uuid_int)
     if relatives is None:
         return None
@@ -823,6 +940,7 @@ def _uuids_as_int_referenced_by_uuid(model, uuid):
     if uuid is None:
         return None
     uuid_int = bu.uuid_as_int(uuid)
+    _tree_for_part(model, model.uuid_part_dict.get(uuid_int), is_rels = False)  # lazy load adds references
     relatives = model.uuid_rels_dict.get(uuid_int)
     if relatives is None:
         return None
@@ -833,6 +951,7 @@ def _uuids_as_int_referencing_uuid(model, uuid):
     if uuid is None:
         return None
     uuid_int = bu.uuid_as_int(uuid)
+    model.complete_lazy_load()
     relatives = model.uuid_rels_dict.get(uuid_int)
     if relatives is None:
         return None
@@ -843,6 +962,7 @@ def _uuids_as_int_softly_related_to_uuid(model, uuid):
     if uuid is None:
         return None
     uuid_int = bu.uuid_as_int(uuid)
+    model.complete_lazy_load()
     relatives = model.uuid_rels_dict.get(uuid_int)
     if relatives is None:
         return None
@@ -850,6 +970,7 @@ def _uuids_as_int_softly_related_to_uuid(model, uuid):
 
 
 def _check_catalogue_dictionaries(model, referred_parts_must_be_present, check_xml):
+    model.complete_lazy_load()
     for uuid_int, part in model.uuid_part_dict.items():
         assert uuid_int is not None and part
         assert bu.is_uuid(uuid_int)
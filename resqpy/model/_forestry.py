@@ -7,6 +7,7 @@ log = logging.getLogger(__name__)
 import copy
 import os
 import shutil
+import warnings
 import zipfile as zf
 
 import resqpy.model._catalogue as m_c
@@ -65,6 +66,8 @@ def _load_part(model, epc, part_name, is_rels = None):
                 model.parts_forest[part_name] = (part_type, part_uuid, part_tree)
                 _add_to_object_parts(model, part_name)
                 _set_uuid_to_part(model, part_name, part_uuid)
+                if model.lazy_load_pending and part_uuid is not None:
+                    _add_uuid_relations(model, part_uuid.int, part_name)
                 if model.crs_uuid is None and part_type == 'obj_LocalDepth3dCrs':  # randomly assign first crs as primary crs for model
                     model.crs_uuid = part_uuid
 
@@ -79,6 +82,8 @@ def _load_part(model, epc, part_name, is_rels = None):
 def _fell_part(model, part_name):
     """Removes the named part from the in-memory parts forest."""
 
+    m_c._invalidate_catalogue_entry(model, part_name)
+    model.part_xml_bytes.pop(part_name, None)
     try:
         _del_uuid_to_part(model, part_name)
     except Exception:
@@ -128,6 +133,7 @@ def _tidy_up_forests(model, tidy_main_tree = True, tidy_others = False, remove_e
         if tidy_main_tree:
             _remove_part_from_main_tree(model, part)
         _del_uuid_to_part(model, part)
+        m_c._invalidate_catalogue_entry(model, part)
         del model.parts_forest[part]
         model.object_parts.pop(part)
     deletion_list = []
@@ -155,7 +161,7 @@ def _tidy_up_forests(model, tidy_main_tree = True, tidy_others = False, remove_e
         del model.other_forest[part]
 
 
-def _load_epc(model, epc_file, full_load = True, epc_subdir = None, copy_from = None, quiet = False):
+def _load_epc(model, epc_file, full_load = True, epc_subdir = None, copy_from = None, quiet = False, lazy_load = False):
     """Load xml parts of model from epc file (HDF5 arrays are not loaded)."""
 
     if not epc_file.endswith('.epc'):
@@ -170,7 +176,16 @@ def _load_epc(model, epc_file, full_load = True, epc_subdir = None, copy_from =
         log.warning('loading model from epc, discarding previous in-memory modifications')
         model.initialize()
 
+    _close_epc_zip(model)
     model.set_epc_file_and_directory(epc_file)
+    model.modified_parts = set()
+    model.part_xml_bytes = {}
+    model.epc_baseline = _epc_signature(epc_file)
+
+    if lazy_load:
+        _lazy_load_epc(model, epc_file, epc_subdir, copy_from)
+        m_c._load_catalogue_index(model, epc_file)
+        return
 
     with zf.ZipFile(epc_file) as epc:
         names = epc.namelist()
@@ -189,6 +204,8 @@ def _load_epc(model, epc_file, full_load = True, epc_subdir = None, copy_from =
         if full_load:
             _tidy_up_forests(model)
 
+    m_c._load_catalogue_index(model, epc_file)
+
     if full_load:
         for uuid_int, part in model.uuid_part_dict.items():
             _add_uuid_relations(model, uuid_int, part)
@@ -197,6 +214,67 @@ def _load_epc(model, epc_file, full_load = True, epc_subdir = None, copy_from =
             _add_uuid_soft_relations(model, uuid_int, part)
 
 
+def _lazy_load_epc(model, epc_file, epc_subdir, copy_from):
+    """Load catalogue of parts from epc file, leaving xml parts to be parsed on demand."""
+
+    epc = zf.ZipFile(epc_file)
+    model.epc_zip = epc  # held open for on demand loading of parts
+    names = epc.namelist()
+    _set_part_names_in_forests(model, epc_subdir, names)
+    with epc.open('[Content_Types].xml') as main_xml:
+        model.main_tree = rqet.parse(main_xml)
+        model.main_root = model.main_tree.getroot()
+        for child in model.main_root:
+            _complete_forest_entry_for_part(epc, model, epc_subdir, False, child)
+    for part_name, (part_type, part_uuid, _) in model.parts_forest.items():
+        if part_type == 'obj_LocalDepth3dCrs':  # as for full load, first crs is treated as primary crs for model
+            model.crs_uuid = part_uuid
+            break
+    model.lazy_load_pending = True
+    if model.rels_present and copy_from:
+        for ext_part in m_c._external_parts_list(model):
+            m_c._tree_for_part(model, rqet.rels_part_name_for_part(ext_part), is_rels = True)
+        model.change_filename_in_hdf5_rels(os.path.split(epc_file)[1][:-4] + '.h5')
+
+
+def _complete_lazy_load(model):
+    """Parses any xml parts not yet loaded for a lazily loaded model and completes the relationship dictionaries."""
+
+    if not model.lazy_load_pending:
+        return
+    model.lazy_load_pending = False  # relations are added in bulk below, rather than as each part is loaded
+    epc = model.epc_zip
+    assert epc is not None, 'epc file not open when completing lazy load'
+    for part_name, (_, _, tree) in list(model.parts_forest.items()):
+        if tree is None:
+            if not _load_part(model, epc, part_name):
+                _fell_part(model, part_name)
+    if model.rels_present:
+        for part_name, (_, tree) in list(model.rels_forest.items()):
+            if tree is None:
+                if not _load_part(model, epc, part_name, is_rels = True):
+                    _fell_part(model, part_name)
+    for part_name, (_, tree) in list(model.other_forest.items()):
+        if tree is None:
+            _load_part(model, epc, part_name, is_rels = False)
+    _tidy_up_forests(model)
+    _close_epc_zip(model)
+
+    for uuid_int, part in model.uuid_part_dict.items():
+        _add_uuid_relations(model, uuid_int, part)
+
+    for uuid_int, part in model.uuid_part_dict.items():
+        _add_uuid_soft_relations(model, uuid_int, part)
+
+
+def _close_epc_zip(model):
+    """Closes the epc file handle held open by a lazily loaded model, if any."""
+
+    if model.epc_zip is not None:
+        model.epc_zip.close()
+        model.epc_zip = None
+
+
 def _add_uuid_soft_relations(model, uuid_int, part):
     if "EpcExternalPart" in part:
         return
@@ -332,7 +410,14 @@ def _load_relationships(epc, model, epc_subdir, names):
                 _fell_part(model, name)
 
 
-def _store_epc(model, epc_file = None, main_xml_name = '[Content_Types].xml', only_if_modified = False, quiet = False):
+def _store_epc(model,
+               epc_file = None,
+               main_xml_name = '[Content_Types].xml',
+               only_if_modified = False,
+               quiet = False,
+               catalogue_index = False,
+               incremental = False,
+               compact = True):
     """Write xml parts of model to epc file (HDF5 arrays are not written here)."""
 
     # for prefix, uri in ns.items():
@@ -348,39 +433,133 @@ def _store_epc(model, epc_file = None, main_xml_name = '[Content_Types].xml', on
     if not quiet:
         log.info(f'storing resqml model to epc file: {epc_file}')
 
-    assert model.main_tree is not None
+    if incremental and _incremental_store_possible(model, epc_file):
+        _store_epc_incremental(model, epc_file, main_xml_name, compact)
+    else:
+        if incremental:
+            log.debug(f'incremental store not possible, rewriting epc file: {epc_file}')
+        _complete_lazy_load(model)
+        assert model.main_tree is not None
+        if model.main_root is None:
+            model.main_root = model.main_tree.getroot()
+        with zf.ZipFile(epc_file, mode = 'w') as epc:
+            _write_main_xml(model, epc, main_xml_name)
+            for part_name, part_tree, standalone in _forest_trees(model):
+                if part_tree is None:
+                    log.warning('No xml tree present to write for part: ' + part_name)
+                    continue
+                _write_part_xml(model, epc, part_name, part_tree, standalone, use_cache = incremental)
+            # todo: other parts (documentation etc.)
+    if catalogue_index:
+        m_c._store_catalogue_index(model, epc_file)
+    model.set_epc_file_and_directory(epc_file)
+    model.modified = False
+    model.modified_parts = set()
+    model.epc_baseline = _epc_signature(epc_file)
+
+
+def _forest_trees(model):
+    """Yields (part name, xml tree, standalone) for all the object, other and rels parts of the model."""
+
+    for part_name, (_, _, part_tree) in model.parts_forest.items():
+        yield _unslashed(part_name), part_tree, None
+    for part_name, (_, part_tree) in model.other_forest.items():
+        yield _unslashed(part_name), part_tree, 'yes'
+    if model.rels_present:
+        for part_name, (_, part_tree) in model.rels_forest.items():
+            yield part_name, part_tree, 'yes'
+
+
+def _unslashed(part_name):
+    return part_name[1:] if part_name[0] == '/' else part_name
+
+
+def _write_main_xml(model, epc, main_xml_name):
+    epc.writestr(main_xml_name, rqet.xml_bytes(model.main_tree, standalone = 'yes'))
+
+
+def _write_part_xml(model, epc, part_name, part_tree, standalone, use_cache = False):
+    """Writes the xml for a part to the open epc zip file, optionally using and populating the model's cache."""
+
+    xml_bytes = model.part_xml_bytes.get(part_name) if use_cache else None
+    if xml_bytes is None:
+        xml_bytes = rqet.xml_bytes(part_tree, standalone = standalone)
+        if use_cache:
+            model.part_xml_bytes[part_name] = xml_bytes
+    epc.writestr(part_name, xml_bytes)
+
+
+def _epc_signature(epc_file):
+    """Returns a tuple identifying the current state of an epc file on disc, or None if it does not exist."""
+
+    try:
+        stat = os.stat(epc_file)
+    except OSError:
+        return None
+    return (os.path.realpath(epc_file), stat.st_size, stat.st_mtime_ns)
+
+
+def _incremental_store_possible(model, epc_file):
+    """Returns True if unmodified parts can be copied from the existing epc file when storing to epc_file."""
+
+    if model.modified_parts is None or model.epc_baseline is None or model.main_tree is None:
+        return False
+    return _epc_signature(epc_file) == model.epc_baseline
+
+
+def _store_epc_incremental(model, epc_file, main_xml_name, compact):
+    """Writes new and modified parts to epc file, with other parts copied from the existing file."""
+
     if model.main_root is None:
         model.main_root = model.main_tree.getroot()
-
-    with zf.ZipFile(epc_file, mode = 'w') as epc:
-        with epc.open(main_xml_name, mode = 'w') as main_xml:
-            rqet.write_xml(main_xml, model.main_tree, standalone = 'yes')
-        for part_name, (_, _, part_tree) in model.parts_forest.items():
-            if part_tree is None:
-                log.warning('No xml tree present to write for part: ' + part_name)
+    reopen = model.epc_zip is not None  # lazily loaded model reading parts on demand from the epc file
+    _close_epc_zip(model)
+    with zf.ZipFile(epc_file, mode = 'r') as old_epc:
+        old_names = set(old_epc.namelist())
+        trees = list(_forest_trees(model))
+        to_write = []  # list of (part name, xml tree, standalone) for new or modified parts
+        for part_name, part_tree, standalone in trees:
+            if part_name in old_names and (part_tree is None or part_name not in model.modified_parts):
                 continue
-            if part_name[0] == '/':
-                part_name = part_name[1:]
-            with epc.open(part_name, mode = 'w') as part_xml:
-                rqet.write_xml(part_xml, part_tree, standalone = None)
-        for part_name, (_, part_tree) in model.other_forest.items():
             if part_tree is None:
-                log.warning('No xml tree present to write for other part: ' + part_name)
+                log.warning('No xml tree present to write for part: ' + part_name)
                 continue
-            if part_name[0] == '/':
-                part_name = part_name[1:]
-            with epc.open(part_name, mode = 'w') as part_xml:
-                rqet.write_xml(part_xml, part_tree, standalone = 'yes')
-        if model.rels_present:
-            for part_name, (_, part_tree) in model.rels_forest.items():
-                if part_tree is None:
-                    log.warning('No xml tree present to write for rels part: ' + part_name)
-                    continue
-                with epc.open(part_name, mode = 'w') as part_xml:
-                    rqet.write_xml(part_xml, part_tree, standalone = 'yes')
-        # todo: other parts (documentation etc.)
-    model.set_epc_file_and_directory(epc_file)
-    model.modified = False
+            to_write.append((part_name, part_tree, standalone))
+        current_names = set(part_name for part_name, _, _ in trees)
+        if not compact and not old_names.issubset(current_names | {main_xml_name}):
+            compact = True  # parts have been removed, so the epc file must be rewritten
+        if compact:
+            temp_file = epc_file + '.tmp'
+            written = set(part_name for part_name, _, _ in to_write)
+            with zf.ZipFile(temp_file, mode = 'w') as epc:
+                _write_main_xml(model, epc, main_xml_name)
+                for part_name, part_tree, standalone in trees:
+                    if part_name in written:
+                        _write_part_xml(model, epc, part_name, part_tree, standalone, use_cache = True)
+                    elif part_name in old_names:
+                        _copy_zip_member(old_epc, epc, part_name)
+    if compact:
+        os.replace(temp_file, epc_file)
+    else:
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message = 'Duplicate name', category = UserWarning)
+            with zf.ZipFile(epc_file, mode = 'a') as epc:
+                _write_main_xml(model, epc, main_xml_name)
+                for part_name, part_tree, standalone in to_write:
+                    _write_part_xml(model, epc, part_name, part_tree, standalone, use_cache = True)
+    log.debug(f'incremental store of {len(to_write)} new or modified parts to epc file: {epc_file}')
+    if reopen:
+        model.epc_zip = zf.ZipFile(epc_file)
+
+
+def _copy_zip_member(source, destination, name):
+    """Copies the content of a member of one zip archive to another, retaining its compression type."""
+
+    info = source.getinfo(name)  # when a name is duplicated, the last (most recent) member is copied
+    new_info = zf.ZipInfo(name, date_time = info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.external_attr = info.external_attr
+    destination.writestr(new_info, source.read(info))
 
 
 def _copy_part(model, existing_uuid, new_uuid, change_hdf5_refs = False):
@@ -393,8 +572,9 @@ def _copy_part(model, existing_uuid, new_uuid, change_hdf5_refs = False):
         log.warning('failed to find existing part for copying with uuid: ' + old_uuid_str)
         return None
     assert len(existing_parts_list) == 1, 'more than one existing part found with uuid: ' + old_uuid_str
-    (part_type, old_uuid, old_tree) = model.parts_forest[existing_parts_list[0]]
+    (part_type, old_uuid, _) = model.parts_forest[existing_parts_list[0]]
     assert bu.matching_uuids(old_uuid, existing_uuid)
+    old_tree = m_c._tree_for_part(model, existing_parts_list[0], is_rels = False)
     new_tree = copy.deepcopy(old_tree)
     new_root = new_tree.getroot()
     part_name = rqet.patch_uuid_in_part_root(new_root, new_uuid)
@@ -437,6 +617,7 @@ def _add_part(model,
     if use_other:
         model.other_forest[part_name] = (content_type, part_tree)
     else:
+        m_c._invalidate_catalogue_entry(model, part_name)
         model.parts_forest[part_name] = (content_type, uuid, part_tree)
         _add_to_object_parts(model, part_name)
         _set_uuid_to_part(model, part_name, uuid)
@@ -454,7 +635,9 @@ def _add_part(model,
         model.rels_forest[rels_part_name] = (uuid, rels_tree)
     if add_to_rels_dict and not use_other:
         _add_uuid_relations(model, uuid.int, part_name)
-    model.set_modified()
+    model.set_modified(part = part_name)
+    if add_relationship_part and model.rels_present:
+        model.set_modified(part = rels_part_name)
 
 
 def _patch_root_for_part(model, part, root):
@@ -465,6 +648,8 @@ def _patch_root_for_part(model, part, root):
     part_tree = rqet.ElementTree(element = root)
     model.parts_forest[part] = (content_type, uuid, part_tree)
     _add_to_object_parts(model, part)
+    m_c._invalidate_catalogue_entry(model, part)
+    model.set_modified(part = part)
 
 
 def _remove_part(model, part_name, remove_relationship_part):
@@ -477,21 +662,24 @@ def _remove_part(model, part_name, remove_relationship_part):
             related_parts = m_c._parts_list_filtered_by_related_uuid(model, m_c._list_of_parts(model),
                                                                      rqet.uuid_in_part_name(part_name))
             for relative in related_parts:
-                (rel_uuid, rel_tree) = model.rels_forest[rqet.rels_part_name_for_part(relative)]
+                rel_tree = m_c._tree_for_part(model, rqet.rels_part_name_for_part(relative), is_rels = True)
                 rel_root = rel_tree.getroot()
                 for child in rel_root:
                     if rqet.stripped_of_prefix(child.tag) != 'Relationship':
                         continue
                     if child.attrib['Target'] == part_name:
                         rel_root.remove(child)
+                        model.set_modified(part = rqet.rels_part_name_for_part(relative))
             rels_part_name = rqet.rels_part_name_for_part(part_name)
         model.rels_forest.pop(rels_part_name)
     _del_uuid_to_part(model, part_name)
     _del_uuid_relations(model, part_name)
+    m_c._invalidate_catalogue_entry(model, part_name)
     model.parts_forest.pop(part_name)
     model.object_parts.pop(part_name)
     _remove_part_from_main_tree(model, part_name)
-    model.set_modified()
+    model.part_xml_bytes.pop(part_name, None)
+    model.modified = True  # removed parts are not written, so need no tracking as modified parts
 
 
 def _del_uuid_relations(model, part_name):
@@ -594,6 +782,7 @@ def _copy_part_from_other_model(model,
                                self_h5_file_name, h5_uuid, other_h5_file_name, root_node, uuid, hdf5_copy_needed)
 
         _add_uuid_relations(model, uuid.int, part)
+        m_c._invalidate_catalogue_entry(model, part)  # xml may have been modified since part was added
 
         resident_uuid = uuid
 
@@ -68,8 +68,8 @@ def _h5_uuid(model):
             except Exception:
                 uuid_list = None
             if uuid_list is None or len(uuid_list) == 0:
-                for part, (_, _, tree) in model.parts_forest.items():
-                    uuid_list = _h5_uuid_list(model, tree.getroot())
+                for part in model.parts_forest:
+                    uuid_list = _h5_uuid_list(model, model.root_for_part(part))
                     if uuid_list is not None and len(uuid_list) > 0:
                         break
             if uuid_list is not None and len(uuid_list) > 0:
@@ -123,7 +123,7 @@ def _h5_target_path_from_rels(model, uuid, override_dir):
         log.debug(f'considering rels: {rel_name}')
         if uuid is None or bu.matching_uuids(uuid, entry[0]):
             log.debug(f'found hdf5 rels part: {rel_name}')
-            rel_root = entry[1].getroot()
+            rel_root = model.root_for_part(rel_name, is_rels = True)
             for child in rel_root:
                 if child.attrib['Id'] == 'Hdf5File' and child.attrib['TargetMode'] == 'External':
                     target_path = child.attrib['Target']
@@ -134,35 +134,86 @@ def _h5_target_path_from_rels(model, uuid, override_dir):
     return None
 
 
-def _h5_access(model, uuid = None, mode = 'r', override = 'default', file_path = None):
-    """Returns an open h5 file handle for the hdf5 file with the given ext uuid."""
+def _h5_access(model,
+               uuid = None,
+               mode = 'r',
+               override = 'default',
+               file_path = None,
+               rdcc_nbytes = None,
+               rdcc_w0 = None,
+               rdcc_nslots = None):
+    """Returns an open h5 file handle for the hdf5 file with the given ext uuid, from the model's pool."""
 
-    if model.h5_currently_open_mode is not None and model.h5_currently_open_mode != mode:
-        _h5_release(model)
     if file_path:
         file_name = _h5_apply_override(model, override, file_path, uuid)
     else:
         file_name = _h5_file_name(model, uuid = uuid, override = override, file_must_exist = (mode == 'r'))
     if mode == 'a' and not os.path.exists(file_name):
         mode = 'w'
-    if model.h5_currently_open_root is not None and os.path.samefile(model.h5_currently_open_path, file_name):
-        return model.h5_currently_open_root
-    if model.h5_currently_open_root is not None:
+    path = _h5_pool_path(file_name)
+    key = (path, mode)
+    h5_root = model.h5_open_files.get(key)
+    if h5_root is not None:
+        model.h5_open_files.move_to_end(key)
+        return h5_root
+    _h5_close_pooled(model, path)  # file must not remain open with a different mode
+    while len(model.h5_open_files) >= model.h5_pool_size:
+        _, lru_root = model.h5_open_files.popitem(last = False)
+        lru_root.close()
+    rdcc_kwargs = {}
+    if rdcc_nbytes is not None:
+        rdcc_kwargs['rdcc_nbytes'] = rdcc_nbytes
+    if rdcc_w0 is not None:
+        rdcc_kwargs['rdcc_w0'] = rdcc_w0
+    if rdcc_nslots is not None:
+        rdcc_kwargs['rdcc_nslots'] = rdcc_nslots
+    h5_root = h5py.File(file_name, mode, **rdcc_kwargs)  # could use try to trap file in use errors?
+    model.h5_open_files[key] = h5_root
+    return h5_root
+
+
+def _h5_pool_path(file_name):
+    """Returns a normalised path for a file, for use in keys of the pool of open hdf5 files."""
+
+    return os.path.normcase(os.path.realpath(file_name))
+
+
+def _h5_release(model, uuid = None, file_path = None):
+    """Releases (closes) all open hdf5 files, or just the one with the given ext uuid or path."""
+
+    if uuid is None and not file_path:
+        for h5_root in model.h5_open_files.values():
+            h5_root.close()
+        model.h5_open_files.clear()
+        return
+    if not file_path:
+        file_path = _h5_file_name(model, uuid = uuid, file_must_exist = False)
+    if file_path:
+        _h5_close_pooled(model, _h5_pool_path(file_path))
+
+
+def _h5_close_pooled(model, path):
+    """Closes any open handles, whatever the mode, for the hdf5 file with the given normalised path."""
+
+    for key in [key for key in model.h5_open_files.keys() if key[0] == path]:
+        model.h5_open_files.pop(key).close()
+
+
+def _h5_release_if_unpooled(model):
+    """Releases open hdf5 files after an access, unless the model is retaining handles in a pool."""
+
+    if model.h5_pool_size <= 1:
         _h5_release(model)
-    model.h5_currently_open_path = file_name
-    model.h5_currently_open_mode = mode
-    model.h5_currently_open_root = h5py.File(file_name, mode)  # could use try to trap file in use errors?
-    return model.h5_currently_open_root
 
 
-def _h5_release(model):
-    """Releases (closes) the currently open hdf5 file."""
+def _h5_set_pool_size(model, pool_size):
+    """Sets the maximum number of hdf5 files to be held open at one time, closing least recently used if needed."""
 
-    if model.h5_currently_open_root is not None:
-        model.h5_currently_open_root.close()
-        model.h5_currently_open_root = None
-    model.h5_currently_open_path = None
-    model.h5_currently_open_mode = None
+    assert pool_size >= 1
+    model.h5_pool_size = pool_size
+    while len(model.h5_open_files) > pool_size:
+        _, lru_root = model.h5_open_files.popitem(last = False)
+        lru_root.close()
 
 
 def _h5_array_shape_and_type(model, h5_key_pair):
@@ -183,7 +234,8 @@ def _h5_array_element(model,
                       object = None,
                       array_attribute = None,
                       dtype = 'float',
-                      required_shape = None):
+                      required_shape = None,
+                      memmap = False):
     """Returns one element from an hdf5 array and/or caches the array."""
 
     def reshaped_index(index, shape_tuple, required_shape):
@@ -231,17 +283,21 @@ def _h5_array_element(model,
             required_shape = shape_tuple
         else:
             required_shape = tuple(required_shape)
-        object.__dict__[array_attribute] = np.zeros(required_shape, dtype = dtype)
-        if shape_tuple == required_shape:
-            object.__dict__[array_attribute][:] = h5_root[h5_key_pair[1]]
-        elif (len(shape_tuple) == len(required_shape) and ('bool' in str_dtype or 'uint8' in str_dtype) and
-              8 * (shape_tuple[-1] - 1) < required_shape[-1] <= 8 * shape_tuple[-1]):
-            a = np.unpackbits(h5_root[h5_key_pair[1]], axis = -1).astype(bool)
-            object.__dict__[array_attribute][:] = a[..., :required_shape[-1]]
+        mm = _h5_memmap(h5_root, h5_key_pair[1], dtype, required_shape) if memmap else None
+        if mm is not None:
+            object.__dict__[array_attribute] = mm
         else:
-            object.__dict__[array_attribute][:] =  \
-                np.array(h5_root[h5_key_pair[1]], dtype = dtype).reshape(required_shape)
-        _h5_release(model)
+            object.__dict__[array_attribute] = np.zeros(required_shape, dtype = dtype)
+            if shape_tuple == required_shape:
+                object.__dict__[array_attribute][:] = h5_root[h5_key_pair[1]]
+            elif (len(shape_tuple) == len(required_shape) and ('bool' in str_dtype or 'uint8' in str_dtype) and
+                  8 * (shape_tuple[-1] - 1) < required_shape[-1] <= 8 * shape_tuple[-1]):
+                a = np.unpackbits(h5_root[h5_key_pair[1]], axis = -1).astype(bool)
+                object.__dict__[array_attribute][:] = a[..., :required_shape[-1]]
+            else:
+                object.__dict__[array_attribute][:] =  \
+                    np.array(h5_root[h5_key_pair[1]], dtype = dtype).reshape(required_shape)
+        _h5_release_if_unpooled(model)
         if index is None:
             return None
         return object.__dict__[array_attribute][tuple(index)]
@@ -258,7 +314,7 @@ def _h5_array_element(model,
             else:
                 index = reshaped_index(index, required_shape, shape_tuple)
                 result = h5_root[h5_key_pair[1]][tuple(index)]
-        _h5_release(model)
+        _h5_release_if_unpooled(model)
         if dtype is None:
             return result
         if result.size == 1:
@@ -271,6 +327,26 @@ def _h5_array_element(model,
         return np.array(result, dtype = dtype)
 
 
+def _h5_memmap(h5_root, internal_path, dtype, required_shape):
+    """Returns a read only memory map onto an hdf5 dataset, or None if the dataset is not suitable for mapping."""
+
+    dset = h5_root[internal_path]
+    if dset.chunks is not None or dset.compression is not None or dset.external:
+        return None  # data is not stored as a single contiguous block
+    h5_dtype = dset.dtype
+    if h5_dtype.kind not in 'iuf' or np.prod(dset.shape, dtype = int) != np.prod(required_shape, dtype = int):
+        return None  # includes bool data packed into bits
+    if dtype is not None:
+        # generic dtypes are satisfied by any precision of the same kind, specific ones must match exactly
+        generic = dtype in ('float', 'int', float, int)
+        if not (np.dtype(dtype) == h5_dtype or (generic and np.dtype(dtype).kind == h5_dtype.kind)):
+            return None
+    offset = dset.id.get_offset()
+    if offset is None:
+        return None  # storage not allocated
+    return np.memmap(h5_root.filename, dtype = h5_dtype, mode = 'r', offset = offset, shape = required_shape)
+
+
 def _h5_array_slice(model, h5_key_pair, slice_tuple):
     """Loads a slice of an hdf5 array."""
 
@@ -312,7 +388,7 @@ def _change_hdf5_uuid_in_hdf5_references(model, node, old_uuid, new_uuid):
     # else:
     #     log.debug(str(count) + ' hdf5 references modified')
     if count > 0:
-        model.set_modified()
+        _set_modified_for_node(model, node)
 
 
 def _change_uuid_in_hdf5_references(model, node, old_uuid, new_uuid):
@@ -335,7 +411,7 @@ def _change_uuid_in_hdf5_references(model, node, old_uuid, new_uuid):
     else:
         log.debug(str(count) + ' hdf5 references modified')
     if count > 0:
-        model.set_modified()
+        _set_modified_for_node(model, node)
 
 
 def _change_filename_in_hdf5_rels(model, new_hdf5_filename = None):
@@ -345,13 +421,27 @@ def _change_filename_in_hdf5_rels(model, new_hdf5_filename = None):
         new_hdf5_filename = os.path.split(model.epc_file)[1][:-4] + '.h5'
     count = 0
     for rel_name, entry in model.rels_forest.items():
+        if entry[1] is None:
+            continue  # not yet loaded by a lazy load, so not needing to be patched
         rel_root = entry[1].getroot()
         for child in rel_root:
             if child.attrib['Id'] == 'Hdf5File' and child.attrib['TargetMode'] == 'External':
                 child.attrib['Target'] = new_hdf5_filename
+                model.set_modified(part = rel_name)
                 count += 1
     log.info(str(count) + ' hdf5 filename' + _pl(count) + ' set to: ' + new_hdf5_filename)
-    if count > 0:
+
+
+def _set_modified_for_node(model, node):
+    """Marks the model as modified after an in-place edit within node, identifying the part where possible."""
+
+    uuid = rqet.uuid_for_part_root(node)
+    part = None if uuid is None else model.part_for_uuid(uuid)
+    if part is None:
+        model.modified = True  # node is not (yet) a part of the model, so will be flagged when added as a part
+    elif model.parts_forest[part][2] is not None and model.parts_forest[part][2].getroot() is node:
+        model.set_modified(part = part)
+    else:
         model.set_modified()
 
 
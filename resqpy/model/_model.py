@@ -7,6 +7,7 @@ log = logging.getLogger(__name__)
 import h5py
 import os
 import warnings
+from collections import OrderedDict
 from typing import Iterable, Optional, Union
 
 import resqpy.model._catalogue as m_c
@@ -47,7 +48,8 @@ class Model():
                  create_basics: Optional[bool] = None,
                  create_hdf5_ext: Optional[bool] = None,
                  copy_from: Optional[str] = None,
-                 quiet = False):
+                 quiet = False,
+                 lazy_load: bool = False):
         """Create an empty model; load it from epc_file if given.
 
         Note:
@@ -84,6 +86,10 @@ class Model():
               any previous instances) before epc_file is opened; this argument is primarily to facilitate
               repeated testing of code that modifies the resqml dataset, eg. by appending new parts
            quiet (boolean, default False): if True, reading and saving info logging messages are suppressed
+           lazy_load (boolean, default False): if True, only the list of parts is read from the epc when
+              opening and the xml for each part is parsed when first accessed, with the relationship
+              dictionaries being built incrementally; full_load is ignored when lazy_load is True; see
+              load_epc() for more details
 
         Returns:
            The newly created Model object
@@ -109,7 +115,8 @@ class Model():
                           full_load = full_load,
                           epc_subdir = epc_subdir,
                           copy_from = copy_from,
-                          quiet = quiet)
+                          quiet = quiet,
+                          lazy_load = lazy_load)
         else:
             if epc_file and new_epc:
                 try:
@@ -143,13 +150,19 @@ class Model():
            not usually called directly (semi-private)
         """
 
+        if getattr(self, 'epc_zip', None) is not None:
+            self.epc_zip.close()
+        if getattr(self, 'h5_open_files', None):
+            m_h._h5_release(self)
         self.epc_file = None
         self.epc_directory = None
+        self.epc_zip = None  # open ZipFile handle, only held whilst a lazy load is pending
+        self.lazy_load_pending = False  # True if some parts of a lazily loaded epc have not yet been parsed
         # hdf5 stuff
         self.h5_dict = {}  # dictionary keyed on hdf5 uuid.bytes; mapping to hdf5 file name (full path)
-        self.h5_currently_open_path = None
-        self.h5_currently_open_root = None  # h5 file handle for open hdf5 file
-        self.h5_currently_open_mode = None
+        # pool of open h5 file handles keyed on (path, mode), in order of least to most recently accessed
+        self.h5_open_files = OrderedDict()
+        self.h5_pool_size = 1  # maximum number of hdf5 files held open at one time
         self.default_h5_override = 'full'  # one of 'none', 'dir', or 'full'
         self.main_h5_uuid = None  # uuid of main hdf5 file
         # xml stuff
@@ -172,7 +185,16 @@ class Model():
         ]  # todo: mapping from reservoir name (citation title) to list of grids for that reservoir
         self.consolidation = None  # Consolidation object for mapping equivalent uuids
         self.modified = False
+        self.modified_parts = set()  # names of xml parts added or modified since load or store; None if not known
+        self.epc_baseline = None  # (path, size, mtime) of epc file holding unmodified parts, for incremental store
+        self.part_xml_bytes = {}  # dictionary keyed on part_name; mapping to serialized xml, for incremental store
+        # serial number bumped whenever the model is marked as modified, with the serial of the latest modification of
+        # each part, most recent last; a None key records the latest modification of unknown parts, eg. initialization
+        self.modification_serial = getattr(self, 'modification_serial', 0) + 1
+        self.part_modification_serial = {None: self.modification_serial}
         self.object_parts = {}  # Dictionary for model object parts that aren't epc refs.
+        self.catalogue_index = {
+        }  # dictionary keyed on part_name; mapping to (title, originator, creation, realization, support uuid, extra)
 
     def parts(self,
               parts_list = None,
@@ -529,15 +551,32 @@ class Model():
                           epc_subdir = epc_subdir,
                           multiple_handling = multiple_handling)
 
-    def set_modified(self):
+    def set_modified(self, part = None):
         """Marks the model as having been modified and assigns a new uuid.
 
+        arguments:
+           part (string, optional): the name of the xml part (object, rels or docProps part) which has been
+              added or modified; if None, the modified parts are treated as unknown
+
         note:
            this modification tracking functionality is not part of the resqml standard and is only loosely
-           applied by the library code; not usually called directly
+           applied by the library code; not usually called directly, except after an in-place edit of the
+           xml of an existing part, when the part name should be given to support an incremental store_epc()
+           and to refresh any consolidation index entry for the part
         """
 
         self.modified = True
+        self.modification_serial += 1
+        if part is None:
+            self.modified_parts = None
+            self.part_xml_bytes.clear()
+        else:
+            part = part[1:] if part.startswith('/') else part
+            self.part_xml_bytes.pop(part, None)
+            if self.modified_parts is not None:
+                self.modified_parts.add(part)
+        self.part_modification_serial.pop(part, None)  # re-inserted to keep the dictionary in order of modification
+        self.part_modification_serial[part] = self.modification_serial
 
     def uuids_as_int_related_to_uuid(self, uuid):
         """Returns set of ints being uuids of objects related to uuid by any category of relationship.
@@ -659,7 +698,13 @@ class Model():
                              tidy_others = tidy_others,
                              remove_extended_core = remove_extended_core)
 
-    def load_epc(self, epc_file, full_load = True, epc_subdir = None, copy_from = None, quiet = False):
+    def load_epc(self,
+                 epc_file,
+                 full_load = True,
+                 epc_subdir = None,
+                 copy_from = None,
+                 quiet = False,
+                 lazy_load = False):
         """Load xml parts of model from epc file (HDF5 arrays are not loaded).
 
         Arguments:
@@ -673,13 +718,19 @@ class Model():
               to epc_file (and paired .h5) prior to opening epc_file; any previous files named
               as epc_file will be overwritten
            quiet (boolean, default False): if True, info logging message is emitted as debug
+           lazy_load (boolean, default False): if True, only the zip directory and content types are read
+              here, with the xml for each part being parsed on first access; full_load is ignored if True
 
         Returns:
            None
 
-        Note:
+        Notes:
            when copy_from is specified, the entire contents of the source dataset are copied,
-           regardless of the epc_subdir setting which only affects the subsequent load into memory
+           regardless of the epc_subdir setting which only affects the subsequent load into memory;
+           with lazy_load, the epc file is held open until all parts have been loaded; references from
+           a part are added to the relationship dictionaries when the part is parsed; any query needing
+           complete relationship information (eg. parts referring to a given uuid), or storing the epc,
+           triggers loading of all remaining parts, see complete_lazy_load()
         """
 
         m_f._load_epc(self,
@@ -687,13 +738,44 @@ class Model():
                       full_load = full_load,
                       epc_subdir = epc_subdir,
                       copy_from = copy_from,
-                      quiet = quiet)
+                      quiet = quiet,
+                      lazy_load = lazy_load)
+
+    def invalidate_catalogue_index(self, part = None):
+        """Discards cached catalogue information for a part, or for all parts; needed after in-place xml edits.
+
+        arguments:
+           part (string, optional): the name of the part whose xml has been modified; if None, the entire
+              catalogue index is discarded
+
+        note:
+           the catalogue index holds citation, realization, supporting representation and extra metadata
+           information extracted from the xml of parts, for use when filtering and sorting parts; entries
+           are refreshed automatically when parts are added, patched or removed via Model methods;
+           the part is also marked as modified, so that an incremental store_epc() rewrites its xml
+        """
+
+        m_c._invalidate_catalogue_entry(self, part)
+        self.set_modified(part = part)
+
+    def complete_lazy_load(self):
+        """Parses all xml parts not yet loaded for a lazily loaded model and completes relationship dictionaries.
+
+        note:
+           does nothing if the model was not lazily loaded or all parts have already been loaded; called
+           automatically when needed, so not usually called directly
+        """
+
+        m_f._complete_lazy_load(self)
 
     def store_epc(self,
                   epc_file = None,
                   main_xml_name = '[Content_Types].xml',
                   only_if_modified = False,
-                  quiet = False):
+                  quiet = False,
+                  catalogue_index = False,
+                  incremental = False,
+                  compact = True):
         """Write xml parts of model to epc file (HDF5 arrays are not written here).
 
         Arguments:
@@ -706,12 +788,31 @@ class Model():
            only_if_modified (boolean, default False): if True, the epc file is only written if the model
               is flagged as having been modified (at least one part added or removed)
            quiet (boolean, default False): if True, info logging is emitted at debug level
+           catalogue_index (boolean, default False): if True, a catalogue index sidecar file is also written,
+              alongside the epc, holding citation and metadata information used when filtering and sorting parts
+           incremental (boolean, default False): if True, and the epc file is the one the model was loaded from
+              or last stored to, and has not since been changed on disk, then only new or modified parts are
+              serialized, with other parts being copied unchanged from the existing epc file; otherwise, the whole
+              epc file is written but the serialized xml retained by earlier incremental stores is reused for parts
+              which have not been modified since
+           compact (boolean, default True): only relevant when incremental is True; if True, a new epc file is
+              written and replaces the existing one; if False, new and modified parts are appended to the
+              existing epc file, leaving superseded copies of modified parts in the zip archive until a later
+              compacting store; ignored (treated as True) if any parts have been removed
 
         Returns:
            None
 
-        Note:
-           the main tree, parts forest and rels forest must all be up to date before calling this method
+        Notes:
+           the main tree, parts forest and rels forest must all be up to date before calling this method;
+           a catalogue index sidecar file is named after the epc file with a _catalogue.json suffix and is used
+           by a subsequent load_epc() provided that the epc file has not been rewritten in the meantime;
+           an incremental store relies on the modified part tracking of the model: parts added, patched or removed
+           via Model methods are tracked automatically, but calling code which edits the xml of an existing part
+           in place should call set_modified(part = part_name); if the modified parts are not known, all loaded
+           parts are serialized; parts of a lazily loaded model which have not been parsed are always copied;
+           a non-compacting incremental store is quickest, for repeated saves whilst building a large model, but
+           the final store should compact the epc file for compatibility with other software
 
         :meta common:
         """
@@ -720,7 +821,10 @@ class Model():
                        epc_file = epc_file,
                        main_xml_name = main_xml_name,
                        only_if_modified = only_if_modified,
-                       quiet = quiet)
+                       quiet = quiet,
+                       catalogue_index = catalogue_index,
+                       incremental = incremental,
+                       compact = compact)
 
     def parts_list_of_type(self, type_of_interest = None, uuid = None):
         """Returns a list of part names for parts of type of interest, optionally matching a uuid.
@@ -1283,7 +1387,14 @@ class Model():
 
         return m_h._h5_file_name(self, uuid = uuid, override = override, file_must_exist = file_must_exist)
 
-    def h5_access(self, uuid = None, mode = 'r', override = 'default', file_path = None):
+    def h5_access(self,
+                  uuid = None,
+                  mode = 'r',
+                  override = 'default',
+                  file_path = None,
+                  rdcc_nbytes = None,
+                  rdcc_w0 = None,
+                  rdcc_nslots = None):
         """Returns an open h5 file handle for the hdf5 file with the given uuid.
 
         arguments:
@@ -1298,19 +1409,37 @@ class Model():
               extension with .h5
            file_path (string, optional): if present, is used as the hdf5 file path, otherwise
               the path will be determined based on the uuid and override arguments
+           rdcc_nbytes (int, optional): if present, the raw data chunk cache size in bytes for the file
+           rdcc_w0 (float, optional): if present, the chunk cache preemption policy for the file
+           rdcc_nslots (int, optional): if present, the number of chunk slots in the raw data chunk cache
 
         returns:
            a file handle to the opened hdf5 file
 
-        note:
+        notes:
            an exception will be raised if the hdf5 file cannot be opened; note that sometimes another
-           piece of code accessing the file might cause a 'resource unavailable' exception
+           piece of code accessing the file might cause a 'resource unavailable' exception;
+           open file handles are held in a pool, keyed on path and mode, with the least recently accessed
+           file being closed when the pool size (see h5_set_pool_size()) would otherwise be exceeded;
+           a file already open in a different mode is closed and reopened in the requested mode;
+           the chunk cache arguments only take effect when the file is opened, not if it is already open
         """
 
-        return m_h._h5_access(self, uuid = uuid, mode = mode, override = override, file_path = file_path)
+        return m_h._h5_access(self,
+                              uuid = uuid,
+                              mode = mode,
+                              override = override,
+                              file_path = file_path,
+                              rdcc_nbytes = rdcc_nbytes,
+                              rdcc_w0 = rdcc_w0,
+                              rdcc_nslots = rdcc_nslots)
 
-    def h5_release(self):
-        """Releases (closes) the currently open hdf5 file.
+    def h5_release(self, uuid = None, file_path = None):
+        """Releases (closes) open hdf5 files; by default all of them.
+
+        arguments:
+           uuid (uuid.UUID, optional): if present, only the hdf5 file for this ext uuid is closed
+           file_path (string, optional): if present, only the hdf5 file with this path is closed
 
         returns:
            None
@@ -1318,7 +1447,26 @@ class Model():
         :meta common:
         """
 
-        m_h._h5_release(self)
+        m_h._h5_release(self, uuid = uuid, file_path = file_path)
+
+    def h5_set_pool_size(self, pool_size):
+        """Sets the maximum number of hdf5 files that the model will hold open at one time.
+
+        arguments:
+           pool_size (int): the maximum number of open hdf5 file handles; must be at least one
+
+        returns:
+           None
+
+        notes:
+           the default pool size is one, in which case files are closed after each array element access,
+           as well as whenever a different file is accessed; with a larger pool size, files remain open
+           after reading until released explicitly or evicted as the least recently accessed file, which
+           avoids repeated file opening costs when reading arrays interleaved across several hdf5 files;
+           whilst a file is held open, other processes may not be able to write to it
+        """
+
+        m_h._h5_set_pool_size(self, pool_size)
 
     def h5_array_shape_and_type(self, h5_key_pair):
         """Returns the shape and dtype of the array, as stored in the hdf5 file.
@@ -1340,7 +1488,8 @@ class Model():
                          object = None,
                          array_attribute = None,
                          dtype = 'float',
-                         required_shape = None):
+                         required_shape = None,
+                         memmap = False):
         """Returns one element from an hdf5 array and/or caches the array.
 
         arguments:
@@ -1357,16 +1506,22 @@ class Model():
            required_shape (tuple of ints, optional): if not None, the hdf5 array will be reshaped to this shape; if index
               is not None, it is taken to be applicable to the required shape; required if the array is bool data that was
               written with resqpy specific dtype of 'pack'
+           memmap (boolean, default False): if True and cache_array is True, and the hdf5 dataset is stored contiguously
+              without compression or chunking, the array is 'cached' as a read only numpy memmap onto the hdf5 file,
+              rather than being read into memory; otherwise the array is read as usual
 
         returns:
            if index is None, then None;
            if index is not None, then the value of the array for the cell identified by index
 
-        note:
+        notes:
            this function can be used to access an individual element from an hdf5 array, or to cache a whole array in memory;
            when accessing an individual element, the index style must match the array indexing; in particular for IJK grid points,
            a (k0, pillar_index) is needed when the grid has split pillars, whereas a (k0, j0, i0) is needed when the grid does
-           not have any split pillars
+           not have any split pillars;
+           a memmap allows the operating system to page in data as needed, and to share it between processes; it has the
+           dtype of the hdf5 dataset, which may differ in precision from a generic dtype argument such as 'float' or 'int';
+           it must not be modified and the hdf5 file must not be overwritten whilst the memmap is in use
         """
 
         return m_h._h5_array_element(self,
@@ -1376,7 +1531,8 @@ class Model():
                                      object = object,
                                      array_attribute = array_attribute,
                                      dtype = dtype,
-                                     required_shape = required_shape)
+                                     required_shape = required_shape,
+                                     memmap = memmap)
 
     def h5_array_slice(self, h5_key_pair, slice_tuple):
         """Loads a slice of an hdf5 array.
@@ -1973,6 +2129,7 @@ class Model():
         """
 
         rqet.cut_extra_metadata(self.root_for_uuid(uuid))
+        self.invalidate_catalogue_index(self.part_for_uuid(uuid))
 
     def copy_part_from_other_model(self,
                                    other_model,
@@ -9,6 +9,7 @@ import os
 import warnings
 
 import resqpy.crs as rqc
+import resqpy.model._catalogue as m_c
 import resqpy.olio.time as time
 import resqpy.olio.uuid as bu
 import resqpy.olio.xml_et as rqet
@@ -46,6 +47,7 @@ def _change_uuid_in_supporting_representation_reference(model, node, old_uuid, n
     if not bu.matching_uuids(uuid_node.text, old_uuid):
         return False
 
+    model.complete_lazy_load()
     uuid_node_int = rqet.uuid_for_part_root(node).int
     relations = model.uuid_rels_dict[uuid_node_int]
     if old_uuid.int in relations[0]:
@@ -64,7 +66,9 @@ def _change_uuid_in_supporting_representation_reference(model, node, old_uuid, n
         title_node = rqet.find_tag(ref_node, 'Title')
         if title_node is not None:
             title_node.text = str(new_title)
-    model.set_modified()
+    part = model.part_for_uuid(uuid_node_int)
+    m_c._invalidate_catalogue_entry(model, part)
+    model.set_modified(part = part)
     return True
 
 
@@ -196,7 +200,7 @@ def _create_rels_part(model):
     rels.set('Extension', 'rels')
     rels.set('ContentType', 'application/vnd.openxmlformats-package.relationships+xml')
     model.rels_present = True
-    model.set_modified()
+    model.modified = True  # main tree is always written when storing, so no part needs flagging as modified
 
     return rels
 
@@ -285,6 +289,7 @@ def _create_doc_props(model, add_as_part = True, root = None, originator = None)
             core_rel.set('Id', 'CoreProperties')
             core_rel.set('Type', ns_url['rels_md'] + 'core-properties')
             core_rel.set('Target', 'docProps/core.xml')
+            model.set_modified(part = '_rels/.rels')
     return dp
 
 
@@ -556,14 +561,16 @@ def _create_reciprocal_relationship(model, node_a, rel_type_a, node_b, rel_type_
     obj_type_a = rqet.stripped_of_prefix(rqet.content_type(node_a.attrib[ns['xsi'] + 'type']))
     part_name_a = rqet.part_name_for_object(obj_type_a, uuid_a)
     rel_part_name_a = rqet.rels_part_name_for_part(part_name_a)
-    (rel_uuid_a, rel_tree_a) = model.rels_forest[rel_part_name_a]
+    rel_uuid_a = model.rels_forest[rel_part_name_a][0]
+    rel_tree_a = m_c._tree_for_part(model, rel_part_name_a, is_rels = True)
     rel_root_a = rel_tree_a.getroot()
 
     uuid_b = node_b.attrib['uuid']
     obj_type_b = rqet.stripped_of_prefix(rqet.content_type(node_b.attrib[ns['xsi'] + 'type']))
     part_name_b = rqet.part_name_for_object(obj_type_b, uuid_b)
     rel_part_name_b = rqet.rels_part_name_for_part(part_name_b)
-    (rel_uuid_b, rel_tree_b) = model.rels_forest[rel_part_name_b]
+    rel_uuid_b = model.rels_forest[rel_part_name_b][0]
+    rel_tree_b = m_c._tree_for_part(model, rel_part_name_b, is_rels = True)
     rel_root_b = rel_tree_b.getroot()
 
     create_a = True
@@ -581,6 +588,7 @@ def _create_reciprocal_relationship(model, node_a, rel_type_a, node_b, rel_type_
                   id_str(uuid_b))  # NB: fesapi prefixes uuid with _ for some rels only (where uuid starts with a digit)
         rel_a.set('Type', ns_url['rels_ext'] + rel_type_a)
         rel_a.set('Target', part_name_b)
+        model.set_modified(part = rel_part_name_a)
 
     create_b = True
     if avoid_duplicates:
@@ -597,6 +605,7 @@ def _create_reciprocal_relationship(model, node_a, rel_type_a, node_b, rel_type_
                   id_str(uuid_a))  # NB: fesapi prefixes uuid with _ for some rels only (where uuid starts with a digit)
         rel_b.set('Type', ns_url['rels_ext'] + rel_type_b)
         rel_b.set('Target', part_name_a)
+        model.set_modified(part = rel_part_name_b)
 
     if "EpcExternalPart" in rel_part_name_a or "EpcExternalPart" in rel_part_name_b:
         return
@@ -5,12 +5,13 @@ import os
 import time
 import uuid
 import joblib  # type: ignore
-from typing import List, Dict, Any, Callable, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Union
 from pathlib import Path
 from joblib import Parallel, delayed, parallel_backend  # type: ignore
 
 import resqpy.model as rq
-import resqpy.olio.consolidation as cons
+import resqpy.multi_processing._recombination as rqmr
 
 log = logging.getLogger(__name__)
 
@@ -39,14 +40,16 @@ def function_multiprocessing(function: Callable,
                              require_success = False,
                              tmp_dir_path: Union[Path, str] = '.',
                              backend: str = 'dask',
-                             clean_up: bool = True) -> List[bool]:
+                             clean_up: bool = True,
+                             max_workers: Optional[int] = None) -> List[bool]:
     """Calls a function concurrently with the specfied arguments.
 
     arguments:
         function (Callable): the wrapper function to be called; needs to return:
             - index (int): the index of the kwargs in the kwargs_list;
             - success (bool): whether the function call was successful, however that is defined;
-            - epc_file (Path or str): the epc file path where the objects are stored;
+            - epc_file (Path or str): the epc file path where the objects are stored; when using the
+              'local' backend, this may instead be an in memory Model (with its hdf5 data written);
             - uuid_list (list of str): list of UUIDs of relevant objects;
         kwargs_list (list of dict): A list of keyword argument dictionaries that are
             used when calling the function
@@ -54,7 +57,8 @@ def function_multiprocessing(function: Callable,
             where the combined epc will be saved
         cluster: if using the Dask backend, a LocalCluster is a Dask cluster on a
             local machine. If using a job queing system, a JobQueueCluster can be used
-            such as an SGECluster, SLURMCluster, PBSCluster, LSFCluster etc
+            such as an SGECluster, SLURMCluster, PBSCluster, LSFCluster etc; not used with the
+            'local' backend
         consolidate (bool): if True and an equivalent part already exists in
             a model, it is not duplicated and the uuids are noted as equivalent
         require_success (bool): if True and any instance fails, then an exception is
@@ -62,10 +66,14 @@ def function_multiprocessing(function: Callable,
         tmp_dir_path (str): path where the temporary directory is saved; defaults to
             the calling code directory
         backend (str): the joblib parallel backend used. Dask is used by default
-            so a Dask cluster must be passed to the cluster argument
+            so a Dask cluster must be passed to the cluster argument; the special value
+            'local' uses a pool of processes on the local machine, without Dask, with the
+            workers returning xml and arrays directly for recombination (see notes)
         clean_up (bool, default True): if True, the temporary directory used during
             multi processing is deleted; if False, it is left in place with its
             contents (to facilitate debugging)
+        max_workers (int, optional): the maximum number of worker processes when using the 'local'
+            backend; if None, the number of processors on the machine is used
 
     returns:
         success_list (List[bool]): A boolean list of successful function calls
@@ -77,7 +85,11 @@ def function_multiprocessing(function: Callable,
         parallel, so a Dask cluster must be setup and passed as an argument if Dask is
         used; Dask will need to be installed in the Python environment because it is not
         a dependency of the project; more info can be found at
-        https://resqpy.readthedocs.io/en/latest/tutorial/multiprocessing.html
+        https://resqpy.readthedocs.io/en/latest/tutorial/multiprocessing.html;
+        with the 'local' backend, each worker process converts the objects it has created into
+        serialised xml and numpy arrays, which are passed back to the parent process; the parent
+        then merges these into the recombined model in memory and writes all the new hdf5 data
+        in one pass, avoiding the reopening of each worker's epc file
     """
     log.info("multiprocessing function called with %s function, %s entries.", function.__name__, len(kwargs_list))
 
@@ -89,7 +101,11 @@ def function_multiprocessing(function: Callable,
         kwargs["index"] = i
         kwargs["parent_tmp_dir"] = str(tmp_dir)
 
-    if cluster is None:
+    if backend == 'local':
+        with ProcessPoolExecutor(max_workers = max_workers) as executor:
+            futures = [executor.submit(_local_worker, function, kwargs) for kwargs in kwargs_list]
+            results = [future.result() for future in futures]
+    elif cluster is None:
         results = []
         for i, kwargs in enumerate(kwargs_list):
             # log.debug(f'calling function for entry {i}; name: {kwargs.get("name")}')
@@ -120,53 +136,37 @@ def function_multiprocessing(function: Callable,
         model_recombined = rq.new_model(epc_file = str(epc_file))
         log.info(f"creating the recombined epc file: {epc_file}")
 
-    model = None
-    for i, epc in enumerate(epc_list):
-        # log.debug(f'recombining from mp instance {i} epc: {epc}')
-        if epc is None:
-            continue
-        attempt = 0
-        while not os.path.exists(epc):
-            attempt += 1
-            if attempt == 7:
-                log.warning(f'mp epc slow to materialise: {epc}')
-            if attempt > 300:
-                raise FileNotFoundError(f'timeout waiting for multiprocess worker epc to become available: {epc}')
-            time.sleep(min(attempt, 10))
-        attempt = 0
-        while True:
-            attempt += 1
-            try:
-                model = rq.Model(epc_file = epc, quiet = True)
-                break
-            except FileNotFoundError:
-                if attempt >= 10:
-                    raise FileNotFoundError(f'timeout waiting for mp epc {epc}')
-                time.sleep(1)
-        uuids = cons.sort_uuids_list(model, uuids_list[i])
-        if uuids is None:
-            uuids = model.uuids()
-        for u in uuids:
-            attempt = 0
-            while True:
-                attempt += 1
-                try:
-                    model_recombined.copy_uuid_from_other_model(model, uuid = u, consolidate = consolidate)
-                    break
-                except BlockingIOError:
-                    if attempt >= 5:
-                        raise
-                time.sleep(1)
+    if backend == 'local':
+        timing = rqmr.merge_payloads(model_recombined, epc_list, consolidate = consolidate)
+    else:
+        timing = rqmr.recombine_epc_list(model_recombined, epc_list, uuids_list, consolidate = consolidate)
 
     # Deleting temporary directory.
     # log.debug(f"deleting the temporary directory {tmp_dir}")
     if clean_up:
         rm_tree(tmp_dir)
 
+    t = time.perf_counter()
     model_recombined.store_epc(quiet = True)
-    if model is not None:
-        model.h5_release()
+    timing['store'] = time.perf_counter() - t
 
+    log.info('recombination timing (seconds): ' + ', '.join([f'{phase}: {t:.3f}' for phase, t in timing.items()]))
     log.debug(f"recombined epc file complete: {epc_file}")
 
     return success_list
+
+
+def _local_worker(function, kwargs):
+    """Calls the function in a worker process and returns its result with objects packed as a payload."""
+
+    index, success, epc, uuid_list = function(**kwargs)
+    payload = None
+    if epc is not None:
+        if isinstance(epc, rq.Model):
+            model = epc
+        else:
+            model = rq.Model(epc_file = str(epc), quiet = True)
+            model.h5_set_default_override('dir')  # arrays are read from the hdf5 file of each external part
+        payload = rqmr.pack_payload(model, uuid_list)
+        model.h5_release()
+    return (index, success, payload, uuid_list)
@@ -0,0 +1,318 @@
+"""Recombination stage for multiprocessing: merges worker outputs into a single model."""
+
+import hashlib
+import io
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+
+import resqpy.model as rq
+import resqpy.olio.consolidation as cons
+import resqpy.olio.uuid as bu
+import resqpy.olio.write_hdf5 as rwh5
+import resqpy.olio.xml_et as rqet
+
+log = logging.getLogger(__name__)
+
+prefetch_count = 4  # number of worker epc files loaded ahead of the merge, in background threads
+
+
+def recombine_epc_list(model, epc_list, uuids_list, consolidate = True):
+    """Merges the listed parts of worker epc files into model, copying hdf5 data in bulk per source file.
+
+    arguments:
+        model (Model): the recombined model into which the worker parts are merged
+        epc_list (list of str): the worker epc file paths; None entries are skipped
+        uuids_list (list of list of UUID): for each epc, the uuids of the parts to merge; if an entry is
+            None, all the parts of that epc are merged
+        consolidate (bool, default True): if True, parts equivalent to resident parts are not duplicated
+
+    returns:
+        dict mapping phase name ('load', 'xml', 'hdf5') to elapsed seconds
+
+    notes:
+        worker epc files are loaded ahead of the merge in background threads; xml is merged without any
+        hdf5 copying, with the hdf5 datasets of new parts being copied afterwards, with each source file
+        opened once; equivalent parts repeated across worker models are identified from a hash of their
+        xml content, avoiding repeated pairwise comparisons
+    """
+
+    timing = {'load': 0.0, 'xml': 0.0, 'hdf5': 0.0}
+    h5_uuid, h5_file_name, ext_node = _prepare_hdf5_ext(model)
+    hash_map = {}
+    source_paths = {}  # maps source hdf5 file name to list of internal paths to copy
+
+    jobs = [(epc, uuids) for epc, uuids in zip(epc_list, uuids_list) if epc is not None]
+    with ThreadPoolExecutor(max_workers = prefetch_count) as executor:
+        futures = deque()
+        next_job = 0
+        for _, uuids in jobs:
+            while next_job < len(jobs) and len(futures) < prefetch_count:
+                futures.append(executor.submit(_load_worker_model, jobs[next_job][0]))
+                next_job += 1
+            future = futures.popleft()
+            t = time.perf_counter()
+            source = future.result()
+            timing['load'] += time.perf_counter() - t
+            t = time.perf_counter()
+            if uuids is None:
+                uuids = source.uuids()
+            uuids = cons.sort_uuids_list(source, uuids)
+            adopted = _merge_model(model, source, uuids, consolidate, hash_map, h5_uuid, ext_node)
+            if adopted:
+                source_h5 = source.h5_file_name()
+                source_paths.setdefault(source_h5, []).extend(adopted)
+            source.h5_release()
+            timing['xml'] += time.perf_counter() - t
+
+    t = time.perf_counter()
+    if source_paths:
+        model.h5_release()
+        rwh5.copy_h5_path_lists(source_paths, h5_file_name, mode = 'a')
+    timing['hdf5'] = time.perf_counter() - t
+    return timing
+
+
+def merge_payloads(model, payloads, consolidate = True):
+    """Merges worker payloads (xml, relationships and arrays) into model, writing hdf5 data in a single pass.
+
+    arguments:
+        model (Model): the recombined model into which the worker parts are merged
+        payloads (list of dict): payloads as packed by worker processes; None entries are skipped
+        consolidate (bool, default True): if True, parts equivalent to resident parts are not duplicated
+
+    returns:
+        dict mapping phase name ('load', 'xml', 'hdf5') to elapsed seconds
+    """
+
+    timing = {'load': 0.0, 'xml': 0.0, 'hdf5': 0.0}
+    h5_uuid, h5_file_name, ext_node = _prepare_hdf5_ext(model)
+    hash_map = {}
+    h5_reg = rwh5.H5Register(model)
+    for payload in payloads:
+        if payload is None:
+            continue
+        t = time.perf_counter()
+        source = _immigrant_model(payload)
+        timing['load'] += time.perf_counter() - t
+        t = time.perf_counter()
+        adopted = _merge_model(model, source, payload['uuids'], consolidate, hash_map, h5_uuid, ext_node)
+        for path in adopted:
+            a = payload['arrays'][path]
+            h5_reg.register_dataset(None, path, a, dtype = a.dtype, hdf5_internal_path = path)
+        timing['xml'] += time.perf_counter() - t
+    t = time.perf_counter()
+    h5_reg.write(file = h5_file_name, mode = 'a')
+    timing['hdf5'] = time.perf_counter() - t
+    return timing
+
+
+def pack_payload(model, uuid_list):
+    """Returns a picklable dictionary holding serialised xml, relationships and hdf5 arrays for listed uuids."""
+
+    if uuid_list is None:
+        uuid_list = model.uuids()
+    uuids = [bu.uuid_as_int(u) for u in cons.sort_uuids_list(model, uuid_list)]
+
+    # include referenced parts, which will be copied along with the listed parts
+    closure = set()
+    pending = list(uuids)
+    while pending:
+        uuid_int = pending.pop()
+        if uuid_int in closure:
+            continue
+        part = model.part_for_uuid(uuid_int)
+        if part is None or model.type_of_part(part) == 'obj_EpcExternalPartReference':
+            continue
+        closure.add(uuid_int)
+        relatives = model.uuid_rels_dict.get(uuid_int)
+        if relatives is not None:
+            pending += list(relatives[0])
+
+    parts = []
+    arrays = {}
+    ext_uuids = set()
+    for uuid_int in closure:
+        part = model.part_for_uuid(uuid_int)
+        root = model.root_for_part(part)
+        xml_fp = io.BytesIO()
+        rqet.write_xml(xml_fp, rqet.ElementTree(element = root), standalone = 'yes')
+        for node in root.iter():
+            if rqet.node_type(node) != 'Hdf5Dataset':
+                continue
+            # each array is read from the hdf5 file of its own external part reference
+            ext_uuid = bu.uuid_from_string(rqet.find_nested_tags_text(node, ['HdfProxy', 'UUID']))
+            h5_path = rqet.find_tag_text(node, 'PathInHdfFile')
+            ext_uuids.add(ext_uuid)
+            arrays[h5_path] = model.h5_access(uuid = ext_uuid, mode = 'r')[h5_path][()]
+        relatives = model.uuid_rels_dict.get(uuid_int, (set(), set(), set()))
+        parts.append((part, model.type_of_part(part), xml_fp.getvalue(), tuple(set(r) for r in relatives)))
+    for ext_uuid in ext_uuids:
+        model.h5_release(uuid = ext_uuid)
+
+    return {'uuids': uuids, 'parts': parts, 'arrays': arrays}
+
+
+def _load_worker_model(epc):
+    """Loads a worker model, waiting for its epc file to materialise if necessary."""
+
+    attempt = 0
+    while not os.path.exists(epc):
+        attempt += 1
+        if attempt == 7:
+            log.warning(f'mp epc slow to materialise: {epc}')
+        if attempt > 300:
+            raise FileNotFoundError(f'timeout waiting for multiprocess worker epc to become available: {epc}')
+        time.sleep(min(attempt, 10))
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return rq.Model(epc_file = epc, quiet = True)
+        except FileNotFoundError:
+            if attempt >= 10:
+                raise FileNotFoundError(f'timeout waiting for mp epc {epc}')
+            time.sleep(1)
+
+
+def _immigrant_model(payload):
+    """Returns an in memory Model holding the parts of a payload."""
+
+    immigrant = rq.Model(create_basics = True, quiet = True)
+    for part, content_type, xml_bytes, _ in payload['parts']:
+        root = rqet.parse(io.BytesIO(xml_bytes)).getroot()
+        immigrant.add_part(content_type, rqet.uuid_in_part_name(part), root, add_relationship_part = False)
+    for part, _, _, relatives in payload['parts']:
+        uuid_int = rqet.uuid_in_part_name(part).int
+        immigrant_relatives = immigrant.uuid_rels_dict.get(uuid_int)
+        if immigrant_relatives is None:
+            immigrant.uuid_rels_dict[uuid_int] = relatives
+        else:
+            for i in range(3):
+                immigrant_relatives[i].update(relatives[i])
+    return immigrant
+
+
+def _prepare_hdf5_ext(model):
+    """Ensures model has an hdf5 ext part and file; returns (h5 uuid, h5 file name, ext part root node)."""
+
+    h5_uuid = model.h5_uuid()
+    if h5_uuid is None:
+        model.create_hdf5_ext()
+        h5_uuid = model.h5_uuid()
+    h5_file_name = model.h5_file_name(file_must_exist = False)
+    if not os.path.exists(h5_file_name):
+        h5py.File(h5_file_name, 'w').close()
+    return h5_uuid, h5_file_name, model.root_for_uuid(h5_uuid)
+
+
+def _merge_model(model, source, uuids, consolidate, hash_map, h5_uuid, ext_node):
+    """Copies xml for uuids (and referenced parts) from source into model; returns hdf5 paths of new parts."""
+
+    source_parts = [part for part in source.parts() if source.type_of_part(part) != 'obj_EpcExternalPartReference']
+    already_present = set(part for part in source_parts if part in model.parts_forest)
+    if consolidate:
+        if model.consolidation is None:
+            model.consolidation = cons.Consolidation(model)
+        hashed_parts = _consolidate_by_hash(model, source, source_parts, hash_map)
+    h5_file_name = model.h5_file_name(file_must_exist = False)
+    for uuid in uuids:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # passing the same hdf5 file name for both models suppresses the per part hdf5 copy
+                model.copy_uuid_from_other_model(source,
+                                                 uuid = uuid,
+                                                 consolidate = consolidate,
+                                                 self_h5_file_name = h5_file_name,
+                                                 h5_uuid = h5_uuid,
+                                                 other_h5_file_name = h5_file_name)
+                break
+            except BlockingIOError:
+                if attempt >= 5:
+                    raise
+            time.sleep(1)
+    if consolidate:
+        _record_hashes(model, source, hashed_parts, hash_map)
+    return _adopt_new_parts(model, source_parts, already_present, h5_uuid, ext_node)
+
+
+def _adopt_new_parts(model, source_parts, already_present, h5_uuid, ext_node):
+    """Redirects hdf5 references of newly copied parts to the model's hdf5 file; returns their internal paths."""
+
+    paths = []
+    for part in source_parts:
+        if part in already_present or part not in model.parts_forest:
+            continue  # already resident, consolidated with a resident part, or not copied
+        root = model.root_for_part(part)
+        part_paths = [node.text for node in rqet.list_of_descendant_tag(root, 'PathInHdfFile')]
+        if part_paths:
+            model.change_hdf5_uuid_in_hdf5_references(root, None, h5_uuid)
+            model.create_reciprocal_relationship(root, 'mlToExternalPartProxy', ext_node, 'externalPartProxyToMl')
+            paths += part_paths
+    return paths
+
+
+def _consolidate_by_hash(model, source, source_parts, hash_map):
+    """Forces equivalence for consolidatable source parts whose content hash matches an earlier merged part."""
+
+    hashed_parts = []
+    for part in cons.sort_parts_list(source, source_parts):
+        obj_type = source.type_of_part(part, strip_obj = True)
+        if obj_type not in cons.consolidatable_list or part in model.parts_forest:
+            continue
+        uuid_int = rqet.uuid_in_part_name(part).int
+        if uuid_int in model.consolidation.map:
+            continue
+        resident_uuid_int = hash_map.get(_content_hash(model, source.root_for_part(part), obj_type))
+        if resident_uuid_int is not None and resident_uuid_int in model.uuid_part_dict:
+            model.consolidation.force_uuid_int_equivalence(uuid_int, resident_uuid_int)
+        else:
+            hashed_parts.append(part)
+    return hashed_parts
+
+
+def _record_hashes(model, source, hashed_parts, hash_map):
+    """Records content hashes of consolidatable parts after merging, against their resident uuids."""
+
+    for part in hashed_parts:
+        uuid_int = rqet.uuid_in_part_name(part).int
+        resident_uuid_int = model.consolidation.map.get(uuid_int, uuid_int)
+        if resident_uuid_int not in model.uuid_part_dict:
+            continue
+        obj_type = source.type_of_part(part, strip_obj = True)
+        hash_map.setdefault(_content_hash(model, source.root_for_part(part), obj_type), resident_uuid_int)
+
+
+def _content_hash(model, root, obj_type):
+    """Returns a hash key for xml content, ignoring uuid and citation other than title, with references mapped."""
+
+    digest = hashlib.sha1()
+    _hash_node(digest, root, model.consolidation.map)
+    return (obj_type, digest.digest())
+
+
+def _hash_node(digest, node, uuid_map):
+    if not isinstance(node.tag, str):
+        return  # xml comment or processing instruction
+    tag = rqet.stripped_of_prefix(node.tag)
+    if tag == 'Citation':
+        digest.update(str(rqet.find_tag_text(node, 'Title')).encode())
+        return
+    digest.update(tag.encode())
+    for key in sorted(node.attrib.keys()):
+        if key != 'uuid':
+            digest.update(f'{key}={node.attrib[key]}'.encode())
+    text = node.text.strip() if node.text else ''
+    if tag == 'UUID' and text:
+        uuid_int = bu.uuid_from_string(text).int
+        text = str(uuid_map.get(uuid_int, uuid_int))
+    digest.update(b'>' + text.encode() + b'<')
+    for child in node:
+        _hash_node(digest, child, uuid_map)
+    digest.update(b'/')
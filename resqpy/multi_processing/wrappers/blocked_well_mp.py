@@ -5,13 +5,14 @@ import logging
 log = logging.getLogger(__name__)
 
 import uuid
-from typing import Tuple, Union, List
+from typing import Tuple, Union, List, Optional
 from pathlib import Path
 from uuid import UUID
 
 import resqpy.model as rq
 import resqpy.grid as grr
 import resqpy.well as rqw
+import resqpy.grid_surface as rqgs
 import resqpy.multi_processing as rqmp
 
 
@@ -59,17 +60,22 @@ def blocked_well_from_trajectory_wrapper(
 
     grid = grr.any_grid(grid_model, uuid = grid_uuid)
 
-    success = True
+    trajectories = []
     for trajectory_uuid in trajectory_uuids:
         model.copy_uuid_from_other_model(trajectory_model, uuid = trajectory_uuid)
-        trajectory = rqw.Trajectory(model, trajectory_uuid)
-        blocked_well = rqw.BlockedWell(model, grid = grid, trajectory = trajectory)
-        if blocked_well is None or blocked_well.cell_count is None or blocked_well.node_count is None:
-            success = False
+        trajectories.append(rqw.Trajectory(model, trajectory_uuid))
+
+    blocked_wells, report = rqgs.blocked_wells_from_trajectories(grid, trajectories)
+    success = bool(report['SUCCESS'].all())
+    for blocked_well in blocked_wells:
+        if blocked_well is None:
             continue
         blocked_well.write_hdf5()
         blocked_well.create_xml()
         uuid_list.append(blocked_well.uuid)
+    for _, row in report[~report['SUCCESS']].iterrows():
+        log.warning(f'failed to block trajectory {row["WELL"]} ({row["UUID"]}): {row["MESSAGE"]}')
+    log.debug(f'blocked {len(uuid_list)} of {len(trajectories)} wells in {report["SECONDS"].sum():.3f} seconds')
 
     model.store_epc(quiet = True)
 
@@ -84,7 +90,9 @@ def blocked_well_from_trajectory_batch(grid_epc: str,
                                        cluster,
                                        n_workers: int,
                                        require_success: bool = False,
-                                       tmp_dir_path: Union[Path, str] = '.') -> List[bool]:
+                                       tmp_dir_path: Union[Path, str] = '.',
+                                       backend: str = 'dask',
+                                       max_workers: Optional[int] = None) -> List[bool]:
     """Creates BlockedWell objects from a common grid and a list of trajectories' uuids, in parallel.
 
     arguments:
@@ -96,17 +104,22 @@ def blocked_well_from_trajectory_batch(grid_epc: str,
         recombined_epc (Path or str): A pathlib Path or path string, where the combined epc will be saved
         cluster (LocalCluster/JobQueueCluster): a LocalCluster is a Dask cluster on a
             local machine; if using a job queing system, a JobQueueCluster can be used
-            such as an SGECluster, SLURMCluster, PBSCluster, LSFCluster etc
-        n_workers (int): the number of workers on the cluster
+            such as an SGECluster, SLURMCluster, PBSCluster, LSFCluster etc; not used with the 'local' backend
+        n_workers (int): the number of workers on the cluster, ie. the number of batches of trajectories
         require_success (bool, default False): if True an exception is raised if any failures
         tmp_dir_path (str or Path, default '.'): the directory within which temporary directories will reside
+        backend (str, default 'dask'): the multiprocessing backend, see function_multiprocessing(); 'local' runs
+            the batches in a pool of processes on the local machine
+        max_workers (int, optional): the maximum number of worker processes when using the 'local' backend
 
     returns:
         success_list (list of bool): A boolean list of successful function calls
 
     notes:
         the returned success list contains one value per batch, set True if all blocked wells
-        were successfully created in the batch, False if one or more failed in the batch
+        were successfully created in the batch, False if one or more failed in the batch;
+        within each batch, the grid preparation is shared by all the wells, see
+        resqpy.grid_surface.blocked_wells_from_trajectories()
     """
     n_uuids = len(trajectory_uuids)
     trajectory_uuids_list = [
@@ -128,6 +141,8 @@ def blocked_well_from_trajectory_batch(grid_epc: str,
                                                  recombined_epc,
                                                  cluster,
                                                  require_success = require_success,
-                                                 tmp_dir_path = tmp_dir_path)
+                                                 tmp_dir_path = tmp_dir_path,
+                                                 backend = backend,
+                                                 max_workers = max_workers)
 
     return success_list
@@ -119,6 +119,16 @@ class BaseResqpy(metaclass = ABCMeta):
                 return True
         return False
 
+    def equivalence_key(self):
+        """Returns a hashable key for indexing potentially equivalent objects, or None if not supported.
+
+        note:
+           derived classes with an is_equivalent() method may override this method; any two equivalent objects
+           must have equal keys, though objects with equal keys are not necessarily equivalent
+        """
+
+        return None
+
     def create_xml(self, title = None, originator = None, extra_metadata = None, add_as_part = False):
         """Write citation block to XML.
 
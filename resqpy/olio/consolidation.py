@@ -4,6 +4,8 @@ import logging
 
 log = logging.getLogger(__name__)
 
+from itertools import islice
+
 import resqpy.crs as rqc
 import resqpy.olio.uuid as bu
 import resqpy.olio.xml_et as rqet
@@ -46,6 +48,7 @@ class Consolidation:
         log.debug(f'new consolidation for {self.model.epc_file} with {len(self.model.uuids())} uuids')
         self.map = {}  # dictionary mapping immigrant uuid int to primary uuid int
         self.stale = True
+        self.key_index = {}  # dictionary mapping obj_type to _KeyIndex of resident objects, built lazily
 
     def equivalent_uuid_for_part(self, part, immigrant_model = None, ignore_identical_part = False):
         """Returns uuid of an equivalent part in resident model, or None if no equivalent found."""
@@ -55,7 +58,13 @@ class Consolidation:
         return bu.uuid_from_int(uuid_int)
 
     def equivalent_uuid_int_for_part(self, part, immigrant_model = None, ignore_identical_part = False):
-        """Returns uuid.int of an equivalent part in resident model, or None if no equivalent found."""
+        """Returns uuid.int of an equivalent part in resident model, or None if no equivalent found.
+
+        note:
+           resident objects are indexed by class on their equivalence key when first needed, so that only those
+           with a matching key are compared with the immigrant object; the index is refreshed when parts are
+           added to the resident model, or marked as modified with resident_model.set_modified()
+        """
 
         # log.debug('Looking for equivalent uuid for: ' + str(part))
         if not part:
@@ -71,51 +80,26 @@ class Consolidation:
         if obj_type is None or obj_type not in consolidatable_list:
             return None
         # log.debug('   object type is consolidatable')
-        resident_uuids = self.model.uuids(obj_type = obj_type)
-        if resident_uuids is None or len(resident_uuids) == 0:
+        if not ignore_identical_part:
+            resident_part = self.model.uuid_part_dict.get(immigrant_uuid_int)
+            if resident_part is not None and self.model.type_of_part(resident_part, strip_obj = True) == obj_type:
+                # log.debug('   uuid already resident: ' + str(resident_uuid))
+                return immigrant_uuid_int
+        key_index = self._key_index_for_type(obj_type)
+        if key_index.is_empty():
             # log.debug('   no resident parts found of type: ' + str(obj_type))
             return None
-        # log.debug(f'   {len(resident_uuids)} resident parts of same class')
-        if not ignore_identical_part:
-            for resident_uuid in resident_uuids:
-                if resident_uuid.int == immigrant_uuid_int:
-                    # log.debug('   uuid already resident: ' + str(resident_uuid))
-                    return resident_uuid.int
 
         # log.debug('   preparing immigrant object')
         immigrant_uuid = bu.uuid_from_int(immigrant_uuid_int)
-        if obj_type.endswith('Interpretation') or obj_type.endswith('Feature'):
-            immigrant_obj = rqo.__dict__[obj_type](immigrant_model, uuid = immigrant_uuid)
-        elif obj_type.endswith('Crs'):
-            immigrant_obj = rqc.Crs(immigrant_model, uuid = immigrant_uuid)
-        elif obj_type == 'TimeSeries':
-            immigrant_obj = rqt.TimeSeries(immigrant_model, uuid = immigrant_uuid)
-        elif obj_type == 'StringTableLookup':
-            immigrant_obj = rqp.StringLookup(immigrant_model, uuid = immigrant_uuid)
-        elif obj_type == 'PropertyKind':
-            immigrant_obj = rqp.PropertyKind(immigrant_model, uuid = immigrant_uuid)
-        else:
-            raise Exception('code failure')
+        immigrant_obj = _object_for_uuid(immigrant_model, obj_type, immigrant_uuid)
         assert immigrant_obj is not None
-        for resident_uuid in resident_uuids:
-            resident_uuid_int = resident_uuid.int
-            # log.debug('   considering resident: ' + str(resident_uuid))
-            if ignore_identical_part and bu.matching_uuids(resident_uuid, immigrant_uuid):
+        for resident_uuid_int, resident_obj in key_index.candidates(_equivalence_key(immigrant_obj)):
+            # log.debug('   considering resident: ' + str(resident_uuid_int))
+            if ignore_identical_part and resident_uuid_int == immigrant_uuid_int:
                 continue
-            if obj_type.endswith('Interpretation') or obj_type.endswith('Feature'):
-                resident_obj = rqo.__dict__[obj_type](self.model, uuid = resident_uuid)
-            elif obj_type.endswith('Crs'):
-                resident_obj = rqc.Crs(self.model, uuid = resident_uuid)
-            elif obj_type == 'TimeSeries':
-                resident_obj = rqt.TimeSeries(self.model, uuid = resident_uuid)
-            elif obj_type == 'StringTableLookup':
-                resident_obj = rqp.StringLookup(self.model, uuid = resident_uuid)
-            elif obj_type == 'PropertyKind':
-                resident_obj = rqp.PropertyKind(self.model, uuid = resident_uuid)
-            else:
-                raise Exception('code failure')
-            assert resident_obj is not None
-            # log.debug('   comparing with: ' + str(resident_obj.uuid))
+            if resident_uuid_int not in self.model.uuid_part_dict:
+                continue  # part removed from resident model since indexing
             if immigrant_obj == resident_obj:  # note: == operator overloaded with equivalence method for these classes
                 while resident_uuid_int in self.map:
                     # log.debug('   following equivalence for: ' + str(resident_uuid))
@@ -125,6 +109,54 @@ class Consolidation:
                 return resident_uuid_int
         return None
 
+    def _key_index_for_type(self, obj_type):
+        """Returns the equivalence key index of resident objects of the given type, bringing it up to date."""
+
+        key_index = self.key_index.get(obj_type)
+        if key_index is not None and key_index.modification_serial != self.model.modification_serial:
+            modified_parts = _parts_modified_since(self.model, key_index.modification_serial)
+            if modified_parts is None:
+                key_index = None  # modifications not known, so index is rebuilt
+            else:
+                # resident parts edited in place since indexing are re-keyed from their current xml
+                for part in modified_parts:
+                    uuid = rqet.uuid_in_part_name(part)
+                    if uuid is None or uuid.int not in key_index.indexed or self.model.part_for_uuid(uuid) != part:
+                        continue
+                    key_index.discard(uuid.int)
+                    key_index.add(uuid.int, _object_for_uuid(self.model, obj_type, uuid))
+        if key_index is None:
+            key_index = _KeyIndex()
+            self.key_index[obj_type] = key_index
+        key_index.modification_serial = self.model.modification_serial
+        uuid_part_dict = self.model.uuid_part_dict
+        part_count = len(uuid_part_dict)
+        last_uuid_int = next(reversed(uuid_part_dict), None)
+        if key_index.part_count == part_count and key_index.last_uuid_int == last_uuid_int:
+            return key_index  # no parts added since last indexed
+        new_uuid_ints = []
+        if key_index.part_count is not None and part_count > key_index.part_count:
+            # parts are appended to the uuid to part dictionary, so only the recent entries need checking, provided
+            # that the last entry seen previously is still in the same position; entries are visited from the end
+            recent = list(islice(reversed(uuid_part_dict.items()), part_count - key_index.part_count + 1))
+            if key_index.part_count == 0 or recent[-1][0] == key_index.last_uuid_int:
+                new_uuid_ints = [
+                    uuid_int for uuid_int, part in reversed(recent)
+                    if self.model.type_of_part(part, strip_obj = True) == obj_type
+                ]
+            else:
+                key_index.part_count = None
+        else:
+            key_index.part_count = None
+        if key_index.part_count is None:
+            new_uuid_ints = [uuid.int for uuid in self.model.uuids(obj_type = obj_type)]
+        for uuid_int in new_uuid_ints:
+            if uuid_int not in key_index.indexed:
+                key_index.add(uuid_int, _object_for_uuid(self.model, obj_type, bu.uuid_from_int(uuid_int)))
+        key_index.part_count = part_count
+        key_index.last_uuid_int = last_uuid_int
+        return key_index
+
     def force_uuid_equivalence(self, immigrant_uuid, resident_uuid):
         """Forces immigrant object to be treated as equivalent to (same as) resident object, identified by uuids."""
 
@@ -168,6 +200,86 @@ class Consolidation:
             assert resident not in self.map.keys()
 
 
+class _KeyIndex:
+    """Resident objects of one class, grouped by equivalence key."""
+
+    def __init__(self):
+        self.keyed = {}  # dictionary mapping equivalence key to list of (uuid int, object)
+        self.unkeyed = []  # list of (uuid int, object) for objects without an equivalence key
+        self.indexed = {}  # dictionary mapping uuid int of each indexed object to its key (None if unkeyed)
+        self.part_count = None  # number of parts in resident model when last refreshed
+        self.last_uuid_int = None  # uuid int of last part in resident model when last refreshed
+        self.modification_serial = None  # modification serial of resident model when last refreshed
+
+    def add(self, uuid_int, obj):
+        key = _equivalence_key(obj)
+        if key is None:
+            self.unkeyed.append((uuid_int, obj))
+        else:
+            self.keyed.setdefault(key, []).append((uuid_int, obj))
+        self.indexed[uuid_int] = key
+
+    def discard(self, uuid_int):
+        if uuid_int not in self.indexed:
+            return
+        key = self.indexed.pop(uuid_int)
+        pairs = self.unkeyed if key is None else self.keyed[key]
+        pairs[:] = [pair for pair in pairs if pair[0] != uuid_int]
+        if key is not None and not pairs:
+            del self.keyed[key]
+
+    def is_empty(self):
+        return not self.indexed
+
+    def candidates(self, key):
+        """Returns list of (uuid int, object) for resident objects which might be equivalent to one with key."""
+        if key is None:
+            return [pair for pairs in self.keyed.values() for pair in pairs] + self.unkeyed
+        return self.keyed.get(key, []) + self.unkeyed
+
+
+def _equivalence_key(obj):
+    """Returns the equivalence key for an object, or None if it does not have a usable (hashable) key."""
+
+    key = obj.equivalence_key()
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _parts_modified_since(model, serial):
+    """Returns list of names of parts marked as modified since the given modification serial, or None if unknown."""
+
+    if serial is None or model.modification_serial < serial:
+        return None
+    parts = []
+    for part, part_serial in reversed(model.part_modification_serial.items()):
+        if part_serial <= serial:
+            break
+        if part is None:
+            return None
+        parts.append(part)
+    return parts
+
+
+def _object_for_uuid(model, obj_type, uuid):
+    """Returns a resqpy object of a consolidatable class, for the part with the given uuid."""
+
+    if obj_type.endswith('Interpretation') or obj_type.endswith('Feature'):
+        return rqo.__dict__[obj_type](model, uuid = uuid)
+    if obj_type.endswith('Crs'):
+        return rqc.Crs(model, uuid = uuid)
+    if obj_type == 'TimeSeries':
+        return rqt.TimeSeries(model, uuid = uuid)
+    if obj_type == 'StringTableLookup':
+        return rqp.StringLookup(model, uuid = uuid)
+    if obj_type == 'PropertyKind':
+        return rqp.PropertyKind(model, uuid = uuid)
+    raise Exception('code failure')
+
+
 def _ordering(obj_type):
     if obj_type in ordering_list:
         return ordering_list.index(obj_type)
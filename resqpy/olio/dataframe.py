@@ -241,6 +241,7 @@ class DataFrame:
             self.mesh.write_hdf5()
             mesh_root = self.mesh.create_xml(title = self.title)
             rqet.create_metadata_xml(mesh_root, {'dataframe': 'true'})
+            self.model.invalidate_catalogue_index(self.model.part_for_uuid(self.mesh.uuid))
             if self.realization is not None:
                 self.pc = rqp.PropertyCollection()
                 self.pc.set_support(support = self.mesh)
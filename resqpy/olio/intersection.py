@@ -172,6 +172,43 @@ def line_triangles_intersects(line_p, line_v, triangles, line_segment = False):
     return intersects
 
 
+def line_triangle_pairs_intersects(line_ps, line_vs, triangles, line_segment = False):
+    """Find the intersection of each of a set of lines with a corresponding triangle, pairwise, in 3D space.
+
+    arguments:
+       line_ps ((n, 3) numpy array): a point on each of n lines
+       line_vs ((n, 3) numpy array): vectors being the direction of each of the n lines
+       triangles ((n, 3, 3) numpy array): three corners of the triangle paired with each line
+       line_segment (boolean, default False): if True, each line is treated as a finite segment between
+          p and p + v, and only intersections within the segment are included
+
+    returns:
+       points ((n, 3) numpy array) of intersection points of each line with its paired triangle,
+       (nan, nan, nan) where a line is parallel to plane of its triangle or intersection with the plane
+       is outside the triangle (or beyond the ends of the segment if applicable)
+
+    note:
+       this function is typically used with candidate pairs selected with a spatial index, as an
+       alternative to line_set_triangles_intersects() which tests every line against every triangle
+    """
+
+    p01s = triangles[:, 1, :] - triangles[:, 0, :]
+    p02s = triangles[:, 2, :] - triangles[:, 0, :]
+    norms = np.cross(p01s, p02s)
+    line_rvs = np.negative(line_vs)
+    denoms = np.sum(norms * line_rvs, axis = -1)
+    lp_t0s = line_ps - triangles[:, 0, :]
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        ts = np.sum(norms * lp_t0s, axis = -1) / denoms
+        us = np.sum(np.cross(p02s, line_rvs) * lp_t0s, axis = -1) / denoms
+        vs = np.sum(np.cross(line_rvs, p01s) * lp_t0s, axis = -1) / denoms
+        outside = np.logical_or(np.logical_or(us < 0.0, us > 1.0), np.logical_or(vs < 0.0, us + vs > 1.0))
+        if line_segment:
+            outside = np.logical_or(outside, np.logical_or(ts < 0.0, ts > 1.0))
+        ts[np.logical_or(outside, denoms == 0.0)] = np.nan
+    return line_ps + line_vs * ts[:, np.newaxis]
+
+
 def intersects_indices(single_line_intersects):
     """Returns a list of the (triangle) indices where a valid intersection has been found for a single line."""
 
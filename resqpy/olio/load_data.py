@@ -7,6 +7,9 @@ import logging
 log = logging.getLogger(__name__)
 
 import os
+import re
+import warnings
+
 import numpy as np
 
 import resqpy.olio.ab_toolbox as abt
@@ -15,6 +18,9 @@ import resqpy.olio.grid_functions as gf
 import resqpy.olio.keyword_files as kf
 import resqpy.olio.write_data as wd
 
+_c_space_re = re.compile(r'(?m)^[ \t]*[Cc](?:[ \t].*)?$')  # line holding a 'C ' comment
+_white_space_re = re.compile(r'\s')
+
 
 def file_exists(file_name, must_be_more_recent_than_file = None):
     """Returns True if the file exists (and is more recent than other file, if given)."""
@@ -47,7 +53,8 @@ def load_corp_array_from_file(file_name,
                               data_free_of_comments = False,
                               use_binary = False,
                               eight_mode = False,
-                              use_numbers_only = None):
+                              use_numbers_only = None,
+                              use_32_bit = False):
     """Loads a nexus corner point (CORP) array from a file, returns a 7D numpy array in pagoda ordering.
 
     arguments:
@@ -72,6 +79,8 @@ def load_corp_array_from_file(file_name,
                 (The code does not look for keywords.); this is not automatically determined from any keyword
                 in the file
        use_numbers_only: no longer in use, ignored
+       use_32_bit (boolean, default False): if True, ascii data is loaded as float32, halving the memory needed;
+                corp binary data is always float32
 
     returns:
        A numpy array containing the CORP data in 7D pagoda protocol ordering. The extent of the grid, and hence
@@ -109,7 +118,8 @@ def load_corp_array_from_file(file_name,
                                         max_lines_for_keyword = max_lines_for_keyword,
                                         comment_char = comment_char,
                                         data_free_of_comments = data_free_of_comments,
-                                        use_binary = use_binary)
+                                        use_binary = use_binary,
+                                        use_32_bit = use_32_bit)
 
     cell_count, remainder = divmod(cp_array.size, 24)
     if remainder:
@@ -146,10 +156,14 @@ def load_array_from_file(file_name,
                          comment_char = None,
                          data_free_of_comments = False,
                          use_binary = False,
-                         use_numbers_only = None):
+                         use_numbers_only = None,
+                         use_32_bit = False):
     """Load an array from an ascii (or pure binary) file.
 
     Arguments are similar to those for load_corp_array_from_file().
+
+    note:
+       pure binary files always hold 64 bit data; if use_32_bit is True, the data is converted after loading
     """
 
     if not use_binary:
@@ -159,7 +173,8 @@ def load_array_from_file(file_name,
                                           keyword = keyword,
                                           max_lines_for_keyword = max_lines_for_keyword,
                                           comment_char = comment_char,
-                                          data_free_of_comments = data_free_of_comments)
+                                          data_free_of_comments = data_free_of_comments,
+                                          use_32_bit = use_32_bit)
 
     (extension, ab_type) = abt.binary_file_extension_and_np_type_for_data_type(data_type)
 
@@ -191,7 +206,7 @@ def load_array_from_file(file_name,
                 except Exception:
                     pass
                 log.info('Data loaded from binary file %s', binary_file_name)
-                return result
+                return _to_32_bit(result) if use_32_bit else result
     except Exception:
         pass
 
@@ -211,7 +226,17 @@ def load_array_from_file(file_name,
         log.warn('Failed to write data to binary file %s', binary_file_name)
         # todo: could delete the binary file in case a corrupt file is left for use next time
 
-    return result
+    return _to_32_bit(result) if use_32_bit else result
+
+
+def _to_32_bit(a):
+    """Returns a 32 bit version of a 64 bit float or int array; other arrays are returned unchanged."""
+
+    if a.dtype == np.float64:
+        return a.astype(np.float32)
+    if a.dtype == np.int64:
+        return a.astype(np.int32)
+    return a
 
 
 # end of load_array_from_file() def
@@ -232,13 +257,15 @@ def load_array_from_ascii_file(file_name,
                                comment_char = None,
                                data_free_of_comments = False,
                                skip_c_space = True,
-                               use_numbers_only = None):
+                               use_numbers_only = None,
+                               use_32_bit = False,
+                               chunk_size = None):
     """Returns a numpy array with data loaded from an ascii file.
 
     arguments:
        file_name: string holding name of the existing ascii data file, eg. 'Cell_depth.dat'
        extent: a python list of integers specifying the extent (shape) of the array, eg. [148, 270, 103];
-          if None, all data is read and returned as a 'flat' 1D array (data must be free from comments)
+          if None, all data is read and returned as a 'flat' 1D array
        data_type: the type of individual data elements, one of 'real','float','int', 'integer', 'bool' or 'boolean'
        keyword: if present, an attempt is made to find the keyword before reading data, if keyword is None or is
           not found, data is read from the start of the file
@@ -248,6 +275,10 @@ def load_array_from_ascii_file(file_name,
           skipped
        skip_c_space: if True then a line starting 'C' followed by white space is skipped as a comment
        use_numbers_only: this argument is no longer in use and is ignored
+       use_32_bit (boolean, default False): if True, real data is returned as float32 and integer data as int32;
+          otherwise 64 bit types are used
+       chunk_size (int, optional): the approximate number of characters of the file to read and parse at a time;
+          if None, a default of 16M is used; a smaller value reduces the memory used for parsing
 
     returns:
        a numpy array of shape specified in extent argument with dtype matching data_type
@@ -264,7 +295,10 @@ def load_array_from_ascii_file(file_name,
        at least one blank line before the data begins, and no further comments are permitted.
        (This format is designed to handle data files generated by a commonly used geomodelling package.)
 
-       Repeat counts must not be present in the ascii data.
+       Repeat counts are supported, in the form n*value, eg. 1000*0.25
+
+       The file is read and parsed in chunks, so the memory needed is little more than that of the returned array
+       when the extent is known.
 
        The extent, if present, can contain any number of dimensions, typically 3 for reservoir modelling work.
        The total number of numbers in the file must match the number of elements in the given extent
@@ -274,29 +308,30 @@ def load_array_from_ascii_file(file_name,
        The data_type defaults to 'real'
        'real' and 'float' are synonymous; 'int' and 'integer' are synonymous;
        'bool' and 'boolean' are synonymous; default is 'real'
-       The numpy data type will be the default 64 bit float or 64 bit int
+       The numpy data type will be 64 bit float or 64 bit int, unless use_32_bit is True; boolean data is
+       returned with numpy bool dtype
     """
-    # todo: Code enhancement could cater for 32 bit options (and 8 bit for bool) if needed to reduce memory usage
 
     if extent is None:
-        cell_count = -1  # np.fromfile interprets this as 'read everything'
+        cell_count = None
         log.debug('Loading unknown number of array data elements from ascii file ' + file_name)
     else:
-        cell_count = np.product(extent)
+        cell_count = int(np.product(extent))
         log.debug('Loading %1d array data elements from ascii file %s', cell_count, file_name)
 
     if data_type in ['real', 'float', float]:
-        d_type = 'float'
+        d_type = np.float32 if use_32_bit else np.float64
+        result_type = d_type
     elif data_type in ['int', 'integer', int]:
-        d_type = 'int'
+        d_type = np.int32 if use_32_bit else np.int64
+        result_type = d_type
     elif data_type in ['bool', 'boolean', bool]:
-        d_type = 'int'  # read booleans as 0 or 1 and convert after
+        d_type = np.int32  # read booleans as 0 or 1 and convert as each chunk is stored
+        result_type = bool
     else:
         assert False, 'Unknown data_type passed to load_array_from_ascii_file' + str(data_type)
 
-    read_file_name = file_name
-
-    with open(read_file_name, 'r') as data_file:
+    with open(file_name, 'r') as data_file:
 
         if not comment_char and not data_free_of_comments:
             comment_char = kf.guess_comment_char(data_file)
@@ -310,104 +345,127 @@ def load_array_from_ascii_file(file_name,
 
         kf.skip_blank_lines_and_comments(data_file, comment_char = comment_char, skip_c_space = skip_c_space)
 
-        result = None
-
-        if data_free_of_comments:  # use numpy fromfile function after passing header comments
-
-            result = np.fromfile(data_file, dtype = d_type, count = cell_count, sep = ' ')
-
-            if result is None:
-                data_file.seek(0)
-
-        if result is None:
-
-            # builds one very big string, stripping trailing comments
-
-            #         s = ''
-            #         while True:
-            #            r = data_file.readline()
-            #            if len(r) == 0: break
-            #            s += r.partition(comment_char)[0] + ' '
-            #         result = np.fromstring(s, dtype = d_type, count = cell_count, sep = ' ')
-            #         # note: extra data will go unnoticed if cell count known!
-            #         del s
-
-            b = bytearray(data_file.read().encode())
-            bc = comment_char.encode()
-            nl = b'\n'
-            sp = b' '
-            i = 0
-            while True:
-                i = b.find(bc, i)
-                if i < 0:
-                    break
-                eol = b.find(nl, i)
-                if eol < 0:
-                    eol = len(b)
-                b[i:eol] = sp * (eol - i)
-
-            result = np.fromstring(b.decode(), dtype = d_type, count = cell_count, sep = ' ')
-            # note: extra data will go unnoticed if cell count known!
-            del b
-
-        if result is None:
-
-            assert (extent is not None)  # TODO: remove this restriction by dynamically extending a flat array
-
-            view_1D = np.zeros(extent, dtype = d_type).flatten()
-            elements = view_1D.size
-            start_of_line = True
-
-            for index in range(elements):
-
-                while True:
-                    ch = data_file.read(1)
-                    assert (ch != '')  # premature end of file
-                    if ch == comment_char:
-                        data_file.readline()
-                        start_of_line = True
-                        continue
-                    if skip_c_space and start_of_line and ch in ['C', 'c']:
-                        next_ch = data_file.read(1)
-                        if next_ch in ' \t\n':
-                            if next_ch != '\n':
-                                data_file.readline()
-                            continue
-                        ch += next_ch
-                        break
-                    if ch not in ' \t\n':
-                        break
-
-                start_of_line = False
-                word = ch
-                while True:
-                    ch = data_file.read(1)
-                    if ch == '':  # end of file (this assumes a whitespace character after last datum)
-                        log.error('Not enough data in file %s: %1d of %1d numbers read', file_name, index, elements)
-                        assert False, 'not enough data in file'
-                    if ch in ' \t\n':
-                        break
-                    word += ch
-                if ch == '\n':
-                    start_of_line = True
-                if d_type == 'float':
-                    view_1D[index] = float(word)
-                else:
-                    view_1D[index] = int(word)
-
-            result = view_1D
+        if data_free_of_comments:
+            comment_char = None
+            skip_c_space = False
 
-        kf.skip_blank_lines_and_comments(data_file, comment_char = comment_char, skip_c_space = skip_c_space)
-        if not kf.end_of_file(data_file):
-            assert False, 'too much data in ascii file: ' + file_name
+        result = _load_ascii_data(data_file,
+                                  file_name,
+                                  cell_count,
+                                  d_type,
+                                  result_type,
+                                  comment_char = comment_char,
+                                  skip_c_space = skip_c_space,
+                                  chunk_size = chunk_size)
 
-    if result is not None and extent is not None:
+    if extent is not None:
         result = result.reshape(extent)
 
-    if data_type in ['bool', 'boolean', bool]:
-        return result != 0  # convert to boolean
+    return result
+
+
+def _load_ascii_data(data_file,
+                     file_name,
+                     cell_count,
+                     d_type,
+                     result_type,
+                     comment_char = None,
+                     skip_c_space = True,
+                     chunk_size = None):
+    """Reads and parses the rest of an open ascii file, in chunks, returning a flat array.
+
+    note:
+       each chunk is extended to the end of a line, so that comments can be stripped before parsing;
+       repeat counts are expanded directly into the output array
+    """
+
+    if not chunk_size:
+        chunk_size = 1 << 24
+    if cell_count is None:
+        pieces = []  # list of arrays, concatenated at the end
+        out = None
     else:
-        return result
+        out = np.empty(cell_count, dtype = result_type)
+    comment_re = None if not comment_char else re.compile(re.escape(comment_char) + '.*')
+    index = 0
+    carry = ''
+    while True:
+        chunk = data_file.read(chunk_size)
+        text = carry + chunk
+        if chunk:
+            eol = text.rfind('\n')
+            if eol < 0:  # no complete line yet
+                carry = text
+                continue
+            carry = text[eol + 1:]
+            text = text[:eol + 1]
+        if comment_re is not None and comment_char in text:
+            text = comment_re.sub('', text)
+        if skip_c_space and ('C' in text or 'c' in text):
+            text = _c_space_re.sub('', text)
+        for n, values in _values_from_text(text, d_type):
+            if out is None:
+                pieces.append(values if isinstance(values, np.ndarray) else np.full(n, values, dtype = d_type))
+            else:
+                assert index + n <= cell_count, 'too much data in ascii file: ' + file_name
+                out[index:index + n] = values
+            index += n
+        if not chunk:
+            break
+
+    if out is None:
+        if pieces:
+            out = np.concatenate(pieces).astype(result_type, copy = False)
+        else:
+            out = np.empty(0, dtype = result_type)
+    elif index < cell_count:
+        log.error('Not enough data in file %s: %1d of %1d numbers read', file_name, index, cell_count)
+        assert False, 'not enough data in file'
+    return out
+
+
+def _values_from_text(text, d_type):
+    """Yields (count, values) pairs parsed from text free of comments; values is an array or a repeated scalar."""
+
+    position = 0
+    star = text.find('*')
+    while star >= 0:
+        start = max(text.rfind(' ', position, star), text.rfind('\t', position, star), text.rfind('\n', position, star))
+        start = max(start + 1, position)
+        end_match = _white_space_re.search(text, star)
+        end = len(text) if end_match is None else end_match.start()
+        values = _parse_numbers(text[position:start], d_type)
+        if values is not None:
+            yield len(values), values
+        count_str = text[start:star]
+        value_str = text[star + 1:end]
+        if not count_str.isdigit() or not value_str:
+            raise ValueError(f'badly formed repeat count in ascii data: {text[start:end][:40]}')
+        yield int(count_str), _parse_numbers(value_str, d_type)[0]
+        position = end
+        star = text.find('*', position)
+    values = _parse_numbers(text[position:], d_type)
+    if values is not None:
+        yield len(values), values
+
+
+def _parse_numbers(text, d_type):
+    """Returns a numpy array of the white space separated numbers in text, or None if there are none."""
+
+    if not text or text.isspace():
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype = d_type, sep = ' ')
+        except DeprecationWarning:
+            pass
+    for word in text.split():  # find the offending word for the error message
+        try:
+            d_type(word)
+        except ValueError:
+            raise ValueError(f'non numeric data found in ascii data: {word[:40]}') from None
+    raise ValueError('failed to parse ascii data')
 
 
 # end of load_array_from_ascii_file() def
@@ -127,6 +127,38 @@ def pip_array_cn(p_a, poly):
     return np.array(np.bitwise_and(crossings, 1), dtype = bool).reshape(list(p_a.shape)[:-1])
 
 
+def pip_paired_cn(p_a, polys):
+    """Return bool array of 2D points inclusion, True where each point is inside its paired polygon.
+
+    Uses crossing number algorithm.
+
+    arguments:
+       p_a (2D numpy float array of shape (N, 2+)): set of xy points to test for inclusion
+       polys (3D numpy float array of shape (N, V, 2+)): the xy vertices of a polygon for each point
+
+    returns:
+       numpy boolean vector of shape (N,): True where point is within its paired polygon
+
+    note:
+       all the polygons must have the same number of vertices, V; polygons with NaN vertices never include a point
+    """
+
+    assert p_a.ndim == 2 and polys.ndim == 3 and len(p_a) == len(polys)
+    x = p_a[:, 0]
+    y = p_a[:, 1]
+    crossings = np.zeros(len(p_a), dtype = int)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        for edge in range(polys.shape[1]):
+            v1 = polys[:, edge - 1]
+            v2 = polys[:, edge]
+            straddle = np.logical_or(np.logical_and(v1[:, 1] <= y, v2[:, 1] > y),
+                                     np.logical_and(v1[:, 1] > y, v2[:, 1] <= y))
+            right = np.logical_or(np.logical_and(v1[:, 0] > x, v2[:, 0] > x),
+                                  x < v1[:, 0] + (v2[:, 0] - v1[:, 0]) * (y - v1[:, 1]) / (v2[:, 1] - v1[:, 1]))
+            crossings += np.logical_and(np.logical_and(np.logical_or(v1[:, 0] > x, v2[:, 0] > x), straddle), right)
+    return np.bitwise_and(crossings, 1).astype(bool)
+
+
 def points_in_polygon(x, y, polygon_file, poly_unit_multiplier = None):
     """Takes a pair of numpy arrays x, y defining points to be tested against polygon specified in polygon_file."""
 
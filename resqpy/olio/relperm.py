@@ -249,6 +249,7 @@ class RelPerm(DataFrame):
         mesh_root = self.mesh.root
         # create an xml of extra metadata to indicate that this is a relative permeability table
         rqet.create_metadata_xml(mesh_root, self.extra_metadata)
+        self.model.invalidate_catalogue_index(self.model.part_for_uuid(self.mesh.uuid))
 
 
 def text_to_relperm_dict(relperm_data, is_file = True):
@@ -7,6 +7,7 @@ import logging
 log = logging.getLogger(__name__)
 
 import numpy as np
+from numba import njit, prange  # type: ignore
 
 import resqpy.fault as rqf
 import resqpy.olio.vector_utilities as vec
@@ -57,11 +58,7 @@ def half_cell_t(grid,
     import resqpy.grid as grr
 
     if darcy_constant is None:
-        length_units = grid.xy_units()
-        assert length_units == 'm' or length_units.startswith('ft'), "Darcy constant must be specified"
-        assert grid.z_units() == length_units
-        # following values are for m3.cP/(kPa.d) and bbl.cP/(psi.d) respectively, source: Wikipedia
-        darcy_constant = 8.527017e-5 if length_units == 'm' else 1.127116e-3
+        darcy_constant = _darcy_constant(grid)
 
     if perm_k is None or perm_j is None or perm_i is None or ntg is None:
         pc = grid.extract_property_collection()
@@ -96,6 +93,16 @@ def half_cell_t(grid,
         raise ValueError(f'grid {type(grid)} is neither RegularGrid nor Grid object in call to half_cell_t()')
 
 
+def _darcy_constant(grid):
+    """Returns the Darcy constant expected by Nexus for the grid's length units."""
+
+    length_units = grid.xy_units()
+    assert length_units == 'm' or length_units.startswith('ft'), "Darcy constant must be specified"
+    assert grid.z_units() == length_units
+    # following values are for m3.cP/(kPa.d) and bbl.cP/(psi.d) respectively, source: Wikipedia
+    return 8.527017e-5 if length_units == 'm' else 1.127116e-3
+
+
 def half_cell_t_regular(grid, perm_k = None, perm_j = None, perm_i = None, ntg = None, darcy_constant = None):
     """Creates a half cell transmissibilty property array for a RegularGrid.
 
@@ -194,18 +201,60 @@ def half_cell_t_irregular(grid,
     assert perm_k is not None and perm_j is not None and perm_i is not None
     assert darcy_constant is not None
 
-    tolerance_sqr = tolerance * tolerance
-
     p = grid.points_ref(masked = False)
-    edge_vectors = []
     pfc = None  # pillars for column mapping, for use when split pillars are present
-    km = kp = None  # raw points k indices for K- and K+ faces, by layer, when K gaps present
+    km = None  # raw points k indices for K- faces, by layer, when K gaps present
     if grid.k_gaps:
         km = grid.k_raw_index_array
-        kp = km + 1
     if grid.has_split_coordinate_lines:
         pfc = grid.create_column_pillar_mapping()
-        if grid.k_gaps:
+
+    return _half_cell_t_irregular_points(p, (grid.nk, grid.nj, grid.ni),
+                                         perm_k,
+                                         perm_j,
+                                         perm_i,
+                                         ntg,
+                                         darcy_constant,
+                                         tolerance,
+                                         pfc = pfc,
+                                         km = km)
+
+
+def _half_cell_t_irregular_points(p,
+                                  extent_kji,
+                                  perm_k,
+                                  perm_j,
+                                  perm_i,
+                                  ntg,
+                                  darcy_constant,
+                                  tolerance,
+                                  pfc = None,
+                                  km = None):
+    """Returns half cell transmissibilities for a raw points array, which may be a slab of layers from a grid.
+
+    arguments:
+       p (numpy float array): the raw points for the layers, shape (nk + k_gaps + 1, nj + 1, ni + 1, 3) or
+          (nk + k_gaps + 1, np, 3) where np is the number of pillars when split pillars are present
+       extent_kji (triple int): the number of layers, rows and columns covered by the points
+       perm_k, j, i, ntg, darcy_constant, tolerance: as for half_cell_t_irregular(), with arrays matching extent_kji
+       pfc (numpy int array of shape (nj, ni, 2, 2), optional): the column to pillar mapping; required if, and
+          only if, split pillars are present
+       km (numpy int array of shape (nk,), optional): raw k index of the top of each layer in p; required if, and
+          only if, K gaps are present
+
+    returns:
+       numpy float array of shape extent_kji + (3, 2), as for half_cell_t_irregular()
+    """
+
+    k_gaps = km is not None
+    split = pfc is not None
+    kp = None if km is None else km + 1
+
+    tolerance_sqr = tolerance * tolerance
+
+    edge_vectors = []
+    if split:
+        if k_gaps:
             edge_vectors.append(p[kp][:, pfc] - p[km][:, pfc])  # k edge vectors, shape (nk, nj, ni, 2, 2, 3)
             edge_vectors.append(
                 p[:, pfc[:, :, 1, :]] -
@@ -220,7 +269,7 @@ def half_cell_t_irregular(grid,
             edge_vectors.append(p[:, pfc[:, :, :, 1]] -
                                 p[:, pfc[:, :, :, 0]])  # i edge vectors, shape (nk + 1, nj, ni, 2, 3) with ip removed
     else:
-        if grid.k_gaps:
+        if k_gaps:
             edge_vectors.append(p[kp] - p[km])  # k edge vectors, shape (nk, nj + 1, ni + 1, 3)
             edge_vectors.append(p[:, 1:, :] - p[:, :-1, :])  # j edge vectors, shape (nk + k_gaps + 1, nj, ni + 1, 3)
             edge_vectors.append(p[:, :, 1:] - p[:, :, :-1])  # i edge vectors, shape (nk + k_gaps + 1, nj + 1, ni, 3)
@@ -229,7 +278,7 @@ def half_cell_t_irregular(grid,
             edge_vectors.append(p[:, 1:] - p[:, :-1])  # j edge vectors, shape (nk + 1, nj, ni + 1, 3)
             edge_vectors.append(p[:, :, 1:] - p[:, :, :-1])  # i edge vectors, shape (nk + 1, nj + 1, ni, 3)
 
-    half_t = np.empty((grid.nk, grid.nj, grid.ni, 3, 2))  # 3 is K,J,I; 2 is -/+ polarity (face)
+    half_t = np.empty(tuple(extent_kji) + (3, 2))  # 3 is K,J,I; 2 is -/+ polarity (face)
 
     # note: for some reason half_axis_length_sqr values of 0.0 yield invalid value in numpy divide, rahter than divide by zero
     np.seterr(divide = 'ignore', invalid = 'ignore')
@@ -237,7 +286,7 @@ def half_cell_t_irregular(grid,
     for axis in range(3):
 
         if axis == 0:  # k
-            if grid.has_split_coordinate_lines:
+            if split:
                 half_axis_vectors = 0.125 * np.abs(np.sum(edge_vectors[0], axis = (
                     3, 4)))  # shape (nk, nj, ni, 3) with 3 being xyz length components of vector
                 face_areas = (projected_tri_area(p[:, pfc[:, :, 0, 0]], p[:, pfc[:, :, 0, 1]], p[:, pfc[:, :, 1, 1]]) +
@@ -249,7 +298,7 @@ def half_cell_t_irregular(grid,
                 face_areas = (projected_tri_area(p[:, :-1, :-1], p[:, :-1, 1:], p[:, 1:, 1:]) +
                               projected_tri_area(p[:, :-1, :-1], p[:, 1:, 1:], p[:, 1:, :-1])
                              )  # shape (nk + k_gaps + 1, nj, ni, 3) where 3 is xyz projection axis
-            if grid.k_gaps:
+            if k_gaps:
                 minus_face_areas = face_areas[
                     km]  # shape (nk, nj, ni, 3) where 3 is xyz projection axis (ie. yz plane, xz plane, xy plane)
                 plus_face_areas = face_areas[kp]
@@ -267,8 +316,8 @@ def half_cell_t_irregular(grid,
                 perm_k * np.sum(half_axis_vectors * plus_face_areas, axis = -1) / half_axis_length_sqr)
 
         elif axis == 1:  # j
-            if grid.has_split_coordinate_lines:
-                if grid.k_gaps:
+            if split:
+                if k_gaps:
                     half_axis_vectors = 0.125 * np.abs(edge_vectors[1][kp][:, :, :, 1] +
                                                        edge_vectors[1][kp][:, :, :, 0] +
                                                        edge_vectors[1][km][:, :, :, 1] +
@@ -287,7 +336,7 @@ def half_cell_t_irregular(grid,
                 minus_face_areas = face_areas[:, :, :, 0]
                 plus_face_areas = face_areas[:, :, :, 1]
             else:
-                if grid.k_gaps:
+                if k_gaps:
                     half_axis_vectors = 0.125 * np.abs(edge_vectors[1][kp][:, :, 1:] + edge_vectors[1][kp][:, :, :-1] +
                                                        edge_vectors[1][km][:, :, 1:] + edge_vectors[1][km][:, :, :-1])
                     face_areas = (projected_tri_area(p[km][:, :-1], p[km][:, :, 1:], p[kp][:, :, 1:]) +
@@ -310,8 +359,8 @@ def half_cell_t_irregular(grid,
                 perm_j * np.sum(half_axis_vectors * plus_face_areas, axis = -1) / half_axis_length_sqr)
 
         else:  # i
-            if grid.has_split_coordinate_lines:
-                if grid.k_gaps:
+            if split:
+                if k_gaps:
                     half_axis_vectors = 0.125 * np.abs(edge_vectors[2][kp][:, :, :, 1] +
                                                        edge_vectors[2][kp][:, :, :, 0] +
                                                        edge_vectors[2][km][:, :, :, 1] +
@@ -330,7 +379,7 @@ def half_cell_t_irregular(grid,
                 minus_face_areas = face_areas[:, :, :, 0]
                 plus_face_areas = face_areas[:, :, :, 1]
             else:
-                if grid.k_gaps:
+                if k_gaps:
                     half_axis_vectors = 0.125 * np.abs(edge_vectors[2][kp][:, 1:, :] + edge_vectors[2][kp][:, :-1, :] +
                                                        edge_vectors[2][km][:, 1:, :] + edge_vectors[2][km][:, :-1, :])
                     face_areas = (projected_tri_area(p[km][:, :-1, :], p[km][:, 1:, :], p[kp][:, 1:, :]) +
@@ -490,12 +539,14 @@ def half_cell_t_2d_triangular_precursor(p, t):
     return normal_lengths, cem_lengths
 
 
-def fault_connection_set(grid, skip_inactive = False):
+def fault_connection_set(grid, skip_inactive = False, parallel = False):
     """Builds a GridConnectionSet for juxtaposed faces where there is a split pillar, with fractional area data.
 
     arguments:
        grid (grid.Grid object): the grid for which a fault connection set is required
        skip_inactive (boolean, default False): if True, connections where either cell is inactive will be excluded
+       parallel (boolean, default False): if True, the split faces are processed in parallel threads by a numba
+          parallel kernel; leave as False if the calling process might later fork, eg. for multiprocessing
 
     returns:
        (GridConnectionSet, numpy float array of shape (count, 2)) where the connection set identifies all cell face
@@ -511,609 +562,56 @@ def fault_connection_set(grid, skip_inactive = False):
        as fractional areas are returned, the results are applicable whether xy & z units are the same or differ
     """
 
-    def all_nan(pillar):
-        # return True if no valid points in pillar
-        return np.all(np.any(np.isnan(pillar), axis = -1))
-
-    def juxtapose(grid, p, pv, pam, pap, pbm, pbp, tol = 0.001):
-        # return list of juxtaposed layer pairs and fractional areas: list of (ka, kb, fa, fb) and error info
-        # TODO: orthogonal offset tolerance on pillars
-
-        def pillar_flavour(pml_top, pml_bot, ppl_top, ppl_bot, tol = 0.001):
-            # return flavour of points pattern on one pillar:
-            # 1: both p above m top
-            # 2: p top above m top, p bot within m
-            # 3: p top above m top, p bot below m bot
-            # 4: both p within m
-            # 5: p top within m, p bot below m bot
-            # 6: both p below m
-            if ppl_top >= pml_top - tol and ppl_bot <= pml_bot + tol:
-                return 4  # tolerance bias towards simplest flavour
-            if ppl_bot <= pml_top + tol:
-                return 1
-            if ppl_top >= pml_bot - tol:
-                return 6
-            if ppl_top <= pml_top + tol:
-                if ppl_bot <= pml_bot + tol:
-                    return 2
-                return 3
-            return 5
-
-        def basic_fr(g, h, ea, eb, tol):
-            # returns fractional area for simple patterns (2 sides of overlap quadrilateral lie on pillars)
-            if ea + eb < tol:
-                return 0.0
-            return (g + h) / (ea + eb)
-
-        def fractional_area(paml_top,
-                            paml_bot,
-                            papl_top,
-                            papl_bot,
-                            pbml_top,
-                            pbml_bot,
-                            pbpl_top,
-                            pbpl_bot,
-                            tol = 0.001):
-            # calculate fractional area of overlap, from m perspective (calling code swaps m & p for other perspective)
-            fla = pillar_flavour(paml_top, paml_bot, papl_top, papl_bot, tol = tol)
-            flb = pillar_flavour(pbml_top, pbml_bot, pbpl_top, pbpl_bot, tol = tol)
-            if (fla, flb) == (4, 4):  # diagram 1
-                return basic_fr(papl_bot - papl_top, pbpl_bot - pbpl_top, paml_bot - paml_top, pbml_bot - pbml_top, tol)
-            elif (fla, flb) == (3, 3):  # diagram 1 (reverse perspective); diagram 3
-                return 1.0
-            elif (fla, flb) == (5, 5):  # diagram 2
-                return basic_fr(paml_bot - papl_top, pbml_bot - pbpl_top, paml_bot - paml_top, pbml_bot - pbml_top, tol)
-            elif (fla, flb) == (2, 2):  # diagram 2 (reverse perspective)
-                return basic_fr(papl_bot - paml_top, pbpl_bot - pbml_top, paml_bot - paml_top, pbml_bot - pbml_top, tol)
-            elif (fla, flb) == (5, 4):  # diagram 5 (diagram 4 is a special case of 5 and 2)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbml_bot - pbpl_bot
-                if eb < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = papl_bot - paml_bot
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                return basic_fr(paml_bot - papl_top, pbml_bot - pbpl_top, paml_bot - paml_top, pbml_bot - pbml_top,
-                                tol) - sub
-            elif (fla, flb) == (4, 5):  # diagram 5 mirror (diagram 4 is a special case of 5)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = paml_bot - papl_bot
-                if ea < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = pbpl_bot - pbml_bot
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                return basic_fr(pbml_bot - pbpl_top, paml_bot - papl_top, pbml_bot - pbml_top, paml_bot - paml_top,
-                                tol) - sub
-            elif (fla, flb) == (2, 3):  # diagram 5 (reverse perspective), similar to 1.0 - diagram 10
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = paml_bot - papl_bot
-                if ea < tol or g < tol:
-                    return 1.0
-                v = pbpl_bot - pbml_bot
-                return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (3, 2):  # diagram 5 mirror (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbml_bot - pbpl_bot
-                if eb < tol or g < tol:
-                    return 1.0
-                v = papl_bot - paml_bot
-                return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (5, 2):  # diagram 6
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = papl_top - paml_top
-                if ea < tol or g < tol:
-                    suba = 0.0
-                else:
-                    v = pbml_top - pbpl_top
-                    suba = (g / (ea + eb)) * (1.0 - v / (v + g))
-                g = pbml_bot - pbpl_bot
-                if eb < tol or g < tol:
-                    subb = 0.0
-                else:
-                    v = papl_bot - paml_bot
-                    subb = (g / (ea + eb)) * (1.0 - v / (v + g))
-                sub = suba + subb
-                return 1.0 - sub
-            elif (fla, flb) == (2, 5):  # diagram 6 mirror
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbpl_top - pbml_top
-                if eb < tol or g < tol:
-                    subb = 0.0
-                else:
-                    v = paml_top - papl_top
-                    subb = (g / (ea + eb)) * (1.0 - v / (v + g))
-                g = paml_bot - papl_bot
-                if ea < tol or g < tol:
-                    suba = 0.0
-                else:
-                    v = pbpl_bot - pbml_bot
-                    suba = (g / (ea + eb)) * (1.0 - v / (v + g))
-                sub = suba + subb
-                return 1.0 - sub
-            elif (fla, flb) == (2, 1):  # diagram 10
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = papl_bot - paml_top
-                if ea < tol or g < tol:
-                    return 0.0
-                v = pbml_top - pbpl_bot
-                return (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (1, 2):  # diagram 10 mirror
-                eb = pbml_bot - pbml_top
-                ea = paml_bot - paml_top
-                g = pbpl_bot - pbml_top
-                if eb < tol or g < tol:
-                    return 0.0
-                v = paml_top - papl_bot
-                return (g / (eb + ea)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (5, 6):  # diagram 10 (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = paml_bot - papl_top
-                if ea < tol or g < tol:
-                    return 0.0
-                v = pbpl_top - pbml_bot
-                return (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (6, 5):  # diagram 10 mirror (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbml_bot - pbpl_top
-                if eb < tol or g < tol:
-                    return 0.0
-                v = papl_top - paml_bot
-                return (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (2, 4):  # diagram 11
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbpl_top - pbml_top
-                if eb < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = paml_top - papl_top
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                return basic_fr(papl_bot - paml_top, pbpl_bot - pbml_top, paml_bot - paml_top, pbml_bot - pbml_top,
-                                tol) - sub
-            elif (fla, flb) == (4, 2):  # diagram 11 mirror
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = papl_top - paml_top
-                if ea < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = pbml_top - pbpl_top
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                return basic_fr(pbpl_bot - pbml_top, papl_bot - paml_top, pbml_bot - pbml_top, paml_bot - paml_top,
-                                tol) - sub
-            elif (fla, flb) == (5, 3):  # diagram 11 (reverse perspective) similar to 1.0 - diagram 10
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = papl_top - paml_top
-                if ea < tol or g < tol:
-                    return 1.0
-                v = pbml_top - pbpl_top
-                return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (3, 5):  # diagram 11 mirror (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbpl_top - pbml_top
-                if eb < tol or g < tol:
-                    return 1.0
-                v = paml_top - papl_top
-                return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
-            elif (fla, flb) == (3, 1):  # diagram 7 (only accurate if pillars parallel and layer constant thickness?)
-                s = papl_bot - paml_bot
-                ea = paml_bot - paml_top
-                if s + ea <= tol:
-                    return 0.0
-                t = pbml_bot - pbpl_bot
-                v = pbml_top - pbpl_bot
-                if t + v <= tol:
-                    return 1.0
-                return 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s))
-            elif (fla, flb) == (1, 3):  # diagram 7 mirror
-                # (only accurate if pillars parallel and layer constant thickness?)
-                s = pbpl_bot - pbml_bot
-                eb = pbml_bot - pbml_top
-                if s + eb <= tol:
-                    return 0.0
-                t = paml_bot - papl_bot
-                v = paml_top - papl_bot
-                if t + v <= tol:
-                    return 1.0
-                return 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s))
-            elif (fla, flb) == (4, 6):  # diagram 7 (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = paml_bot - papl_top
-                if ea < tol or g < tol:
-                    return 0.0
-                v = pbpl_top - pbml_bot
-                gs = paml_bot - papl_bot
-                if gs < tol:
-                    sub = 0.0
-                else:
-                    vs = pbpl_bot - pbml_bot
-                    sub = (gs / (ea + eb)) * (1.0 - vs / (vs + gs))
-                return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
-            elif (fla, flb) == (6, 4):  # diagram 7 mirror (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbml_bot - pbpl_top
-                if eb < tol or g < tol:
-                    return 0.0
-                v = papl_top - paml_bot
-                gs = pbml_bot - pbpl_bot
-                if gs < tol:
-                    sub = 0.0
-                else:
-                    vs = papl_bot - paml_bot
-                    sub = (gs / (ea + eb)) * (1.0 - vs / (vs + gs))
-                return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
-            elif (fla, flb) == (4, 1):  # diagram 12
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = papl_bot - paml_top
-                if ea < tol or g < tol:
-                    return 0.0
-                gs = papl_top - paml_top
-                if gs < tol:
-                    sub = 0.0
-                else:
-                    v = pbml_top - pbpl_top
-                    sub = (gs / (ea + eb)) * (1.0 - v / (v + gs))
-                v = pbml_top - pbpl_bot
-                return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
-            elif (fla, flb) == (1, 4):  # diagram 12 mirror
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbpl_bot - pbml_top
-                if eb < tol or g < tol:
-                    return 0.0
-                gs = pbpl_top - pbml_top
-                if gs < tol:
-                    sub = 0.0
-                else:
-                    v = paml_top - papl_top
-                    sub = (gs / (ea + eb)) * (1.0 - v / (v + gs))
-                v = paml_top - papl_bot
-                return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
-            elif (fla, flb) == (3, 6):  # diagram 12 (reverse perspective)
-                s = pbpl_top - pbml_bot
-                eb = pbml_bot - pbml_top
-                if s + eb <= tol:
-                    return 1.0
-                t = paml_bot - papl_top
-                v = paml_top - papl_top
-                if t + v <= tol:
-                    return 0.0
-                return 1.0 - (0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)))
-            elif (fla, flb) == (6, 3):  # diagram 12 mirror (reverse perspective)
-                s = papl_top - paml_bot
-                ea = paml_bot - paml_top
-                if s + ea <= tol:
-                    return 1.0
-                t = pbml_bot - pbpl_top
-                v = pbml_top - pbpl_top
-                if t + v <= tol:
-                    return 0.0
-                return 1.0 - (0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)))
-            elif (fla, flb) == (5, 1):  # diagram 9 (only accurate if pillars parallel and layer constant thickness?)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = papl_top - paml_top
-                if ea < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = pbml_top - pbpl_top
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                s = papl_bot - paml_bot
-                if s + ea <= tol:
-                    return 0.0
-                t = pbml_bot - pbpl_bot
-                v = pbml_top - pbpl_bot
-                if t + v <= tol:
-                    return 1.0 - sub
-                return 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) - sub
-            elif (fla, flb) == (1, 5):  # diagram 9 mirror
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbpl_top - pbml_top
-                if eb < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = paml_top - papl_top
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                s = pbpl_bot - pbml_bot
-                if s + eb <= tol:
-                    return 0.0
-                t = paml_bot - papl_bot
-                v = paml_top - papl_bot
-                if t + v <= tol:
-                    return 1.0 - sub
-                return 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) - sub
-            elif (fla, flb) == (2, 6):  # diagram 9 (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = paml_bot - papl_bot
-                if ea < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = pbpl_bot - pbml_bot
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                s = paml_top - papl_top
-                if s + ea <= tol:
-                    return 0.0
-                t = pbpl_top - pbml_top
-                v = pbpl_top - pbml_bot
-                if t + v <= tol:
-                    return 1.0 - sub
-                return 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) - sub
-            elif (fla, flb) == (6, 2):  # diagram 9 mirror (reverse perspective)
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                g = pbml_bot - pbpl_bot
-                if eb < tol or g < tol:
-                    sub = 0.0
-                else:
-                    v = papl_bot - paml_bot
-                    sub = (g / (ea + eb)) * (1.0 - v / (v + g))
-                s = pbml_top - pbpl_top
-                if s + eb <= tol:
-                    return 0.0
-                t = papl_top - paml_top
-                v = papl_top - paml_bot
-                if t + v <= tol:
-                    return 1.0 - sub
-                return 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) - sub
-            elif (fla, flb) == (6, 1):  # diagram 8; solution only accurate if pillars are parallel
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                s = papl_top - paml_bot
-                if s + ea <= tol:
-                    suba = 0.0
-                else:
-                    t = pbml_bot - pbpl_top
-                    v = pbml_top - pbpl_top
-                    suba = 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) if t + v > tol else 1.0
-                s = pbml_top - pbpl_bot
-                if s + eb <= tol:
-                    subb = 0.0
-                else:
-                    t = papl_bot - paml_top
-                    v = papl_bot - paml_bot
-                    subb = 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) if t + v > tol else 1.0
-                sub = suba + subb
-                return max(1.0 - sub, 0.0)
-            elif (fla, flb) == (1, 6):  # diagram 8 mirror or reverse perspective
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                s = pbpl_top - pbml_bot
-                if s + eb <= tol:
-                    subb = 0.0
-                else:
-                    t = paml_bot - papl_top
-                    v = paml_top - papl_top
-                    subb = 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) if t + v > tol else 1.0
-                s = paml_top - papl_bot
-                if s + ea <= tol:
-                    suba = 0.0
-                else:
-                    t = pbpl_bot - pbml_top
-                    v = pbpl_bot - pbml_bot
-                    suba = 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) if t + v > tol else 1.0
-                sub = suba + subb
-                return max(1.0 - sub, 0.0)
-            elif (fla, flb) == (4, 3):  # diagram 13
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                if ea < tol:
-                    return 1.0
-                g = papl_top - paml_top
-                if g < tol:
-                    sub1 = 0.0
-                else:
-                    v = pbml_top - pbpl_top
-                    sub1 = (g / (ea + eb)) * (1.0 - v / (v + g))
-                g = paml_bot - papl_bot
-                if g < tol:
-                    sub2 = 0.0
-                else:
-                    v = pbpl_bot - pbml_bot
-                    sub2 = (g / (ea + eb)) * (1.0 - v / (v + g))
-                return 1.0 - (sub1 + sub2)
-            elif (fla, flb) == (3, 4):  # diagram 13 mirror or reverse perspective
-                ea = paml_bot - paml_top
-                eb = pbml_bot - pbml_top
-                if eb < tol:
-                    return 1.0
-                g = pbpl_top - pbml_top
-                if g < tol:
-                    sub1 = 0.0
-                else:
-                    v = paml_top - papl_top
-                    sub1 = (g / (ea + eb)) * (1.0 - v / (v + g))
-                g = pbml_bot - pbpl_bot
-                if g < tol:
-                    sub2 = 0.0
-                else:
-                    v = papl_bot - paml_bot
-                    sub2 = (g / (ea + eb)) * (1.0 - v / (v + g))
-                return 1.0 - (sub1 + sub2)
-            else:
-                raise Exception(f'unexpected juxtaposition pattern ({fla}, {flb})')
-
-        pav = 0.5 * (pv[pam] + pv[pap])  # mean pillar unit vector for -I side of J face
-        pbv = 0.5 * (pv[pbm] + pv[pbp])  # mean pillar unit vector for +I side of J face
-        if all_nan(p[:, pam, :]) or all_nan(p[:, pap, :]) or all_nan(p[:, pbm, :]) or all_nan(p[:, pbp, :]):
-            return []
-        o = np.nanmin(p[:, pam, :], axis = 0)  # arbitrary local origin
-        oe = np.expand_dims(o, 0)
-        paml = p[:, pam, :] - oe  # pillar points translated to local space
-        papl = p[:, pap, :] - oe
-        pbml = p[:, pbm, :] - oe
-        pbpl = p[:, pbp, :] - oe
-        pamln = np.empty(
-            paml.shape[0])  # pillar points normalised to scalar distances on mean pillar vector, arbitrary origin
-        for i in range(pamln.size):
-            pamln[i] = np.dot(paml[i], pav)
-        papln = np.empty(papl.shape[0])
-        for i in range(papln.size):
-            papln[i] = np.dot(papl[i], pav)
-        pbmln = np.empty(pbml.shape[0])
-        for i in range(pbmln.size):
-            pbmln[i] = np.dot(pbml[i], pbv)
-        pbpln = np.empty(pbpl.shape[0])
-        for i in range(pbpln.size):
-            pbpln[i] = np.dot(pbpl[i], pbv)
-
-        juxta_list = []
-        fa_p_totals = np.zeros(grid.nk)
-        fa_m_worst_scaling = 1.0
-        fa_m_downscaling_count = 0
-        for km in range(grid.nk):  # for each layer on -ve side of fault
-            km_top = grid.k_raw_index_array[km] if grid.k_gaps else km  # index of top points on -ve side of fault
-            km_bot = km_top + 1
-            paml_top = pamln[
-                km_top]  # point distances in local vector space; note local vector is different for pillars a and b
-            paml_bot = pamln[km_bot]
-            pbml_top = pbmln[km_top]
-            pbml_bot = pbmln[km_bot]
-            if np.any(np.isnan((paml_top, paml_bot, pbml_top, pbml_bot))):
-                continue
-            # scan layers on +ve side of fault looking for juxtaposition
-            kp = -1
-            km_start_index = len(juxta_list)
-            fa_m_total = 0.0
-            while True:
-                kp += 1
-                if kp >= grid.nk:
-                    break
-                kp_top = grid.k_raw_index_array[kp] if grid.k_gaps else kp  # index of top points on +ve side of fault
-                kp_bot = kp_top + 1
-                papl_top = papln[
-                    kp_top]  # point distances in local vector space; note local vector is different for pillars a and b
-                papl_bot = papln[kp_bot]
-                pbpl_top = pbpln[kp_top]
-                pbpl_bot = pbpln[kp_bot]
-                if np.any(np.isnan((papl_top, papl_bot, pbpl_top, pbpl_bot))):
-                    continue
-                # in following comments, 'shallower' means less distance in local vector, which is a K direction vector of sorts
-                if (paml_top >= papl_bot - tol) and (pbml_top >= pbpl_bot - tol):
-                    continue  # p fully shallower than m
-                if (paml_bot <= papl_top + tol) and (pbml_bot <= pbpl_top + tol):
-                    continue  # p fully deeper than m
-                # juxtaposition established, now determine fractional overlap area from perspectives of both sides of fault
-                fa_m = fractional_area(paml_top,
-                                       paml_bot,
-                                       papl_top,
-                                       papl_bot,
-                                       pbml_top,
-                                       pbml_bot,
-                                       pbpl_top,
-                                       pbpl_bot,
-                                       tol = tol)
-                fa_p = fractional_area(papl_top,
-                                       papl_bot,
-                                       paml_top,
-                                       paml_bot,
-                                       pbpl_top,
-                                       pbpl_bot,
-                                       pbml_top,
-                                       pbml_bot,
-                                       tol = tol)
-                # log.debug(f'K {km} {fa_m}  <->  {fa_p} {kp}')
-                fa_m = min(max(fa_m, 0.0), 1.0)
-                fa_p = min(max(fa_p, 0.0), 1.0)
-                juxta_list.append((km, kp, fa_m, fa_p))
-                fa_m_total += fa_m
-                fa_p_totals[kp] += fa_p
-            # find sum of fractional areas by layer (separately for both perspectives); normalise to max of 1.0
-            if fa_m_total > 1.0:
-                fa_m_downscaling_count += 1
-                if fa_m_total > fa_m_worst_scaling:
-                    fa_m_worst_scaling = fa_m_total
-                    # log.warning(f'downscaling fractional areas on minus side of fault by factor of {fa_m_total} in layer {km}')
-                for i in range(km_start_index, len(juxta_list)):
-                    (km, kp, fa_m, fa_p) = juxta_list[i]
-                    juxta_list[i] = (km, kp, fa_m / fa_m_total, fa_p)
-        any_p_scaling = False
-        fa_p_worst_scaling = np.nanmax(fa_p_totals)
-        fa_p_downscaling_count = 0
-        for kp in range(grid.nk):
-            if fa_p_totals[kp] > 1.0:
-                fa_p_downscaling_count += 1
-                # log.warning(f'downscaling fractional areas on plus side of fault by factor of {fa_p_totals[kp]} in layer {kp}')
-                any_p_scaling = True
-        if any_p_scaling:
-            for i in range(len(juxta_list)):
-                (km, kp, fa_m, fa_p) = juxta_list[i]
-                if fa_p_totals[kp] > 1.0:
-                    juxta_list[i] = (km, kp, fa_m, fa_p / fa_p_totals[kp])
-        return juxta_list, (fa_m_downscaling_count, fa_p_downscaling_count, fa_m_worst_scaling, fa_p_worst_scaling)
-
     if not grid.has_split_coordinate_lines:
         return None, None
     skip_inactive = skip_inactive and hasattr(grid, 'inactive') and grid.inactive is not None
 
     p = grid.points_ref(masked = False)  # shape (nk + k_gaps + 1, np, 3)
-    pv = vec.unit_vectors(p[-1] - p[0])  # pillar vectors; shape (np, 3); could postpone to individual pillar work
+    pv = vec.unit_vectors(p[-1] - p[0])  # pillar vectors; shape (np, 3)
     col_j_split, col_i_split = grid.split_column_faces(
     )  # internal only column faces; shapes (nj - 1, ni), (nj, ni - 1)
     pfc = grid.create_column_pillar_mapping()  # pillars for column; shape (nj, ni, 2, 2)
+    k_top = grid.k_raw_index_array if grid.k_gaps else np.arange(grid.nk, dtype = int)  # index of top points
 
-    juxtaposed_j_list = []
     j_ji = np.stack(np.where(col_j_split)).T  # ji0 columns where +J face is split; shape (nc, 2)
-    warning_count = 0
-    for (j, i) in j_ji:
-        # log.debug(f'J, I  {j}, {i}')
-        pam = pfc[j, i, 1, 0]  # pillar index for -I edge of J face, for col on -J side of fault
-        pap = pfc[j + 1, i, 0, 0]  # pillar index for -I edge of J face, for col on +J side of fault
-        pbm = pfc[j, i, 1, 1]  # pillar index for +I edge of J face, for col on -J side of fault
-        pbp = pfc[j + 1, i, 0, 1]  # pillar index for +I edge of J face, for col on +J side of fault
-        ji_list, scaling_info = juxtapose(grid, p, pv, pam, pap, pbm, pbp)
-        if scaling_info[2] > 1.2 or scaling_info[3] > 1.2:
-            if warning_count < 20:
-                log.warning(
-                    f'severe downscaling for I+ face in column ({j}, {i}); worst m {scaling_info[2]}; worst p {scaling_info[3]}'
-                )
-            elif warning_count == 20:
-                log.warning('other similar I face warnings suppressed')
-            warning_count += 1
-        for (km, kp, fa_m, fa_p) in ji_list:
-            if skip_inactive and (grid.inactive[km, j, i] or grid.inactive[kp, j + 1, i]):
-                continue
-            juxtaposed_j_list.append(((km, j, i), (kp, j + 1, i), fa_m, fa_p))
-    juxtaposed_i_list = []
+    j, i = j_ji[:, 0], j_ji[:, 1]
+    j_pillars = np.stack(
+        (
+            pfc[j, i, 1, 0],  # pillar index for -I edge of J face, for col on -J side of fault
+            pfc[j + 1, i, 0, 0],  # pillar index for -I edge of J face, for col on +J side of fault
+            pfc[j, i, 1, 1],  # pillar index for +I edge of J face, for col on -J side of fault
+            pfc[j + 1, i, 0, 1]),  # pillar index for +I edge of J face, for col on +J side of fault
+        axis = -1)
     i_ji = np.stack(np.where(col_i_split)).T  # ji0 columns where +I face is split; shape (nc, 2)
-    warning_count = 0
-    for (j, i) in i_ji:
-        pam = pfc[j, i, 0, 1]  # pillar index for -J edge of I face, for col on -I side of fault
-        pap = pfc[j, i + 1, 0, 0]  # pillar index for -J edge of I face, for col on +I side of fault
-        pbm = pfc[j, i, 1, 1]  # pillar index for +J edge of I face, for col on -I side of fault
-        pbp = pfc[j, i + 1, 1, 0]  # pillar index for +J edge of I face, for col on +I side of fault
-        ji_list, scaling_info = juxtapose(grid, p, pv, pam, pap, pbm, pbp)
-        if scaling_info[2] > 1.2 or scaling_info[3] > 1.2:
-            if warning_count < 20:
-                log.warning(
-                    f'severe downscaling for J+ face in column ({j}, {i}); worst m {scaling_info[2]}; worst p {scaling_info[3]}'
-                )
-            elif warning_count == 20:
-                log.warning('other similar J face warnings suppressed')
-            warning_count += 1
-        for (km, kp, fa_m, fa_p) in ji_list:
-            if skip_inactive and (grid.inactive[km, j, i] or grid.inactive[kp, j, i + 1]):
-                continue
-            juxtaposed_i_list.append(((km, j, i), (kp, j, i + 1), fa_m, fa_p))
-
-    combo_list = juxtaposed_j_list + juxtaposed_i_list
-    count = len(combo_list)
+    j, i = i_ji[:, 0], i_ji[:, 1]
+    i_pillars = np.stack(
+        (
+            pfc[j, i, 0, 1],  # pillar index for -J edge of I face, for col on -I side of fault
+            pfc[j, i + 1, 0, 0],  # pillar index for -J edge of I face, for col on +I side of fault
+            pfc[j, i, 1, 1],  # pillar index for +J edge of I face, for col on -I side of fault
+            pfc[j, i + 1, 1, 0]),  # pillar index for +J edge of I face, for col on +I side of fault
+        axis = -1)
+
+    cell_pairs = []
+    fa_list = []
+    for ji, pillars, ji_step, face_name in ((j_ji, j_pillars, (1, 0), 'I+'), (i_ji, i_pillars, (0, 1), 'J+')):
+        face, km, kp, fa, scaling = _juxtaposition(p, pv, pillars, k_top, parallel = parallel)
+        severe = np.where(np.any(scaling > 1.2, axis = 1))[0]
+        for f in severe[:20]:
+            log.warning(f'severe downscaling for {face_name} face in column ({ji[f, 0]}, {ji[f, 1]}); ' +
+                        f'worst m {scaling[f, 0]}; worst p {scaling[f, 1]}')
+        if len(severe) > 20:
+            log.warning(f'other similar {face_name[0]} face warnings suppressed')
+        kji_m = np.stack((km, ji[face, 0], ji[face, 1]), axis = -1)
+        kji_p = np.stack((kp, ji[face, 0] + ji_step[0], ji[face, 1] + ji_step[1]), axis = -1)
+        if skip_inactive:
+            active = np.logical_not(np.logical_or(grid.inactive[tuple(kji_m.T)], grid.inactive[tuple(kji_p.T)]))
+            kji_m, kji_p, fa = kji_m[active], kji_p[active], fa[active]
+        cell_pairs.append(np.stack((grid.natural_cell_indices(kji_m), grid.natural_cell_indices(kji_p)), axis = -1))
+        fa_list.append(fa)
+
+    j_count = len(cell_pairs[0])
+    count = j_count + len(cell_pairs[1])
     if count == 0:
         return None, None
 
@@ -1122,16 +620,12 @@ def fault_connection_set(grid, skip_inactive = False):
     fcs.grid_list = [grid]
     fcs.count = count
     fcs.grid_index_pairs = np.zeros((count, 2), dtype = int)
-    fcs.cell_index_pairs = np.zeros((count, 2), dtype = int)
-    fcs.cell_index_pairs[:] = np.array([
-        grid.natural_cell_indices(np.array([[k, j, i] for ((k, j, i), _, _, _) in combo_list])),
-        grid.natural_cell_indices(np.array([[k, j, i] for (_, (k, j, i), _, _) in combo_list]))
-    ]).T
+    fcs.cell_index_pairs = np.concatenate(cell_pairs, axis = 0).astype(int)
     fcs.face_index_pairs = np.zeros((count, 2), dtype = int)
-    fcs.face_index_pairs[:len(juxtaposed_j_list), 0] = fcs.face_index_map[1, 1]  # J+
-    fcs.face_index_pairs[:len(juxtaposed_j_list), 1] = fcs.face_index_map[1, 0]  # J-
-    fcs.face_index_pairs[len(juxtaposed_j_list):, 0] = fcs.face_index_map[2, 1]  # I+
-    fcs.face_index_pairs[len(juxtaposed_j_list):, 1] = fcs.face_index_map[2, 0]  # I-
+    fcs.face_index_pairs[:j_count, 0] = fcs.face_index_map[1, 1]  # J+
+    fcs.face_index_pairs[:j_count, 1] = fcs.face_index_map[1, 0]  # J-
+    fcs.face_index_pairs[j_count:, 0] = fcs.face_index_map[2, 1]  # I+
+    fcs.face_index_pairs[j_count:, 1] = fcs.face_index_map[2, 0]  # I-
 
     feature_name = 'all faults with throw'
     fcs.feature_indices = np.zeros(count, dtype = int)  # could create seperate features by named fracture
@@ -1143,11 +637,576 @@ def fault_connection_set(grid, skip_inactive = False):
 
     fcs.feature_list = [('obj_FaultInterpretation', fi_uuid, str(feature_name))]
 
-    fa = np.array([[fa_m, fa_p] for (_, _, fa_m, fa_p) in combo_list])
+    fa = np.concatenate(fa_list, axis = 0)
 
     return fcs, fa
 
 
+@njit  # pragma: no cover
+def _pillar_flavour(pml_top, pml_bot, ppl_top, ppl_bot, tol = 0.001):
+    # return flavour of points pattern on one pillar:
+    # 1: both p above m top
+    # 2: p top above m top, p bot within m
+    # 3: p top above m top, p bot below m bot
+    # 4: both p within m
+    # 5: p top within m, p bot below m bot
+    # 6: both p below m
+    if ppl_top >= pml_top - tol and ppl_bot <= pml_bot + tol:
+        return 4  # tolerance bias towards simplest flavour
+    if ppl_bot <= pml_top + tol:
+        return 1
+    if ppl_top >= pml_bot - tol:
+        return 6
+    if ppl_top <= pml_top + tol:
+        if ppl_bot <= pml_bot + tol:
+            return 2
+        return 3
+    return 5
+
+
+@njit  # pragma: no cover
+def _basic_fr(g, h, ea, eb, tol):
+    # returns fractional area for simple patterns (2 sides of overlap quadrilateral lie on pillars)
+    if ea + eb < tol:
+        return 0.0
+    return (g + h) / (ea + eb)
+
+
+@njit  # pragma: no cover
+def _fractional_area(paml_top, paml_bot, papl_top, papl_bot, pbml_top, pbml_bot, pbpl_top, pbpl_bot, tol = 0.001):
+    # calculate fractional area of overlap, from m perspective (calling code swaps m & p for other perspective)
+    fla = _pillar_flavour(paml_top, paml_bot, papl_top, papl_bot, tol = tol)
+    flb = _pillar_flavour(pbml_top, pbml_bot, pbpl_top, pbpl_bot, tol = tol)
+    if fla == 4 and flb == 4:  # diagram 1
+        return _basic_fr(papl_bot - papl_top, pbpl_bot - pbpl_top, paml_bot - paml_top, pbml_bot - pbml_top, tol)
+    elif fla == 3 and flb == 3:  # diagram 1 (reverse perspective); diagram 3
+        return 1.0
+    elif fla == 5 and flb == 5:  # diagram 2
+        return _basic_fr(paml_bot - papl_top, pbml_bot - pbpl_top, paml_bot - paml_top, pbml_bot - pbml_top, tol)
+    elif fla == 2 and flb == 2:  # diagram 2 (reverse perspective)
+        return _basic_fr(papl_bot - paml_top, pbpl_bot - pbml_top, paml_bot - paml_top, pbml_bot - pbml_top, tol)
+    elif fla == 5 and flb == 4:  # diagram 5 (diagram 4 is a special case of 5 and 2)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbml_bot - pbpl_bot
+        if eb < tol or g < tol:
+            sub = 0.0
+        else:
+            v = papl_bot - paml_bot
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        return _basic_fr(paml_bot - papl_top, pbml_bot - pbpl_top, paml_bot - paml_top, pbml_bot - pbml_top, tol) - sub
+    elif fla == 4 and flb == 5:  # diagram 5 mirror (diagram 4 is a special case of 5)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = paml_bot - papl_bot
+        if ea < tol or g < tol:
+            sub = 0.0
+        else:
+            v = pbpl_bot - pbml_bot
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        return _basic_fr(pbml_bot - pbpl_top, paml_bot - papl_top, pbml_bot - pbml_top, paml_bot - paml_top, tol) - sub
+    elif fla == 2 and flb == 3:  # diagram 5 (reverse perspective), similar to 1.0 - diagram 10
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = paml_bot - papl_bot
+        if ea < tol or g < tol:
+            return 1.0
+        v = pbpl_bot - pbml_bot
+        return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 3 and flb == 2:  # diagram 5 mirror (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbml_bot - pbpl_bot
+        if eb < tol or g < tol:
+            return 1.0
+        v = papl_bot - paml_bot
+        return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 5 and flb == 2:  # diagram 6
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = papl_top - paml_top
+        if ea < tol or g < tol:
+            suba = 0.0
+        else:
+            v = pbml_top - pbpl_top
+            suba = (g / (ea + eb)) * (1.0 - v / (v + g))
+        g = pbml_bot - pbpl_bot
+        if eb < tol or g < tol:
+            subb = 0.0
+        else:
+            v = papl_bot - paml_bot
+            subb = (g / (ea + eb)) * (1.0 - v / (v + g))
+        sub = suba + subb
+        return 1.0 - sub
+    elif fla == 2 and flb == 5:  # diagram 6 mirror
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbpl_top - pbml_top
+        if eb < tol or g < tol:
+            subb = 0.0
+        else:
+            v = paml_top - papl_top
+            subb = (g / (ea + eb)) * (1.0 - v / (v + g))
+        g = paml_bot - papl_bot
+        if ea < tol or g < tol:
+            suba = 0.0
+        else:
+            v = pbpl_bot - pbml_bot
+            suba = (g / (ea + eb)) * (1.0 - v / (v + g))
+        sub = suba + subb
+        return 1.0 - sub
+    elif fla == 2 and flb == 1:  # diagram 10
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = papl_bot - paml_top
+        if ea < tol or g < tol:
+            return 0.0
+        v = pbml_top - pbpl_bot
+        return (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 1 and flb == 2:  # diagram 10 mirror
+        eb = pbml_bot - pbml_top
+        ea = paml_bot - paml_top
+        g = pbpl_bot - pbml_top
+        if eb < tol or g < tol:
+            return 0.0
+        v = paml_top - papl_bot
+        return (g / (eb + ea)) * (1.0 - v / (v + g))
+    elif fla == 5 and flb == 6:  # diagram 10 (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = paml_bot - papl_top
+        if ea < tol or g < tol:
+            return 0.0
+        v = pbpl_top - pbml_bot
+        return (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 6 and flb == 5:  # diagram 10 mirror (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbml_bot - pbpl_top
+        if eb < tol or g < tol:
+            return 0.0
+        v = papl_top - paml_bot
+        return (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 2 and flb == 4:  # diagram 11
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbpl_top - pbml_top
+        if eb < tol or g < tol:
+            sub = 0.0
+        else:
+            v = paml_top - papl_top
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        return _basic_fr(papl_bot - paml_top, pbpl_bot - pbml_top, paml_bot - paml_top, pbml_bot - pbml_top, tol) - sub
+    elif fla == 4 and flb == 2:  # diagram 11 mirror
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = papl_top - paml_top
+        if ea < tol or g < tol:
+            sub = 0.0
+        else:
+            v = pbml_top - pbpl_top
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        return _basic_fr(pbpl_bot - pbml_top, papl_bot - paml_top, pbml_bot - pbml_top, paml_bot - paml_top, tol) - sub
+    elif fla == 5 and flb == 3:  # diagram 11 (reverse perspective) similar to 1.0 - diagram 10
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = papl_top - paml_top
+        if ea < tol or g < tol:
+            return 1.0
+        v = pbml_top - pbpl_top
+        return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 3 and flb == 5:  # diagram 11 mirror (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbpl_top - pbml_top
+        if eb < tol or g < tol:
+            return 1.0
+        v = paml_top - papl_top
+        return 1.0 - (g / (ea + eb)) * (1.0 - v / (v + g))
+    elif fla == 3 and flb == 1:  # diagram 7 (only accurate if pillars parallel and layer constant thickness?)
+        s = papl_bot - paml_bot
+        ea = paml_bot - paml_top
+        if s + ea <= tol:
+            return 0.0
+        t = pbml_bot - pbpl_bot
+        v = pbml_top - pbpl_bot
+        if t + v <= tol:
+            return 1.0
+        return 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s))
+    elif fla == 1 and flb == 3:  # diagram 7 mirror
+        # (only accurate if pillars parallel and layer constant thickness?)
+        s = pbpl_bot - pbml_bot
+        eb = pbml_bot - pbml_top
+        if s + eb <= tol:
+            return 0.0
+        t = paml_bot - papl_bot
+        v = paml_top - papl_bot
+        if t + v <= tol:
+            return 1.0
+        return 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s))
+    elif fla == 4 and flb == 6:  # diagram 7 (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = paml_bot - papl_top
+        if ea < tol or g < tol:
+            return 0.0
+        v = pbpl_top - pbml_bot
+        gs = paml_bot - papl_bot
+        if gs < tol:
+            sub = 0.0
+        else:
+            vs = pbpl_bot - pbml_bot
+            sub = (gs / (ea + eb)) * (1.0 - vs / (vs + gs))
+        return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
+    elif fla == 6 and flb == 4:  # diagram 7 mirror (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbml_bot - pbpl_top
+        if eb < tol or g < tol:
+            return 0.0
+        v = papl_top - paml_bot
+        gs = pbml_bot - pbpl_bot
+        if gs < tol:
+            sub = 0.0
+        else:
+            vs = papl_bot - paml_bot
+            sub = (gs / (ea + eb)) * (1.0 - vs / (vs + gs))
+        return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
+    elif fla == 4 and flb == 1:  # diagram 12
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = papl_bot - paml_top
+        if ea < tol or g < tol:
+            return 0.0
+        gs = papl_top - paml_top
+        if gs < tol:
+            sub = 0.0
+        else:
+            v = pbml_top - pbpl_top
+            sub = (gs / (ea + eb)) * (1.0 - v / (v + gs))
+        v = pbml_top - pbpl_bot
+        return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
+    elif fla == 1 and flb == 4:  # diagram 12 mirror
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbpl_bot - pbml_top
+        if eb < tol or g < tol:
+            return 0.0
+        gs = pbpl_top - pbml_top
+        if gs < tol:
+            sub = 0.0
+        else:
+            v = paml_top - papl_top
+            sub = (gs / (ea + eb)) * (1.0 - v / (v + gs))
+        v = paml_top - papl_bot
+        return (g / (ea + eb)) * (1.0 - v / (v + g)) - sub
+    elif fla == 3 and flb == 6:  # diagram 12 (reverse perspective)
+        s = pbpl_top - pbml_bot
+        eb = pbml_bot - pbml_top
+        if s + eb <= tol:
+            return 1.0
+        t = paml_bot - papl_top
+        v = paml_top - papl_top
+        if t + v <= tol:
+            return 0.0
+        return 1.0 - (0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)))
+    elif fla == 6 and flb == 3:  # diagram 12 mirror (reverse perspective)
+        s = papl_top - paml_bot
+        ea = paml_bot - paml_top
+        if s + ea <= tol:
+            return 1.0
+        t = pbml_bot - pbpl_top
+        v = pbml_top - pbpl_top
+        if t + v <= tol:
+            return 0.0
+        return 1.0 - (0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)))
+    elif fla == 5 and flb == 1:  # diagram 9 (only accurate if pillars parallel and layer constant thickness?)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = papl_top - paml_top
+        if ea < tol or g < tol:
+            sub = 0.0
+        else:
+            v = pbml_top - pbpl_top
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        s = papl_bot - paml_bot
+        if s + ea <= tol:
+            return 0.0
+        t = pbml_bot - pbpl_bot
+        v = pbml_top - pbpl_bot
+        if t + v <= tol:
+            return 1.0 - sub
+        return 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) - sub
+    elif fla == 1 and flb == 5:  # diagram 9 mirror
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbpl_top - pbml_top
+        if eb < tol or g < tol:
+            sub = 0.0
+        else:
+            v = paml_top - papl_top
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        s = pbpl_bot - pbml_bot
+        if s + eb <= tol:
+            return 0.0
+        t = paml_bot - papl_bot
+        v = paml_top - papl_bot
+        if t + v <= tol:
+            return 1.0 - sub
+        return 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) - sub
+    elif fla == 2 and flb == 6:  # diagram 9 (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = paml_bot - papl_bot
+        if ea < tol or g < tol:
+            sub = 0.0
+        else:
+            v = pbpl_bot - pbml_bot
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        s = paml_top - papl_top
+        if s + ea <= tol:
+            return 0.0
+        t = pbpl_top - pbml_top
+        v = pbpl_top - pbml_bot
+        if t + v <= tol:
+            return 1.0 - sub
+        return 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) - sub
+    elif fla == 6 and flb == 2:  # diagram 9 mirror (reverse perspective)
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        g = pbml_bot - pbpl_bot
+        if eb < tol or g < tol:
+            sub = 0.0
+        else:
+            v = papl_bot - paml_bot
+            sub = (g / (ea + eb)) * (1.0 - v / (v + g))
+        s = pbml_top - pbpl_top
+        if s + eb <= tol:
+            return 0.0
+        t = papl_top - paml_top
+        v = papl_top - paml_bot
+        if t + v <= tol:
+            return 1.0 - sub
+        return 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) - sub
+    elif fla == 6 and flb == 1:  # diagram 8; solution only accurate if pillars are parallel
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        s = papl_top - paml_bot
+        if s + ea <= tol:
+            suba = 0.0
+        else:
+            t = pbml_bot - pbpl_top
+            v = pbml_top - pbpl_top
+            suba = 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) if t + v > tol else 1.0
+        s = pbml_top - pbpl_bot
+        if s + eb <= tol:
+            subb = 0.0
+        else:
+            t = papl_bot - paml_top
+            v = papl_bot - paml_bot
+            subb = 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) if t + v > tol else 1.0
+        sub = suba + subb
+        return max(1.0 - sub, 0.0)
+    elif fla == 1 and flb == 6:  # diagram 8 mirror or reverse perspective
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        s = pbpl_top - pbml_bot
+        if s + eb <= tol:
+            subb = 0.0
+        else:
+            t = paml_bot - papl_top
+            v = paml_top - papl_top
+            subb = 0.5 * (s / (s + t) + 1.0 - v / (v + eb + s)) if t + v > tol else 1.0
+        s = paml_top - papl_bot
+        if s + ea <= tol:
+            suba = 0.0
+        else:
+            t = pbpl_bot - pbml_top
+            v = pbpl_bot - pbml_bot
+            suba = 0.5 * (s / (s + t) + 1.0 - v / (v + ea + s)) if t + v > tol else 1.0
+        sub = suba + subb
+        return max(1.0 - sub, 0.0)
+    elif fla == 4 and flb == 3:  # diagram 13
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        if ea < tol:
+            return 1.0
+        g = papl_top - paml_top
+        if g < tol:
+            sub1 = 0.0
+        else:
+            v = pbml_top - pbpl_top
+            sub1 = (g / (ea + eb)) * (1.0 - v / (v + g))
+        g = paml_bot - papl_bot
+        if g < tol:
+            sub2 = 0.0
+        else:
+            v = pbpl_bot - pbml_bot
+            sub2 = (g / (ea + eb)) * (1.0 - v / (v + g))
+        return 1.0 - (sub1 + sub2)
+    elif fla == 3 and flb == 4:  # diagram 13 mirror or reverse perspective
+        ea = paml_bot - paml_top
+        eb = pbml_bot - pbml_top
+        if eb < tol:
+            return 1.0
+        g = pbpl_top - pbml_top
+        if g < tol:
+            sub1 = 0.0
+        else:
+            v = paml_top - papl_top
+            sub1 = (g / (ea + eb)) * (1.0 - v / (v + g))
+        g = pbml_bot - pbpl_bot
+        if g < tol:
+            sub2 = 0.0
+        else:
+            v = papl_bot - paml_bot
+            sub2 = (g / (ea + eb)) * (1.0 - v / (v + g))
+        return 1.0 - (sub1 + sub2)
+    else:
+        raise ValueError('unexpected juxtaposition pattern')
+
+
+@njit  # pragma: no cover
+def _all_nan_pillar(p, pillar):
+    # return True if no valid points in pillar
+    for k in range(p.shape[0]):
+        if not (np.isnan(p[k, pillar, 0]) or np.isnan(p[k, pillar, 1]) or np.isnan(p[k, pillar, 2])):
+            return False
+    return True
+
+
+@njit  # pragma: no cover
+def _pillar_distances(p, pillar, o, v):
+    # return pillar points as scalar distances along vector v, relative to local origin o
+    d = np.empty(p.shape[0])
+    for k in range(p.shape[0]):
+        d[k] = (p[k, pillar, 0] - o[0]) * v[0] + (p[k, pillar, 1] - o[1]) * v[1] + (p[k, pillar, 2] - o[2]) * v[2]
+    return d
+
+
+@njit  # pragma: no cover
+def _juxtapose_face(p, pv, pam, pap, pbm, pbp, k_top, km_a, kp_a, fa_a, start, fill, tol = 0.001):
+    # count, or fill in from start, juxtaposed layer pairs and fractional areas for one split face
+    # returns (number of juxtaposed layer pairs, worst m downscaling factor, worst p downscaling factor)
+    # TODO: orthogonal offset tolerance on pillars
+    nk = k_top.size
+    if _all_nan_pillar(p, pam) or _all_nan_pillar(p, pap) or _all_nan_pillar(p, pbm) or _all_nan_pillar(p, pbp):
+        return 0, 1.0, 0.0
+    pav = 0.5 * (pv[pam] + pv[pap])  # mean pillar unit vector for -I side of J face
+    pbv = 0.5 * (pv[pbm] + pv[pbp])  # mean pillar unit vector for +I side of J face
+    o = np.empty(3)  # arbitrary local origin
+    for d in range(3):
+        o[d] = np.nanmin(p[:, pam, d])
+    # pillar points normalised to scalar distances on mean pillar vector, arbitrary origin
+    pamln = _pillar_distances(p, pam, o, pav)
+    papln = _pillar_distances(p, pap, o, pav)
+    pbmln = _pillar_distances(p, pbm, o, pbv)
+    pbpln = _pillar_distances(p, pbp, o, pbv)
+
+    count = 0
+    fa_p_totals = np.zeros(nk)
+    fa_m_worst_scaling = 1.0
+    for km in range(nk):  # for each layer on -ve side of fault
+        km_top = k_top[km]  # index of top points on -ve side of fault
+        km_bot = km_top + 1
+        # point distances in local vector space; note local vector is different for pillars a and b
+        paml_top = pamln[km_top]
+        paml_bot = pamln[km_bot]
+        pbml_top = pbmln[km_top]
+        pbml_bot = pbmln[km_bot]
+        if np.isnan(paml_top) or np.isnan(paml_bot) or np.isnan(pbml_top) or np.isnan(pbml_bot):
+            continue
+        km_start = start + count
+        fa_m_total = 0.0
+        # scan layers on +ve side of fault looking for juxtaposition
+        for kp in range(nk):
+            kp_top = k_top[kp]  # index of top points on +ve side of fault
+            kp_bot = kp_top + 1
+            papl_top = papln[kp_top]
+            papl_bot = papln[kp_bot]
+            pbpl_top = pbpln[kp_top]
+            pbpl_bot = pbpln[kp_bot]
+            if np.isnan(papl_top) or np.isnan(papl_bot) or np.isnan(pbpl_top) or np.isnan(pbpl_bot):
+                continue
+            # in following comments, 'shallower' means less distance in local vector, which is a K direction vector of sorts
+            if (paml_top >= papl_bot - tol) and (pbml_top >= pbpl_bot - tol):
+                continue  # p fully shallower than m
+            if (paml_bot <= papl_top + tol) and (pbml_bot <= pbpl_top + tol):
+                continue  # p fully deeper than m
+            if fill:
+                # juxtaposition established, now determine fractional overlap area from perspectives of both sides
+                fa_m = _fractional_area(paml_top, paml_bot, papl_top, papl_bot, pbml_top, pbml_bot, pbpl_top, pbpl_bot,
+                                        tol)
+                fa_p = _fractional_area(papl_top, papl_bot, paml_top, paml_bot, pbpl_top, pbpl_bot, pbml_top, pbml_bot,
+                                        tol)
+                fa_m = min(max(fa_m, 0.0), 1.0)
+                fa_p = min(max(fa_p, 0.0), 1.0)
+                km_a[start + count] = km
+                kp_a[start + count] = kp
+                fa_a[start + count, 0] = fa_m
+                fa_a[start + count, 1] = fa_p
+                fa_m_total += fa_m
+                fa_p_totals[kp] += fa_p
+            count += 1
+        # normalise sum of fractional areas for layer on minus side to max of 1.0
+        if fa_m_total > 1.0:
+            if fa_m_total > fa_m_worst_scaling:
+                fa_m_worst_scaling = fa_m_total
+            for r in range(km_start, start + count):
+                fa_a[r, 0] = fa_a[r, 0] / fa_m_total
+    fa_p_worst_scaling = np.max(fa_p_totals) if nk > 0 else 0.0
+    if fill:
+        # normalise sums of fractional areas for layers on plus side to max of 1.0
+        for r in range(start, start + count):
+            if fa_p_totals[kp_a[r]] > 1.0:
+                fa_a[r, 1] = fa_a[r, 1] / fa_p_totals[kp_a[r]]
+    return count, fa_m_worst_scaling, fa_p_worst_scaling
+
+
+def _juxtaposition_arrays_py(p, pv, pillars, k_top):  # pragma: no cover
+    # returns (counts, km, kp, fa, scaling) for split faces with pillar indices given in array of shape (n, 4)
+    # compiled below as both serial and parallel kernels; prange acts as range in the serial kernel
+    n = len(pillars)
+    counts = np.zeros(n, dtype = np.int64)
+    scaling = np.zeros((n, 2))
+    km_a = np.zeros(0, dtype = np.int64)
+    fa_a = np.zeros((0, 2))
+    # first pass counts juxtaposed layer pairs for each face
+    for f in prange(n):
+        counts[f] = _juxtapose_face(p, pv, pillars[f, 0], pillars[f, 1], pillars[f, 2], pillars[f, 3], k_top, km_a,
+                                    km_a, fa_a, 0, False)[0]
+    starts = np.zeros(n, dtype = np.int64)
+    total = 0
+    for f in range(n):
+        starts[f] = total
+        total += counts[f]
+    km_a = np.zeros(total, dtype = np.int64)
+    kp_a = np.zeros(total, dtype = np.int64)
+    fa_a = np.zeros((total, 2))
+    # second pass fills in layer pairs and fractional areas
+    for f in prange(n):
+        _, scaling[f, 0], scaling[f, 1] = _juxtapose_face(p, pv, pillars[f, 0], pillars[f, 1], pillars[f, 2],
+                                                          pillars[f, 3], k_top, km_a, kp_a, fa_a, starts[f], True)
+    return counts, km_a, kp_a, fa_a, scaling
+
+
+_juxtaposition_arrays = njit(_juxtaposition_arrays_py)
+_juxtaposition_arrays_parallel = njit(parallel = True)(_juxtaposition_arrays_py)
+
+
+def _juxtaposition(p, pv, pillars, k_top, parallel = False):
+    # returns (face, km, kp, fa, scaling) for all split faces, where face, km & kp are int arrays of shape (N,) holding
+    # the index into pillars of the split face and the juxtaposed layers on minus and plus sides, fa is float array
+    # of shape (N, 2) holding the fractional areas from the two perspectives, and scaling is float array of shape
+    # (len(pillars), 2) holding the worst downscaling factors applied to the fractional areas on the two sides
+    pillars = np.ascontiguousarray(pillars, dtype = np.int64)
+    k_top = np.ascontiguousarray(k_top, dtype = np.int64)
+    kernel = _juxtaposition_arrays_parallel if parallel else _juxtaposition_arrays
+    counts, km, kp, fa, scaling = kernel(p, pv, pillars, k_top)
+    face = np.repeat(np.arange(len(pillars), dtype = np.int64), counts)
+    return face, km, kp, fa, scaling
+
+
 def projected_tri_area(pa, pb, pc):
     """Return array holding areas of triangles projected onto each of yz, xz, xy.
 
@@ -9,6 +9,11 @@ import logging
 log = logging.getLogger(__name__)
 
 import os
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import h5py
 import numpy as np
 
@@ -48,6 +53,7 @@ class H5Register():
         self.model = model
         self.default_chunks = default_chunks
         self.default_compression = default_compression
+        self.write_report = None  # populated with throughput information by write_fp()
 
     def register_dataset(self,
                          object_uuid,
@@ -135,17 +141,27 @@ class H5Register():
         if hdf5_internal_path:
             self.hdf5_path_dict[(object_uuid, group_tail)] = hdf5_internal_path
 
-    def write_fp(self, fp, use_int32 = None):
+    def write_fp(self, fp, use_int32 = None, threads = 1, report = False):
         """Write or append to an hdf5 file, writing the pre-registered datasets (arrays).
 
         arguments:
            fp: an already open h5py._hl.files.File object
+           use_int32 (bool, optional): if True, int64 arrays will be written as int32; if None,
+              global default will be used
+           threads (int, default 1): if greater than one, dtype conversion and gzip compression of
+              upcoming datasets are carried out by a pool of this many threads, while the current
+              dataset is being written
+           report (bool, default False): if True, a throughput summary is logged at info level
 
         returns:
            None
 
-        note:
-           the file handle fp must have been opened with mode 'w' or 'a'
+        notes:
+           the file handle fp must have been opened with mode 'w' or 'a';
+           with multiple threads, gzip compressed datasets have their chunks compressed ahead of time
+           and written with direct chunk writes; the resulting file is identical in content to a serial
+           write; a summary of the most recent write is always left in the write_report attribute,
+           as a dict with keys 'datasets', 'bytes', 'seconds' and 'mb_per_second'
         """
 
         # note: in resqml, an established hdf5 file has a uuid and should therefore be immutable
@@ -153,6 +169,8 @@ class H5Register():
         assert (fp is not None)
         if use_int32 is None:
             use_int32 = write_int_as_int32
+        start = time.perf_counter()
+        jobs = []
         for (object_uuid, group_tail) in self.dataset_dict.keys():
             if (object_uuid, group_tail) in self.hdf5_path_dict.keys():
                 internal_path = self.hdf5_path_dict[(object_uuid, group_tail)]
@@ -165,15 +183,39 @@ class H5Register():
                     dtype = 'int32'
             if write_bool_as_uint8 and str(dtype).lower().startswith('bool'):
                 dtype = 'uint8'
-            # log.debug('Writing hdf5 dataset ' + internal_path + ' of size ' + str(a.size) + ' type ' + str(dtype))
-            if chunks is None:
-                fp.create_dataset(internal_path, data = a, dtype = dtype)
-            elif compression is None:
-                fp.create_dataset(internal_path, data = a, dtype = dtype, chunks = chunks)
-            else:
-                fp.create_dataset(internal_path, data = a, dtype = dtype, chunks = chunks, compression = compression)
-
-    def write(self, file = None, mode = 'w', release_after = True, use_int32 = None):
+            jobs.append((internal_path, a, dtype, chunks, compression))
+        n_bytes = 0
+        if threads is None or threads <= 1:
+            for job in jobs:
+                n_bytes += _write_dataset(fp, *job)
+        else:
+            # prepare a bounded number of datasets ahead of the one being written, to limit memory use
+            with ThreadPoolExecutor(max_workers = threads) as executor:
+                pending = deque()
+                job_iter = iter(jobs)
+                for job in job_iter:
+                    pending.append(executor.submit(_prepare_dataset, *job))
+                    if len(pending) >= 2 * threads:
+                        break
+                while pending:
+                    prepared = pending.popleft().result()
+                    job = next(job_iter, None)
+                    if job is not None:
+                        pending.append(executor.submit(_prepare_dataset, *job))
+                    n_bytes += _write_prepared_dataset(fp, *prepared)
+        seconds = time.perf_counter() - start
+        self.write_report = {
+            'datasets': len(jobs),
+            'bytes': n_bytes,
+            'seconds': seconds,
+            'mb_per_second': n_bytes / (1.0e6 * seconds) if seconds > 0.0 else None
+        }
+        if report:
+            log.info(f'hdf5 write of {len(jobs)} datasets, {n_bytes / 1.0e6:.1f} MB in {seconds:.3f} seconds' +
+                     (f' ({self.write_report["mb_per_second"]:.1f} MB/s)' if seconds > 0.0 else '') +
+                     f' using {max(1, threads or 1)} thread(s)')
+
+    def write(self, file = None, mode = 'w', release_after = True, use_int32 = None, threads = 1, report = False):
         """Create or append to an hdf5 file, writing the pre-registered datasets (arrays).
 
         arguments:
@@ -186,6 +228,9 @@ class H5Register():
            use_int32 (bool, optional): if True, int64 arrays will be written as int32; if None,
               global default will be used (currently True); if False, int64 arrays will be
               written as such
+           threads (int, default 1): if greater than one, dtype conversion and compression of datasets
+              are pipelined using a pool of this many threads; see write_fp()
+           report (bool, default False): if True, a throughput summary is logged at info level
 
         returns:
            None
@@ -204,11 +249,89 @@ class H5Register():
         if mode == 'a' and isinstance(file, str) and not os.path.exists(file):
             mode = 'w'
         assert isinstance(file, h5py._hl.files.File)
-        self.write_fp(file, use_int32 = use_int32)
+        self.write_fp(file, use_int32 = use_int32, threads = threads, report = report)
         if release_after:
             self.model.h5_release()
 
 
+def _write_dataset(fp, internal_path, a, dtype, chunks, compression):
+    """Serially writes one dataset, returning the number of bytes of data written."""
+
+    if chunks is None:
+        dset = fp.create_dataset(internal_path, data = a, dtype = dtype)
+    elif compression is None:
+        dset = fp.create_dataset(internal_path, data = a, dtype = dtype, chunks = chunks)
+    else:
+        dset = fp.create_dataset(internal_path, data = a, dtype = dtype, chunks = chunks, compression = compression)
+    return dset.size * dset.dtype.itemsize
+
+
+def _prepare_dataset(internal_path, a, dtype, chunks, compression):
+    """Converts the array to its target dtype and gzip compresses its chunks, if appropriate; runs in a worker thread.
+
+    returns:
+       (internal_path, array, dtype, chunks, compression, compressed chunk list or None)
+    """
+
+    numeric = a.dtype.kind in 'biuf' and np.dtype(dtype).kind in 'biuf'
+    if numeric:
+        a = np.ascontiguousarray(a, dtype = dtype)
+    if not numeric or compression != 'gzip' or chunks is None or a.ndim == 0 or a.size == 0:
+        return (internal_path, a, dtype, chunks, compression, None)
+    if chunks is True:
+        chunks = _auto_chunk_shape(a.shape, a.dtype.itemsize)
+    chunks = tuple(chunks)
+    assert len(chunks) == a.ndim
+    compressed = []
+    grid_shape = tuple((extent - 1) // c + 1 for extent, c in zip(a.shape, chunks))
+    for chunk_index in np.ndindex(grid_shape):
+        offset = tuple(i * c for i, c in zip(chunk_index, chunks))
+        block = a[tuple(slice(o, o + c) for o, c in zip(offset, chunks))]
+        if block.shape != chunks:  # edge chunks are stored full size, padded with zeros
+            padded = np.zeros(chunks, dtype = a.dtype)
+            padded[tuple(slice(0, n) for n in block.shape)] = block
+            block = padded
+        # default gzip level used by h5py is 4
+        compressed.append((offset, zlib.compress(np.ascontiguousarray(block).tobytes(), 4)))
+    return (internal_path, a, dtype, chunks, compression, compressed)
+
+
+def _auto_chunk_shape(shape, item_size):
+    """Returns a chunk shape for an array, using the same heuristic as h5py applies when chunks is True.
+
+    note:
+       axes are repeatedly halved, starting with the first, until the chunk size in bytes is close to a target
+       which grows with the size of the array, between limits of 8 KiB and 1 MiB
+    """
+
+    chunk_base, chunk_min, chunk_max = 16 * 1024, 8 * 1024, 1024 * 1024
+    chunks = np.array(shape, dtype = float)
+    target_size = chunk_base * (2**np.log10(np.prod(chunks) * item_size / (1024.0 * 1024.0)))
+    target_size = min(max(target_size, chunk_min), chunk_max)
+    axis = 0
+    while True:
+        chunk_bytes = np.prod(chunks) * item_size
+        if ((chunk_bytes < target_size or abs(chunk_bytes - target_size) / target_size < 0.5) and
+                chunk_bytes < chunk_max):
+            break
+        if np.prod(chunks) == 1:
+            break
+        chunks[axis % len(chunks)] = np.ceil(chunks[axis % len(chunks)] / 2.0)
+        axis += 1
+    return tuple(int(c) for c in chunks)
+
+
+def _write_prepared_dataset(fp, internal_path, a, dtype, chunks, compression, compressed):
+    """Writes one dataset prepared by _prepare_dataset(), returning the number of bytes of data written."""
+
+    if compressed is None:
+        return _write_dataset(fp, internal_path, a, dtype, chunks, compression)
+    dset = fp.create_dataset(internal_path, shape = a.shape, dtype = a.dtype, chunks = chunks, compression = 'gzip')
+    for offset, data in compressed:
+        dset.id.write_direct_chunk(offset, data)
+    return a.nbytes
+
+
 def copy_h5(file_in, file_out, uuid_inclusion_list = None, uuid_exclusion_list = None, mode = 'w'):
     """Create a copy of an hdf5, optionally including or excluding arrays with specified uuids.
 
@@ -345,6 +468,46 @@ def copy_h5_path_list(file_in, file_out, hdf5_path_list, mode = 'w', chunks = No
     return copy_count
 
 
+def copy_h5_path_lists(path_lists, file_out, mode = 'a'):
+    """Copies hdf5 datasets (or groups) from several hdf5 files into one, opening each file only once.
+
+    arguments:
+       path_lists (dict): mapping from path of an existing hdf5 file to be copied from, to a list of the
+          hdf5 internal paths of the datasets (or groups) to be copied from that file
+       file_out (string): path of output hdf5 file to be created or appended to (see mode)
+       mode (string, default 'a'): mode to open output file with; must be 'w' or 'a' for
+          (over)write or append respectively
+
+    returns:
+       number of hdf5 datasets (or groups) copied
+
+    notes:
+       the hdf5 library object copy is used, so data is copied with its existing storage layout,
+       chunking and compression, without decompressing and recompressing; internal paths already
+       present in the output file are not copied
+    """
+
+    assert mode in ['w', 'a']
+    copy_count = 0
+    with h5py.File(file_out, mode) as fp_out:
+        for file_in, hdf5_path_list in path_lists.items():
+            assert file_in != file_out, 'identical input and output files specified for hdf5 copy'
+            if not hdf5_path_list:
+                continue
+            with h5py.File(file_in, 'r') as fp_in:
+                for path in hdf5_path_list:
+                    if path in fp_out:
+                        log.warning(f'not copying hdf5 data due to pre-existence for: {path}')
+                        continue
+                    assert path in fp_in, f'internal path {path} not found in hdf5 file {file_in}'
+                    group_path, _, name = path.rpartition('/')
+                    assert name, f'no hdf5 dataset name in internal path {path}'
+                    group = fp_out.require_group(group_path) if group_path.strip('/') else fp_out
+                    fp_in.copy(fp_in[path], group, name = name)
+                    copy_count += 1
+    return copy_count
+
+
 def change_uuid(file, old_uuid, new_uuid):
     """Changes hdf5 internal path (group name) for part, switching from old to new uuid.
 
@@ -11,7 +11,7 @@ import uuid
 # import xml element tree parse method and classes here to allow single point for switching between lxml and etree
 # alternative to lxml.etree: xml.etree.ElementTree
 from lxml.etree import (  # type: ignore
-    Element, ElementTree, SubElement, _Element,  # noqa
+    Element, ElementTree, SubElement, _Element, _ElementTree,  # noqa
     parse)
 
 import resqpy.olio.uuid as bu
@@ -676,92 +676,159 @@ def write_xml_node(xml_fp, root, level = 0, namespace_keys = []):
     """Recursively write an xml node to an open file; return number of nodes written."""
     if root is None:
         return 0
-    ns_keys = namespace_keys.copy()
+    fragments = []
+    node_count = _render_node(fragments, root, level, set(namespace_keys))
+    xml_fp.write(''.join(fragments).encode())
+    return node_count
+
+
+def write_xml(xml_fp, tree, standalone = None):
+    """Write an xml tree to file in an indented format; gSOAP/FESAPI compatible; return number of nodes written."""
+
+    fragments = [_xml_declaration(standalone)]
+    nodes = _render_node(fragments, tree.getroot(), 0, set())
+    xml_fp.write(''.join(fragments).encode())
+    return nodes
+
+
+def xml_bytes(tree, standalone = None):
+    """Returns an xml tree serialized as bytes, identical to the output of write_xml(); gSOAP/FESAPI compatible.
 
-    tag, pre_colon = colon_prefixed(root.tag)
+    arguments:
+       tree (ElementTree or Element): the xml tree, or root node, to be serialized
+       standalone (str, optional): if present, the value of standalone to include in the xml declaration
+
+    returns:
+       bytes holding the utf-8 encoded xml, with a declaration line and indented nodes
 
+    note:
+       the whole tree is rendered into a single buffer, with namespace and tag information looked up from
+       cached tables, so this is much quicker than writing node by node
+    """
+
+    root = tree.getroot() if isinstance(tree, _ElementTree) else tree
+    fragments = [_xml_declaration(standalone)]
+    _render_node(fragments, root, 0, set())
+    return ''.join(fragments).encode()
+
+
+def _xml_declaration(standalone):
+    if standalone is None:
+        return '<?xml version="1.0" encoding="UTF-8"?>\n'
+    return '<?xml version="1.0" encoding="UTF-8" standalone="' + standalone + '"?>\n'
+
+
+@lru_cache(maxsize = None)
+def _tag_info(curly_tag):
+    """Returns (tag as written, namespace prefix, content types or rels flag) for an element tag."""
+
+    tag, pre_colon = colon_prefixed(curly_tag)
     if pre_colon == 'content_types':
-        tag = tag[14:]
-        ct_special = True
-    elif pre_colon == 'rels':
-        tag = tag[5:]
-        ct_special = True
-    else:
-        ct_special = False
+        return tag[14:], pre_colon, True
+    if pre_colon == 'rels':
+        return tag[5:], pre_colon, True
+    return tag, pre_colon, False
 
-    line = 3 * level * ' ' + '<' + tag  # todo: if any tags involve special characters, use _escaped_text(tag)
-    if pre_colon and pre_colon not in ns_keys:
-        line += ' xmlns'
-        if not ct_special:
-            line += ':' + pre_colon
-        line += '="' + ns[pre_colon] + '"'
-        ns_keys.append(pre_colon)
-
-    attrib_ns_list = []
-    attrib_list = []
-    type_pre_colon = None
-    for key, val in root.attrib.items():
-        colon_attrib_key, pre_colon_attrib = colon_prefixed(key)
-        if pre_colon_attrib and pre_colon_attrib not in ns_keys:
-            attrib_ns_list.append(pre_colon_attrib)
-        if match(key, 'type'):
-            type_attr, type_pre_colon = colon_prefixed(val)
-            attrib_list.append(colon_attrib_key + '="' + type_attr + '"')
-        elif ct_special and colon_attrib_key == 'PartName' and val.startswith('obj_'):
-            attrib_list.append(colon_attrib_key + '="/' + val + '"')
-        else:
-            attrib_list.append(colon_attrib_key + '="' + val + '"')
 
-    for attrib_ns in attrib_ns_list:
-        line += ' xmlns:' + attrib_ns + '="' + ns[attrib_ns] + '"'
-        ns_keys.append(attrib_ns)
-    if type_pre_colon and type_pre_colon not in ns_keys:  # must be included in the local xml line?
-        line += ' xmlns:' + type_pre_colon + '="' + ns[type_pre_colon] + '"'
-        ns_keys.append(type_pre_colon)
+@lru_cache(maxsize = None)
+def _attrib_info(curly_key):
+    """Returns (key as written, namespace prefix, is type flag) for an attribute key."""
 
-    if attrib_list:
-        line += ' ' + ' '.join(attrib_list)
+    colon_key, pre_colon = colon_prefixed(curly_key)
+    return colon_key, pre_colon, match(curly_key, 'type')
 
-    node_count = 1
-    len_root = len(root)
-    if ct_special and len_root == 0:
-        line += '/>\n'
-        xml_fp.write(line.encode())
-    else:
-        line += '>'
-        text = root.text
-        if (not text or text.isspace()) and tag.endswith('Title'):
-            text = 'untitled'
-        if text and not text.isspace():
-            line += text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        xml_fp.write(line.encode())
 
-        indentation = ''
-        if len_root:
-            xml_fp.write(b'\n')
-            indentation = 3 * level * ' '
-            for child in root:
-                node_count += write_xml_node(xml_fp, child, level = level + 1, namespace_keys = ns_keys)
+@lru_cache(maxsize = None)
+def _type_value_info(curly_value):
+    return colon_prefixed(curly_value)
 
-        line = indentation + '</' + tag + '>\n'
-        xml_fp.write(line.encode())
 
-    return node_count
+@lru_cache(maxsize = None)
+def _xmlns_declaration(pre_colon, ct_special = False):
+    if ct_special:
+        return ' xmlns="' + ns[pre_colon] + '"'
+    return ' xmlns:' + pre_colon + '="' + ns[pre_colon] + '"'
 
 
-def write_xml(xml_fp, tree, standalone = None):
-    """Write an xml tree to file in an indented format; gSOAP/FESAPI compatible; return number of nodes written."""
+@lru_cache(maxsize = None)
+def _indent(level):
+    return 3 * level * ' '
 
-    #   print('-------------------------------------------------------------------------------------') # debug
-    line = '<?xml version="1.0" encoding="UTF-8"'
-    if standalone is not None:
-        line += ' standalone="' + standalone + '"'
-    line += '?>\n'
-    xml_fp.write(line.encode())
-    #   print(line, end = '')  # debug
-    nodes = write_xml_node(xml_fp, tree.getroot())
 
-    return nodes
+def _render_node(fragments, root, level, ns_keys):
+    """Appends the serialized form of node root, and its descendants, to list of str fragments; returns node count.
+
+    note:
+       ns_keys is the set of namespace prefixes already declared by ancestors; it is restored before returning
+    """
+
+    tag, pre_colon, ct_special = _tag_info(root.tag)
+    indentation = _indent(level)
+    added = None
+
+    line = indentation + '<' + tag  # todo: if any tags involve special characters, use _escaped_text(tag)
+    if pre_colon and pre_colon not in ns_keys:
+        line += _xmlns_declaration(pre_colon, ct_special)
+        ns_keys.add(pre_colon)
+        added = [pre_colon]
+
+    items = root.items()
+    if items:
+        attrib_list = []
+        type_pre_colon = None
+        for key, val in items:
+            colon_attrib_key, pre_colon_attrib, is_type = _attrib_info(key)
+            if pre_colon_attrib and pre_colon_attrib not in ns_keys:
+                line += _xmlns_declaration(pre_colon_attrib)
+                if added is None:
+                    added = []
+                added.append(pre_colon_attrib)
+            if is_type:
+                type_attr, type_pre_colon = _type_value_info(val)
+                attrib_list.append(colon_attrib_key + '="' + type_attr + '"')
+            elif ct_special and colon_attrib_key == 'PartName' and val.startswith('obj_'):
+                attrib_list.append(colon_attrib_key + '="/' + val + '"')
+            else:
+                attrib_list.append(colon_attrib_key + '="' + val + '"')
+        if added is not None:
+            ns_keys.update(added)
+        if type_pre_colon and type_pre_colon not in ns_keys:  # must be included in the local xml line?
+            line += _xmlns_declaration(type_pre_colon)
+            ns_keys.add(type_pre_colon)
+            if added is None:
+                added = []
+            added.append(type_pre_colon)
+        line += ' ' + ' '.join(attrib_list)
+
+    node_count = 1
+    if len(root) == 0:
+        if ct_special:
+            fragments.append(line + '/>\n')
+        else:
+            text = root.text
+            if text and not text.isspace():
+                text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            elif tag.endswith('Title'):
+                text = 'untitled'
+            else:
+                text = ''
+            fragments.append(line + '>' + text + '</' + tag + '>\n')
+    else:
+        text = root.text
+        if text and not text.isspace():
+            line += '>' + text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;') + '\n'
+        elif tag.endswith('Title'):
+            line += '>untitled\n'
+        else:
+            line += '>\n'
+        fragments.append(line)
+        for child in root:
+            node_count += _render_node(fragments, child, level + 1, ns_keys)
+        fragments.append(indentation + '</' + tag + '>\n')
+
+    if added is not None:
+        ns_keys.difference_update(added)
+    return node_count
 
 
 def load_metadata_from_xml(node):
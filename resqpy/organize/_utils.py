@@ -39,6 +39,16 @@ def equivalent_extra_metadata(a, b):
     return a_em == b_em
 
 
+def equivalence_key_for(obj):
+    """Returns the equivalence key for an optional related object, or None if the object is None."""
+    return None if obj is None else obj.equivalence_key()
+
+
+def citation_title_for_root(obj):
+    """Returns the citation title held in the xml for an object, or None if the object has no xml."""
+    return None if obj.root is None else rqet.citation_title_for_node(obj.root)
+
+
 def extract_has_occurred_during(parent_node, tag = 'HasOccuredDuring'):  # RESQML Occured (stet)
     """Extracts UUIDs of chrono bottom and top from xml for has occurred during sub-node, or (None, None)."""
     hod_node = rqet.find_tag(parent_node, tag)
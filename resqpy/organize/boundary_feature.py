@@ -32,6 +32,11 @@ class BoundaryFeature(BaseResqpy):
             return False
         return self.feature_name == other.feature_name
 
+    def equivalence_key(self):
+        """Returns the feature name as the equivalence key."""
+
+        return (self.feature_name,)
+
     def create_xml(self, add_as_part = True, originator = None, reuse = True):
         """Creates a geobody feature xml node from this geobody feature object."""
         if reuse and self.try_reuse():
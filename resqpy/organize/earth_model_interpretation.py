@@ -1,7 +1,7 @@
 """Class for RESQML Earth Model Interpretation organizational objects."""
 
 from ._utils import (equivalent_extra_metadata, extract_has_occurred_during, equivalent_chrono_pairs,
-                     create_xml_has_occurred_during)
+                     create_xml_has_occurred_during, equivalence_key_for, citation_title_for_root)
 
 import resqpy.olio.uuid as bu
 import resqpy.olio.xml_et as rqet
@@ -75,6 +75,11 @@ class EarthModelInterpretation(BaseResqpy):
         return self.domain == other.domain and equivalent_chrono_pairs(self.has_occurred_during,
                                                                        other.has_occurred_during)
 
+    def equivalence_key(self):
+        """Returns the title, domain and organization feature key as the equivalence key."""
+
+        return (citation_title_for_root(self), self.domain, equivalence_key_for(self.organization_feature))
+
     def create_xml(self,
                    organization_feature_root = None,
                    add_as_part = True,
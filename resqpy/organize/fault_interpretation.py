@@ -153,6 +153,12 @@ class FaultInterpretation(BaseResqpy):
                 return False
         return True
 
+    def equivalence_key(self):
+        """Returns the title, domain, normal and listric flags and feature key as the equivalence key."""
+
+        return (self.title, self.domain, self.is_normal, self.is_listric,
+                ou.equivalence_key_for(self.tectonic_boundary_feature))
+
     def create_xml(self,
                    tectonic_boundary_feature_root = None,
                    add_as_part = True,
@@ -42,6 +42,11 @@ class FluidBoundaryFeature(BaseResqpy):
             return False
         return self.feature_name == other.feature_name and self.kind == other.kind
 
+    def equivalence_key(self):
+        """Returns the feature name and fluid contact kind as the equivalence key."""
+
+        return (self.feature_name, self.kind)
+
     def _load_from_xml(self):
         self.kind = rqet.find_tag_text(self.root, 'FluidContact')
 
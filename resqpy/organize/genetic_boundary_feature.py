@@ -49,6 +49,11 @@ class GeneticBoundaryFeature(BaseResqpy):
             return False
         return self.feature_name == other.feature_name and self.kind == other.kind and self.absolute_age == other.absolute_age
 
+    def equivalence_key(self):
+        """Returns the feature name and kind as the equivalence key."""
+
+        return (self.feature_name, self.kind)
+
     def create_xml(self, add_as_part = True, originator = None, reuse = True):
         """Creates a genetic boundary feature organisational xml node from this genetic boundary feature object."""
 
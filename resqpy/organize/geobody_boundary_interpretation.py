@@ -101,6 +101,11 @@ class GeobodyBoundaryInterpretation(BaseResqpy):
             return False
         return set(self.boundary_relation_list) == set(other.boundary_relation_list)
 
+    def equivalence_key(self):
+        """Returns the title, domain and feature key as the equivalence key."""
+
+        return (ou.citation_title_for_root(self), self.domain, ou.equivalence_key_for(self.genetic_boundary_feature))
+
     def create_xml(self,
                    genetic_boundary_feature_root = None,
                    add_as_part = True,
@@ -97,6 +97,12 @@ class GeobodyInterpretation(BaseResqpy):
                 self.composition == other.composition and self.implacement == other.implacement and
                 self.geobody_shape == other.geobody_shape)
 
+    def equivalence_key(self):
+        """Returns the title, domain, geobody attributes and feature key as the equivalence key."""
+
+        return (ou.citation_title_for_root(self), self.domain, self.composition, self.implacement, self.geobody_shape,
+                ou.equivalence_key_for(self.geobody_feature))
+
     def create_xml(self,
                    geobody_feature_root = None,
                    add_as_part = True,
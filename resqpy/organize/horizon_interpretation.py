@@ -96,6 +96,12 @@ class HorizonInterpretation(BaseResqpy):
             return False
         return set(self.boundary_relation_list) == set(other.boundary_relation_list)
 
+    def equivalence_key(self):
+        """Returns the title, domain, stratigraphy surface and feature key as the equivalence key."""
+
+        return (ou.citation_title_for_root(self), self.domain, self.sequence_stratigraphy_surface,
+                ou.equivalence_key_for(self.genetic_boundary_feature))
+
     def create_xml(self,
                    genetic_boundary_feature_root = None,
                    add_as_part = True,
@@ -41,6 +41,11 @@ class OrganizationFeature(BaseResqpy):
         return (self.feature_name == other.feature_name and self.organization_kind == other.organization_kind and
                 ((not check_extra_metadata) or ou.equivalent_extra_metadata(self, other)))
 
+    def equivalence_key(self):
+        """Returns the feature name and organization kind as the equivalence key."""
+
+        return (self.feature_name, self.organization_kind)
+
     def _load_from_xml(self):
         self.organization_kind = rqet.find_tag_text(self.root, 'OrganizationKind')
 
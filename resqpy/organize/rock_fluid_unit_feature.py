@@ -60,6 +60,11 @@ class RockFluidUnitFeature(BaseResqpy):
             return False
         return True
 
+    def equivalence_key(self):
+        """Returns the feature name and phase as the equivalence key."""
+
+        return (self.feature_name, self.phase)
+
     def _load_from_xml(self):
 
         self.phase = rqet.find_tag_text(self.root, 'Phase')
@@ -45,6 +45,11 @@ class TectonicBoundaryFeature(BaseResqpy):
             return False
         return self.feature_name == other.feature_name and self.kind == other.kind
 
+    def equivalence_key(self):
+        """Returns the feature name and kind as the equivalence key."""
+
+        return (self.feature_name, self.kind)
+
     def create_xml(self, add_as_part = True, originator = None, reuse = True):
         """Creates a tectonic boundary feature organisational xml node from this tectonic boundary feature object."""
 
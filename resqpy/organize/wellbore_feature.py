@@ -34,6 +34,11 @@ class WellboreFeature(BaseResqpy):
             return False
         return self.feature_name == other.feature_name
 
+    def equivalence_key(self):
+        """Returns the feature name as the equivalence key."""
+
+        return (self.feature_name,)
+
     def create_xml(self, add_as_part = True, originator = None, reuse = True):
         """Creates a wellbore feature organisational xml node from this wellbore feature object."""
         if reuse and self.try_reuse():
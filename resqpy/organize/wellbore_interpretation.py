@@ -98,6 +98,11 @@ class WellboreInterpretation(BaseResqpy):
             return False
         return (self.title == other.title and self.is_drilled == other.is_drilled)
 
+    def equivalence_key(self):
+        """Returns the title, drilled flag and feature key as the equivalence key."""
+
+        return (self.title, self.is_drilled, ou.equivalence_key_for(self.wellbore_feature))
+
     def create_xml(self,
                    wellbore_feature_root = None,
                    add_as_part = True,
@@ -15,72 +15,28 @@ import resqpy.property.property_common as rqp_c
 import resqpy.property._collection_get_attributes as pcga
 
 
-def _add_selected_part_from_other_dict(collection, part, other, realization, support_uuid, uuid, continuous,
-                                       categorical, count, points, indexable, property_kind, facet_type, facet,
-                                       citation_title, citation_title_match_mode, time_series_uuid, time_index,
-                                       string_lookup_uuid, related_uuid, const_value, extra, ignore_clashes):
-    if _check_not_none_and_not_equals(realization, other.realization_for_part, part):
-        return
-    if _check_not_none_and_not_uuid_match(support_uuid, other.support_uuid_for_part, part):
-        return
-    if _check_not_none_and_not_uuid_match(uuid, other.uuid_for_part, part):
-        return
-    if _check_not_none_and_not_equals(continuous, other.continuous_for_part, part):
-        return
-    if _check_categorical_and_lookup(categorical, other, part):
-        return
-    if _check_not_none_and_not_equals(count, other.count_for_part, part):
-        return
-    if _check_not_none_and_not_equals(points, other.points_for_part, part):
-        return
-    if _check_not_none_and_not_equals(indexable, other.indexable_for_part, part):
-        return
-    if property_kind is not None and not rqp_c.same_property_kind(other.property_kind_for_part(part), property_kind):
-        return
-    if _check_not_none_and_not_equals(facet_type, other.facet_type_for_part, part):
-        return
-    if _check_not_none_and_not_equals(facet, other.facet_for_part, part):
-        return
-    if _check_citation_title(citation_title, citation_title_match_mode, other, part):
-        return
-    if _check_not_none_and_not_uuid_match(time_series_uuid, other.time_series_uuid_for_part, part):
-        return
-    if _check_not_none_and_not_equals(time_index, other.time_index_for_part, part):
-        return
-    if _check_not_none_and_not_uuid_match(string_lookup_uuid, other.string_lookup_uuid_for_part, part):
-        return
-    if _check_not_none_and_not_equals(const_value, other.constant_value_for_part, part):
-        return
-    if related_uuid is not None:
-        assert other.model is not None
-        if other.model.part(parts_list = [part], related_uuid = related_uuid) is None:
-            return
-    if extra is not None and len(extra):
-        em = other.extra_metadata_for_part(part)
-        if em is None or len(em) < len(extra):
-            return
-        for key, value in extra.items():
-            if em.get(key) != value:
-                return
-    if part in collection.dict.keys():
-        if ignore_clashes:
-            return
-        assert (False)
-    collection.dict[part] = other.dict[part]
-
-
-def _add_part_to_dict_get_realization(collection, realization, xml_node):
+def _child_nodes(xml_node):
+    """Returns a dictionary mapping prefix-stripped tag to first child node with that tag, in one pass."""
+
+    children = {}
+    for child in xml_node:
+        if isinstance(child.tag, str):
+            children.setdefault(rqet.stripped_of_prefix(child.tag), child)
+    return children
+
+
+def _add_part_to_dict_get_realization(collection, realization, children):
     if realization is not None and collection.realization is not None:
         assert (realization == collection.realization)
     if realization is None:
         realization = collection.realization
-    realization_node = rqet.find_tag(xml_node, 'RealizationIndex')  # optional; if present use to populate realization
+    realization_node = children.get('RealizationIndex')  # optional; if present use to populate realization
     if realization_node is not None:
         realization = int(realization_node.text)
     return realization
 
 
-def _add_part_to_dict_get_type_details(collection, part, continuous, xml_node):
+def _add_part_to_dict_get_type_details(collection, part, continuous, children):
     sl_ref_node = None
     type = collection.model.type_of_part(part)
     #      log.debug('adding part ' + part + ' of type ' + type)
@@ -92,14 +48,14 @@ def _add_part_to_dict_get_type_details(collection, part, continuous, xml_node):
     points = (type == 'obj_PointsProperty')
     string_lookup_uuid = None
     if type == 'obj_CategoricalProperty':
-        sl_ref_node = rqet.find_tag(xml_node, 'Lookup')
+        sl_ref_node = children.get('Lookup')
         string_lookup_uuid = bu.uuid_from_string(rqet.find_tag_text(sl_ref_node, 'UUID'))
 
     return type, continuous, points, string_lookup_uuid, sl_ref_node
 
 
-def _add_part_to_dict_get_support_uuid(collection, part):
-    support_uuid = collection.model.supporting_representation_for_part(part)
+def _add_part_to_dict_get_support_uuid(collection, children):
+    support_uuid = bu.uuid_from_string(rqet.find_tag_text(children.get('SupportingRepresentation'), 'UUID'))
     if support_uuid is None:
         support_uuid = collection.support_uuid
     elif collection.support_uuid is None:
@@ -111,11 +67,11 @@ def _add_part_to_dict_get_support_uuid(collection, part):
     return support_uuid
 
 
-def _add_part_to_dict_get_uom(collection, part, continuous, xml_node, trust_uom, property_kind, minimum, maximum, facet,
+def _add_part_to_dict_get_uom(collection, part, continuous, children, trust_uom, property_kind, minimum, maximum, facet,
                               facet_type, points):
     uom = None
     if continuous and not points:
-        uom_node = rqet.find_tag(xml_node, 'UOM')
+        uom_node = children.get('UOM')
         if uom_node is not None:
             if uom_node.text == 'Euc':
                 em = rqet.load_metadata_from_xml(collection.model.root_for_part(part))
@@ -137,60 +93,59 @@ def _add_part_to_dict_get_uom(collection, part, continuous, xml_node, trust_uom,
     return uom
 
 
-def _check_not_none_and_not_equals(attrib, method, part):
-    if attrib is None:
-        return False
+def _fails_equality(attrib, value):
+    """Returns True if value does not pass the filter attrib, which may be '*' (any non-None) or 'none'."""
+
     if attrib == '*':
-        return method(part) is None
+        return value is None
     elif attrib == 'none':
-        return method(part) is not None
-    return method(part) != attrib
+        return value is not None
+    return value != attrib
+
 
+def _fails_uuid_match(uuid, value):
+    """Returns True if value does not pass the uuid filter, which may be '*' (any non-None) or 'none'."""
 
-def _check_not_none_and_not_uuid_match(uuid, method, part):
-    if uuid is None:
-        return False
     if isinstance(uuid, str):
         if uuid == '*':
-            return method(part) is None
+            return value is None
         elif uuid == 'none':
-            return method(part) is not None
-    return not bu.matching_uuids(uuid, method(part))
-
-
-def _check_citation_title(citation_title, citation_title_match_mode, other, part):
-    if citation_title is not None:
-        if isinstance(citation_title_match_mode, bool):
-            citation_title_match_mode = 'starts' if citation_title_match_mode else None
-        if citation_title_match_mode is None or citation_title_match_mode == 'is':
-            return other.citation_title_for_part(part) != citation_title
-        elif citation_title_match_mode == 'starts':
-            return not other.citation_title_for_part(part).startswith(citation_title)
-        elif citation_title_match_mode == 'ends':
-            return not other.citation_title_for_part(part).endswith(citation_title)
-        elif citation_title_match_mode == 'contains':
-            return citation_title not in other.citation_title_for_part(part)
-        elif citation_title_match_mode == 'is not':
-            return other.citation_title_for_part(part) == citation_title
-        elif citation_title_match_mode == 'does not start':
-            return other.citation_title_for_part(part).startswith(citation_title)
-        elif citation_title_match_mode == 'does not end':
-            return other.citation_title_for_part(part).endswith(citation_title)
-        elif citation_title_match_mode == 'does not contain':
-            return citation_title in other.citation_title_for_part(part)
-        else:
-            raise ValueError(f'invalid title mode {citation_title_match_mode} in property filtering')
-    return False
-
-
-def _check_categorical_and_lookup(categorical, other, part):
-    if categorical is not None:
-        if categorical:
-            if other.continuous_for_part(part) or (other.string_lookup_uuid_for_part(part) is None):
-                return True
-        else:
-            if not (other.continuous_for_part(part) or (other.string_lookup_uuid_for_part(part) is None)):
-                return True
+            return value is not None
+    return not bu.matching_uuids(uuid, value)
+
+
+def _fails_citation_title(citation_title, citation_title_match_mode, title):
+    """Returns True if title does not pass the citation title filter with the given match mode."""
+
+    if isinstance(citation_title_match_mode, bool):
+        citation_title_match_mode = 'starts' if citation_title_match_mode else None
+    if citation_title_match_mode is None or citation_title_match_mode == 'is':
+        return title != citation_title
+    elif citation_title_match_mode == 'starts':
+        return not title.startswith(citation_title)
+    elif citation_title_match_mode == 'ends':
+        return not title.endswith(citation_title)
+    elif citation_title_match_mode == 'contains':
+        return citation_title not in title
+    elif citation_title_match_mode == 'is not':
+        return title == citation_title
+    elif citation_title_match_mode == 'does not start':
+        return title.startswith(citation_title)
+    elif citation_title_match_mode == 'does not end':
+        return title.endswith(citation_title)
+    elif citation_title_match_mode == 'does not contain':
+        return citation_title in title
+    raise ValueError(f'invalid title mode {citation_title_match_mode} in property filtering')
+
+
+def _fails_extra(extra, em):
+    """Returns True if the extra metadata dictionary em does not include all the items of extra."""
+
+    if em is None or len(em) < len(extra):
+        return True
+    for key, value in extra.items():
+        if em.get(key) != value:
+            return True
     return False
 
 
@@ -286,23 +241,23 @@ def _process_imported_property_get_p_array(collection, p_cached_name):
         return None
 
 
-def _add_part_to_dict_get_count_and_indexable(xml_node):
-    count_node = rqet.find_tag(xml_node, 'Count')
+def _add_part_to_dict_get_count_and_indexable(children):
+    count_node = children.get('Count')
     assert count_node is not None
     count = int(count_node.text)
 
-    indexable_node = rqet.find_tag(xml_node, 'IndexableElement')
+    indexable_node = children.get('IndexableElement')
     assert indexable_node is not None
     indexable = indexable_node.text
 
     return count, indexable
 
 
-def _add_part_to_dict_get_property_kind(xml_node, citation_title):
+def _add_part_to_dict_get_property_kind(children, citation_title):
     perm_synonyms = ['permeability rock', 'rock permeability']
     kh_synonyms = ['permeability thickness', 'permeability length']  # not exactly synonymous but close enough
     (p_kind_from_keyword, facet_type, facet) = rqp_c.property_kind_and_facet_from_keyword(citation_title)
-    prop_kind_node = rqet.find_tag(xml_node, 'PropertyKind')
+    prop_kind_node = children.get('PropertyKind')
     assert (prop_kind_node is not None)
     kind_node = rqet.find_tag(prop_kind_node, 'Kind')
     property_kind_uuid = None  # only used for bespoke (local) property kinds
@@ -325,10 +280,10 @@ def _add_part_to_dict_get_property_kind(xml_node, citation_title):
     return property_kind, property_kind_uuid, lpk_node
 
 
-def _add_part_to_dict_get_facet(xml_node):
+def _add_part_to_dict_get_facet(children):
     facet_type = None
     facet = None
-    facet_node = rqet.find_tag(xml_node, 'Facet')  # todo: handle more than one facet for a property
+    facet_node = children.get('Facet')  # todo: handle more than one facet for a property
     if facet_node is not None:
         facet_type = rqet.find_tag(facet_node, 'Facet').text
         facet = rqet.find_tag(facet_node, 'Value').text
@@ -339,10 +294,10 @@ def _add_part_to_dict_get_facet(xml_node):
     return facet_type, facet
 
 
-def _add_part_to_dict_get_timeseries(xml_node):
+def _add_part_to_dict_get_timeseries(children):
     time_series_uuid = None
     time_index = None
-    time_node = rqet.find_tag(xml_node, 'TimeIndex')
+    time_node = children.get('TimeIndex')
     if time_node is not None:
         time_index = int(rqet.find_tag(time_node, 'Index').text)
         time_series_uuid = bu.uuid_from_string(rqet.find_tag(rqet.find_tag(time_node, 'TimeSeries'), 'UUID').text)
@@ -350,28 +305,28 @@ def _add_part_to_dict_get_timeseries(xml_node):
     return time_series_uuid, time_index
 
 
-def _add_part_to_dict_get_minmax(xml_node):
+def _add_part_to_dict_get_minmax(children):
     minimum = None
-    min_node = rqet.find_tag(xml_node, 'MinimumValue')
+    min_node = children.get('MinimumValue')
     if min_node is not None:
         minimum = min_node.text  # NB: left as text
     maximum = None
-    max_node = rqet.find_tag(xml_node, 'MaximumValue')
+    max_node = children.get('MaximumValue')
     if max_node is not None:
         maximum = max_node.text  # NB: left as text
 
     return minimum, maximum
 
 
-def _add_part_to_dict_get_null_constvalue_points(xml_node, continuous, points):
+def _add_part_to_dict_get_null_constvalue_points(children, continuous, points):
     null_value = None
     if not continuous:
-        null_value = rqet.find_nested_tags_int(xml_node, ['PatchOfValues', 'Values', 'NullValue'])
+        null_value = rqet.find_nested_tags_int(children.get('PatchOfValues'), ['Values', 'NullValue'])
     const_value = None
     if points:
-        values_node = rqet.find_nested_tags(xml_node, ['PatchOfPoints', 'Points'])
+        values_node = rqet.find_tag(children.get('PatchOfPoints'), 'Points')
     else:
-        values_node = rqet.find_nested_tags(xml_node, ['PatchOfValues', 'Values'])
+        values_node = rqet.find_tag(children.get('PatchOfValues'), 'Values')
     values_type = rqet.node_type(values_node)
     assert values_type is not None
     if values_type.endswith('ConstantArray'):
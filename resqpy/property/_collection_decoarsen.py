@@ -0,0 +1,159 @@
+"""Submodule containing functions for decoarsening imported grid property arrays."""
+
+# Nexus is a registered trademark of the Halliburton Company
+
+import logging
+
+log = logging.getLogger(__name__)
+
+import numpy as np
+from numba import njit  # type: ignore
+
+skip_keywords = ['UID', 'ICOARS', 'KID', 'DAD']  # TODO: complete this list
+decoarsen_length_kinds = ['length', 'cell length', 'thickness', 'permeability thickness', 'permeability length']
+decoarsen_area_kinds = ['transmissibility']
+decoarsen_volume_kinds = ['volume', 'rock volume', 'pore volume', 'fluid volume']
+
+
+def _decoarsen_from_kid(kid):
+    """Returns (decoarsen array, k share, j share, i share) reverse engineered from Nexus KID data, or None values."""
+
+    kid_mask = (kid == -3)  # -3 indicates cell inactive due to coarsening
+    if not np.any(kid_mask):
+        return None, None, None, None
+    log.debug(f'{np.count_nonzero(kid_mask)} cells marked as requiring decoarsening in KID data')
+    decoarsen_array, k_share, j_share, i_share = _kid_hosts(np.ascontiguousarray(kid), kid_mask)
+    assert np.all(decoarsen_array >= 0)
+    return decoarsen_array, k_share, j_share, i_share
+
+
+@njit  # pragma: no cover
+def _kid_hosts(kid, kid_mask):
+    """Returns host natural cell index and k, j & i share counts for each cell, given KID data and coarsened mask."""
+    nk, nj, ni = kid.shape
+    decoarsen_array = np.full((nk, nj, ni), -1, dtype = np.int64)
+    k_share = np.zeros((nk, nj, ni), dtype = np.int64)
+    j_share = np.zeros((nk, nj, ni), dtype = np.int64)
+    i_share = np.zeros((nk, nj, ni), dtype = np.int64)
+    natural = 0
+    for k0 in range(nk):
+        for j0 in range(nj):
+            for i0 in range(ni):
+                if kid[k0, j0, i0] == 0:
+                    ke = k0 + 1
+                    while ke < nk and kid_mask[ke, j0, i0]:
+                        ke += 1
+                    je = j0 + 1
+                    while je < nj and kid_mask[k0, je, i0]:
+                        je += 1
+                    ie = i0 + 1
+                    while ie < ni and kid_mask[k0, j0, ie]:
+                        ie += 1
+                    # todo: check for conflict and resolve
+                    decoarsen_array[k0:ke, j0:je, i0:ie] = natural
+                    k_share[k0:ke, j0:je, i0:ie] = ke - k0
+                    j_share[k0:ke, j0:je, i0:ie] = je - j0
+                    i_share[k0:ke, j0:je, i0:ie] = ie - i0
+                elif not kid_mask[k0, j0, i0]:  # inactive for reasons other than coarsening
+                    decoarsen_array[k0, j0, i0] = natural
+                    k_share[k0, j0, i0] = 1
+                    j_share[k0, j0, i0] = 1
+                    i_share[k0, j0, i0] = 1
+                natural += 1
+    return decoarsen_array, k_share, j_share, i_share
+
+
+@njit  # pragma: no cover
+def _shares_from_decoarsen(decoarsen_array):
+    """Returns k, j & i share counts for each cell, given the natural cell index of the host for each cell."""
+    nk, nj, ni = decoarsen_array.shape
+    k_share = np.zeros((nk, nj, ni), dtype = np.int64)
+    j_share = np.zeros((nk, nj, ni), dtype = np.int64)
+    i_share = np.zeros((nk, nj, ni), dtype = np.int64)
+    natural = 0
+    for k0 in range(nk):
+        for j0 in range(nj):
+            for i0 in range(ni):
+                if k_share[k0, j0, i0] == 0:
+                    ke = k0 + 1
+                    while ke < nk and decoarsen_array[ke, j0, i0] == natural:
+                        ke += 1
+                    je = j0 + 1
+                    while je < nj and decoarsen_array[k0, je, i0] == natural:
+                        je += 1
+                    ie = i0 + 1
+                    while ie < ni and decoarsen_array[k0, j0, ie] == natural:
+                        ie += 1
+                    k_share[k0:ke, j0:je, i0:ie] = ke - k0
+                    j_share[k0:ke, j0:je, i0:ie] = je - j0
+                    i_share[k0:ke, j0:je, i0:ie] = ie - i0
+                natural += 1
+    return k_share, j_share, i_share
+
+
+def _sharing_needed(imported_list):
+    """Returns True if any imported property is of a kind which is split between decoarsened cells."""
+
+    for import_item in imported_list:
+        kind = import_item[10]
+        if kind in decoarsen_volume_kinds or kind in decoarsen_area_kinds or kind in decoarsen_length_kinds:
+            return True
+    return False
+
+
+def _share_key(import_item):
+    """Returns None, 'volume', 'k', 'j' or 'i' indicating the share to divide by, or 'skip', for an imported item."""
+
+    keyword = import_item[2]
+    kind = import_item[10]
+    if kind in decoarsen_volume_kinds:
+        return 'volume'
+    if kind in decoarsen_area_kinds:
+        # only transmissibilty currently in this set of supported property kinds
+        log.warning(
+            f'decoarsening of transmissibility {keyword} skipped due to simple methods not yielding correct values')
+        return 'skip'
+    if kind in decoarsen_length_kinds:
+        facet_dir = import_item[12] if import_item[11] == 'direction' else None
+        if kind in ['thickness', 'permeability thickness'] or (facet_dir == 'K'):
+            return 'k'
+        if facet_dir in ['J', 'I']:
+            return facet_dir.lower()
+        log.warning(f'decoarsening of length property {keyword} skipped as direction not established')
+        return 'skip'
+    return None
+
+
+def _decoarsen_imported_arrays(collection, decoarsen_array, k_share, j_share, i_share):
+    """Redistributes the cached cell arrays of the imported list to fine cells; returns number of arrays decoarsened."""
+
+    extent_kji = tuple(collection.grid.extent_kji)
+    hosts = np.ascontiguousarray(decoarsen_array, dtype = np.int64).reshape(-1)
+    cell_count = hosts.size
+    shares = {}  # maps share key to float array of shares, established when first needed
+    property_count = 0
+    for import_item in collection.imported_list:
+        if import_item[3] is None or not hasattr(collection, import_item[3]):
+            continue  # todo: handle decoarsening of const arrays?
+        if import_item[14] is not None and import_item[14] != 'cells':
+            continue
+        coarsened = collection.__dict__[import_item[3]]
+        assert coarsened.size == cell_count
+        if import_item[2].upper() in skip_keywords:
+            continue
+        key = _share_key(import_item)
+        if key == 'skip':
+            continue
+        redistributed = np.take(coarsened.reshape(-1), hosts)
+        if key is not None:
+            share = shares.get(key)
+            if share is None:
+                if key == 'volume':
+                    share = (k_share * j_share * i_share).astype(float).reshape(-1)
+                else:
+                    share = {'k': k_share, 'j': j_share, 'i': i_share}[key].astype(float).reshape(-1)
+                shares[key] = share
+            redistributed = redistributed / share
+        collection.__dict__[import_item[3]] = redistributed.reshape(extent_kji)
+        property_count += 1
+    return property_count
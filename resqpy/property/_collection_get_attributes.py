@@ -87,7 +87,7 @@ def _get_property_array_min_max_value(collection, property_array, const_value, d
     elif property_array is not None:
         return _get_property_array_min_max_array(property_array, min_value, max_value, discrete, categorical,
                                                  null_value)
-    return None, None
+    return min_value, max_value
 
 
 def _get_property_array_min_max_const(const_value, null_value, min_value, max_value, discrete):
@@ -590,15 +590,15 @@ def _get_indexable_element(indexable_element, support_type):
     return indexable_element
 
 
-def _cached_part_array_ref_get_array(collection, part, dtype, model, cached_array_name, use_pack):
+def _cached_part_array_ref_get_array(collection, part, dtype, model, cached_array_name, use_pack, memmap = False):
     const_value = collection.constant_value_for_part(part)
     if const_value is None:
-        _cached_part_array_ref_const_none(collection, part, dtype, model, cached_array_name, use_pack)
+        _cached_part_array_ref_const_none(collection, part, dtype, model, cached_array_name, use_pack, memmap = memmap)
     else:
         _cached_part_array_ref_const_notnone(collection, part, const_value, cached_array_name)
 
 
-def _cached_part_array_ref_const_none(collection, part, dtype, model, cached_array_name, use_pack):
+def _cached_part_array_ref_const_none(collection, part, dtype, model, cached_array_name, use_pack, memmap = False):
     part_node = collection.node_for_part(part)
     if part_node is None:
         return None
@@ -623,7 +623,8 @@ def _cached_part_array_ref_const_none(collection, part, dtype, model, cached_arr
                            object = collection,
                            array_attribute = cached_array_name,
                            required_shape = required_shape,
-                           dtype = dtype)
+                           dtype = dtype,
+                           memmap = memmap)
 
 
 def _cached_part_array_ref_const_notnone(collection, part, const_value, cached_array_name):
@@ -0,0 +1,216 @@
+"""Submodule containing functions for bulk loading of property arrays into a stacked array."""
+
+# Nexus is a registered trademark of the Halliburton Company
+
+import logging
+
+log = logging.getLogger(__name__)
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+import numpy as np
+
+import resqpy.model._hdf5 as m_h
+import resqpy.property._collection_get_attributes as pcga
+import resqpy.property.property_common as rqp_c
+
+stack_by_list = ['realization', 'time index', 'facet']
+
+
+def _stacked_array_ref(collection,
+                       stack_by = 'realization',
+                       use_32_bit = False,
+                       dtype = None,
+                       fill_missing = True,
+                       fill_value = None,
+                       indexable_element = None,
+                       box = None,
+                       out = None,
+                       memmap_file = None,
+                       threads = 4,
+                       use_pack = True):
+    """Returns a +1D array of all parts, loaded in bulk, with first axis being over stack_by values."""
+
+    assert stack_by in stack_by_list, f'unrecognised stack_by value: {stack_by}'
+    stack_values, continuous = _stack_checks(collection, stack_by)
+    if fill_value is None:
+        fill_value = np.NaN if continuous else -1
+    if indexable_element is None:
+        indexable_element = collection.indexable_for_part(collection.parts()[0])
+    if dtype is None:
+        dtype = rqp_c.dtype_flavour(continuous, use_32_bit)
+
+    slot_for_value = _slot_for_value(stack_by, stack_values, fill_missing)
+    part_shape = collection.supporting_shape(indexable_element = indexable_element)
+    if collection.points_for_part(collection.parts()[0]):
+        part_shape.append(3)
+    part_shape = tuple(part_shape)
+    box_slices = _box_slices(box, part_shape)
+    sub_shape = tuple(len(range(*s.indices(extent))) for s, extent in zip(box_slices, part_shape))
+    shape = (max(slot_for_value.values()) + 1,) + sub_shape
+
+    if out is None:
+        if memmap_file:
+            out = np.lib.format.open_memmap(memmap_file, mode = 'w+', dtype = dtype, shape = shape)
+        else:
+            out = np.empty(shape, dtype = dtype)
+    else:
+        assert tuple(out.shape) == shape, f'output array shape {out.shape} does not match required shape {shape}'
+        assert out.flags.c_contiguous, 'output array for stacked properties must be C contiguous'
+
+    loaded = np.zeros(shape[0], dtype = bool)
+    h5_jobs = []  # list of (slot, h5 key pair, part)
+    for part in collection.parts():
+        slot = slot_for_value[_stack_value_for_part(collection, part, stack_by)]
+        loaded[slot] = True
+        cached_array_name = rqp_c._cache_name(part)
+        if hasattr(collection, cached_array_name):
+            out[slot] = collection.__dict__[cached_array_name][box_slices]
+            continue
+        const_value = collection.constant_value_for_part(part)
+        if const_value is not None:
+            out[slot] = const_value
+            continue
+        h5_key_pair = collection.h5_key_pair_for_part(part)
+        assert h5_key_pair is not None, f'hdf5 reference missing for property part {part}'
+        h5_jobs.append((slot, h5_key_pair, part))
+    if not np.all(loaded):
+        out[np.logical_not(loaded)] = fill_value
+
+    _load_h5_jobs(collection, h5_jobs, out, part_shape, box_slices, threads, use_pack)
+    return out
+
+
+def _stack_checks(collection, stack_by):
+    """Checks the collection is suitable for stacking and returns (sorted list of stack values, continuous)."""
+
+    if stack_by == 'realization':
+        return pcga._realizations_array_ref_initial_checks(collection)
+    if stack_by == 'time index':
+        return pcga._time_array_ref_initial_checks(collection)
+    pcga._facet_array_ref_checks(collection)
+    facet_list = collection.facet_list(sort_list = True)
+    assert len(facet_list) > 0, 'no facets found in property collection'
+    assert collection.number_of_parts() == len(facet_list), 'collection covers more than facet variability'
+    continuous = collection.all_continuous()
+    if not continuous:
+        assert collection.all_discrete(), 'mixture of continuous and discrete properties in collection'
+    return facet_list, continuous
+
+
+def _slot_for_value(stack_by, stack_values, fill_missing):
+    """Returns a dictionary mapping stack value to index in the first axis of the stacked array."""
+
+    if fill_missing and stack_by != 'facet':
+        return dict((value, value) for value in stack_values)
+    return dict((value, index) for index, value in enumerate(stack_values))
+
+
+def _stack_value_for_part(collection, part, stack_by):
+    if stack_by == 'realization':
+        return collection.realization_for_part(part)
+    if stack_by == 'time index':
+        return collection.time_index_for_part(part)
+    return collection.facet_for_part(part)
+
+
+def _box_slices(box, part_shape):
+    """Returns a tuple of slices, one per axis of part_shape, selecting the box (min & max inclusive, leading axes)."""
+
+    if box is None:
+        return tuple(slice(0, extent) for extent in part_shape)
+    box = np.array(box, dtype = int)
+    assert box.ndim == 2 and box.shape[0] == 2 and box.shape[1] <= len(part_shape), 'badly formed box'
+    assert np.all(box[0] >= 0) and np.all(box[1] >= box[0]) and np.all(box[1] < part_shape[:box.shape[1]]),  \
+        'box does not fit within property array'
+    slices = [slice(box[0, axis], box[1, axis] + 1) for axis in range(box.shape[1])]
+    slices += [slice(0, extent) for extent in part_shape[box.shape[1]:]]
+    return tuple(slices)
+
+
+def _load_h5_jobs(collection, h5_jobs, out, part_shape, box_slices, threads, use_pack):
+    """Reads hdf5 datasets into slots of out, using a pool of threads with one lock per hdf5 file."""
+
+    if not h5_jobs:
+        return
+    model = collection.model
+    # make sure any data written through the model's open hdf5 handles is visible to the new handles
+    for (path, mode), h5_root in model.h5_open_files.items():
+        if mode != 'r':
+            h5_root.flush()
+    h5_files = {}  # maps pool path to (h5py file, lock)
+    read_jobs = []  # list of (function, arguments)
+    try:
+        for slot, (ext_uuid, internal_path), part in h5_jobs:
+            file_name = model.h5_file_name(uuid = ext_uuid, file_must_exist = True)
+            path = m_h._h5_pool_path(file_name)
+            if path not in h5_files:
+                h5_files[path] = (h5py.File(file_name, 'r'), threading.Lock())
+            h5_root, lock = h5_files[path]
+            dset = h5_root[internal_path]
+            if tuple(dset.shape) != part_shape:
+                # packed or reshaped data: use the usual caching route, serially
+                _load_via_cache(collection, part, out, slot, box_slices, use_pack)
+                continue
+            offset = _contiguous_offset(dset)
+            if offset is None:
+                read_jobs.append((_read_h5, (dset, lock, out, slot, box_slices)))
+            elif all(s.start == 0 and s.stop == extent for s, extent in zip(box_slices, part_shape)) and  \
+                    dset.dtype == out.dtype:
+                read_jobs.append((_read_raw, (file_name, offset, out, slot)))
+            else:
+                read_jobs.append((_read_mapped, (file_name, offset, dset.dtype, part_shape, out, slot, box_slices)))
+        if threads is None or threads <= 1 or len(read_jobs) <= 1:
+            for fn, args in read_jobs:
+                fn(*args)
+        else:
+            with ThreadPoolExecutor(max_workers = threads) as executor:
+                for future in [executor.submit(fn, *args) for fn, args in read_jobs]:
+                    future.result()
+    finally:
+        for h5_root, _ in h5_files.values():
+            h5_root.close()
+
+
+def _contiguous_offset(dset):
+    """Returns the byte offset of a contiguous, uncompressed numeric dataset in its file, or None."""
+
+    if dset.chunks is not None or dset.compression is not None or dset.external:
+        return None
+    if dset.dtype.kind not in 'iuf' or not dset.dtype.isnative:
+        return None
+    return dset.id.get_offset()
+
+
+def _read_raw(file_name, offset, out, slot):
+    """Reads a whole contiguous dataset of matching dtype directly into a slot of out."""
+
+    view = memoryview(out[slot].reshape(-1)).cast('B')
+    with open(file_name, 'rb', buffering = 0) as fp:
+        fp.seek(offset)
+        n = fp.readinto(view)
+    assert n == len(view), f'short read from hdf5 file {file_name}'
+
+
+def _read_mapped(file_name, offset, h5_dtype, part_shape, out, slot, box_slices):
+    """Copies a box from a contiguous dataset into a slot of out, via a read only memory map."""
+
+    mm = np.memmap(file_name, dtype = h5_dtype, mode = 'r', offset = offset, shape = part_shape)
+    out[slot] = mm[box_slices]
+    del mm
+
+
+def _read_h5(dset, lock, out, slot, box_slices):
+    """Reads a box from a chunked or compressed dataset into a slot of out, holding the lock for the file."""
+
+    with lock:
+        dset.read_direct(out[slot], source_sel = box_slices)
+
+
+def _load_via_cache(collection, part, out, slot, box_slices, use_pack):
+    pa = collection.cached_part_array_ref(part, dtype = out.dtype, use_pack = use_pack)
+    out[slot] = pa[box_slices]
+    collection.uncache_part_array(part)
@@ -0,0 +1,164 @@
+"""Submodule containing a columnar table of property collection metadata, for vectorised selection of parts."""
+
+# Nexus is a registered trademark of the Halliburton Company
+
+import logging
+
+log = logging.getLogger(__name__)
+
+import numpy as np
+
+import resqpy.property._collection_add_part as pcap
+import resqpy.property.property_common as rqp_c
+
+
+class _PartsDict(dict):
+    """Dictionary mapping part name to metadata tuple, which counts modifications so that tables can be reused."""
+
+    version = 0  # class level default, so that items can be set before any instance attribute exists (eg. unpickling)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, key, default = None):
+        self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        self.version += 1
+        super().update(*args, **kwargs)
+
+    def clear(self):
+        self.version += 1
+        super().clear()
+
+    def __ior__(self, other):
+        self.version += 1
+        return super().__ior__(other)
+
+
+class _PartsTable():
+    """Columnar view of the metadata tuples of a property collection, with categorical encoding of columns.
+
+    note:
+       columns are identified by index into the metadata tuple and are only encoded when first required;
+       for each encoded column, codes is a numpy int32 array with one element per part and categories is a list
+       of the distinct values found in the column (including None), such that categories[codes[i]] is the value
+       for the i'th part
+    """
+
+    def __init__(self, parts_dict):
+        self.source = parts_dict
+        self.version = getattr(parts_dict, 'version', None)
+        self.parts = list(parts_dict.keys())
+        self.rows = list(parts_dict.values())
+        self.columns = {}  # maps tuple index to (codes, categories)
+
+    def column(self, index):
+        """Returns (codes, categories) for the column of the metadata tuples with given index."""
+
+        column = self.columns.get(index)
+        if column is None:
+            lookup = {}  # maps value to code
+            codes = np.fromiter((lookup.setdefault(row[index], len(lookup)) for row in self.rows),
+                                dtype = np.int32,
+                                count = len(self.rows))
+            column = (codes, list(lookup.keys()))
+            self.columns[index] = column
+        return column
+
+    def restrict(self, selected, index, passes):
+        """Clears elements of boolean selected array where the value in column index does not pass.
+
+        note:
+           the passes function is called once per distinct value amongst those parts which are currently selected
+        """
+
+        codes, categories = self.column(index)
+        present = np.bincount(codes[selected], minlength = len(categories)) > 0
+        passing = np.zeros(len(categories), dtype = bool)
+        for code in np.nonzero(present)[0]:
+            passing[code] = passes(categories[code])
+        selected &= passing[codes]
+
+    def unique_values(self, index):
+        """Returns list of the distinct values, excluding None, in the column with given index."""
+
+        return [value for value in self.column(index)[1] if value is not None]
+
+
+def _parts_table(collection):
+    """Returns a columnar table of the collection's metadata, reusing the cached table if dict is unchanged."""
+
+    parts_dict = collection.dict
+    table = getattr(collection, 'parts_table', None)
+    if table is not None and table.source is parts_dict and table.version == parts_dict.version:
+        return table
+    table = _PartsTable(parts_dict)
+    if isinstance(parts_dict, _PartsDict):
+        collection.parts_table = table
+    else:  # modifications can't be tracked, so don't cache
+        collection.parts_table = None
+    return table
+
+
+def _unique_element_list(collection, index, sort_list = True):
+    """Returns an optionally sorted list of unique values (excluding None) of an element identified by index."""
+
+    result = _parts_table(collection).unique_values(index)
+    if sort_list:
+        result.sort()
+    return result
+
+
+def _selected_parts(other, realization, support_uuid, uuid, continuous, categorical, count, points, indexable,
+                    property_kind, facet_type, facet, citation_title, citation_title_match_mode, time_series_uuid,
+                    time_index, string_lookup_uuid, related_uuid, const_value, extra):
+    """Returns list of parts in other collection which pass all the filters which are not None."""
+
+    table = _parts_table(other)
+    selected = np.ones(len(table.parts), dtype = bool)
+    for index, attrib in [(0, realization), (4, continuous), (5, count), (21, points), (6, indexable), (8, facet_type),
+                          (9, facet), (12, time_index), (20, const_value)]:
+        if attrib is not None:
+            table.restrict(selected, index, lambda value: not pcap._fails_equality(attrib, value))
+    for index, attrib in [(1, support_uuid), (2, uuid), (11, time_series_uuid), (16, string_lookup_uuid)]:
+        if attrib is not None:
+            table.restrict(selected, index, lambda value: not pcap._fails_uuid_match(attrib, value))
+    if categorical is not None:
+        if categorical:
+            table.restrict(selected, 4, lambda value: not value)
+            table.restrict(selected, 16, lambda value: value is not None)
+        else:
+            not_categorical = selected.copy()
+            table.restrict(not_categorical, 4, lambda value: value)
+            table.restrict(selected, 16, lambda value: value is None)
+            selected |= not_categorical
+    if property_kind is not None:
+        table.restrict(selected, 7, lambda value: rqp_c.same_property_kind(value, property_kind))
+    if citation_title is not None:
+        table.restrict(selected, 10,
+                       lambda value: not pcap._fails_citation_title(citation_title, citation_title_match_mode, value))
+
+    parts = [table.parts[i] for i in np.nonzero(selected)[0]]
+    if related_uuid is not None and parts:
+        assert other.model is not None
+        parts = [
+            part for part in parts if other.model.part(parts_list = [part], related_uuid = related_uuid) is not None
+        ]
+    if extra is not None and len(extra):
+        parts = [part for part in parts if not pcap._fails_extra(extra, other.extra_metadata_for_part(part))]
+    return parts
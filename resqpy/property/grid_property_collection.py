@@ -16,6 +16,7 @@ import resqpy.olio.load_data as ld
 import resqpy.olio.write_data as wd
 import resqpy.olio.xml_et as rqet
 import resqpy.property.property_common as rqp_c
+import resqpy.property._collection_decoarsen as pcdc
 
 
 class GridPropertyCollection(rqp.PropertyCollection):
@@ -157,7 +158,8 @@ class GridPropertyCollection(rqp.PropertyCollection):
                                        facet_type = None,
                                        facet = None,
                                        realization = None,
-                                       use_binary = True):
+                                       use_binary = True,
+                                       use_32_bit = False):
         """Reads a property array from an ascii (or pure binary) file, caches and adds to imported list.
 
         Does not add to collection dict.
@@ -184,6 +186,8 @@ class GridPropertyCollection(rqp.PropertyCollection):
               then the data is loaded from that instead of from the ascii file; if True but the binary version does not
               exist (or is older than the ascii file), the pure binary version is written as a side effect of the import;
               if False, the ascii file is used even if a pure binary equivalent exists, and no binary file is written
+           use_32_bit (boolean, default False): if True, the array is cached as float32 or int32 (the ascii data is
+              loaded directly into the 32 bit array, which may contain n*value repeat counts); if False, 64 bit
 
         note:
            this function only performs the first importation step of actually reading the array into memory; other steps
@@ -207,7 +211,8 @@ class GridPropertyCollection(rqp.PropertyCollection):
                                                    data_type = data_type,
                                                    comment_char = '!',
                                                    data_free_of_comments = False,
-                                                   use_binary = use_binary)
+                                                   use_binary = use_binary,
+                                                   use_32_bit = use_32_bit)
         except Exception:
             log.exception('failed to import {} array from file {}'.format(keyword, file_name))
             return None
@@ -455,11 +460,6 @@ class GridPropertyCollection(rqp.PropertyCollection):
         # 10: property_kind, 11: facet_type, 12: facet, 13: realization, 14: indexable_element, 15: count, 16: local_property_kind_uuid,
         # 17: const_value)
 
-        skip_keywords = ['UID', 'ICOARS', 'KID', 'DAD']  # TODO: complete this list
-        decoarsen_length_kinds = ['length', 'cell length', 'thickness', 'permeability thickness', 'permeability length']
-        decoarsen_area_kinds = ['transmissibility']
-        decoarsen_volume_kinds = ['volume', 'rock volume', 'pore volume', 'fluid volume']
-
         assert self.grid is not None
 
         kid_attr_name = None
@@ -477,42 +477,8 @@ class GridPropertyCollection(rqp.PropertyCollection):
 
         if decoarsen_array is None and kid_attr_name is not None:
             kid = self.__dict__[kid_attr_name]
-            kid_mask = (kid == -3)  # -3 indicates cell inactive due to coarsening
-            assert kid_mask.shape == tuple(self.grid.extent_kji)
-            if np.any(kid_mask):
-                log.debug(f'{np.count_nonzero(kid_mask)} cells marked as requiring decoarsening in KID data')
-                decoarsen_array = np.full(self.grid.extent_kji, -1, dtype = int)
-                k_share = np.zeros(self.grid.extent_kji, dtype = int)
-                j_share = np.zeros(self.grid.extent_kji, dtype = int)
-                i_share = np.zeros(self.grid.extent_kji, dtype = int)
-                natural = 0
-                for k0 in range(self.grid.nk):
-                    for j0 in range(self.grid.nj):
-                        for i0 in range(self.grid.ni):
-                            #                     if decoarsen_array[k0, j0, i0] < 0:
-                            if kid[k0, j0, i0] == 0:
-                                #                        assert not kid_mask[k0, j0, i0]
-                                ke = k0 + 1
-                                while ke < self.grid.nk and kid_mask[ke, j0, i0]:
-                                    ke += 1
-                                je = j0 + 1
-                                while je < self.grid.nj and kid_mask[k0, je, i0]:
-                                    je += 1
-                                ie = i0 + 1
-                                while ie < self.grid.ni and kid_mask[k0, j0, ie]:
-                                    ie += 1
-                                # todo: check for conflict and resolve
-                                decoarsen_array[k0:ke, j0:je, i0:ie] = natural
-                                k_share[k0:ke, j0:je, i0:ie] = ke - k0
-                                j_share[k0:ke, j0:je, i0:ie] = je - j0
-                                i_share[k0:ke, j0:je, i0:ie] = ie - i0
-                            elif not kid_mask[k0, j0, i0]:  # inactive for reasons other than coarsening
-                                decoarsen_array[k0, j0, i0] = natural
-                                k_share[k0, j0, i0] = 1
-                                j_share[k0, j0, i0] = 1
-                                i_share[k0, j0, i0] = 1
-                            natural += 1
-                assert np.all(decoarsen_array >= 0)
+            assert kid.shape == tuple(self.grid.extent_kji)
+            decoarsen_array, k_share, j_share, i_share = pcdc._decoarsen_from_kid(kid)
 
         if decoarsen_array is None:
             return None
@@ -524,77 +490,14 @@ class GridPropertyCollection(rqp.PropertyCollection):
         if np.all(decoarsen_array.flatten() == np.arange(cell_count, dtype = int)):
             return None  # identity array
 
-        if k_share is None:
-            sharing_needed = False
-            for import_item in self.imported_list:
-                kind = import_item[10]
-                if kind in decoarsen_volume_kinds or kind in decoarsen_area_kinds or kind in decoarsen_length_kinds:
-                    sharing_needed = True
-                    break
-            if sharing_needed:
-                k_share = np.zeros(self.grid.extent_kji, dtype = int)
-                j_share = np.zeros(self.grid.extent_kji, dtype = int)
-                i_share = np.zeros(self.grid.extent_kji, dtype = int)
-                natural = 0
-                for k0 in range(self.grid.nk):
-                    for j0 in range(self.grid.nj):
-                        for i0 in range(self.grid.ni):
-                            if k_share[k0, j0, i0] == 0:
-                                ke = k0 + 1
-                                while ke < self.grid.nk and decoarsen_array[ke, j0, i0] == natural:
-                                    ke += 1
-                                je = j0 + 1
-                                while je < self.grid.nj and decoarsen_array[k0, je, i0] == natural:
-                                    je += 1
-                                ie = i0 + 1
-                                while ie < self.grid.ni and decoarsen_array[k0, j0, ie] == natural:
-                                    ie += 1
-                                k_share[k0:ke, j0:je, i0:ie] = ke - k0
-                                j_share[k0:ke, j0:je, i0:ie] = je - j0
-                                i_share[k0:ke, j0:je, i0:ie] = ie - i0
-                            natural += 1
+        if k_share is None and pcdc._sharing_needed(self.imported_list):
+            k_share, j_share, i_share = pcdc._shares_from_decoarsen(
+                np.ascontiguousarray(decoarsen_array, dtype = np.int64).reshape(tuple(self.grid.extent_kji)))
 
         if k_share is not None:
             assert np.all(k_share > 0) and np.all(j_share > 0) and np.all(i_share > 0)
-            volume_share = (k_share * j_share * i_share).astype(float)
-            k_share = k_share.astype(float)
-            j_share = j_share.astype(float)
-            i_share = i_share.astype(float)
-
-        property_count = 0
-        for import_item in self.imported_list:
-            if import_item[3] is None or not hasattr(self, import_item[3]):
-                continue  # todo: handle decoarsening of const arrays?
-            if import_item[14] is not None and import_item[14] != 'cells':
-                continue
-            coarsened = self.__dict__[import_item[3]].flatten()
-            assert coarsened.size == cell_count
-            keyword = import_item[2]
-            if keyword.upper() in skip_keywords:
-                continue
-            kind = import_item[10]
-            if kind in decoarsen_volume_kinds:
-                redistributed = coarsened[decoarsen_array] / volume_share
-            elif kind in decoarsen_area_kinds:
-                # only transmissibilty currently in this set of supported property kinds
-                log.warning(
-                    f'decoarsening of transmissibility {keyword} skipped due to simple methods not yielding correct values'
-                )
-            elif kind in decoarsen_length_kinds:
-                facet_dir = import_item[12] if import_item[11] == 'direction' else None
-                if kind in ['thickness', 'permeability thickness'] or (facet_dir == 'K'):
-                    redistributed = coarsened[decoarsen_array] / k_share
-                elif facet_dir == 'J':
-                    redistributed = coarsened[decoarsen_array] / j_share
-                elif facet_dir == 'I':
-                    redistributed = coarsened[decoarsen_array] / i_share
-                else:
-                    log.warning(f'decoarsening of length property {keyword} skipped as direction not established')
-            else:
-                redistributed = coarsened[decoarsen_array]
-            self.__dict__[import_item[3]] = redistributed.reshape(self.grid.extent_kji)
-            property_count += 1
 
+        property_count = pcdc._decoarsen_imported_arrays(self, decoarsen_array, k_share, j_share, i_share)
         if property_count:
             log.debug(f'{property_count} properties decoarsened')
 
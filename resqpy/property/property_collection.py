@@ -14,6 +14,8 @@ import resqpy.property._collection_create_xml as pcxml
 import resqpy.property._collection_get_attributes as pcga
 import resqpy.property._collection_support as pcs
 import resqpy.property._collection_add_part as pcap
+import resqpy.property._collection_stack as pcst
+import resqpy.property._collection_table as pctab
 import resqpy.property.string_lookup as rqp_sl
 import resqpy.property.property_common as rqp_c
 import resqpy.olio.uuid as bu
@@ -61,7 +63,7 @@ class PropertyCollection():
             'support (grid, wellbore frame, blocked well, mesh, or grid connection set) must be specified ' + \
             'when populating property collection from property set'
 
-        self.dict = {}  # main dictionary of model property parts which are members of the collection
+        self.dict = pctab._PartsDict()  # main dictionary of model property parts which are members of the collection
         # above is mapping from part_name to:
         # (realization, support, uuid, xml_node, continuous, count, indexable, prop_kind, facet_type, facet, citation_title,
         #   time_series_uuid, time_index, min, max, uom, string_lookup_uuid, property_kind_uuid, extra_metadata, null_value,
@@ -71,6 +73,7 @@ class PropertyCollection():
         #     20           21
         # note: grid is included to allow for super-collections covering more than one grid
         # todo: replace items 8 & 9 with a facet dictionary (to allow for multiple facets)
+        self.parts_table = None  # columnar view of dict, used for selections; rebuilt when dict is modified
         self.model = None
         self.support = None
         self.support_root = None
@@ -274,20 +277,21 @@ class PropertyCollection():
         xml_node = self.model.root_for_part(part, is_rels = False)
         assert xml_node is not None
 
-        realization = pcap._add_part_to_dict_get_realization(self, realization, xml_node)
+        children = pcap._child_nodes(xml_node)  # one pass over the top level of the xml
+        realization = pcap._add_part_to_dict_get_realization(self, realization, children)
         type, continuous, points, string_lookup_uuid, sl_ref_node = pcap._add_part_to_dict_get_type_details(
-            self, part, continuous, xml_node)
+            self, part, continuous, children)
         extra_metadata = rqet.load_metadata_from_xml(xml_node)
-        citation_title = rqet.find_tag(rqet.find_tag(xml_node, 'Citation'), 'Title').text
-        count, indexable = pcap._add_part_to_dict_get_count_and_indexable(xml_node)
-        property_kind, property_kind_uuid, lpk_node = pcap._add_part_to_dict_get_property_kind(xml_node, citation_title)
-        facet_type, facet = pcap._add_part_to_dict_get_facet(xml_node)
-        time_series_uuid, time_index = pcap._add_part_to_dict_get_timeseries(xml_node)
-        minimum, maximum = pcap._add_part_to_dict_get_minmax(xml_node)
-        support_uuid = pcap._add_part_to_dict_get_support_uuid(self, part)
-        uom = pcap._add_part_to_dict_get_uom(self, part, continuous, xml_node, trust_uom, property_kind, minimum,
+        citation_title = rqet.find_tag(children.get('Citation'), 'Title').text
+        count, indexable = pcap._add_part_to_dict_get_count_and_indexable(children)
+        property_kind, property_kind_uuid, lpk_node = pcap._add_part_to_dict_get_property_kind(children, citation_title)
+        facet_type, facet = pcap._add_part_to_dict_get_facet(children)
+        time_series_uuid, time_index = pcap._add_part_to_dict_get_timeseries(children)
+        minimum, maximum = pcap._add_part_to_dict_get_minmax(children)
+        support_uuid = pcap._add_part_to_dict_get_support_uuid(self, children)
+        uom = pcap._add_part_to_dict_get_uom(self, part, continuous, children, trust_uom, property_kind, minimum,
                                              maximum, facet, facet_type, points)
-        null_value, const_value = pcap._add_part_to_dict_get_null_constvalue_points(xml_node, continuous, points)
+        null_value, const_value = pcap._add_part_to_dict_get_null_constvalue_points(children, continuous, points)
 
         self.dict[part] = (realization, support_uuid, uuid, xml_node, continuous, count, indexable, property_kind,
                            facet_type, facet, citation_title, time_series_uuid, time_index, minimum, maximum, uom,
@@ -491,12 +495,15 @@ class PropertyCollection():
         if time_index is not None:
             assert time_index >= 0
 
-        for (part, info) in other.dict.items():
-            pcap._add_selected_part_from_other_dict(self, part, other, realization, support_uuid, uuid, continuous,
-                                                    categorical, count, points, indexable, property_kind, facet_type,
-                                                    facet, citation_title, citation_title_match_mode, time_series_uuid,
-                                                    time_index, string_lookup_uuid, related_uuid, const_value, extra,
-                                                    ignore_clashes)
+        for part in pctab._selected_parts(other, realization, support_uuid, uuid, continuous, categorical, count,
+                                          points, indexable, property_kind, facet_type, facet, citation_title,
+                                          citation_title_match_mode, time_series_uuid, time_index, string_lookup_uuid,
+                                          related_uuid, const_value, extra):
+            if part in self.dict:
+                if ignore_clashes:
+                    continue
+                assert False, 'attempt to inherit a part which already exists in property collection: ' + part
+            self.dict[part] = other.dict[part]
 
     def inherit_similar_parts_for_time_series_from_other_collection(self,
                                                                     other,
@@ -920,15 +927,7 @@ class PropertyCollection():
         :meta private:
         """
 
-        s = set()
-        for _, t in self.dict.items():
-            e = t[index]
-            if e is not None:
-                s = s.union({e})
-        result = list(s)
-        if sort_list:
-            result.sort()
-        return result
+        return pctab._unique_element_list(self, index, sort_list = sort_list)
 
     def part_str(self, part, include_citation_title = True):
         """Returns a human-readable string identifying the part.
@@ -999,7 +998,7 @@ class PropertyCollection():
     def realization_list(self, sort_list = True):
         """Returns a list of unique realization numbers present in the collection."""
 
-        return self.unique_element_list(0)
+        return self.unique_element_list(0, sort_list = sort_list)
 
     def support_uuid_for_part(self, part):
         """Returns supporting representation object's uuid that the property relates to.
@@ -1411,12 +1410,12 @@ class PropertyCollection():
                     min_node = rqet.find_tag(p_root, 'MinimumValue')
                     if min_node is not None:
                         min_node.text = str(minimum)
-                        model.set_modified()
+                        model.set_modified(part = part)
                 if maximum is not None:
                     max_node = rqet.find_tag(p_root, 'MaximumValue')
                     if max_node is not None:
                         max_node.text = str(maximum)
-                        model.set_modified()
+                        model.set_modified(part = part)
 
     def uom_for_part(self, part):
         """Returns the resqml units of measure for the property part.
@@ -1658,7 +1657,7 @@ class PropertyCollection():
         assert self.has_single_uom(
         ), 'attempt to assign realization numbers to properties with differing units of measure'
 
-        new_dict = {}
+        new_dict = pctab._PartsDict()
         realization = 0
         for key, entry in self.dict.items():
             entry_list = list(entry)
@@ -1740,7 +1739,13 @@ class PropertyCollection():
             return None  # could treat as fatal error
         return model.h5_uuid_and_path_for_node(first_values_node, tag = tag)
 
-    def cached_part_array_ref(self, part, dtype = None, masked = False, exclude_null = False, use_pack = True):
+    def cached_part_array_ref(self,
+                              part,
+                              dtype = None,
+                              masked = False,
+                              exclude_null = False,
+                              use_pack = True,
+                              memmap = False):
         """Returns a numpy array containing the data for the property part; the array is cached in this collection.
 
         arguments:
@@ -1753,6 +1758,9 @@ class PropertyCollection():
               holding the null value will also be masked out
            use_pack (boolean, default True): if True, and the property is a boolean array, the hdf5 data will
               be unpacked if its shape indicates that it has been packed into bits for storage
+           memmap (boolean, default False): if True, and the hdf5 dataset is stored contiguously without compression
+              or chunking, the cached array is a read only numpy memmap onto the hdf5 file instead of an in memory copy;
+              only has an effect if the array is not already cached
 
         returns:
            reference to a cached numpy array containing the actual property data; multiple calls will return
@@ -1767,7 +1775,9 @@ class PropertyCollection():
            'cells' for grid objects); if exclude_null is set True then null value elements will also be masked out
            (as long as masked is True); however, it is recommended simply to use np.NaN values in floating point
            property arrays if the commonality is not needed;
-           set use_pack True if the hdf5 data may have been written with a similar setting
+           set use_pack True if the hdf5 data may have been written with a similar setting;
+           a memmap lets the operating system page the data in as needed and share it between processes, so is
+           suited to very large arrays; it will have the dtype of the hdf5 dataset and must not be modified
 
         :meta common:
         """
@@ -1778,7 +1788,13 @@ class PropertyCollection():
             return None
 
         if not hasattr(self, cached_array_name):
-            pcga._cached_part_array_ref_get_array(self, part, dtype, model, cached_array_name, use_pack)
+            pcga._cached_part_array_ref_get_array(self,
+                                                  part,
+                                                  dtype,
+                                                  model,
+                                                  cached_array_name,
+                                                  use_pack,
+                                                  memmap = memmap)
 
         if masked:
             exclude_value = self.null_value_for_part(part) if exclude_null else None
@@ -2035,6 +2051,75 @@ class PropertyCollection():
         else:
             return pcga._time_array_ref_not_fill_missing(self, ti_list, dtype, a)
 
+    def stacked_array_ref(self,
+                          stack_by = 'realization',
+                          use_32_bit = False,
+                          dtype = None,
+                          fill_missing = True,
+                          fill_value = None,
+                          indexable_element = None,
+                          box = None,
+                          out = None,
+                          memmap_file = None,
+                          threads = 4,
+                          use_pack = True):
+        """Returns a +1D array of all parts, loaded in bulk, with first axis over realizations, time indices or facets.
+
+        arguments:
+           stack_by (string, default 'realization'): one of 'realization', 'time index' or 'facet', being the
+              variability covered by the parts of the collection
+           use_32_bit (boolean, default False): if True, the resulting numpy array will use a 32 bit dtype; if False, 64 bit;
+              ignored if dtype or out is given
+           dtype (numpy dtype, optional): if present, the element type of the resulting array, overriding use_32_bit
+           fill_missing (boolean, default True): if True, and stack_by is 'realization' or 'time index', the first axis
+              of the resulting array ranges from 0 to the maximum value present, with slices for missing values being
+              filled with fill_value; if False, or stacking by facet, the first axis covers just the values present,
+              in sorted order
+           fill_value (int or float, optional): the value to use for missing slices; if None, will default to np.NaN
+              if data is continuous, -1 otherwise
+           indexable_element (string, optional): the indexable element for the properties in the collection; if None,
+              will be determined from the data
+           box (numpy int array of shape (2, N), optional): if present, only this subset of each property array is
+              loaded; box[0] holds the minimum and box[1] the maximum (inclusive) indices for the first N axes of
+              the property arrays, eg. a kji0 box for grid cell properties
+           out (numpy array, optional): if present, a preallocated C contiguous array, of the required shape,
+              into which the data is loaded; its dtype takes precedence over the dtype and use_32_bit arguments
+           memmap_file (string, optional): if present, and out is None, the result is a numpy memmap onto a new
+              .npy file with this path, instead of an in memory array; ignored if out is given
+           threads (int, default 4): the number of threads to use for concurrent reading of hdf5 data
+           use_pack (boolean, default True): if True, and the property is a boolean array, the hdf5 data will
+              be unpacked if its shape indicates that it has been packed into bits
+
+        returns:
+           numpy array containing the data for all the parts, the first axis being over stack_by values and the
+           remaining axes matching the shape of the individual property arrays, or the box if given
+
+        notes:
+           this method gives the same data as realizations_array_ref(), time_series_array_ref() or facets_array_ref()
+           but is much quicker for large collections, such as the realizations of a big ensemble;
+           the hdf5 datasets are read concurrently by a pool of threads directly into the result array, without
+           caching the individual arrays in the collection; contiguous, uncompressed datasets are read without
+           going through the hdf5 library; chunked or compressed datasets are read with h5py, holding a lock
+           for each hdf5 file; arrays already cached in the collection are copied from the cache;
+           the facet_list(sort_list = True) method returns the facet values corresponding to the first axis when
+           stacking by facet
+        """
+
+        if out is not None:
+            dtype = out.dtype
+        return pcst._stacked_array_ref(self,
+                                       stack_by = stack_by,
+                                       use_32_bit = use_32_bit,
+                                       dtype = dtype,
+                                       fill_missing = fill_missing,
+                                       fill_value = fill_value,
+                                       indexable_element = indexable_element,
+                                       box = box,
+                                       out = out,
+                                       memmap_file = memmap_file,
+                                       threads = threads,
+                                       use_pack = use_pack)
+
     def combobulated_face_array(self, resqml_a):
         """Returns a logically ordered copy of RESQML faces-per-cell property array resqml_a.
 
@@ -69,6 +69,11 @@ class PropertyKind(BaseResqpy):
                 return False
         return True
 
+    def equivalence_key(self):
+        """Returns the title, parent kind, abstract flag and naming system as the equivalence key."""
+
+        return (self.title, self.parent_kind, self.is_abstract, self.naming_system)
+
     def create_xml(self, add_as_part = True, originator = None, reuse = True):
         """Create xml for this bespoke property kind."""
 
@@ -96,6 +96,11 @@ class StringLookup(BaseResqpy):
             return False
         return self.str_dict == other.str_dict
 
+    def equivalence_key(self):
+        """Returns the title, index range and sorted lookup items as the equivalence key."""
+
+        return (self.title, self.min_index, self.max_index, tuple(sorted(self.str_dict.items())))
+
     def set_list_from_dict_conditionally(self):
         """Sets a list copy of the lookup table, which can be indexed directly, if it makes sense to do so."""
 
@@ -6,6 +6,8 @@ log = logging.getLogger(__name__)
 
 import numpy as np
 
+import resqpy.surface._spatial_index as rqssi
+
 
 class CombinedSurface:
     """Class allowing a collection of Surface objects to be treated as a single surface.
@@ -76,3 +78,17 @@ class CombinedSurface:
                 points_offset += p.shape[0]
 
         return self.triangles, self.points
+
+    def xy_triangle_index(self):
+        """Returns a bucketed xy spatial index of the composite triangles, cached and reused for line intersections."""
+
+        return rqssi.xy_triangle_index(self)
+
+    def line_set_intersections(self, line_ps, line_vs, line_segment = False):
+        """Returns line indices, triangle indices and xyz points of intersections of lines with the combined surface.
+
+        note:
+           see Surface.line_set_intersections() for details
+        """
+
+        return self.xy_triangle_index().line_set_intersections(line_ps, line_vs, line_segment = line_segment)
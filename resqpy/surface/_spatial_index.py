@@ -0,0 +1,178 @@
+"""Submodule containing a bucketed xy spatial index of surface triangles, for fast line intersection queries."""
+
+import logging
+
+log = logging.getLogger(__name__)
+
+import numpy as np
+
+import resqpy.olio.intersection as meet
+
+
+class _XyTriangleIndex():
+    """Bucketed xy spatial index of the triangles of a surface."""
+
+    def __init__(self, t, p):
+        """Builds the index for triangles t (int array of shape (N, 3)) indexing into points p (shape (M, 3))."""
+
+        self.t = t
+        self.p = p
+        self.triangles = p[t]  # shape (N, 3, 3)
+        n = len(t)
+        self.bucket_size = 1.0
+        self.origin = np.zeros(2)
+        self.n_buckets_xy = np.ones(2, dtype = int)
+        self.bucket_start = np.zeros(2, dtype = int)
+        self.bucket_triangles = np.zeros(0, dtype = int)
+        self.box = np.zeros((2, 3))
+        if n == 0:
+            return
+        t_min = np.min(self.triangles, axis = 1)
+        t_max = np.max(self.triangles, axis = 1)
+        self.box[0] = np.min(t_min, axis = 0)
+        self.box[1] = np.max(t_max, axis = 0)
+        self.origin = self.box[0, :2].copy()
+        extent = self.box[1, :2] - self.origin
+        # aim for a few triangles per bucket, whilst allowing for steep surfaces with a small xy extent
+        size = float(np.median(np.max(t_max[:, :2] - t_min[:, :2], axis = 1)))
+        min_size = np.sqrt(extent[0] * extent[1] / (2.0 * n))
+        self.bucket_size = max(size, min_size, 1.0e-6 * max(1.0, float(np.max(extent))), 1.0e-9)
+        self.n_buckets_xy = (extent / self.bucket_size).astype(int) + 1
+        b_min = self._bucket_xy(t_min[:, :2])
+        b_max = self._bucket_xy(t_max[:, :2])
+        # expand each triangle into the buckets overlapped by its xy bounding box
+        tri_rep, buckets = self._expand(b_min, b_max)
+        order = np.argsort(buckets, kind = 'stable')
+        self.bucket_triangles = tri_rep[order]
+        self.bucket_start = np.searchsorted(buckets[order], np.arange(self.n_buckets_xy[0] * self.n_buckets_xy[1] + 1))
+
+    def _bucket_xy(self, xy):
+        """Returns int array of bucket (x, y) indices for xy points, clipped to the indexed extent."""
+        b = np.floor((xy - self.origin) / self.bucket_size).astype(int)
+        return np.clip(b, 0, self.n_buckets_xy - 1)
+
+    def _expand(self, b_min, b_max):
+        """Returns (item indices, flat bucket indices) for all buckets within the bucket ranges of the items."""
+        nx = b_max[:, 0] - b_min[:, 0] + 1
+        ny = b_max[:, 1] - b_min[:, 1] + 1
+        counts = nx * ny
+        item_rep = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(len(item_rep)) - np.repeat(np.cumsum(counts) - counts, counts)
+        by, bx = divmod(local, nx[item_rep])
+        buckets = (b_min[item_rep, 1] + by) * self.n_buckets_xy[0] + b_min[item_rep, 0] + bx
+        return item_rep, buckets
+
+    def clipped_lines(self, line_ps, line_vs, line_segment):
+        """Returns (t_start, t_end) arrays for the parts of the lines within the xyz bounding box of the surface.
+
+        note:
+           where a line does not pass through the box, t_start will be greater than t_end
+        """
+
+        c = len(line_ps)
+        if line_segment:
+            t_start = np.zeros(c)
+            t_end = np.ones(c)
+        else:
+            t_start = np.full(c, -np.inf)
+            t_end = np.full(c, np.inf)
+        margin = 1.0e-6 * max(1.0, float(np.max(self.box[1] - self.box[0])))
+        lo = self.box[0] - margin
+        hi = self.box[1] + margin
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            for axis in range(3):
+                v = line_vs[:, axis]
+                p = line_ps[:, axis]
+                moving = (v != 0.0)
+                t_a = (lo[axis] - p) / v
+                t_b = (hi[axis] - p) / v
+                t_start = np.where(moving, np.maximum(t_start, np.minimum(t_a, t_b)), t_start)
+                t_end = np.where(moving, np.minimum(t_end, np.maximum(t_a, t_b)), t_end)
+                outside = np.logical_and(np.logical_not(moving), np.logical_or(p < lo[axis], p > hi[axis]))
+                t_end[outside] = -np.inf
+        return t_start, t_end
+
+    def candidate_pairs(self, line_ps, line_vs, line_segment = False):
+        """Returns pair of int arrays: line indices and triangle indices of triangles in buckets crossed by the lines.
+
+        note:
+           the pairs are unique and sorted by line index then triangle index
+        """
+
+        line_ps = np.asarray(line_ps, dtype = float).reshape((-1, 3))
+        line_vs = np.asarray(line_vs, dtype = float).reshape((-1, 3))
+        if len(line_vs) == 1 and len(line_ps) > 1:
+            line_vs = np.repeat(line_vs, len(line_ps), axis = 0)
+        empty = (np.zeros(0, dtype = int), np.zeros(0, dtype = int))
+        if len(self.bucket_triangles) == 0 or len(line_ps) == 0:
+            return empty
+        t_start, t_end = self.clipped_lines(line_ps, line_vs, line_segment)
+        lines = np.where(np.logical_and(t_start <= t_end, np.isfinite(t_start + t_end)))[0]
+        if len(lines) == 0:
+            return empty
+        xy_a = line_ps[lines, :2] + t_start[lines, np.newaxis] * line_vs[lines, :2]
+        xy_b = line_ps[lines, :2] + t_end[lines, np.newaxis] * line_vs[lines, :2]
+        b_min = self._bucket_xy(np.minimum(xy_a, xy_b))
+        b_max = self._bucket_xy(np.maximum(xy_a, xy_b))
+        line_rep, buckets = self._expand(b_min, b_max)
+        # discard buckets within the bounding box of a segment but not close to the segment itself
+        multiple = np.where(np.repeat(np.any(b_max > b_min, axis = 1), (b_max - b_min + 1).prod(axis = 1)))[0]
+        if len(multiple):
+            by, bx = divmod(buckets[multiple], self.n_buckets_xy[0])
+            centre = self.origin + (np.stack((bx, by), axis = -1) + 0.5) * self.bucket_size
+            a = xy_a[line_rep[multiple]]
+            ab = xy_b[line_rep[multiple]] - a
+            ab_sqr = np.sum(ab * ab, axis = -1)
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                f = np.where(ab_sqr > 0.0, np.sum((centre - a) * ab, axis = -1) / ab_sqr, 0.0)
+            nearest = a + np.clip(f, 0.0, 1.0)[:, np.newaxis] * ab
+            distance_sqr = np.sum((centre - nearest)**2, axis = -1)
+            far = multiple[distance_sqr > 0.5 * self.bucket_size * self.bucket_size * 1.0001]
+            keep = np.ones(len(buckets), dtype = bool)
+            keep[far] = False
+            line_rep = line_rep[keep]
+            buckets = buckets[keep]
+        counts = self.bucket_start[buckets + 1] - self.bucket_start[buckets]
+        pair_line = np.repeat(line_rep, counts)
+        local = np.arange(len(pair_line)) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_tri = self.bucket_triangles[np.repeat(self.bucket_start[buckets], counts) + local]
+        keys = np.unique(lines[pair_line].astype(np.int64) * len(self.t) + pair_tri)
+        return (keys // len(self.t)).astype(int), (keys % len(self.t)).astype(int)
+
+    def candidates(self, line_p, line_v, line_segment = False):
+        """Returns sorted int array of indices of triangles which might be intersected by a single line."""
+
+        return self.candidate_pairs(line_p, line_v, line_segment = line_segment)[1]
+
+    def line_set_intersections(self, line_ps, line_vs, line_segment = False, chunk_size = 1000000):
+        """Returns line indices, triangle indices and xyz points of intersections of lines with the triangles.
+
+        note:
+           the results are ordered by line index then triangle index, as for meet.distilled_intersects()
+        """
+
+        line_ps = np.asarray(line_ps, dtype = float).reshape((-1, 3))
+        line_vs = np.asarray(line_vs, dtype = float).reshape((-1, 3))
+        if len(line_vs) == 1 and len(line_ps) > 1:
+            line_vs = np.repeat(line_vs, len(line_ps), axis = 0)
+        pair_line, pair_tri = self.candidate_pairs(line_ps, line_vs, line_segment = line_segment)
+        xyz = np.empty((len(pair_line), 3))
+        for start in range(0, len(pair_line), chunk_size):
+            end = min(start + chunk_size, len(pair_line))
+            xyz[start:end] = meet.line_triangle_pairs_intersects(line_ps[pair_line[start:end]],
+                                                                 line_vs[pair_line[start:end]],
+                                                                 self.triangles[pair_tri[start:end]],
+                                                                 line_segment = line_segment)
+        hit = np.logical_not(np.isnan(xyz[:, 0]))
+        return pair_line[hit], pair_tri[hit], xyz[hit]
+
+
+def xy_triangle_index(surface):
+    """Returns a bucketed xy spatial index of the surface's triangles, cached in the surface object."""
+
+    t, p = surface.triangles_and_points()
+    index = getattr(surface, 'xy_triangle_index_cache', None)
+    if index is None or index.t is not t or index.p is not p:
+        index = _XyTriangleIndex(t, p)
+        surface.xy_triangle_index_cache = index
+    return index
@@ -20,6 +20,7 @@ import resqpy.olio.xml_et as rqet
 import resqpy.property as rqp
 import resqpy.surface as rqs
 import resqpy.surface._base_surface as rqsb
+import resqpy.surface._spatial_index as rqssi
 import resqpy.surface._triangulated_patch as rqstp
 import resqpy.weights_and_measures as wam
 
@@ -793,17 +794,52 @@ class Surface(rqsb.BaseSurface):
         for patch in self.patch_list:
             patch.vertical_rescale_points(ref_depth, scaling_factor)
 
+    def xy_triangle_index(self):
+        """Returns a bucketed xy spatial index of the triangles, cached and reused for line intersection queries.
+
+        note:
+           the index is rebuilt automatically if the triangles and points arrays of the surface are replaced
+           but not if they are modified in situ
+        """
+
+        return rqssi.xy_triangle_index(self)
+
     def line_intersection(self, line_p, line_v, line_segment = False):
         """Returns x,y,z of an intersection point of straight line with the surface, or None if no intersection found."""
 
-        t, p = self.triangles_and_points()
-        tp = p[t]
-        intersects = meet.line_triangles_intersects(line_p, line_v, tp, line_segment = line_segment)
+        index = self.xy_triangle_index()
+        candidates = index.candidates(line_p, line_v, line_segment = line_segment)
+        if len(candidates) == 0:
+            return None
+        intersects = meet.line_triangles_intersects(line_p,
+                                                    line_v,
+                                                    index.triangles[candidates],
+                                                    line_segment = line_segment)
         indices = meet.intersects_indices(intersects)
         if not indices or len(indices) == 0:
             return None
         return intersects[indices[0]]
 
+    def line_set_intersections(self, line_ps, line_vs, line_segment = False):
+        """Returns all intersections of a set of straight lines (or line segments) with the surface.
+
+        arguments:
+           line_ps (numpy float array of shape (N, 3)): a point on each of N lines
+           line_vs (numpy float array of shape (N, 3) or (3,)): direction vector for each line, or one common vector
+           line_segment (bool, default False): if True, each line is treated as a finite segment between p and p + v
+
+        returns:
+           (numpy int array of shape (M,), numpy int array of shape (M,), numpy float array of shape (M, 3)):
+           for M intersections, the line indices, the triangle indices and the (x, y, z) intersection points,
+           ordered by line index then triangle index
+
+        notes:
+           a cached spatial index of the triangles is used so that only triangles near to each line are tested;
+           the results are equivalent to those of meet.distilled_intersects(meet.line_set_triangles_intersects())
+        """
+
+        return self.xy_triangle_index().line_set_intersections(line_ps, line_vs, line_segment = line_segment)
+
     def sample_z_at_xy_points(self, points, multiple_handling = 'any'):
         """Returns interpolated z values for an array of xy values.
 
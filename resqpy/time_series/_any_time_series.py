@@ -57,6 +57,11 @@ class AnyTimeSeries(BaseResqpy):
             return False
         return None
 
+    def equivalence_key(self):
+        """Returns (timeframe, number of timestamps) as the equivalence key."""
+
+        return (self.timeframe, self.number_of_timestamps())
+
     def set_model(self, parent_model):
         """Associate the time series with a resqml model (does not create xml or write hdf5 data)."""
         self.model = parent_model
@@ -76,3 +76,8 @@ class GeologicTimeSeries(ats.AnyTimeSeries):
         if super_equivalence is not None:
             return super_equivalence
         return self.timestamps == other_ts.timestamps  # has no tolerance of small differences
+
+    def equivalence_key(self):
+        """Returns (timeframe, timestamps) as the equivalence key."""
+
+        return (self.timeframe, tuple(self.timestamps))
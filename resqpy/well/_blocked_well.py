@@ -1477,217 +1477,105 @@ class BlockedWell(BaseResqpy):
 
         grid_crs_list = self.__verify_number_of_grids_and_crs_units(column_list = column_list)
 
-        k_face_check = np.zeros((2, 2), dtype = int)
-        k_face_check[1, 1] = 1  # now represents entry, exit of K-, K+
-        k_face_check_end = k_face_check.copy()
-        k_face_check_end[1] = -1  # entry through K-, terminating (TD) within cell
-
         traj_crs, traj_z_inc_down = self.__get_trajectory_crs_and_z_inc_down()
 
-        df = pd.DataFrame(columns = column_list)
-        df = df.astype({i_col: int, j_col: int, k_col: int})
-
-        ci = -1
-        row_ci_list = []
         interval_count = self.__get_interval_count()
-
-        for interval in range(interval_count):
-
-            if self.grid_indices[interval] < 0:
-                continue  # unblocked interval
-
-            ci += 1
-            row_dict = {}
-            grid = self.grid_list[self.grid_indices[interval]]
-            grid_crs = grid_crs_list[self.grid_indices[interval]]
-            grid_name = rqet.citation_title_for_node(grid.root).replace(' ', '_')
-            natural_cell = self.cell_indices[ci]
-            cell_kji0 = grid.denaturalized_cell_index(natural_cell)
-            tuple_kji0 = tuple(cell_kji0)
-
-            skip_interval = BlockedWell.__skip_interval_check(max_depth = max_depth,
-                                                              grid = grid,
-                                                              cell_kji0 = cell_kji0,
-                                                              grid_crs = grid_crs,
-                                                              active_only = active_only,
-                                                              tuple_kji0 = tuple_kji0,
-                                                              min_k0 = min_k0,
-                                                              max_k0 = max_k0,
-                                                              k0_list = k0_list,
-                                                              region_list = region_list,
-                                                              region_uuid = region_uuid,
-                                                              max_satw = max_satw,
-                                                              satw_uuid = satw_uuid,
-                                                              min_sato = min_sato,
-                                                              sato_uuid = sato_uuid,
-                                                              max_satg = max_satg,
-                                                              satg_uuid = satg_uuid)
-            if skip_interval:
+        blocked_intervals = np.nonzero(self.grid_indices[:interval_count] >= 0)[0]  # interval index for each cell
+        blocked_kji0 = self.__blocked_cell_kji0_array(interval_count)
+        skip_mask = self.__skip_interval_mask(blocked_kji0 = blocked_kji0,
+                                              interval_count = interval_count,
+                                              max_depth = max_depth,
+                                              grid_crs_list = grid_crs_list,
+                                              active_only = active_only,
+                                              min_k0 = min_k0,
+                                              max_k0 = max_k0,
+                                              k0_list = k0_list,
+                                              region_list = region_list,
+                                              region_uuid = region_uuid,
+                                              max_satw = max_satw,
+                                              satw_uuid = satw_uuid,
+                                              min_sato = min_sato,
+                                              sato_uuid = sato_uuid,
+                                              max_satg = max_satg,
+                                              satg_uuid = satg_uuid)
+
+        # trajectory points for all nodes and interval mid points, sampled in single vectorised calls
+        node_xyz = mid_xyz = None
+        if self.trajectory is not None and interval_count > 0:
+            if doing_entry_exit and not use_face_centres:
+                node_xyz = self.trajectory.xyz_for_mds(self.node_mds[:interval_count + 1])
+            if doing_xyz and length_mode == 'MD':
+                mid_xyz = self.trajectory.xyz_for_mds(
+                    0.5 * (self.node_mds[:interval_count] + self.node_mds[1:interval_count + 1]))
+
+        part_perf_fraction = self.__part_perf_fractions(pc = pc,
+                                                        pc_titles = pc_titles,
+                                                        perforation_list = perforation_list,
+                                                        blocked_intervals = blocked_intervals,
+                                                        skip_mask = skip_mask)
+
+        # column oriented arrays with one element per blocked cell, computed for all the intervals in a grid at once
+        column_arrays = {}
+        blocked_grid_indices = self.grid_indices[blocked_intervals]
+        for grid_index, grid in enumerate(self.grid_list):
+            ci = np.nonzero(np.logical_and(blocked_grid_indices == grid_index, np.logical_not(skip_mask)))[0]
+            if len(ci) == 0:
                 continue
-
-            skip_interval_due_to_perforations, part_perf_fraction = self.__get_part_perf_fraction_for_interval(
-                pc = pc, pc_titles = pc_titles, perforation_list = perforation_list, ci = ci, interval = interval)
-
-            if skip_interval_due_to_perforations:
-                continue
-
-            entry_xyz, exit_xyz, ee_crs = self.__get_entry_exit_xyz_and_crs_for_interval(
-                doing_entry_exit = doing_entry_exit,
-                use_face_centres = use_face_centres,
+            grid_skip_mask, grid_arrays = self.__interval_arrays_for_grid(
                 grid = grid,
-                cell_kji0 = cell_kji0,
-                interval = interval,
+                grid_crs = grid_crs_list[grid_index],
                 ci = ci,
-                grid_crs = grid_crs,
-                traj_crs = traj_crs)
-
-            skip_interval_due_to_invalid_length, length = self.__get_length_of_interval(
-                length_mode = length_mode,
-                interval = interval,
-                length_uom = length_uom,
-                entry_xyz = entry_xyz,
-                exit_xyz = exit_xyz,
-                ee_crs = ee_crs,
-                perforation_list = perforation_list,
-                part_perf_fraction = part_perf_fraction,
-                min_length = min_length)
-
-            if skip_interval_due_to_invalid_length:
-                continue
-
-            md = 0.5 * (self.node_mds[interval + 1] + self.node_mds[interval])
-
-            anglv, sine_anglv, cosine_anglv, angla, sine_angla, cosine_angla = self.__get_angles_for_interval(
+                intervals = blocked_intervals[ci],
+                cells_kji0 = blocked_kji0[ci],
+                part_perf_fraction = part_perf_fraction[ci],
                 pc = pc,
+                pc_timeless = pc_timeless,
                 pc_titles = pc_titles,
+                column_list = column_list,
                 doing_angles = doing_angles,
-                set_k_face_intervals_vertical = set_k_face_intervals_vertical,
-                ci = ci,
-                k_face_check = k_face_check,
-                k_face_check_end = k_face_check_end,
-                entry_xyz = entry_xyz,
-                exit_xyz = exit_xyz,
-                ee_crs = ee_crs,
-                traj_z_inc_down = traj_z_inc_down,
-                grid = grid,
-                grid_crs = grid_crs,
-                cell_kji0 = cell_kji0,
-                anglv_ref = anglv_ref,
-                angla_plane_ref = angla_plane_ref)
-
-            ntg_is_one, k_i, k_j, k_k = BlockedWell.__get_ntg_and_directional_perm_for_interval(
+                doing_xyz = doing_xyz,
+                doing_entry_exit = doing_entry_exit,
                 doing_kh = doing_kh,
                 do_well_inflow = do_well_inflow,
+                use_face_centres = use_face_centres,
+                node_xyz = node_xyz,
+                mid_xyz = mid_xyz,
+                traj_crs = traj_crs,
+                traj_z_inc_down = traj_z_inc_down,
+                length_mode = length_mode,
+                length_uom = length_uom,
+                perforation_list = perforation_list,
+                min_length = min_length,
+                min_kh = min_kh,
+                set_k_face_intervals_vertical = set_k_face_intervals_vertical,
+                anglv_ref = anglv_ref,
+                angla_plane_ref = angla_plane_ref,
                 ntg_uuid = ntg_uuid,
-                grid = grid,
-                tuple_kji0 = tuple_kji0,
-                isotropic_perm = isotropic_perm,
-                preferential_perforation = preferential_perforation,
-                part_perf_fraction = part_perf_fraction,
                 perm_i_uuid = perm_i_uuid,
                 perm_j_uuid = perm_j_uuid,
-                perm_k_uuid = perm_k_uuid)
-
-            skip_interval_due_to_min_kh, kh = BlockedWell.__get_kh_for_interval(doing_kh = doing_kh,
-                                                                                isotropic_perm = isotropic_perm,
-                                                                                ntg_is_one = ntg_is_one,
-                                                                                length = length,
-                                                                                perm_i_uuid = perm_i_uuid,
-                                                                                grid = grid,
-                                                                                tuple_kji0 = tuple_kji0,
-                                                                                k_i = k_i,
-                                                                                k_j = k_j,
-                                                                                k_k = k_k,
-                                                                                anglv = anglv,
-                                                                                sine_anglv = sine_anglv,
-                                                                                cosine_anglv = cosine_anglv,
-                                                                                sine_angla = sine_angla,
-                                                                                cosine_angla = cosine_angla,
-                                                                                min_kh = min_kh,
-                                                                                pc = pc,
-                                                                                pc_titles = pc_titles,
-                                                                                ci = ci)
-
-            if skip_interval_due_to_min_kh:
-                continue
+                perm_k_uuid = perm_k_uuid,
+                isotropic_perm = isotropic_perm,
+                preferential_perforation = preferential_perforation,
+                radw = radw,
+                skin = skin,
+                depth_inc_down = depth_inc_down)
+            skip_mask[ci] = grid_skip_mask
+            for col, a in grid_arrays.items():
+                if col not in column_arrays:
+                    column_arrays[col] = np.full(len(blocked_intervals), np.NaN, dtype = a.dtype)
+                column_arrays[col][ci] = a
+
+        column_data = BlockedWell.__column_data_from_arrays(
+            column_arrays = column_arrays,
+            rows = np.nonzero(np.logical_not(skip_mask))[0],
+            column_list = column_list,
+            blocked_kji0 = blocked_kji0,
+            blocked_grid_indices = blocked_grid_indices,
+            grid_names = [rqet.citation_title_for_node(grid.root).replace(' ', '_') for grid in self.grid_list],
+            stat = stat,
+            one_based = one_based)
 
-            length, radw_i, skin_i, radb, wi, wbc = BlockedWell.__get_pc_arrays_for_interval(pc = pc,
-                                                                                             pc_timeless = pc_timeless,
-                                                                                             pc_titles = pc_titles,
-                                                                                             ci = ci,
-                                                                                             length = length,
-                                                                                             radw = radw,
-                                                                                             skin = skin,
-                                                                                             length_uom = length_uom,
-                                                                                             grid = grid,
-                                                                                             traj_crs = traj_crs)
-            if skin_i is None:
-                skin_i = 0.0
-            if radw_i is None:
-                radw_i = (0.33 if length_uom == 'ft' else 0.1)
-
-            radb, wi, wbc = BlockedWell.__get_well_inflow_parameters_for_interval(do_well_inflow = do_well_inflow,
-                                                                                  isotropic_perm = isotropic_perm,
-                                                                                  ntg_is_one = ntg_is_one,
-                                                                                  k_i = k_i,
-                                                                                  k_j = k_j,
-                                                                                  k_k = k_k,
-                                                                                  sine_anglv = sine_anglv,
-                                                                                  cosine_anglv = cosine_anglv,
-                                                                                  sine_angla = sine_angla,
-                                                                                  cosine_angla = cosine_angla,
-                                                                                  grid = grid,
-                                                                                  cell_kji0 = cell_kji0,
-                                                                                  radw = radw_i,
-                                                                                  radb = radb,
-                                                                                  wi = wi,
-                                                                                  wbc = wbc,
-                                                                                  skin = skin_i,
-                                                                                  kh = kh,
-                                                                                  length_uom = length_uom,
-                                                                                  column_list = column_list)
-
-            xyz = self.__get_xyz_for_interval(doing_xyz = doing_xyz,
-                                              length_mode = length_mode,
-                                              length_uom = length_uom,
-                                              md = md,
-                                              traj_crs = traj_crs,
-                                              depth_inc_down = depth_inc_down,
-                                              traj_z_inc_down = traj_z_inc_down,
-                                              entry_xyz = entry_xyz,
-                                              exit_xyz = exit_xyz,
-                                              ee_crs = ee_crs,
-                                              pc = pc,
-                                              pc_titles = pc_titles,
-                                              ci = ci)
-
-            md = self.__get_md_array_in_correct_units_for_interval(md = md,
-                                                                   length_uom = length_uom,
-                                                                   pc = pc,
-                                                                   pc_titles = pc_titles,
-                                                                   ci = ci)
-
-            df = BlockedWell.__append_interval_data_to_dataframe(df = df,
-                                                                 grid_name = grid_name,
-                                                                 radw = radw_i,
-                                                                 skin = skin_i,
-                                                                 angla = angla,
-                                                                 anglv = anglv,
-                                                                 length = length,
-                                                                 kh = kh,
-                                                                 xyz = xyz,
-                                                                 md = md,
-                                                                 stat = stat,
-                                                                 part_perf_fraction = part_perf_fraction,
-                                                                 radb = radb,
-                                                                 wi = wi,
-                                                                 wbc = wbc,
-                                                                 column_list = column_list,
-                                                                 one_based = one_based,
-                                                                 row_dict = row_dict,
-                                                                 cell_kji0 = cell_kji0,
-                                                                 row_ci_list = row_ci_list,
-                                                                 ci = ci)
+        df = BlockedWell.__dataframe_from_columns(column_data, column_list)
 
         self.__add_as_properties(df = df,
                                  add_as_properties = add_as_properties,
@@ -1808,45 +1696,6 @@ class BlockedWell(BaseResqpy):
             prop_uuid = uuid_or_dict  # uuid either in form of string or uuid.UUID
         return grid.property_collection.single_array_ref(uuid = prop_uuid)
 
-    @staticmethod
-    def __get_ref_vector(grid, grid_crs, cell_kji0, mode):
-        # returns unit vector with true direction, ie. accounts for differing xy & z units in grid's crs
-        # gravity = np.array((0.0, 0.0, 1.0))
-        if mode == 'normal well i+':
-            return None  # ANGLA only: option for no projection onto a plane
-        ref_vector = None
-        # options for anglv or angla reference: 'z down', 'z+', 'k down', 'k+', 'normal ij', 'normal ij down'
-        if mode == 'z+':
-            ref_vector = np.array((0.0, 0.0, 1.0))
-        elif mode == 'z down':
-            if grid_crs.z_inc_down:
-                ref_vector = np.array((0.0, 0.0, 1.0))
-            else:
-                ref_vector = np.array((0.0, 0.0, -1.0))
-        else:
-            cell_axial_vectors = grid.interface_vectors_kji(cell_kji0)
-            if grid_crs.xy_units != grid_crs.z_units:
-                wam.convert_lengths(cell_axial_vectors[..., 2], grid_crs.z_units, grid_crs.xy_units)
-            if mode in ['k+', 'k down']:
-                ref_vector = vec.unit_vector(cell_axial_vectors[0])
-                if mode == 'k down' and not grid.k_direction_is_down:
-                    ref_vector = -ref_vector
-            else:  # normal to plane of ij axes
-                ref_vector = vec.unit_vector(vec.cross_product(cell_axial_vectors[1], cell_axial_vectors[2]))
-                if mode == 'normal ij down':
-                    if grid_crs.z_inc_down:
-                        if ref_vector[2] < 0.0:
-                            ref_vector = -ref_vector
-                    else:
-                        if ref_vector[2] > 0.0:
-                            ref_vector = -ref_vector
-            if ref_vector is None or ref_vector[2] == 0.0:
-                if grid_crs.z_inc_down:
-                    ref_vector = np.array((0.0, 0.0, 1.0))
-                else:
-                    ref_vector = np.array((0.0, 0.0, -1.0))
-        return ref_vector
-
     @staticmethod
     def __verify_angle_references(anglv_ref, angla_plane_ref):
         """Verify that the references for anglv and angla are one of the acceptable options."""
@@ -2054,6 +1903,58 @@ class BlockedWell(BaseResqpy):
 
         return traj_crs, traj_z_inc_down
 
+    def __blocked_cell_kji0_array(self, interval_count):
+        """Returns int array of shape (number of blocked intervals, 3) holding the kji0 cell indices."""
+
+        blocked_kji0 = np.zeros((len(self.cell_indices), 3), dtype = int)
+        blocked_grid_indices = self.grid_indices[:interval_count][self.grid_indices[:interval_count] >= 0]
+        for grid_index, grid in enumerate(self.grid_list):
+            mask = (blocked_grid_indices == grid_index)
+            if np.any(mask):
+                blocked_kji0[mask] = grid.denaturalized_cell_indices(np.asarray(self.cell_indices)[mask])
+        return blocked_kji0
+
+    def __skip_interval_mask(self, blocked_kji0, interval_count, max_depth, grid_crs_list, active_only, min_k0, max_k0,
+                             k0_list, region_list, region_uuid, max_satw, satw_uuid, min_sato, sato_uuid, max_satg,
+                             satg_uuid):
+        """Returns boolean array flagging blocked intervals to be skipped due to cell based constraints."""
+
+        skip = np.zeros(len(blocked_kji0), dtype = bool)
+        if len(blocked_kji0) == 0:
+            return skip
+        k0s = blocked_kji0[:, 0]
+        if min_k0 is not None:
+            skip[k0s < min_k0] = True
+        if max_k0 is not None:
+            skip[k0s > max_k0] = True
+        if k0_list is not None:
+            skip[np.logical_not(np.isin(k0s, k0_list))] = True
+        blocked_grid_indices = self.grid_indices[:interval_count][self.grid_indices[:interval_count] >= 0]
+        for grid_index, grid in enumerate(self.grid_list):
+            g_mask = (blocked_grid_indices == grid_index)
+            if not np.any(g_mask):
+                continue
+            g_kji0 = tuple(blocked_kji0[g_mask].T)
+            g_skip = skip[g_mask]
+            # note: masks are cast to bool as inactive and property arrays may have a numeric dtype
+            if active_only and grid.inactive is not None:
+                g_skip |= grid.inactive[g_kji0].astype(bool)
+            if region_list is not None:
+                in_region = np.isin(BlockedWell.__prop_array(region_uuid, grid)[g_kji0], region_list)
+                g_skip |= np.logical_not(in_region).astype(bool)
+            for limit, uuid, sign in [(max_satw, satw_uuid, 1.0), (min_sato, sato_uuid, -1.0),
+                                      (max_satg, satg_uuid, 1.0)]:
+                if limit is not None:
+                    g_skip |= (sign * BlockedWell.__prop_array(uuid, grid)[g_kji0] > sign * limit).astype(bool)
+            if max_depth is not None:
+                for i in np.where(np.logical_not(g_skip))[0]:
+                    g_skip[i] = BlockedWell.__check_cell_depth(max_depth = max_depth,
+                                                               grid = grid,
+                                                               cell_kji0 = blocked_kji0[g_mask][i],
+                                                               grid_crs = grid_crs_list[grid_index])
+            skip[g_mask] = g_skip
+        return skip
+
     @staticmethod
     def __check_cell_depth(max_depth, grid, cell_kji0, grid_crs):
         """Check whether the maximum depth specified has been exceeded with the current interval."""
@@ -2067,122 +1968,248 @@ class BlockedWell(BaseResqpy):
                 max_depth_exceeded = True
         return max_depth_exceeded
 
-    @staticmethod
-    def __skip_interval_check(max_depth, grid, cell_kji0, grid_crs, active_only, tuple_kji0, min_k0, max_k0, k0_list,
-                              region_list, region_uuid, max_satw, satw_uuid, min_sato, sato_uuid, max_satg, satg_uuid):
-        """Check whether any conditions are met that mean the interval should be skipped."""
-
-        max_depth_exceeded = BlockedWell.__check_cell_depth(max_depth = max_depth,
-                                                            grid = grid,
-                                                            cell_kji0 = cell_kji0,
-                                                            grid_crs = grid_crs)
-        inactive_grid = active_only and grid.inactive is not None and grid.inactive[tuple_kji0]
-        out_of_bounds_layer_1 = (min_k0 is not None and cell_kji0[0] < min_k0) or (max_k0 is not None and
-                                                                                   cell_kji0[0] > max_k0)
-        out_of_bounds_layer_2 = k0_list is not None and cell_kji0[0] not in k0_list
-        out_of_bounds_region = (region_list is not None and
-                                BlockedWell.__prop_array(region_uuid, grid)[tuple_kji0] not in region_list)
-        saturation_limit_exceeded_1 = (max_satw is not None and
-                                       BlockedWell.__prop_array(satw_uuid, grid)[tuple_kji0] > max_satw)
-        saturation_limit_exceeded_2 = (min_sato is not None and
-                                       BlockedWell.__prop_array(sato_uuid, grid)[tuple_kji0] < min_sato)
-        saturation_limit_exceeded_3 = (max_satg is not None and
-                                       BlockedWell.__prop_array(satg_uuid, grid)[tuple_kji0] > max_satg)
-        skip_interval = any([
-            max_depth_exceeded, inactive_grid, out_of_bounds_layer_1, out_of_bounds_layer_2, out_of_bounds_region,
-            saturation_limit_exceeded_1, saturation_limit_exceeded_2, saturation_limit_exceeded_3
-        ])
-
-        return skip_interval
-
-    def __get_part_perf_fraction_for_interval(self, pc, pc_titles, ci, perforation_list, interval, length_tol = 0.01):
-        """Get the partial perforation fraction for the interval."""
-
-        skip_interval = False
+    def __part_perf_fractions(self, pc, pc_titles, perforation_list, blocked_intervals, skip_mask, length_tol = 0.01):
+        """Returns the partial perforation fraction for each blocked interval, setting skip_mask where unperforated."""
+
         if 'PPERF' in pc_titles:
-            part_perf_fraction = pc.single_array_ref(citation_title = 'PPERF')[ci]
-        else:
-            part_perf_fraction = 1.0
-            if perforation_list is not None:
-                perf_length = 0.0
-                for perf_start, perf_end in perforation_list:
-                    if perf_end <= self.node_mds[interval] or perf_start >= self.node_mds[interval + 1]:
-                        continue
-                    if perf_start <= self.node_mds[interval]:
-                        if perf_end >= self.node_mds[interval + 1]:
-                            perf_length += self.node_mds[interval + 1] - self.node_mds[interval]
-                            break
-                        else:
-                            perf_length += perf_end - self.node_mds[interval]
-                    else:
-                        if perf_end >= self.node_mds[interval + 1]:
-                            perf_length += self.node_mds[interval + 1] - perf_start
-                        else:
-                            perf_length += perf_end - perf_start
-                if perf_length < length_tol:
-                    skip_interval = True
-                    perf_length = 0.0
-                part_perf_fraction = min(1.0, perf_length / (self.node_mds[interval + 1] - self.node_mds[interval]))
-
-        return skip_interval, part_perf_fraction
-
-    def __get_entry_exit_xyz_and_crs_for_interval(self, doing_entry_exit, use_face_centres, grid, cell_kji0, interval,
-                                                  ci, grid_crs, traj_crs):
-        # calculate the entry and exit points for the interval and set the entry and exit coordinate reference system
-
-        entry_xyz = None
-        exit_xyz = None
-        ee_crs = None
-        if doing_entry_exit:
-            assert self.trajectory is not None
-            if use_face_centres:
-                entry_xyz = grid.face_centre(cell_kji0, self.face_pair_indices[ci, 0, 0], self.face_pair_indices[ci, 0,
-                                                                                                                 1])
-                if self.face_pair_indices[ci, 1, 0] >= 0:
-                    exit_xyz = grid.face_centre(cell_kji0, self.face_pair_indices[ci, 1, 0],
-                                                self.face_pair_indices[ci, 1, 1])
-                else:
-                    exit_xyz = grid.face_centre(cell_kji0, self.face_pair_indices[ci, 0, 0],
-                                                1 - self.face_pair_indices[ci, 0, 1])
-                ee_crs = grid_crs
-            else:
-                entry_xyz = self.trajectory.xyz_for_md(self.node_mds[interval])
-                exit_xyz = self.trajectory.xyz_for_md(self.node_mds[interval + 1])
-                ee_crs = traj_crs
+            return pc.single_array_ref(citation_title = 'PPERF')
+        if perforation_list is None:
+            return np.ones(len(blocked_intervals))
+        start_mds = self.node_mds[blocked_intervals]
+        end_mds = self.node_mds[blocked_intervals + 1]
+        perf_length = np.zeros(len(blocked_intervals))
+        for perf_start, perf_end in perforation_list:
+            perf_length += np.maximum(np.minimum(end_mds, perf_end) - np.maximum(start_mds, perf_start), 0.0)
+        unperforated = (perf_length < length_tol)
+        skip_mask[unperforated] = True
+        perf_length[unperforated] = 0.0
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            return np.minimum(1.0, perf_length / (end_mds - start_mds))
+
+    def __interval_arrays_for_grid(self, grid, grid_crs, ci, intervals, cells_kji0, part_perf_fraction, pc, pc_timeless,
+                                   pc_titles, column_list, doing_angles, doing_xyz, doing_entry_exit, doing_kh,
+                                   do_well_inflow, use_face_centres, node_xyz, mid_xyz, traj_crs, traj_z_inc_down,
+                                   length_mode, length_uom, perforation_list, min_length, min_kh,
+                                   set_k_face_intervals_vertical, anglv_ref, angla_plane_ref, ntg_uuid, perm_i_uuid,
+                                   perm_j_uuid, perm_k_uuid, isotropic_perm, preferential_perforation, radw, skin,
+                                   depth_inc_down):
+        """Returns skip mask and dict of column arrays for the blocked cells ci, which must all be in the one grid."""
+
+        count = len(ci)
+        skip_mask = np.zeros(count, dtype = bool)
+        cells = tuple(cells_kji0.T)
+        face_centres = BlockedWell.__face_centres_for_cells(grid,
+                                                            cells_kji0) if use_face_centres or doing_angles else None
+
+        entry_xyz, exit_xyz, ee_crs = self.__entry_exit_xyz_for_intervals(doing_entry_exit = doing_entry_exit,
+                                                                          use_face_centres = use_face_centres,
+                                                                          face_centres = face_centres,
+                                                                          ci = ci,
+                                                                          intervals = intervals,
+                                                                          grid_crs = grid_crs,
+                                                                          traj_crs = traj_crs,
+                                                                          node_xyz = node_xyz)
+
+        length = self.__interval_lengths(length_mode = length_mode,
+                                         intervals = intervals,
+                                         length_uom = length_uom,
+                                         entry_xyz = entry_xyz,
+                                         exit_xyz = exit_xyz,
+                                         ee_crs = ee_crs,
+                                         perforation_list = perforation_list,
+                                         part_perf_fraction = part_perf_fraction)
+        if min_length is not None:
+            skip_mask[length < min_length] = True
+
+        anglv, sine_anglv, cosine_anglv, angla, sine_angla, cosine_angla = self.__interval_angles(
+            pc = pc,
+            pc_titles = pc_titles,
+            doing_angles = doing_angles,
+            set_k_face_intervals_vertical = set_k_face_intervals_vertical,
+            ci = ci,
+            entry_xyz = entry_xyz,
+            exit_xyz = exit_xyz,
+            ee_crs = ee_crs,
+            traj_z_inc_down = traj_z_inc_down,
+            grid = grid,
+            grid_crs = grid_crs,
+            face_centres = face_centres,
+            anglv_ref = anglv_ref,
+            angla_plane_ref = angla_plane_ref)
 
-        return entry_xyz, exit_xyz, ee_crs
+        ntg_is_one, k_i, k_j, k_k = BlockedWell.__ntg_and_directional_perms(
+            doing_kh = doing_kh,
+            do_well_inflow = do_well_inflow,
+            ntg_uuid = ntg_uuid,
+            grid = grid,
+            cells = cells,
+            isotropic_perm = isotropic_perm,
+            preferential_perforation = preferential_perforation,
+            part_perf_fraction = part_perf_fraction,
+            perm_i_uuid = perm_i_uuid,
+            perm_j_uuid = perm_j_uuid,
+            perm_k_uuid = perm_k_uuid)
 
-    def __get_length_of_interval(self, length_mode, interval, length_uom, entry_xyz, exit_xyz, ee_crs, perforation_list,
-                                 part_perf_fraction, min_length):
-        """Calculate the length of the interval."""
+        kh = BlockedWell.__interval_kh(doing_kh = doing_kh,
+                                       isotropic_perm = isotropic_perm,
+                                       ntg_is_one = ntg_is_one,
+                                       length = length,
+                                       k_i = k_i,
+                                       k_j = k_j,
+                                       k_k = k_k,
+                                       anglv = anglv,
+                                       sine_anglv = sine_anglv,
+                                       cosine_anglv = cosine_anglv,
+                                       sine_angla = sine_angla,
+                                       cosine_angla = cosine_angla,
+                                       pc = pc,
+                                       pc_titles = pc_titles,
+                                       ci = ci)
+        if doing_kh and min_kh is not None:
+            skip_mask[kh < min_kh] = True
+
+        length, radw, skin, radb, wi, wbc = BlockedWell.__pc_arrays_for_intervals(pc = pc,
+                                                                                  pc_timeless = pc_timeless,
+                                                                                  pc_titles = pc_titles,
+                                                                                  ci = ci,
+                                                                                  length = length,
+                                                                                  radw = radw,
+                                                                                  skin = skin,
+                                                                                  length_uom = length_uom,
+                                                                                  grid = grid,
+                                                                                  traj_crs = traj_crs)
+        if skin is None:
+            skin = 0.0
+        if radw is None:
+            radw = (0.33 if length_uom == 'ft' else 0.1)
+        assert np.all(np.broadcast_to(radw, (count,))[np.logical_not(skip_mask)] > 0.0)
+
+        radb, wi, wbc = BlockedWell.__well_inflow_parameters(do_well_inflow = do_well_inflow,
+                                                             isotropic_perm = isotropic_perm,
+                                                             ntg_is_one = ntg_is_one,
+                                                             k_i = k_i,
+                                                             k_j = k_j,
+                                                             k_k = k_k,
+                                                             sine_anglv = sine_anglv,
+                                                             cosine_anglv = cosine_anglv,
+                                                             sine_angla = sine_angla,
+                                                             cosine_angla = cosine_angla,
+                                                             grid = grid,
+                                                             face_centres = face_centres,
+                                                             radw = radw,
+                                                             radb = radb,
+                                                             wi = wi,
+                                                             wbc = wbc,
+                                                             skin = skin,
+                                                             kh = kh,
+                                                             length_uom = length_uom,
+                                                             column_list = column_list)
+
+        xyz = self.__interval_xyz(doing_xyz = doing_xyz,
+                                  length_mode = length_mode,
+                                  length_uom = length_uom,
+                                  intervals = intervals,
+                                  mid_xyz = mid_xyz,
+                                  traj_crs = traj_crs,
+                                  depth_inc_down = depth_inc_down,
+                                  traj_z_inc_down = traj_z_inc_down,
+                                  entry_xyz = entry_xyz,
+                                  exit_xyz = exit_xyz,
+                                  ee_crs = ee_crs,
+                                  pc = pc,
+                                  pc_titles = pc_titles,
+                                  ci = ci)
+
+        md = self.__interval_mds(intervals = intervals,
+                                 length_uom = length_uom,
+                                 pc = pc,
+                                 pc_titles = pc_titles,
+                                 ci = ci)
+
+        column_values_dict = {
+            'RADW': radw,
+            'SKIN': skin,
+            'ANGLA': angla,
+            'ANGLV': anglv,
+            'LENGTH': length,
+            'KH': kh,
+            'DEPTH': xyz[:, 2],
+            'MD': md,
+            'X': xyz[:, 0],
+            'Y': xyz[:, 1],
+            'PPERF': part_perf_fraction,
+            'RADB': radb,
+            'WI': wi,
+            'WBC': wbc
+        }
+        return skip_mask, {
+            col: np.broadcast_to(column_values_dict[col], (count,)) for col in column_list if col in column_values_dict
+        }
+
+    @staticmethod
+    def __face_centres_for_cells(grid, cells_kji0):
+        """Returns array of shape (N, 3, 2, 3) being (cell, axis, 0 or 1, xyz) of face centre points for the cells."""
+
+        if hasattr(grid, 'array_corner_points'):
+            cp = grid.array_corner_points[tuple(cells_kji0.T)]
+        else:
+            cp = np.full((len(cells_kji0), 2, 2, 2, 3), np.NaN)
+            for index, cell_kji0 in enumerate(cells_kji0):
+                cell_cp = grid.corner_points(tuple(cell_kji0))
+                if cell_cp is not None:
+                    cp[index] = cell_cp
+        face_centres = np.empty((len(cells_kji0), 3, 2, 3))
+        for zero_or_one in range(2):
+            face_centres[:, 0, zero_or_one] = 0.25 * np.sum(cp[:, zero_or_one, :, :], axis = (1, 2))
+            face_centres[:, 1, zero_or_one] = 0.25 * np.sum(cp[:, :, zero_or_one, :], axis = (1, 2))
+            face_centres[:, 2, zero_or_one] = 0.25 * np.sum(cp[:, :, :, zero_or_one], axis = (1, 2))
+        return face_centres
+
+    def __entry_exit_xyz_for_intervals(self, doing_entry_exit, use_face_centres, face_centres, ci, intervals, grid_crs,
+                                       traj_crs, node_xyz):
+        # returns the entry and exit points for the intervals and the entry and exit coordinate reference system
+
+        if not doing_entry_exit:
+            return None, None, None
+        assert self.trajectory is not None
+        if not use_face_centres:
+            return node_xyz[intervals], node_xyz[intervals + 1], traj_crs
+        face_pairs = self.face_pair_indices[ci]
+        cell_index = np.arange(len(ci))
+        entry_xyz = face_centres[cell_index, face_pairs[:, 0, 0], face_pairs[:, 0, 1]]
+        exiting = (face_pairs[:, 1, 0] >= 0)  # otherwise terminating within cell, so use face opposite entry
+        exit_axis = np.where(exiting, face_pairs[:, 1, 0], face_pairs[:, 0, 0])
+        exit_polarity = np.where(exiting, face_pairs[:, 1, 1], 1 - face_pairs[:, 0, 1])
+        exit_xyz = face_centres[cell_index, exit_axis, exit_polarity]
+        return entry_xyz, exit_xyz, grid_crs
+
+    def __interval_lengths(self, length_mode, intervals, length_uom, entry_xyz, exit_xyz, ee_crs, perforation_list,
+                           part_perf_fraction):
+        """Returns the lengths of the intervals."""
 
-        skip_interval = False
         if length_mode == 'MD':
-            length = self.node_mds[interval + 1] - self.node_mds[interval]
+            length = self.node_mds[intervals + 1] - self.node_mds[intervals]
             if length_uom is not None and self.trajectory is not None and length_uom != self.trajectory.md_uom:
                 length = wam.convert_lengths(length, self.trajectory.md_uom, length_uom)
         else:  # use straight line length between entry and exit
             entry_xyz, exit_xyz = BlockedWell._single_uom_entry_exit_xyz(entry_xyz, exit_xyz, ee_crs)
-            length = vec.naive_length(exit_xyz - entry_xyz)
+            length = vec.naive_lengths(exit_xyz - entry_xyz)
             if length_uom is not None:
                 length = wam.convert_lengths(length, ee_crs.z_units, length_uom)
             elif self.trajectory is not None:
                 length = wam.convert_lengths(length, ee_crs.z_units, self.trajectory.md_uom)
         if perforation_list is not None:
-            length *= part_perf_fraction
-        if min_length is not None and length < min_length:
-            skip_interval = True
-
-        return skip_interval, length
+            length = length * part_perf_fraction
+        return length
 
     @staticmethod
     def _single_uom_xyz(xyz, crs, required_uom):
         xyz = np.array(xyz, dtype = float)
         if crs.xy_units != required_uom:
-            xyz[0] = wam.convert_lengths(xyz[0], crs.xy_units, required_uom)
-            xyz[1] = wam.convert_lengths(xyz[1], crs.xy_units, required_uom)
+            xyz[..., 0] = wam.convert_lengths(xyz[..., 0], crs.xy_units, required_uom)
+            xyz[..., 1] = wam.convert_lengths(xyz[..., 1], crs.xy_units, required_uom)
         if crs.z_units != required_uom:
-            xyz[2] = wam.convert_lengths(xyz[2], crs.z_units, required_uom)
+            xyz[..., 2] = wam.convert_lengths(xyz[..., 2], crs.z_units, required_uom)
         return xyz
 
     @staticmethod
@@ -2190,203 +2217,172 @@ class BlockedWell(BaseResqpy):
         return (BlockedWell._single_uom_xyz(entry_xyz, ee_crs, ee_crs.z_units),
                 BlockedWell._single_uom_xyz(exit_xyz, ee_crs, ee_crs.z_units))
 
-    def __get_angles_for_interval(self, pc, pc_titles, doing_angles, set_k_face_intervals_vertical, ci, k_face_check,
-                                  k_face_check_end, entry_xyz, exit_xyz, ee_crs, traj_z_inc_down, grid, grid_crs,
-                                  cell_kji0, anglv_ref, angla_plane_ref):
-        """Calculate angla, anglv and related trigonometirc transforms for the interval."""
-
-        sine_anglv = sine_angla = 0.0
-        cosine_anglv = cosine_angla = 1.0
-        anglv = pc.single_array_ref(citation_title = 'ANGLV')[ci] if 'ANGLV' in pc_titles else None
-        angla = pc.single_array_ref(citation_title = 'ANGLA')[ci] if 'ANGLA' in pc_titles else None
-
-        if doing_angles and not (set_k_face_intervals_vertical and
-                                 (np.all(self.face_pair_indices[ci] == k_face_check) or
-                                  np.all(self.face_pair_indices[ci] == k_face_check_end))):
-            anglv, sine_anglv, cosine_anglv, vector, a_ref_vector = BlockedWell.__get_anglv_for_interval(
-                anglv = anglv,
-                entry_xyz = entry_xyz,
-                exit_xyz = exit_xyz,
-                ee_crs = ee_crs,
-                traj_z_inc_down = traj_z_inc_down,
-                grid = grid,
-                grid_crs = grid_crs,
-                cell_kji0 = cell_kji0,
-                anglv_ref = anglv_ref,
-                angla_plane_ref = angla_plane_ref)
-            if anglv != 0.0:
-                angla, sine_angla, cosine_angla = BlockedWell.__get_angla_for_interval(angla = angla,
-                                                                                       grid = grid,
-                                                                                       cell_kji0 = cell_kji0,
-                                                                                       vector = vector,
-                                                                                       a_ref_vector = a_ref_vector)
+    def __interval_angles(self, pc, pc_titles, doing_angles, set_k_face_intervals_vertical, ci, entry_xyz, exit_xyz,
+                          ee_crs, traj_z_inc_down, grid, grid_crs, face_centres, anglv_ref, angla_plane_ref):
+        """Returns arrays of anglv, angla and related trigonometric transforms for the intervals."""
+
+        count = len(ci)
+        sine_anglv = np.zeros(count)
+        cosine_anglv = np.ones(count)
+        sine_angla = np.zeros(count)
+        cosine_angla = np.ones(count)
+        anglv_given = 'ANGLV' in pc_titles
+        angla_given = 'ANGLA' in pc_titles
+        anglv = pc.single_array_ref(citation_title = 'ANGLV')[ci] if anglv_given else np.full(count, np.NaN)
+        angla = pc.single_array_ref(citation_title = 'ANGLA')[ci] if angla_given else np.full(count, np.NaN)
+
+        doing = np.full(count, doing_angles, dtype = bool)
+        if doing_angles and set_k_face_intervals_vertical:
+            face_pairs = self.face_pair_indices[ci].reshape((count, 4))
+            k_face = np.logical_or(np.all(face_pairs == (0, 0, 0, 1), axis = 1),
+                                   np.all(face_pairs == (0, 0, -1, -1), axis = 1))  # K- to K+, or K- to TD
+            doing[k_face] = False
+        if not anglv_given:
+            anglv[np.logical_not(doing)] = 0.0
+        if not angla_given:
+            angla[np.logical_not(doing)] = 0.0
+        if not np.any(doing):
+            return anglv, sine_anglv, cosine_anglv, angla, sine_angla, cosine_angla
+
+        rows = np.nonzero(doing)[0]
+        entry_xyz, exit_xyz = BlockedWell._single_uom_entry_exit_xyz(entry_xyz[rows], exit_xyz[rows], ee_crs)
+        vector = vec.unit_vectors(exit_xyz - entry_xyz)  # nominal wellbore vector for each interval
+        if traj_z_inc_down is not None and traj_z_inc_down != grid_crs.z_inc_down:
+            vector[:, 2] = -vector[:, 2]
+        unit_adjusted_vector = vector
+        if grid.crs.xy_units != grid.crs.z_units:
+            unit_adjusted_vector = vector.copy()
+            unit_adjusted_vector[:, 2] = wam.convert_lengths(unit_adjusted_vector[:, 2], grid.crs.z_units,
+                                                             grid.crs.xy_units)
+        cell_axial_vectors = face_centres[rows, :, 1] - face_centres[rows, :, 0]
+        v_ref_vector = BlockedWell.__ref_vectors(grid, grid_crs, cell_axial_vectors, anglv_ref)
+        if angla_plane_ref == anglv_ref:
+            a_ref_vector = v_ref_vector
         else:
-            if angla is None:
-                angla = 0.0
-            if anglv is None:
-                anglv = 0.0
-
-        return anglv, sine_anglv, cosine_anglv, angla, sine_angla, cosine_angla
-
-    @staticmethod
-    def __get_angla_for_interval(angla, grid, cell_kji0, vector, a_ref_vector):
-        """Calculate angla and related trigonometric transforms for the interval."""
-
+            a_ref_vector = BlockedWell.__ref_vectors(grid, grid_crs, cell_axial_vectors, angla_plane_ref)
+        if anglv_given:
+            anglv_rad = vec.radians_from_degrees(anglv[rows])
+        else:
+            anglv_rad = np.arccos(np.clip(vec.dot_products(unit_adjusted_vector, v_ref_vector), -1.0, 1.0))
+            anglv[rows] = vec.degrees_from_radians(anglv_rad)
+        cosine_anglv[rows] = np.cos(anglv_rad)
+        sine_anglv[rows] = np.sin(anglv_rad)
+
+        # angla is only set for intervals which are not aligned with the anglv reference vector
+        inclined = (anglv[rows] != 0.0)
+        rows = rows[inclined]
+        vector = vector[inclined]
         # project well vector and i-axis vector onto plane defined by normal vector a_ref_vector
-        i_axis = grid.interface_vector(cell_kji0, 2)
+        i_axis = cell_axial_vectors[inclined, 2]
         if grid.crs.xy_units != grid.crs.z_units:
-            i_axis[2] = wam.convert_lengths(i_axis[2], grid.crs.z_units, grid.crs.xy_units)
-        i_axis = vec.unit_vector(i_axis)
+            i_axis[:, 2] = wam.convert_lengths(i_axis[:, 2], grid.crs.z_units, grid.crs.xy_units)
+        i_axis = vec.unit_vectors(i_axis)
         if a_ref_vector is not None:  # project vector and i axis onto a plane
-            vector -= vec.dot_product(vector, a_ref_vector) * a_ref_vector
-            vector = vec.unit_vector(vector)
-            # log.debug('i axis unit vector: ' + str(i_axis))
-            i_axis -= vec.dot_product(i_axis, a_ref_vector) * a_ref_vector
-            i_axis = vec.unit_vector(i_axis)
-        # log.debug('i axis unit vector in reference plane: ' + str(i_axis))
-        if angla is not None:
-            angla_rad = vec.radians_from_degrees(angla)
-            cosine_angla = maths.cos(angla_rad)
-            sine_angla = maths.sin(angla_rad)
+            a_ref_vector = a_ref_vector[inclined]
+            vector = vec.unit_vectors(vector -
+                                      np.expand_dims(vec.dot_products(vector, a_ref_vector), -1) * a_ref_vector)
+            i_axis = vec.unit_vectors(i_axis -
+                                      np.expand_dims(vec.dot_products(i_axis, a_ref_vector), -1) * a_ref_vector)
+        if angla_given:
+            angla_rad = vec.radians_from_degrees(angla[rows])
+            sine_angla[rows] = np.sin(angla_rad)
         else:
-            cosine_angla = min(max(vec.dot_product(vector, i_axis), -1.0), 1.0)
-            angla_rad = maths.acos(cosine_angla)
+            angla_rad = np.arccos(np.clip(vec.dot_products(vector, i_axis), -1.0, 1.0))
             # negate angla if vector is 'clockwise from' i_axis when viewed from above, projected in the xy plane
             # todo: have discussion around angla sign under different ijk handedness (and z inc direction?)
-            sine_angla = maths.sin(angla_rad)
-            angla = vec.degrees_from_radians(angla_rad)
-            if vec.clockwise((0.0, 0.0), i_axis, vector) > 0.0:
-                angla = -angla
-                angla_rad = -angla_rad  ## as angle_rad before --> typo?
-                sine_angla = -sine_angla
-
-        # log.debug('angla: ' + str(angla))
+            sign = np.where(vector[:, 0] * i_axis[:, 1] - vector[:, 1] * i_axis[:, 0] > 0.0, -1.0, 1.0)
+            angla[rows] = sign * vec.degrees_from_radians(angla_rad)
+            sine_angla[rows] = sign * np.sin(angla_rad)
+        cosine_angla[rows] = np.cos(angla_rad)
 
-        return angla, sine_angla, cosine_angla
+        return anglv, sine_anglv, cosine_anglv, angla, sine_angla, cosine_angla
 
     @staticmethod
-    def __get_anglv_for_interval(anglv, entry_xyz, exit_xyz, ee_crs, traj_z_inc_down, grid, grid_crs, cell_kji0,
-                                 anglv_ref, angla_plane_ref):
-        """Get anglv and related trigonometric transforms for the interval."""
-
-        entry_xyz, exit_xyz = BlockedWell._single_uom_entry_exit_xyz(entry_xyz, exit_xyz, ee_crs)
-        vector = vec.unit_vector(np.array(exit_xyz) - np.array(entry_xyz))  # nominal wellbore vector for interval
-        if traj_z_inc_down is not None and traj_z_inc_down != grid_crs.z_inc_down:
-            vector[2] = -vector[2]
-        if grid.crs.xy_units == grid.crs.z_units:
-            unit_adjusted_vector = vector
-        else:
-            unit_adjusted_vector = vector.copy()
-            unit_adjusted_vector[2] = wam.convert_lengths(unit_adjusted_vector[2], grid.crs.z_units, grid.crs.xy_units)
-        v_ref_vector = BlockedWell.__get_ref_vector(grid, grid_crs, cell_kji0, anglv_ref)
-        # log.debug('v ref vector: ' + str(v_ref_vector))
-        if angla_plane_ref == anglv_ref:
-            a_ref_vector = v_ref_vector
-        else:
-            a_ref_vector = BlockedWell.__get_ref_vector(grid, grid_crs, cell_kji0, angla_plane_ref)
-        # log.debug('a ref vector: ' + str(a_ref_vector))
-        if anglv is not None:
-            anglv_rad = vec.radians_from_degrees(anglv)
-            cosine_anglv = maths.cos(anglv_rad)
-            sine_anglv = maths.sin(anglv_rad)
-        else:
-            cosine_anglv = min(max(vec.dot_product(unit_adjusted_vector, v_ref_vector), -1.0), 1.0)
-            anglv_rad = maths.acos(cosine_anglv)
-            sine_anglv = maths.sin(anglv_rad)
-            anglv = vec.degrees_from_radians(anglv_rad)
-        # log.debug('anglv: ' + str(anglv))
-
-        return anglv, sine_anglv, cosine_anglv, vector, a_ref_vector
+    def __ref_vectors(grid, grid_crs, cell_axial_vectors, mode):
+        # returns unit vectors with true direction, ie. accounts for differing xy & z units in grid's crs;
+        # cell_axial_vectors has shape (N, 3, 3) being the interface vectors for axes k, j, i of each cell
+        if mode == 'normal well i+':
+            return None  # ANGLA only: option for no projection onto a plane
+        count = len(cell_axial_vectors)
+        # options for anglv or angla reference: 'z down', 'z+', 'k down', 'k+', 'normal ij', 'normal ij down'
+        down = np.array((0.0, 0.0, 1.0 if grid_crs.z_inc_down else -1.0))
+        if mode == 'z+':
+            return np.tile((0.0, 0.0, 1.0), (count, 1))
+        if mode == 'z down':
+            return np.tile(down, (count, 1))
+        cell_axial_vectors = cell_axial_vectors.copy()
+        if grid_crs.xy_units != grid_crs.z_units:
+            wam.convert_lengths(cell_axial_vectors[..., 2], grid_crs.z_units, grid_crs.xy_units)
+        if mode in ['k+', 'k down']:
+            ref_vector = vec.unit_vectors(cell_axial_vectors[:, 0])
+            if mode == 'k down' and not grid.k_direction_is_down:
+                ref_vector = -ref_vector
+        else:  # normal to plane of ij axes
+            ref_vector = vec.unit_vectors(np.cross(cell_axial_vectors[:, 1], cell_axial_vectors[:, 2]))
+            if mode == 'normal ij down':
+                if grid_crs.z_inc_down:
+                    upward = (ref_vector[:, 2] < 0.0)
+                else:
+                    upward = (ref_vector[:, 2] > 0.0)
+                ref_vector[upward] = -ref_vector[upward]
+        ref_vector[ref_vector[:, 2] == 0.0] = down
+        return ref_vector
 
     @staticmethod
-    def __get_ntg_and_directional_perm_for_interval(doing_kh, do_well_inflow, ntg_uuid, grid, tuple_kji0,
-                                                    isotropic_perm, preferential_perforation, part_perf_fraction,
-                                                    perm_i_uuid, perm_j_uuid, perm_k_uuid):
-        """Get the net-to-gross and directional permeability arrays for the interval."""
-
-        ntg_is_one = False
-        k_i = k_j = k_k = None
-        if doing_kh or do_well_inflow:
-            if ntg_uuid is None:
-                ntg = 1.0
-                ntg_is_one = True
-            else:
-                ntg = BlockedWell.__prop_array(ntg_uuid, grid)[tuple_kji0]
-                ntg_is_one = maths.isclose(ntg, 1.0, rel_tol = 0.001)
-            if isotropic_perm and ntg_is_one:
-                k_i = k_j = k_k = BlockedWell.__prop_array(perm_i_uuid, grid)[tuple_kji0]
-            else:
-                if preferential_perforation and not ntg_is_one:
-                    if part_perf_fraction <= ntg:
-                        ntg = 1.0  # effective ntg when perforated intervals are in pay
-                    else:
-                        ntg /= part_perf_fraction  # adjusted ntg when some perforations in non-pay
-                # todo: check netgross facet type in property perm i & j parts: if set to gross then don't multiply by ntg below
-                k_i = BlockedWell.__prop_array(perm_i_uuid, grid)[tuple_kji0] * ntg
-                k_j = BlockedWell.__prop_array(perm_j_uuid, grid)[tuple_kji0] * ntg
-                k_k = BlockedWell.__prop_array(perm_k_uuid, grid)[tuple_kji0]
+    def __ntg_and_directional_perms(doing_kh, do_well_inflow, ntg_uuid, grid, cells, isotropic_perm,
+                                    preferential_perforation, part_perf_fraction, perm_i_uuid, perm_j_uuid,
+                                    perm_k_uuid):
+        """Returns a mask where net to gross is one and the ntg adjusted directional permeability arrays for cells."""
 
+        if not (doing_kh or do_well_inflow):
+            return None, None, None, None
+        perm_i = BlockedWell.__prop_array(perm_i_uuid, grid)[cells]
+        if ntg_uuid is None:
+            ntg = np.ones(len(perm_i))
+            ntg_is_one = np.ones(len(perm_i), dtype = bool)
+        else:
+            ntg = BlockedWell.__prop_array(ntg_uuid, grid)[cells]
+            ntg_is_one = (np.abs(ntg - 1.0) <= 0.001 * np.maximum(np.abs(ntg), 1.0))
+        if isotropic_perm and np.all(ntg_is_one):
+            return ntg_is_one, perm_i, perm_i, perm_i
+        if preferential_perforation:
+            # effective ntg is one when perforated intervals are in pay, or adjusted when some perforations in non-pay
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                ntg = np.where(ntg_is_one, ntg, np.where(part_perf_fraction <= ntg, 1.0, ntg / part_perf_fraction))
+        # todo: check netgross facet type in property perm i & j parts: if set to gross then don't multiply by ntg below
+        k_i = perm_i * ntg
+        k_j = BlockedWell.__prop_array(perm_i_uuid if perm_j_uuid is None else perm_j_uuid, grid)[cells] * ntg
+        k_k = BlockedWell.__prop_array(perm_i_uuid if perm_k_uuid is None else perm_k_uuid, grid)[cells]
+        if isotropic_perm:
+            k_i = np.where(ntg_is_one, perm_i, k_i)
+            k_j = np.where(ntg_is_one, perm_i, k_j)
+            k_k = np.where(ntg_is_one, perm_i, k_k)
         return ntg_is_one, k_i, k_j, k_k
 
     @staticmethod
-    def __get_kh_for_interval(doing_kh, isotropic_perm, ntg_is_one, length, perm_i_uuid, grid, tuple_kji0, k_i, k_j,
-                              k_k, anglv, sine_anglv, cosine_anglv, sine_angla, cosine_angla, min_kh, pc, pc_titles,
-                              ci):
-        """Get the permeability-thickness value for the interval."""
-
-        skip_interval = False
-        if doing_kh:
-            kh = BlockedWell.__get_kh_if_doing_kh(isotropic_perm = isotropic_perm,
-                                                  ntg_is_one = ntg_is_one,
-                                                  length = length,
-                                                  perm_i_uuid = perm_i_uuid,
-                                                  grid = grid,
-                                                  tuple_kji0 = tuple_kji0,
-                                                  k_i = k_i,
-                                                  k_j = k_j,
-                                                  k_k = k_k,
-                                                  anglv = anglv,
-                                                  sine_anglv = sine_anglv,
-                                                  cosine_anglv = cosine_anglv,
-                                                  sine_angla = sine_angla,
-                                                  cosine_angla = cosine_angla)
-            if min_kh is not None and kh < min_kh:
-                skip_interval = True
-        elif 'KH' in pc_titles:
-            kh = pc.single_array_ref(citation_title = 'KH')[ci]
-        else:
-            kh = None
-        return skip_interval, kh
+    def __interval_kh(doing_kh, isotropic_perm, ntg_is_one, length, k_i, k_j, k_k, anglv, sine_anglv, cosine_anglv,
+                      sine_angla, cosine_angla, pc, pc_titles, ci):
+        """Returns the permeability-thickness values for the intervals."""
 
-    @staticmethod
-    def __get_kh_if_doing_kh(isotropic_perm, ntg_is_one, length, perm_i_uuid, grid, tuple_kji0, k_i, k_j, k_k, anglv,
-                             sine_anglv, cosine_anglv, sine_angla, cosine_angla):
+        if not doing_kh:
+            return pc.single_array_ref(citation_title = 'KH')[ci] if 'KH' in pc_titles else None
         # note: this is believed to return required value even when grid crs has mixed xy & z units;
         # angles are true angles accounting for any mixed units
-        if isotropic_perm and ntg_is_one:
-            kh = length * BlockedWell.__prop_array(perm_i_uuid, grid)[tuple_kji0]
-        else:
-            if np.isnan(k_i) or np.isnan(k_j):
-                kh = 0.0
-            elif anglv == 0.0:
-                kh = length * maths.sqrt(k_i * k_j)
-            elif np.isnan(k_k):
-                kh = 0.0
-            else:
-                k_e = maths.pow(k_i * k_j * k_k, 1.0 / 3.0)
-                if k_e == 0.0:
-                    kh = 0.0
-                else:
-                    l_i = length * maths.sqrt(k_e / k_i) * sine_anglv * cosine_angla
-                    l_j = length * maths.sqrt(k_e / k_j) * sine_anglv * sine_angla
-                    l_k = length * maths.sqrt(k_e / k_k) * cosine_anglv
-                    l_p = maths.sqrt(l_i * l_i + l_j * l_j + l_k * l_k)
-                    kh = k_e * l_p
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            k_e = np.power(k_i * k_j * k_k, 1.0 / 3.0)
+            l_i = length * np.sqrt(k_e / k_i) * sine_anglv * cosine_angla
+            l_j = length * np.sqrt(k_e / k_j) * sine_anglv * sine_angla
+            l_k = length * np.sqrt(k_e / k_k) * cosine_anglv
+            kh = np.select([np.logical_or(np.isnan(k_i), np.isnan(k_j)), anglv == 0.0,
+                            np.isnan(k_k), k_e == 0.0], [0.0, length * np.sqrt(k_i * k_j), 0.0, 0.0],
+                           default = k_e * np.sqrt(l_i * l_i + l_j * l_j + l_k * l_k))
+        if isotropic_perm:
+            kh = np.where(ntg_is_one, length * k_i, kh)
         return kh
 
     @staticmethod
-    def __get_pc_arrays_for_interval(pc, pc_timeless, pc_titles, ci, length, radw, skin, length_uom, grid, traj_crs):
-        """Get the property collection arrays for the interval."""
+    def __pc_arrays_for_intervals(pc, pc_timeless, pc_titles, ci, length, radw, skin, length_uom, grid, traj_crs):
+        """Returns length, radw, skin, radb, wi & wbc, as arrays where available from properties, else as passed."""
 
         def get_item(v, title, pc_titles, pc, pc_timeless, ci, uom):
 
@@ -2420,7 +2416,6 @@ class BlockedWell(BaseResqpy):
             r_uom = length_uom
         length = get_item(length, 'LENGTH', pc_titles, pc, pc_timeless, ci, l_uom)
         radw = get_item(radw, 'RADW', pc_titles, pc, pc_timeless, ci, r_uom)
-        assert radw is None or radw > 0.0  # todo: allow zero for inactive intervals?
         skin = get_item(skin, 'SKIN', pc_titles, pc, pc_timeless, ci, None)
         if skin is None:
             skin = get_item(None, 'skin', pc_titles, pc, pc_timeless, ci, None)
@@ -2433,177 +2428,115 @@ class BlockedWell(BaseResqpy):
         return length, radw, skin, radb, wi, wbc
 
     @staticmethod
-    def __get_well_inflow_parameters_for_interval(do_well_inflow, isotropic_perm, ntg_is_one, k_i, k_j, k_k, sine_anglv,
-                                                  cosine_anglv, sine_angla, cosine_angla, grid, cell_kji0, radw, radb,
-                                                  wi, wbc, skin, kh, length_uom, column_list):
-
-        if do_well_inflow:
-            if not length_uom:
-                length_uom = grid.crs.z_units
-            k_ei, k_ej, k_ek, radw_e = BlockedWell.__calculate_ke_and_radw_e(isotropic_perm = isotropic_perm,
-                                                                             ntg_is_one = ntg_is_one,
-                                                                             radw = radw,
-                                                                             k_i = k_i,
-                                                                             k_j = k_j,
-                                                                             k_k = k_k,
-                                                                             sine_anglv = sine_anglv,
-                                                                             cosine_anglv = cosine_anglv,
-                                                                             sine_angla = sine_angla,
-                                                                             cosine_angla = cosine_angla)
-
-            cell_axial_vectors = grid.interface_vectors_kji(cell_kji0)
-            wam.convert_lengths(cell_axial_vectors[..., :2], grid.crs.xy_units, length_uom)
-            wam.convert_lengths(cell_axial_vectors[..., 2], grid.crs.z_units, length_uom)
-            d2 = np.empty(3)
-            for axis in range(3):
-                d2[axis] = np.sum(cell_axial_vectors[axis] * cell_axial_vectors[axis])
-            if radb is None:
-                radb_e = BlockedWell.__calculate_radb_e(k_ei = k_ei,
-                                                        k_ej = k_ej,
-                                                        k_ek = k_ek,
-                                                        k_i = k_i,
-                                                        k_j = k_j,
-                                                        k_k = k_k,
-                                                        d2 = d2,
-                                                        sine_anglv = sine_anglv,
-                                                        cosine_anglv = cosine_anglv,
-                                                        sine_angla = sine_angla,
-                                                        cosine_angla = cosine_angla)
-                radb = radw * radb_e / radw_e
-                log.debug(f'RADB value calculated in BlockedWell dataframe method as: {radb}')
-            if wi is None:
-                wi = 0.0 if radb <= 0.0 else 2.0 * maths.pi / (maths.log(radb / radw) + skin)
-            if 'WBC' in column_list and wbc is None:
-                assert length_uom == 'm' or length_uom.startswith('ft'),  \
-                    'WBC only calculable for length uom of m or ft*'
-                conversion_constant = 8.5270171e-5 if length_uom == 'm' else 0.006328286
-                wbc = conversion_constant * kh * wi  # note: pperf aleady accounted for in kh
-
-        return radb, wi, wbc
-
-    @staticmethod
-    def __calculate_ke_and_radw_e(isotropic_perm, ntg_is_one, radw, k_i, k_j, k_k, sine_anglv, cosine_anglv, sine_angla,
-                                  cosine_angla):
+    def __well_inflow_parameters(do_well_inflow, isotropic_perm, ntg_is_one, k_i, k_j, k_k, sine_anglv, cosine_anglv,
+                                 sine_angla, cosine_angla, grid, face_centres, radw, radb, wi, wbc, skin, kh,
+                                 length_uom, column_list):
+        """Returns arrays of block equivalent radius, well index and wellbore constant for the intervals."""
 
-        if isotropic_perm and ntg_is_one:
-            k_ei = k_ej = k_ek = k_i
-            radw_e = radw
-        else:
-            k_ei = maths.sqrt(k_j * k_k)
-            k_ej = maths.sqrt(k_i * k_k)
-            k_ek = maths.sqrt(k_i * k_j)
-            r_wi = 0.0 if k_ei == 0.0 else 0.5 * radw * (maths.sqrt(k_ei / k_j) + maths.sqrt(k_ei / k_k))
-            r_wj = 0.0 if k_ej == 0.0 else 0.5 * radw * (maths.sqrt(k_ej / k_i) + maths.sqrt(k_ej / k_k))
-            r_wk = 0.0 if k_ek == 0.0 else 0.5 * radw * (maths.sqrt(k_ek / k_i) + maths.sqrt(k_ek / k_j))
+        if not do_well_inflow:
+            return radb, wi, wbc
+        if not length_uom:
+            length_uom = grid.crs.z_units
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            k_ei = np.sqrt(k_j * k_k)
+            k_ej = np.sqrt(k_i * k_k)
+            k_ek = np.sqrt(k_i * k_j)
+            r_wi = np.where(k_ei == 0.0, 0.0, 0.5 * radw * (np.sqrt(k_ei / k_j) + np.sqrt(k_ei / k_k)))
+            r_wj = np.where(k_ej == 0.0, 0.0, 0.5 * radw * (np.sqrt(k_ej / k_i) + np.sqrt(k_ej / k_k)))
+            r_wk = np.where(k_ek == 0.0, 0.0, 0.5 * radw * (np.sqrt(k_ek / k_i) + np.sqrt(k_ek / k_j)))
             rwi = r_wi * sine_anglv * cosine_angla
             rwj = r_wj * sine_anglv * sine_angla
             rwk = r_wk * cosine_anglv
-            radw_e = maths.sqrt(rwi * rwi + rwj * rwj + rwk * rwk)
-            if radw_e == 0.0:
-                radw_e = radw  # no permeability in this situation anyway
+            radw_e = np.sqrt(rwi * rwi + rwj * rwj + rwk * rwk)
+            radw_e = np.where(radw_e == 0.0, radw, radw_e)  # no permeability in this situation anyway
+            if isotropic_perm:
+                k_ei = np.where(ntg_is_one, k_i, k_ei)
+                k_ej = np.where(ntg_is_one, k_i, k_ej)
+                k_ek = np.where(ntg_is_one, k_i, k_ek)
+                radw_e = np.where(ntg_is_one, radw, radw_e)
 
-        return k_ei, k_ej, k_ek, radw_e
+            if radb is None:
+                cell_axial_vectors = face_centres[:, :, 1] - face_centres[:, :, 0]
+                wam.convert_lengths(cell_axial_vectors[..., :2], grid.crs.xy_units, length_uom)
+                wam.convert_lengths(cell_axial_vectors[..., 2], grid.crs.z_units, length_uom)
+                d2 = np.sum(cell_axial_vectors * cell_axial_vectors, axis = -1)
+                r_bi = np.where(k_ei == 0.0, 0.0, 0.14 * np.sqrt(k_ei * (d2[:, 1] / k_j + d2[:, 0] / k_k)))
+                r_bj = np.where(k_ej == 0.0, 0.0, 0.14 * np.sqrt(k_ej * (d2[:, 2] / k_i + d2[:, 0] / k_k)))
+                r_bk = np.where(k_ek == 0.0, 0.0, 0.14 * np.sqrt(k_ek * (d2[:, 2] / k_i + d2[:, 1] / k_j)))
+                rbi = r_bi * sine_anglv * cosine_angla
+                rbj = r_bj * sine_anglv * sine_angla
+                rbk = r_bk * cosine_anglv
+                radb = radw * np.sqrt(rbi * rbi + rbj * rbj + rbk * rbk) / radw_e
+            if wi is None:
+                wi = np.where(radb <= 0.0, 0.0, 2.0 * maths.pi / (np.log(radb / radw) + skin))
 
-    @staticmethod
-    def __calculate_radb_e(k_ei, k_ej, k_ek, k_i, k_j, k_k, d2, sine_anglv, cosine_anglv, sine_angla, cosine_angla):
-
-        r_bi = 0.0 if k_ei == 0.0 else 0.14 * maths.sqrt(k_ei * (d2[1] / k_j + d2[0] / k_k))
-        r_bj = 0.0 if k_ej == 0.0 else 0.14 * maths.sqrt(k_ej * (d2[2] / k_i + d2[0] / k_k))
-        r_bk = 0.0 if k_ek == 0.0 else 0.14 * maths.sqrt(k_ek * (d2[2] / k_i + d2[1] / k_j))
-        rbi = r_bi * sine_anglv * cosine_angla
-        rbj = r_bj * sine_anglv * sine_angla
-        rbk = r_bk * cosine_anglv
-        radb_e = maths.sqrt(rbi * rbi + rbj * rbj + rbk * rbk)
-
-        return radb_e
-
-    def __get_xyz_for_interval(self, doing_xyz, length_mode, length_uom, md, traj_crs, depth_inc_down, traj_z_inc_down,
-                               entry_xyz, exit_xyz, ee_crs, pc, pc_titles, ci):
-        """Get the x, y and z location of the midpoint of the interval."""
-
-        xyz = (np.NaN, np.NaN, np.NaN)
-        if doing_xyz:
-            xyz = self.__get_xyz_if_doing_xyz(length_mode = length_mode,
-                                              md = md,
-                                              length_uom = length_uom,
-                                              traj_crs = traj_crs,
-                                              depth_inc_down = depth_inc_down,
-                                              traj_z_inc_down = traj_z_inc_down,
-                                              entry_xyz = entry_xyz,
-                                              exit_xyz = exit_xyz,
-                                              ee_crs = ee_crs)
-        xyz = np.array(xyz)
-        for i, col_header in enumerate(['X', 'Y', 'DEPTH']):
-            if col_header in pc_titles:
-                xyz[i] = pc.single_array_ref(citation_title = col_header)[ci]
+        if 'WBC' in column_list and wbc is None:
+            assert length_uom == 'm' or length_uom.startswith('ft'),  \
+                'WBC only calculable for length uom of m or ft*'
+            conversion_constant = 8.5270171e-5 if length_uom == 'm' else 0.006328286
+            wbc = conversion_constant * kh * wi  # note: pperf aleady accounted for in kh
 
-        return xyz
+        return radb, wi, wbc
 
-    def __get_xyz_if_doing_xyz(self, length_mode, md, length_uom, traj_crs, depth_inc_down, traj_z_inc_down, exit_xyz,
-                               entry_xyz, ee_crs):
+    def __interval_xyz(self, doing_xyz, length_mode, length_uom, intervals, mid_xyz, traj_crs, depth_inc_down,
+                       traj_z_inc_down, entry_xyz, exit_xyz, ee_crs, pc, pc_titles, ci):
+        """Returns array of shape (N, 3) holding the x, y and depth of the mid point of each of the intervals."""
 
-        if length_mode == 'MD' and self.trajectory is not None:
-            xyz = self.trajectory.xyz_for_md(md)
+        if not doing_xyz:
+            xyz = np.full((len(ci), 3), np.NaN)
+        elif length_mode == 'MD' and self.trajectory is not None:
+            xyz = mid_xyz[intervals]
             if length_uom is not None and length_uom != self.trajectory.md_uom:
                 wam.convert_lengths(xyz, traj_crs.z_units, length_uom)
             if depth_inc_down and traj_z_inc_down is False:
-                xyz[2] = -xyz[2]
+                xyz[:, 2] = -xyz[:, 2]
         else:
-            xyz = 0.5 * (np.array(exit_xyz) + np.array(entry_xyz))
+            xyz = 0.5 * (exit_xyz + entry_xyz)
             if length_uom is not None and length_uom != ee_crs.z_units:
-                xyz[2] = wam.convert_lengths(xyz[2], ee_crs.z_units, length_uom)
+                xyz[:, 2] = wam.convert_lengths(xyz[:, 2], ee_crs.z_units, length_uom)
             if depth_inc_down != ee_crs.z_inc_down:
-                xyz[2] = -xyz[2]
+                xyz[:, 2] = -xyz[:, 2]
+        for i, col_header in enumerate(['X', 'Y', 'DEPTH']):
+            if col_header in pc_titles:
+                xyz[:, i] = pc.single_array_ref(citation_title = col_header)[ci]
 
         return xyz
 
-    def __get_md_array_in_correct_units_for_interval(self, md, length_uom, pc, pc_titles, ci):
-        """Convert the measured depth to the correct units or get the measured depth from the property collection."""
+    def __interval_mds(self, intervals, length_uom, pc, pc_titles, ci):
+        """Returns the mid point measured depths of the intervals in the correct units, or from the property."""
 
         if 'MD' in pc_titles:
-            md = pc.single_array_ref(citation_title = 'MD')[ci]
-        elif length_uom is not None and self.trajectory is not None and length_uom != self.trajectory.md_uom:
+            return pc.single_array_ref(citation_title = 'MD')[ci]
+        md = 0.5 * (self.node_mds[intervals + 1] + self.node_mds[intervals])
+        if length_uom is not None and self.trajectory is not None and length_uom != self.trajectory.md_uom:
             md = wam.convert_lengths(md, self.trajectory.md_uom, length_uom)
-
         return md
 
     @staticmethod
-    def __append_interval_data_to_dataframe(df, grid_name, radw, skin, angla, anglv, length, kh, xyz, md, stat,
-                                            part_perf_fraction, radb, wi, wbc, column_list, one_based, row_dict,
-                                            cell_kji0, row_ci_list, ci):
-        """Append the row of data corresponding to the interval to the dataframe."""
-
-        column_names = [
-            'GRID', 'RADW', 'SKIN', 'ANGLA', 'ANGLV', 'LENGTH', 'KH', 'DEPTH', 'MD', 'X', 'Y', 'STAT', 'PPERF', 'RADB',
-            'WI', 'WBC'
-        ]
-        column_values = [
-            grid_name, radw, skin, angla, anglv, length, kh, xyz[2], md, xyz[0], xyz[1], stat, part_perf_fraction, radb,
-            wi, wbc
-        ]
-        column_values_dict = dict(zip(column_names, column_values))
+    def __column_data_from_arrays(column_arrays, rows, column_list, blocked_kji0, blocked_grid_indices, grid_names,
+                                  stat, one_based):
+        """Returns a dictionary mapping column name to the values for the rows to be included in the dataframe."""
 
-        data = df.to_dict()
-        data = {k: list(v.values()) for k, v in data.items()}
+        column_data = {}
         for col_index, col in enumerate(column_list):
             if col_index < 3:
-                if one_based:
-                    row_dict[col] = [cell_kji0[2 - col_index] + 1]
-                else:
-                    row_dict[col] = [cell_kji0[2 - col_index]]
+                column_data[col] = blocked_kji0[rows, 2 - col_index] + (1 if one_based else 0)
+            elif col == 'GRID':
+                column_data[col] = [grid_names[grid_index] for grid_index in blocked_grid_indices[rows]]
+            elif col == 'STAT':
+                column_data[col] = [stat] * len(rows)
             else:
-                row_dict[col] = [column_values_dict[col]]
+                column_data[col] = column_arrays[col][rows] if col in column_arrays else np.full(len(rows), np.NaN)
+        return column_data
 
-        for col, vals in row_dict.items():
-            if col in data:
-                data[col].extend(vals)
-            else:
-                data[col] = vals
-        df = pd.DataFrame(data)
-
-        row_ci_list.append(ci)
+    @staticmethod
+    def __dataframe_from_columns(column_data, column_list):
+        """Returns a pandas dataframe built in a single step from lists of column data."""
 
-        return df
+        if len(column_data[column_list[0]]) == 0:
+            df = pd.DataFrame(columns = column_list)
+            return df.astype({column_list[0]: int, column_list[1]: int, column_list[2]: int})
+        return pd.DataFrame(column_data, columns = column_list)
 
     def __add_as_properties(self,
                             df,
@@ -598,28 +598,69 @@ class Trajectory(BaseResqpy):
         :meta common:
         """
 
-        def interpolate(p1, p2, f):
-            return f * p2 + (1.0 - f) * p1
-
-        def search(md, i1, i2):
-            if i2 - i1 <= 1:
-                if md == self.measured_depths[i1]:
-                    return self.control_points[i1]
-                return interpolate(self.control_points[i1], self.control_points[i1 + 1],
-                                   (md - self.measured_depths[i1]) /
-                                   (self.measured_depths[i1 + 1] - self.measured_depths[i1]))
-            im = i1 + (i2 - i1) // 2
-            if self.measured_depths[im] >= md:
-                return search(md, i1, im)
-            return search(md, im, i2)
-
         if md < 0.0 or md > self.finish_md or md > self.measured_depths[-1]:
             return None
-        if md <= self.start_md:
+        return self.xyz_for_mds(np.array([md], dtype = float))[0]
+
+    def xyz_for_mds(self, mds, spline = False, use_tangents_if_present = True):
+        """Returns xyz points corresponding to an array of measured depths.
+
+        arguments:
+           mds (numpy float array): measured depths for which xyz locations are required; units must be those of
+              self.md_uom
+           spline (boolean, default False): if True, points are interpolated along a cubic spline between the knots,
+              using the same formulation as splined_trajectory(); if False, simple linear interpolation is used
+           use_tangents_if_present (boolean, default True): if True and spline is True, any tangent vectors of this
+              trajectory are used for the spline; otherwise tangents are calculated as in splined_trajectory()
+
+        returns:
+           numpy float array of shape mds.shape + (3,) being the x, y, z coordinates of the points on the trajectory
+
+        notes:
+           the knot interval for each measured depth is located with a single vectorised search;
+           NaN values are returned for measured depths which are less than zero or greater than the finish md;
+           for a measured depth less than the start md, a linear interpolation between the md datum location and
+           the first knot is returned;
+           where spline is True, the fractional position within a knot interval is taken as the spline parameter
+
+        :meta common:
+        """
+
+        mds = np.asarray(mds, dtype = float)
+        flat_mds = mds.reshape(-1)
+        xyz = np.full((flat_mds.size, 3), np.nan)
+        knot_mds = self.measured_depths
+        valid = np.logical_and(flat_mds >= 0.0, flat_mds <= min(self.finish_md, knot_mds[-1]))
+        above = np.logical_and(valid, flat_mds <= self.start_md)
+        if np.any(above):
+            datum_xyz = np.array(self.md_datum.location, dtype = float)
             if self.start_md == 0.0:
-                return self.md_datum.location
-            return interpolate(np.array(self.md_datum.location), self.control_points[0], md / self.start_md)
-        return search(md, 0, self.knot_count - 1)
+                xyz[above] = datum_xyz
+            else:
+                f = (flat_mds[above] / self.start_md).reshape((-1, 1))
+                xyz[above] = f * self.control_points[0] + (1.0 - f) * datum_xyz
+        below = np.where(np.logical_and(valid, np.logical_not(above)))[0]
+        if len(below):
+            md = flat_mds[below]
+            seg = np.clip(np.searchsorted(knot_mds, md, side = 'left') - 1, 0, self.knot_count - 2)
+            f = (md - knot_mds[seg]) / (knot_mds[seg + 1] - knot_mds[seg])
+            p1 = self.control_points[seg]
+            p2 = self.control_points[seg + 1]
+            if spline and self.knot_count > 1:
+                tangent_vectors = self.tangent_vectors
+                if tangent_vectors is None or not use_tangents_if_present:
+                    tangent_vectors = rql.tangents(self.control_points, weight = 'square')
+                seg_lengths = vec.naive_lengths(p2 - p1).reshape((-1, 1))
+                t = f.reshape((-1, 1))
+                t2 = t * t
+                t3 = t * t2
+                xyz[below] = ((2.0 * t3 - 3.0 * t2 + 1.0) * p1 +
+                              (t3 - 2.0 * t2 + t) * tangent_vectors[seg] * seg_lengths + (-2.0 * t3 + 3.0 * t2) * p2 +
+                              (t3 - t2) * tangent_vectors[seg + 1] * seg_lengths)
+            else:
+                f = f.reshape((-1, 1))
+                xyz[below] = f * p2 + (1.0 - f) * p1
+        return xyz.reshape(mds.shape + (3,))
 
     def inclinations(self):
         """Returns a numpy array of inclinations in degrees, zero being vertical, with a value per interval.
@@ -146,6 +146,19 @@ class WellboreFrame(BaseResqpy):
             return None
         return self.trajectory.crs_uuid
 
+    def node_xyz(self, spline = False):
+        """Returns numpy float array of shape (node_count, 3) being the trajectory xyz points at the frame nodes.
+
+        arguments:
+            spline (boolean, default False): if True, the points are interpolated along a cubic spline of the
+                trajectory; if False, linear interpolation between trajectory knots is used
+
+        note:
+            the points are in the crs of the trajectory
+        """
+        assert self.trajectory is not None and self.node_mds is not None
+        return self.trajectory.xyz_for_mds(self.node_mds, spline = spline)
+
     def extract_property_collection(self):
         """Returns property collection for the frame, creating attribute if not already established."""
         if self.property_collection is None:
@@ -249,7 +249,7 @@ class WellboreMarkerFrame(BaseResqpy):
         Interp_Citation_Title.
         """
 
-        xyz = np.empty((self.node_count, 3))
+        xyz = self.trajectory.xyz_for_mds(self.node_mds)
         boundary_feature_type_list = []
         marker_citation_title_list = []
         interp_citation_title_list = []
@@ -263,7 +263,6 @@ class WellboreMarkerFrame(BaseResqpy):
                 interp_citation_title = self.model.title_for_root(root = interp_root)
             else:
                 interp_citation_title = None
-            xyz[i] = self.trajectory.xyz_for_md(self.node_mds[i])
             boundary_feature_type_list.append(boundary_feature_type)
             marker_citation_title_list.append(marker_citation_title)
             interp_citation_title_list.append(interp_citation_title)
@@ -152,6 +152,116 @@ def test_gcs_property_inheritance(tmp_path):
     np.seterr(**restore)
 
 
+def test_gcs_matched_indices(tmp_path):
+    model, g, j_faces, i_faces, gcs = make_l_fault_gcs(tmp_path, 'gcs_matched')
+
+    # a subset, selected with a cell mask, should find its pairs in the full set
+    mask = np.zeros(g.extent_kji, dtype = bool)
+    mask[1:4, 1:, :] = True
+    sub_gcs, sub_indices = gcs.filtered_by_cell_mask(mask, both_cells_required = False, return_indices = True)
+    assert sub_gcs is not None and 0 < sub_gcs.count < gcs.count
+    assert np.all(sub_gcs.matched_indices(gcs) == sub_indices)
+    assert len(sub_gcs.feature_list) == 1
+
+    # pairs are matched regardless of order of the two cell faces
+    swapped = rqf.GridConnectionSet(model, grid = g)
+    swapped.append(sub_gcs)
+    swapped.cell_index_pairs = swapped.cell_index_pairs[:, ::-1].copy()
+    swapped.face_index_pairs = swapped.face_index_pairs[:, ::-1].copy()
+    assert np.all(swapped.matched_indices(gcs) == sub_indices)
+
+    # pairs missing from the other set are flagged with -1
+    matched = gcs.matched_indices(sub_gcs)
+    assert np.count_nonzero(matched >= 0) == sub_gcs.count
+    assert np.all(matched[sub_indices] == np.arange(sub_gcs.count))
+
+
+def test_gcs_inherit_features(tmp_path):
+    model, g, j_faces, i_faces, _ = make_l_fault_gcs(tmp_path, 'gcs_inherit')
+    i_upper_faces = i_faces.copy()
+    i_upper_faces[3:] = False
+
+    def single_feature_gcs(name, j_faces = None, i_faces = None):
+        return rqf.GridConnectionSet(model,
+                                     grid = g,
+                                     j_faces = j_faces,
+                                     i_faces = i_faces,
+                                     feature_name = name,
+                                     create_organizing_objects_where_needed = True)
+
+    # the set to inherit into has two original features, one of which will be wholly replaced
+    gcs = rqf.GridConnectionSet(model, grid = g)
+    gcs.append(single_feature_gcs('ORIG_J', j_faces = j_faces))
+    gcs.append(single_feature_gcs('ORIG_I', i_faces = i_faces))
+    assert gcs.list_of_feature_names() == ['ORIG_J', 'ORIG_I']
+    original_cell_pairs = gcs.cell_index_pairs.copy()
+
+    # the featured set covers all the j faces but only the upper layers of the i faces, with pair order swapped
+    featured = rqf.GridConnectionSet(model, grid = g)
+    featured.append(single_feature_gcs('NAMED_J', j_faces = j_faces))
+    featured.append(single_feature_gcs('NAMED_I', i_faces = i_upper_faces))
+    featured.cell_index_pairs = featured.cell_index_pairs[:, ::-1].copy()
+    featured.face_index_pairs = featured.face_index_pairs[:, ::-1].copy()
+
+    gcs.inherit_features(featured)
+
+    # the original j feature is no longer in use so is removed; cell face pairs are unchanged
+    assert gcs.list_of_feature_names() == ['ORIG_I', 'NAMED_J', 'NAMED_I']
+    assert len(gcs.feature_list) == 3
+    np.testing.assert_array_equal(gcs.cell_index_pairs, original_cell_pairs)
+    j_count = np.count_nonzero(j_faces)
+    k = g.denaturalized_cell_indices(gcs.cell_index_pairs[:, 0])[:, 0]
+    expected = np.empty(gcs.count, dtype = int)
+    expected[:j_count] = 1
+    expected[j_count:] = np.where(k[j_count:] < 3, 2, 0)
+    np.testing.assert_array_equal(gcs.feature_indices, expected)
+
+
+def test_gcs_write_simulator_runs(tmp_path):
+    model, g, j_faces, i_faces, gcs = make_l_fault_gcs(tmp_path, 'gcs_write_sim')
+
+    # a transmissibility multiplier which changes part way down one column
+    cell_pairs, _ = gcs.list_of_cell_face_pairs_for_feature_index()
+    tm = np.ones(gcs.count, dtype = float)
+    tm[np.logical_and(np.all(cell_pairs[:, 0, 1:] == (1, 0), axis = 1), cell_pairs[:, 0, 0] >= 3)] = 0.25
+    gcs.property_collection = rqp.PropertyCollection()
+    gcs.property_collection.set_support(support = gcs)
+    gcs.property_collection.add_cached_array_to_imported_list(tm,
+                                                              'unit test',
+                                                              'TMULT',
+                                                              uom = 'Euc',
+                                                              property_kind = 'transmissibility multiplier',
+                                                              indexable_element = 'faces')
+    gcs.write_hdf5()
+    gcs.create_xml(write_new_properties = True)
+    tm_uuid = gcs.property_collection.uuid_for_part(gcs.property_collection.singleton())
+
+    dat_path = os.path.join(tmp_path, 'l_fault.dat')
+    gcs.write_simulator(dat_path, trans_mult_uuid = tm_uuid)
+    with open(dat_path, 'r') as fp:
+        lines = fp.read().split('\n')
+    assert lines.count('MULT\tTY\tALL\tPLUS\tMULT') == 1
+    assert lines.count('MULT\tTX\tALL\tPLUS\tMULT') == 1
+    assert lines.count('\tFNAME\tL') == 2
+    rows = [line for line in lines if line.startswith('\t') and line[1].isdigit()]
+    # one row per column, except where the multiplier changes
+    assert len(rows) == 5
+    assert '\t1\t1\t2\t2\t1\t3\t1.0000' in rows
+    assert '\t1\t1\t2\t2\t4\t5\t0.2500' in rows
+    assert '\t2\t2\t1\t1\t1\t5\t1.0000' in rows
+
+    # parallel formatting gives the same file
+    both_path = os.path.join(tmp_path, 'l_fault_both.dat')
+    both_mp_path = os.path.join(tmp_path, 'l_fault_both_mp.dat')
+    gcs.write_simulator(both_path, include_both_sides = True, trans_mult_uuid = tm_uuid)
+    gcs.write_simulator(both_mp_path, include_both_sides = True, trans_mult_uuid = tm_uuid, processes = 2)
+    with open(both_path, 'r') as fp:
+        both_text = fp.read()
+    with open(both_mp_path, 'r') as fp:
+        assert fp.read() == both_text
+    assert both_text.count('MINUS') == 2
+
+
 def test_pinchout_and_k_gap_gcs(tmp_path):
     epc = os.path.join(tmp_path, 'gcs_pinchout_k_gap.epc')
     model = rq.new_model(epc)
@@ -390,6 +500,28 @@ def test_two_grid_gcs(tmp_path):
     assert np.all(gcs.cell_index_pairs < 60)
 
 
+def make_l_fault_gcs(tmp_path, name):
+    epc = os.path.join(tmp_path, f'{name}.epc')
+    model = rq.Model(epc, new_epc = True, create_basics = True, create_hdf5_ext = True)
+    g = grr.RegularGrid(model, extent_kji = (5, 3, 3), dxyz = (10.0, 10.0, 1.0))
+    g.write_hdf5()
+    g.create_xml(title = 'unsplit grid')
+
+    # L shaped fault
+    j_faces = np.zeros((g.nk, g.nj - 1, g.ni), dtype = bool)
+    j_faces[:, 0, 1:] = True
+    i_faces = np.zeros((g.nk, g.nj, g.ni - 1), dtype = bool)
+    i_faces[:, 1:, 0] = True
+    gcs = rqf.GridConnectionSet(model,
+                                grid = g,
+                                j_faces = j_faces,
+                                i_faces = i_faces,
+                                feature_name = 'L fault',
+                                create_organizing_objects_where_needed = True)
+
+    return model, g, j_faces, i_faces, gcs
+
+
 def make_epc_with_gcs(tmp_path):
     epc = os.path.join(tmp_path, 'two_fault.epc')
     model = rq.new_model(epc)
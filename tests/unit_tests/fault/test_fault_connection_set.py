@@ -1299,6 +1299,59 @@ def test_fault_connection_set(tmp_path):
         np.isclose(grid_fa, np.array([[0.5, 0.5], [1.0, 0.5], [0.75, 0.75], [0.5, 0.25], [0.5, 1.0 / 3]]), atol = 0.01))
 
 
+def test_fault_connection_set_parallel(tmp_path):
+    epc = os.path.join(tmp_path, 'parallel_juxtaposition.epc')
+    model = rq.new_model(epc)
+    crs = rqc.Crs(model, z_inc_down = True)
+    crs.create_xml()
+    grid = grr.RegularGrid(model,
+                           extent_kji = (6, 8, 8),
+                           dxyz = (10.0, 10.0, 1.0),
+                           crs_uuid = crs.uuid,
+                           set_points_cached = True)
+    grid.write_hdf5()
+    grid.create_xml(title = 'unfaulted', write_geometry = True)
+    lines = [
+        rql.Polyline(model,
+                     is_closed = False,
+                     set_crs = crs.uuid,
+                     title = 'f0',
+                     set_coord = np.array([[25.0, -1.0, 0.0], [45.0, 81.0, 0.0]])),
+        rql.Polyline(model,
+                     is_closed = False,
+                     set_crs = crs.uuid,
+                     title = 'f1',
+                     set_coord = np.array([[-1.0, 42.0, 0.0], [81.0, 38.0, 0.0]]))
+    ]
+    fault_lines = rql.PolylineSet(model, polylines = lines, title = 'fault lines')
+    fault_lines.write_hdf5()
+    fault_lines.create_xml()
+    model.store_epc()
+    faulted = rqdm.add_faults(epc,
+                              source_grid = grid,
+                              polylines = fault_lines,
+                              left_right_throw_dict = {
+                                  'f0': (-1.3, 0.9),
+                                  'f1': (0.6, -2.1)
+                              },
+                              new_grid_title = 'faulted',
+                              create_gcs = False)
+    faulted = rq.Model(epc).grid(uuid = faulted.uuid)
+
+    fcs, fa = rqtr.fault_connection_set(faulted)
+    p_fcs, p_fa = rqtr.fault_connection_set(faulted, parallel = True)
+    assert fcs is not None and fcs.count > 0
+    assert np.all(p_fcs.cell_index_pairs == fcs.cell_index_pairs)
+    assert np.all(p_fcs.face_index_pairs == fcs.face_index_pairs)
+    assert_array_almost_equal(p_fa, fa)
+    assert np.all(fa >= 0.0) and np.all(fa <= 1.0)
+    # fractional areas on each side of each cell face sum to no more than one
+    for side in (0, 1):
+        totals = np.zeros(6 * faulted.cell_count())
+        np.add.at(totals, 6 * fcs.cell_index_pairs[:, side] + fcs.face_index_pairs[:, side], fa[:, side])
+        assert np.all(totals <= 1.0 + 1.0e-6)
+
+
 def test_add_faults(tmp_path):
 
     def write_poly(filename, a, mode = 'w'):
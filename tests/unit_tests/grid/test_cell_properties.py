@@ -328,3 +328,43 @@ def test_interface_lengths_kji(model_test: Model, dxyz):
 
     # Assert
     np.testing.assert_array_almost_equal(interface_length, dxyz[::-1])
+
+
+@pytest.mark.parametrize('grid_fixture', ['faulted_grid', 's_bend_grid', 's_bend_faulted_grid', 's_bend_k_gap_grid'])
+def test_layer_blocked_cell_geometry(grid_fixture, request):
+    grid = request.getfixturevalue(grid_fixture)
+    model = grid.model
+    if grid.uuid is None or model.part_for_uuid(grid.uuid) is None:
+        grid.write_hdf5()
+        grid.create_xml()
+
+    # reference values computed with full corner points
+    full_grid = Grid(model, uuid = grid.uuid)
+    expected_volume = full_grid.volume()
+    expected_thickness = full_grid.thickness()
+    expected_centres = full_grid.centre_point()
+
+    # layer blocked computation from a fresh grid object, without caching the points
+    blocked_grid = Grid(model, uuid = grid.uuid)
+    blocked_grid.uncache_points()
+    volume = np.zeros(blocked_grid.extent_kji)
+    thickness = np.zeros(blocked_grid.extent_kji)
+    centres = np.zeros(tuple(blocked_grid.extent_kji) + (3,))
+    assert blocked_grid.layer_blocked_cell_geometry(volume_out = volume,
+                                                    thickness_out = thickness,
+                                                    centre_out = centres,
+                                                    layer_block_size = 2)
+    assert blocked_grid.points_cached is None
+    assert not hasattr(blocked_grid, 'array_corner_points')
+    np.testing.assert_array_almost_equal(volume, expected_volume)
+    np.testing.assert_array_almost_equal(thickness, expected_thickness)
+    np.testing.assert_array_almost_equal(centres, expected_centres)
+
+    # layer_block_size arguments of the cached property methods
+    blocked_grid = Grid(model, uuid = grid.uuid)
+    blocked_grid.uncache_points()
+    np.testing.assert_array_almost_equal(blocked_grid.volume(layer_block_size = 3), expected_volume)
+    np.testing.assert_array_almost_equal(blocked_grid.thickness(layer_block_size = 3), expected_thickness)
+    np.testing.assert_array_almost_equal(blocked_grid.centre_point(layer_block_size = 3), expected_centres)
+    assert blocked_grid.points_cached is None
+    assert not hasattr(blocked_grid, 'array_corner_points')
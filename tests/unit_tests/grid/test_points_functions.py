@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 import resqpy.grid._points_functions as pf
+import resqpy.olio.point_inclusion as pip
 
 
 def test_uncache_points(basic_regular_grid):
@@ -572,3 +573,83 @@ def test_find_cell_for_x_sect_xz(faulted_grid):
                                         azimuth = 0.0)
     k, j = pf.find_cell_for_x_sect_xz(x_sect, 250.0, 3030.0)
     assert k == 1 and j == 2
+
+
+@pytest.mark.parametrize('grid_fixture', ['s_bend_faulted_grid', 's_bend_k_gap_grid', 'faulted_grid'])
+def test_corner_points_vectorised(grid_fixture, request):
+    grid = request.getfixturevalue(grid_fixture)
+    grid.invalidate_corner_points()
+
+    # generate reference corner points one cell at a time
+    expected = np.empty((grid.nk, grid.nj, grid.ni, 2, 2, 2, 3))
+    for k in range(grid.nk):
+        for j in range(grid.nj):
+            for i in range(grid.ni):
+                expected[k, j, i] = pf.corner_points(grid, cell_kji0 = (k, j, i))
+    assert not hasattr(grid, 'array_corner_points')
+
+    # layer range without caching
+    k_end = min(3, grid.nk)
+    cp_layers = grid.corner_points_for_layers(1, k_end, dtype = np.float32)
+    assert cp_layers.dtype == np.float32
+    assert not hasattr(grid, 'array_corner_points')
+    np.testing.assert_array_almost_equal(cp_layers, expected[1:k_end], decimal = 2)
+
+    # full array, cached
+    cp = grid.corner_points()
+    assert cp.shape == (grid.nk, grid.nj, grid.ni, 2, 2, 2, 3)
+    np.testing.assert_array_almost_equal(cp, expected)
+    assert grid.corner_points_for_layers(1, k_end) is not None
+
+    # float32 option
+    grid.invalidate_corner_points()
+    cp32 = grid.corner_points(dtype = np.float32)
+    assert cp32.dtype == np.float32
+    np.testing.assert_array_almost_equal(cp32, expected, decimal = 2)
+
+
+@pytest.mark.parametrize('grid_fixture', ['faulted_grid', 's_bend_faulted_grid', 's_bend_k_gap_grid'])
+def test_find_cells_for_points_xy(grid_fixture, request):
+    grid = request.getfixturevalue(grid_fixture)
+    cp = grid.corner_points()
+    xy = cp[..., :2].reshape((-1, 2))
+    lo = np.nanmin(xy, axis = 0) - 10.0
+    hi = np.nanmax(xy, axis = 0) + 10.0
+    points = np.random.default_rng(7).uniform(lo, hi, size = (300, 2))
+
+    for k0 in (0, grid.nk - 1):
+        for vertical_ref in ('top', 'base'):
+            ji = grid.find_cells_for_points_xy(points, k0 = k0, vertical_ref = vertical_ref)
+            assert ji.shape == (300, 2)
+            assert np.any(ji[:, 0] >= 0)
+            for p, (j, i) in zip(points, ji):
+                expected = grid.find_cell_for_point_xy(p[0], p[1], k0 = k0, vertical_ref = vertical_ref)
+                # where cells overlap in xy, a different containing cell may be found; the single point search only
+                # checks the cells around the nearest pillar, so might not find a cell that the indexed search does
+                if expected[0] is not None:
+                    assert j >= 0 and i >= 0
+                if j >= 0:
+                    poly = grid.poly_line_for_cell((k0, j, i), vertical_ref = vertical_ref)
+                    assert pip.pip_cn(p, poly)
+                else:
+                    assert i == -1
+    assert (grid.nk - 1, 'base') in grid.xy_cell_index_cache
+    grid.invalidate_corner_points()
+    assert not hasattr(grid, 'xy_cell_index_cache')
+
+
+@pytest.mark.parametrize('grid_fixture', ['faulted_grid', 's_bend_faulted_grid'])
+def test_find_cells_for_points_xyz(grid_fixture, request):
+    grid = request.getfixturevalue(grid_fixture)
+    thick = grid.thickness()
+    centres = grid.centre_point()
+    kji = grid.find_cells_for_points_xyz(centres)
+    assert kji.shape == centres.shape
+    expected = np.stack(np.meshgrid(np.arange(grid.nk), np.arange(grid.nj), np.arange(grid.ni), indexing = 'ij'),
+                        axis = -1)
+    thick_enough = thick > 0.01
+    assert np.all(kji[thick_enough] == expected[thick_enough])
+
+    # points outside the grid are not found
+    outside = np.array([[-1.0e6, -1.0e6, 0.0], [0.0, 0.0, -1.0e6]])
+    assert np.all(grid.find_cells_for_points_xyz(outside) == -1)
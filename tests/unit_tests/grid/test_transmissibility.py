@@ -0,0 +1,124 @@
+import h5py
+import numpy as np
+import pytest
+
+from resqpy.grid import Grid
+import resqpy.olio.transmission as rqtr
+import resqpy.property as rqp
+
+
+def _add_static_properties(grid):
+    model = grid.model
+    if grid.uuid is None or model.part_for_uuid(grid.uuid) is None:
+        grid.write_hdf5()
+        grid.create_xml()
+    rng = np.random.default_rng(1234)
+    shape = tuple(grid.extent_kji)
+    rqp.Property.from_array(model,
+                            0.5 + 0.5 * rng.random(shape),
+                            source_info = 'random',
+                            keyword = 'NTG',
+                            support_uuid = grid.uuid,
+                            property_kind = 'net to gross ratio',
+                            indexable_element = 'cells',
+                            uom = 'm3/m3')
+    for axis in 'KJI':
+        rqp.Property.from_array(model,
+                                1.0 + 500.0 * rng.random(shape),
+                                source_info = 'random',
+                                keyword = 'PERM' + axis,
+                                support_uuid = grid.uuid,
+                                property_kind = 'rock permeability',
+                                facet_type = 'direction',
+                                facet = axis,
+                                indexable_element = 'cells',
+                                uom = 'mD')
+
+
+@pytest.mark.parametrize('grid_fixture', ['s_bend_grid', 's_bend_faulted_grid', 's_bend_k_gap_grid'])
+def test_layer_blocked_transmissibility(grid_fixture, request):
+    grid = request.getfixturevalue(grid_fixture)
+    model = grid.model
+    _add_static_properties(grid)
+
+    # reference values computed in memory
+    full_grid = Grid(model, uuid = grid.uuid)
+    expected = full_grid.transmissibility(use_tr_properties = False)
+    expected_half_t = full_grid.half_cell_transmissibility(use_property = False)
+
+    # layer blocked computation from a fresh grid object, without caching the points
+    blocked_grid = Grid(model, uuid = grid.uuid)
+    blocked_grid.uncache_points()
+    uuids = blocked_grid.layer_blocked_transmissibility(layer_block_size = 2, include_half_cell_t = True)
+    assert len(uuids) == 4
+    assert blocked_grid.points_cached is None
+    assert not hasattr(blocked_grid, 'array_half_cell_t')
+    for uuid, facet, expected_tr in zip(uuids[:3], 'KJI', expected):
+        prop = rqp.Property(model, uuid = uuid)
+        assert prop.property_kind() == 'transmissibility'
+        assert prop.facet() == facet
+        assert prop.indexable_element() == 'faces'
+        tr = prop.array_ref()
+        assert tr.dtype == np.float64
+        np.testing.assert_array_almost_equal(tr, expected_tr)
+        assert np.isclose(prop.minimum_value(), np.min(expected_tr))
+        assert np.isclose(prop.maximum_value(), np.max(expected_tr))
+    half_t_prop = rqp.Property(model, uuid = uuids[3])
+    assert half_t_prop.indexable_element() == 'faces per cell'
+    gpc = rqp.GridPropertyCollection()
+    gpc.set_grid(blocked_grid)
+    np.testing.assert_array_almost_equal(gpc.combobulated_face_array(half_t_prop.array_ref()), expected_half_t)
+
+    # the new properties are picked up by the in memory methods
+    check_grid = Grid(model, uuid = grid.uuid)
+    np.testing.assert_array_almost_equal(check_grid.half_cell_transmissibility(), expected_half_t)
+    for tr, expected_tr in zip(check_grid.transmissibility(), expected):
+        np.testing.assert_array_almost_equal(tr, expected_tr)
+
+
+def test_layer_blocked_transmissibility_float32_passed_arrays(s_bend_faulted_grid):
+    grid = s_bend_faulted_grid
+    model = grid.model
+    grid.write_hdf5()
+    grid.create_xml()
+    shape = tuple(grid.extent_kji)
+    perm_k = np.full(shape, 12.5)
+    perm_j = np.linspace(10.0, 200.0, num = grid.nk * grid.nj * grid.ni).reshape(shape)
+    perm_i = perm_j[::-1].copy()
+
+    full_grid = Grid(model, uuid = grid.uuid)
+    half_t = rqtr.half_cell_t(full_grid, perm_k = perm_k, perm_j = perm_j, perm_i = perm_i, ntg = 0.8)
+
+    # an unrelated hdf5 file held open in the model's pool is left open
+    model.h5_set_pool_size(4)
+    other_h5 = model.epc_file[:-4] + '_other.h5'
+    h5py.File(other_h5, 'w').close()
+    other_fp = model.h5_access(mode = 'r', file_path = other_h5, override = 'none')
+
+    blocked_grid = Grid(model, uuid = grid.uuid)
+    uuids = blocked_grid.layer_blocked_transmissibility(layer_block_size = 3,
+                                                        perm_k = perm_k,
+                                                        perm_j = perm_j,
+                                                        perm_i = perm_i,
+                                                        ntg = 0.8,
+                                                        dtype = np.float32,
+                                                        realization = 3)
+    assert len(uuids) == 3
+    assert other_fp.id.valid and other_fp in model.h5_open_files.values()
+    props = [rqp.Property(model, uuid = uuid) for uuid in uuids]
+    for prop in props:
+        ext_uuid, h5_path = prop.collection.h5_key_pair_for_part(prop.part)
+        assert model.h5_access(uuid = ext_uuid)[h5_path].dtype == np.float32
+    k_tr, j_tr, i_tr = [prop.array_ref() for prop in props]
+    assert props[0].realization() == 3
+    assert k_tr.shape == (grid.nk + 1, grid.nj, grid.ni)
+    assert np.all(k_tr[0] == 0.0) and np.all(k_tr[-1] == 0.0)
+    assert np.all(j_tr[:, 0] == 0.0) and np.all(j_tr[:, -1] == 0.0)
+    assert np.all(i_tr[:, :, 0] == 0.0) and np.all(i_tr[:, :, -1] == 0.0)
+    expected_k = 1.0 / (1.0 / half_t[:-1, :, :, 0, 1] + 1.0 / half_t[1:, :, :, 0, 0])
+    np.testing.assert_allclose(k_tr[1:-1], np.nan_to_num(expected_k, nan = 0.0), rtol = 1.0e-6)
+    # column faces with a split pillar are left at zero
+    split_j, split_i = blocked_grid.split_column_faces()
+    assert np.any(split_i)
+    assert np.all(i_tr[:, :, 1:-1][:, split_i] == 0.0)
+    assert np.any(i_tr[:, :, 1:-1][:, np.logical_not(split_i)] > 0.0)
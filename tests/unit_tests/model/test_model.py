@@ -1,4 +1,5 @@
 import os
+import zipfile
 
 import numpy as np
 import pytest
@@ -676,6 +677,172 @@ def test_without_full_load(example_model_with_prop_ts_rels):
     assert rqet.find_tag(crs_root, 'VerticalUom') is not None
 
 
+def test_lazy_load(example_model_with_properties):
+    epc = example_model_with_properties.epc_file
+    full_model = rq.Model(epc)
+    grid_uuid = full_model.uuid(obj_type = 'IjkGridRepresentation')
+    # open model with lazy loading of xml
+    model = rq.Model(epc_file = epc, lazy_load = True)
+    assert model.lazy_load_pending
+    assert model.epc_zip is not None
+    assert all(tree is None for (_, _, tree) in model.parts_forest.values())
+    assert len(model.uuid_rels_dict) == 0
+    assert model.crs_uuid is not None
+    # accessing one part parses only that part and adds its references
+    grid = grr.Grid(model, uuid = grid_uuid, find_properties = False)
+    assert grid.nk == 3
+    assert model.tree_for_part(model.part_for_uuid(grid_uuid)) is not None
+    assert any(tree is None for (_, _, tree) in model.parts_forest.values())
+    assert model.uuids_as_int_referenced_by_uuid(grid_uuid) == full_model.uuids_as_int_referenced_by_uuid(grid_uuid)
+    assert model.lazy_load_pending
+    # a related uuid query over a filtered list of parts only parses those parts
+    for mode in (None, 0, 1, 2):
+        lazy_parts = model.parts(obj_type = 'DiscreteProperty', related_uuid = grid_uuid, related_mode = mode)
+        full_parts = full_model.parts(obj_type = 'DiscreteProperty', related_uuid = grid_uuid, related_mode = mode)
+        assert lazy_parts == full_parts
+    assert model.lazy_load_pending
+    # a query needing reverse relationships completes the load
+    assert model.uuids_as_int_related_to_uuid(grid_uuid) == full_model.uuids_as_int_related_to_uuid(grid_uuid)
+    assert not model.lazy_load_pending
+    assert model.epc_zip is None
+    assert model.uuid_rels_dict == full_model.uuid_rels_dict
+    model.check_catalogue_dictionaries()
+
+
+def test_lazy_load_store(example_model_with_properties):
+    epc = example_model_with_properties.epc_file
+    parts = rq.Model(epc).parts(sort_by = 'uuid')
+    model = rq.Model(epc_file = epc, lazy_load = True)
+    assert len(model.titles(title = 'Zone')) == 2
+    model.store_epc()
+    assert not model.lazy_load_pending
+    model = rq.Model(epc)
+    assert model.parts(sort_by = 'uuid') == parts
+
+
+def _epc_members(epc):
+    with zipfile.ZipFile(epc) as z:
+        return dict((name, z.read(name)) for name in z.namelist())  # last member wins for duplicated names
+
+
+def test_incremental_store(example_model_with_properties, tmp_path):
+    epc = example_model_with_properties.epc_file
+    for lazy in [False, True]:
+        model = rq.Model(epc, lazy_load = lazy)
+        assert model.modified_parts == set()
+        grid = model.grid()
+        rqp.Property.from_array(model,
+                                np.full((3, 5, 5), 7.0),
+                                source_info = 'test',
+                                keyword = f'new {lazy}',
+                                support_uuid = grid.uuid,
+                                property_kind = 'length',
+                                uom = 'm')
+        new_part = model.part(title = f'new {lazy}')
+        assert new_part in model.modified_parts
+        assert rqet.rels_part_name_for_part(model.part(uuid = grid.uuid)) in model.modified_parts
+        # in place edit of an existing part, flagged explicitly
+        zone_part = model.parts(obj_type = 'DiscreteProperty')[0]
+        zone_root = model.root_for_part(zone_part)
+        rqet.find_nested_tags(zone_root, ['Citation', 'Title']).text = f'Layer {lazy}'
+        model.set_modified(part = zone_part)
+        assert zone_part in model.modified_parts
+
+        # appending leaves superseded copies in the epc until compacted
+        model.store_epc(incremental = True, compact = False)
+        assert model.modified_parts == set() and not model.modified
+        with zipfile.ZipFile(epc) as z:
+            names = z.namelist()
+        assert len(names) > len(set(names))
+        reloaded = rq.Model(epc)
+        assert reloaded.part(title = f'Layer {lazy}') == zone_part
+        assert reloaded.part(title = f'new {lazy}') == new_part
+        assert len(reloaded.parts()) == len(model.parts())
+
+        # compacting store, with a removed part
+        model.remove_part(zone_part)
+        model.store_epc(incremental = True)
+        with zipfile.ZipFile(epc) as z:
+            names = z.namelist()
+        assert len(names) == len(set(names))
+        assert zone_part not in names
+        full_epc = os.path.join(tmp_path, f'full_{lazy}.epc')
+        rq.Model(epc).store_epc(full_epc)
+        assert _epc_members(epc) == _epc_members(full_epc)
+        epc_model = rq.Model(epc)
+        assert epc_model.parts(sort_by = 'uuid') == model.parts(sort_by = 'uuid')
+        epc_model.check_catalogue_dictionaries()
+
+        # serialized xml of parts written incrementally is retained, until the part is modified
+        assert new_part in model.part_xml_bytes
+        copy_epc = os.path.join(tmp_path, f'copy_{lazy}.epc')
+        model.store_epc(copy_epc, incremental = True)
+        assert _epc_members(copy_epc) == _epc_members(full_epc)
+        model.set_modified(part = new_part)
+        assert new_part not in model.part_xml_bytes
+
+    # unknown modifications, or an epc changed on disc, lead to a full rewrite
+    model = rq.Model(epc)
+    model.set_modified()
+    assert model.modified_parts is None
+    model.store_epc(incremental = True)
+    assert model.modified_parts == set()
+    rq.Model(epc).store_epc()
+    model.set_modified(part = model.parts()[0])
+    model.store_epc(incremental = True, compact = False)
+    with zipfile.ZipFile(epc) as z:
+        names = z.namelist()
+    assert len(names) == len(set(names))
+
+
+def test_incremental_store_after_in_place_metadata_edit(example_model_with_properties):
+    epc = example_model_with_properties.epc_file
+    model = rq.Model(epc)
+    grid_part = model.part(obj_type = 'IjkGridRepresentation')
+    # in place edit of an existing part, flagged via the catalogue invalidation hook
+    rqet.create_metadata_xml(model.root_for_part(grid_part), {'edited': 'true'})
+    model.invalidate_catalogue_index(grid_part)
+    assert grid_part in model.modified_parts
+    model.store_epc(incremental = True)
+    assert rqet.load_metadata_from_xml(rq.Model(epc).root_for_part(grid_part)).get('edited') == 'true'
+    model.remove_extra_metadata(model.uuid_for_part(grid_part))
+    assert grid_part in model.modified_parts
+    model.store_epc(incremental = True)
+    assert not rqet.load_metadata_from_xml(rq.Model(epc).root_for_part(grid_part))
+
+
+def test_catalogue_index(example_model_with_properties):
+    model = example_model_with_properties
+    epc = model.epc_file
+    zone_parts = model.parts(obj_type = 'DiscreteProperty', title = 'Zone')
+    assert len(zone_parts) == 1
+    zone_part = zone_parts[0]
+    assert zone_part in model.catalogue_index
+    # check index is updated when part xml is patched
+    zone_root = model.root_for_part(zone_part)
+    rqet.find_nested_tags(zone_root, ['Citation', 'Title']).text = 'Layer'
+    model.patch_root_for_part(zone_part, zone_root)
+    assert len(model.parts(obj_type = 'DiscreteProperty', title = 'Zone')) == 0
+    assert model.titles(parts_list = zone_parts) == ['Layer']
+    # write sidecar and check it is used when reopening, including for a lazy load
+    model.store_epc(catalogue_index = True)
+    assert os.path.exists(epc[:-4] + '_catalogue.json')
+    for lazy in [False, True]:
+        model = rq.Model(epc, lazy_load = lazy)
+        assert len(model.catalogue_index) == len(model.parts())
+        assert model.parts(title = 'Layer') == zone_parts
+        titles = model.titles(obj_type = 'DiscreteProperty', sort_by = 'title')
+        assert len(titles) > 1 and titles == sorted(titles)
+        if lazy:
+            assert all(tree is None for (_, _, tree) in model.parts_forest.values())
+    # check that an out of date sidecar is ignored
+    model = rq.Model(epc)
+    model.store_epc()
+    model = rq.Model(epc)
+    assert len(model.catalogue_index) == 0
+    assert model.parts(title = 'Layer') == zone_parts
+
+
 def test_forestry(example_model_with_prop_ts_rels):
     model = example_model_with_prop_ts_rels
     full_parts_list = model.parts()
@@ -737,6 +904,37 @@ def test_h5_array_element(example_model_with_properties):
     assert zone == 2
 
 
+def test_h5_pool(tmp_path):
+    epc = os.path.join(tmp_path, 'pool.epc')
+    model = rq.new_model(epc)
+    h5_files = [os.path.join(tmp_path, f'pool_{i}.h5') for i in range(3)]
+    for i, h5_file in enumerate(h5_files):
+        h5_root = model.h5_access(mode = 'w', file_path = h5_file, override = 'none')
+        h5_root.create_dataset('a', data = np.full((3, 4), i, dtype = int))
+    # default pool size of one retains only most recently accessed file
+    assert len(model.h5_open_files) == 1
+    model.h5_release()
+    assert len(model.h5_open_files) == 0
+    model.h5_set_pool_size(2)
+    for _ in range(2):
+        for i, h5_file in enumerate(h5_files):
+            h5_root = model.h5_access(file_path = h5_file, override = 'none', rdcc_nbytes = 2**20)
+            assert np.all(h5_root['a'][:] == i)
+            assert len(model.h5_open_files) <= 2
+    assert [key[0] for key in model.h5_open_files.keys()] == [os.path.realpath(f) for f in h5_files[1:]]
+    # accessing a file in a different mode replaces the handle
+    h5_root = model.h5_access(mode = 'a', file_path = h5_files[2], override = 'none')
+    h5_root.create_dataset('b', data = np.zeros(5))
+    assert list(model.h5_open_files.keys())[-1][1] == 'a'
+    assert len(model.h5_open_files) == 2
+    # release of a single file
+    model.h5_release(file_path = h5_files[1])
+    assert len(model.h5_open_files) == 1
+    model.h5_set_pool_size(1)
+    model.h5_release()
+    assert len(model.h5_open_files) == 0
+
+
 def add_grids(model, crs, add_lengths):
     grid_a = grr.RegularGrid(model,
                              extent_kji = (2, 2, 2),
@@ -891,6 +1089,57 @@ def test_uuid_consolidation(tmp_path):
     assert len(combined_model.uuids(obj_type = 'IjkGridRepresentation', related_uuid = crs_uuid)) == 3
 
 
+def test_consolidation_key_index(tmp_path):
+    resident = rq.new_model(f"{tmp_path}/resident.epc")
+    immigrant = rq.new_model(f"{tmp_path}/immigrant.epc")
+    for model in (resident, immigrant):
+        for i in range(5):
+            rqp.PropertyKind(model, title = f'kind {i}', parent_property_kind = 'length').create_xml()
+        for x_offset in (0.0, 100.0):
+            crs = rqc.Crs(model, x_offset = x_offset, z_inc_down = True)
+            crs.create_xml()
+    # crs with a different offset shares an equivalence key, but is not equivalent
+    odd_crs = rqc.Crs(immigrant, x_offset = 50.0, z_inc_down = True)
+    odd_crs.create_xml()
+    assert odd_crs.equivalence_key() == rqc.Crs(resident, x_offset = 0.0).equivalence_key()
+
+    consolidation = cons.Consolidation(resident)
+    for uuid in immigrant.uuids(obj_type = 'PropertyKind'):
+        resident_uuid = consolidation.equivalent_uuid_for_part(immigrant.part_for_uuid(uuid),
+                                                               immigrant_model = immigrant)
+        assert resident_uuid is not None
+        assert rqp.PropertyKind(resident, uuid = resident_uuid) == rqp.PropertyKind(immigrant, uuid = uuid)
+        assert rqp.PropertyKind(resident, uuid = resident_uuid).title == rqp.PropertyKind(immigrant, uuid = uuid).title
+    for uuid in immigrant.uuids(obj_type = 'LocalDepth3dCrs'):
+        resident_uuid = consolidation.equivalent_uuid_for_part(immigrant.part_for_uuid(uuid),
+                                                               immigrant_model = immigrant)
+        if bu.matching_uuids(uuid, odd_crs.uuid):
+            assert resident_uuid is None
+        else:
+            assert rqc.Crs(resident, uuid = resident_uuid) == rqc.Crs(immigrant, uuid = uuid)
+
+    # parts added to the resident model after indexing are found
+    late_pk = rqp.PropertyKind(resident, title = 'late kind', parent_property_kind = 'area')
+    late_pk.create_xml()
+    immigrant_pk = rqp.PropertyKind(immigrant, title = 'late kind', parent_property_kind = 'area')
+    immigrant_pk.create_xml()
+    resident_uuid = consolidation.equivalent_uuid_for_part(immigrant_pk.part, immigrant_model = immigrant)
+    assert bu.matching_uuids(resident_uuid, late_pk.uuid)
+
+    # resident parts edited in place after indexing are compared using their current xml
+    edited_uuid = resident.uuid(obj_type = 'PropertyKind', title = 'kind 0')
+    edited_part = resident.part_for_uuid(edited_uuid)
+    rqet.find_nested_tags(resident.root_for_part(edited_part), ['Citation', 'Title']).text = 'edited kind'
+    resident.set_modified(part = edited_part)
+    stale_pk = rqp.PropertyKind(immigrant, title = 'kind 0', parent_property_kind = 'length')
+    stale_pk.create_xml(reuse = False)
+    assert consolidation.equivalent_uuid_for_part(stale_pk.part, immigrant_model = immigrant) is None
+    edited_pk = rqp.PropertyKind(immigrant, title = 'edited kind', parent_property_kind = 'length')
+    edited_pk.create_xml()
+    resident_uuid = consolidation.equivalent_uuid_for_part(edited_pk.part, immigrant_model = immigrant)
+    assert bu.matching_uuids(resident_uuid, edited_uuid)
+
+
 def test_untitled(tmp_path):
     epc = os.path.join(tmp_path, 'test_untitled.epc')
     model = rq.new_model(epc)
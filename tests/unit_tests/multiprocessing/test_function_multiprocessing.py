@@ -1,8 +1,13 @@
 import pytest
 import os
+import numpy as np
+from numpy.testing import assert_array_almost_equal
 
+import resqpy.crs as rqc
 import resqpy.model as rq
+import resqpy.olio.xml_et as rqet
 import resqpy.organize as rqo
+import resqpy.surface as rqs
 import resqpy.multi_processing._multiprocessing as rqmp
 
 
@@ -35,3 +40,60 @@ def test_fn_multiprocessing(tmp_path):
     names = m.titles(obj_type = 'OrganizationFeature')
     assert len(names) == n
     assert all([t.startswith('structure') for t in names])
+
+
+def make_point_set(index, parent_tmp_dir, in_memory = False, separate_h5 = False):
+    epc = os.path.join(parent_tmp_dir, f'mp_ps_test_{index}.epc')
+    model = rq.new_model(epc)
+    crs = rqc.Crs(model)
+    crs.create_xml()
+    ps = rqs.PointSet(model,
+                      points_array = np.full((5, 3), float(index)),
+                      crs_uuid = crs.uuid,
+                      title = f'point set {index}')
+    ext_uuid = None
+    h5_file = None
+    if separate_h5:  # write the arrays to an hdf5 file other than the main one for the model
+        model.h5_set_default_override('dir')  # honour the hdf5 file names of the external part references
+        model.create_hdf5_ext()  # main hdf5 external part reference, not used for the point set
+        h5_file = os.path.join(parent_tmp_dir, f'mp_ps_test_{index}_extra.h5')
+        ext_uuid = rqet.uuid_for_part_root(model.create_hdf5_ext(file_name = h5_file))
+    ps.write_hdf5(file_name = h5_file)
+    ps.create_xml(ext_uuid = ext_uuid)
+    if in_memory:
+        return (index, True, model, [ps.uuid])
+    model.store_epc()
+    return (index, True, epc, [ps.uuid])
+
+
+@pytest.mark.parametrize('backend, max_workers, in_memory, separate_h5', [('dask', None, False, False),
+                                                                          ('local', 2, False, False),
+                                                                          ('local', 2, True, False),
+                                                                          ('local', 2, False, True),
+                                                                          ('local', 2, True, True)])
+def test_fn_multiprocessing_recombination(tmp_path, backend, max_workers, in_memory, separate_h5):
+    combo_epc = str(tmp_path / 'combo.epc')
+    n = 4
+    args_list = [{'in_memory': in_memory, 'separate_h5': separate_h5} for _ in range(n)]
+    good = rqmp.function_multiprocessing(make_point_set,
+                                         kwargs_list = args_list,
+                                         recombined_epc = combo_epc,
+                                         cluster = None,
+                                         consolidate = True,
+                                         require_success = True,
+                                         tmp_dir_path = tmp_path,
+                                         backend = backend,
+                                         max_workers = max_workers)
+    assert len(good) == n
+    assert all(good)
+    m = rq.Model(combo_epc)
+    # the identical crs objects are consolidated into one
+    assert len(m.uuids(obj_type = 'LocalDepth3dCrs')) == 1
+    ps_uuids = m.uuids(obj_type = 'PointSetRepresentation')
+    assert len(ps_uuids) == n
+    for ps_uuid in ps_uuids:
+        ps = rqs.PointSet(m, uuid = ps_uuid)
+        index = int(ps.title.split()[-1])
+        assert_array_almost_equal(ps.full_array_ref(), np.full((5, 3), float(index)))
+        assert m.uuid(obj_type = 'LocalDepth3dCrs', related_uuid = ps_uuid) is not None
+        assert m.h5_uuid().int in m.uuid_rels_dict[ps_uuid.int][2]  # relationship with hdf5 ext part
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+import resqpy.olio.load_data as ld
+
+
+def _write(tmp_path, text):
+    file_name = os.path.join(tmp_path, 'data.dat')
+    with open(file_name, 'w') as fp:
+        fp.write(text)
+    return file_name
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7])
+def test_load_array_from_ascii_file_repeats_and_comments(tmp_path, chunk_size):
+    # Arrange
+    text = '! header comment\nC another comment\nPORO\n 0.1 0.2 3*0.25 ! trailing comment\nc\n  0.3\t2*0.35\n0.4\n'
+    file_name = _write(tmp_path, text)
+    expected = np.array([0.1, 0.2, 0.25, 0.25, 0.25, 0.3, 0.35, 0.35, 0.4])
+
+    # Act
+    a = ld.load_array_from_ascii_file(file_name, keyword = 'PORO', chunk_size = chunk_size)
+    b = ld.load_array_from_ascii_file(file_name,
+                                      extent = (3, 3),
+                                      keyword = 'PORO',
+                                      use_32_bit = True,
+                                      chunk_size = chunk_size)
+
+    # Assert
+    assert a.dtype == np.float64 and a.shape == (9,)
+    np.testing.assert_array_almost_equal(a, expected)
+    assert b.dtype == np.float32 and b.shape == (3, 3)
+    np.testing.assert_array_almost_equal(b, expected.reshape((3, 3)))
+
+
+def test_load_array_from_ascii_file_int_and_bool(tmp_path):
+    # Arrange
+    file_name = _write(tmp_path, '1 0 3*1\n0\n')
+
+    # Act
+    i64 = ld.load_array_from_ascii_file(file_name, data_type = 'integer')
+    i32 = ld.load_array_from_ascii_file(file_name, extent = (2, 3), data_type = 'int', use_32_bit = True)
+    b = ld.load_array_from_file(file_name, extent = (6,), data_type = 'bool', comment_char = '!')
+
+    # Assert
+    assert i64.dtype == np.int64 and i32.dtype == np.int32 and b.dtype == bool
+    np.testing.assert_array_equal(i64, (1, 0, 1, 1, 1, 0))
+    np.testing.assert_array_equal(i32, ((1, 0, 1), (1, 1, 0)))
+    np.testing.assert_array_equal(b, (True, False, True, True, True, False))
+
+
+def test_load_array_from_ascii_file_bad_data(tmp_path):
+    with pytest.raises(AssertionError):
+        ld.load_array_from_ascii_file(_write(tmp_path, '1.0 2.0 3.0\n4.0\n'), extent = (3,))
+    with pytest.raises(AssertionError):
+        ld.load_array_from_ascii_file(_write(tmp_path, '1.0 2*2.0\n'), extent = (4,))
+    with pytest.raises(ValueError):
+        ld.load_array_from_ascii_file(_write(tmp_path, '1.0 2.0 END\n'), extent = (3,))
+    with pytest.raises(ValueError):
+        ld.load_array_from_ascii_file(_write(tmp_path, '1.0 2*\n'), extent = (3,))
+
+
+def test_load_array_from_file_binary_32_bit(tmp_path):
+    # Arrange
+    file_name = _write(tmp_path, '1.5 2*2.5 3.5\n')
+
+    # Act
+    first = ld.load_array_from_file(file_name, extent = (2, 2), use_binary = True, use_32_bit = True)
+    second = ld.load_array_from_file(file_name, extent = (2, 2), use_binary = True, use_32_bit = True)
+
+    # Assert
+    assert os.path.exists(file_name + '.db')
+    assert np.fromfile(file_name + '.db', dtype = np.float64).size == 4
+    for a in (first, second):
+        assert a.dtype == np.float32
+        np.testing.assert_array_equal(a, ((1.5, 2.5), (2.5, 3.5)))
@@ -112,3 +112,76 @@ def test_global_chunks_and_compression(tmp_path):
 
             assert b.shape == a.shape
             assert_array_almost_equal(b, a)
+
+
+def test_threaded_write(tmp_path):
+    epc = os.path.join(tmp_path, 'threaded.epc')
+    model = rq.new_model(epc)
+    rng = np.random.default_rng(13)
+    arrays = {
+        'float': (rng.random((7, 11, 13)), None, 'gzip', (2, 4, 13)),
+        'auto': (rng.random((5, 9, 10)), None, 'gzip', 'auto'),
+        'int64': (rng.integers(-100, 100, size = (6, 5), dtype = np.int64), None, 'gzip', 'slice'),
+        'bool': (rng.random((4, 3, 5)) > 0.5, None, 'lzf', 'all'),
+        'plain': (np.arange(10, dtype = float), None, None, None),
+        'packed': (rng.random((3, 20)) > 0.5, 'pack', 'gzip', 'all')
+    }
+    uuids = {}
+
+    h5_reg = rqwh.H5Register(model)
+    for name, (a, dtype, compression, chunks) in arrays.items():
+        uuids[name] = bu.new_uuid()
+        h5_reg.register_dataset(uuids[name],
+                                'values_patch0',
+                                a,
+                                dtype = dtype,
+                                chunks = chunks,
+                                compression = compression)
+    h5_reg.write(threads = 4, report = True)
+
+    report = h5_reg.write_report
+    assert report is not None
+    assert report['datasets'] == len(arrays)
+    assert report['bytes'] > 0
+
+    h5_root = model.h5_access()
+    for name, (a, dtype, compression, chunks) in arrays.items():
+        dset = h5_root[f'/RESQML/{uuids[name]}/values_patch0']
+        b = np.array(dset)
+        if name == 'packed':
+            b = np.unpackbits(b, axis = -1)[..., :a.shape[-1]].astype(bool)
+        if compression is not None:
+            assert dset.compression == compression
+        if name == 'int64':
+            assert dset.dtype == np.int32
+        if name == 'bool':
+            assert dset.dtype == np.uint8
+        assert b.shape == a.shape
+        assert np.all(b == a)
+    model.h5_release()
+
+
+def test_copy_h5_path_lists(tmp_path):
+
+    expected = {}
+    path_lists = {}
+    for i in range(3):
+        file_in = str(tmp_path / f'source_{i}.h5')
+        with h5py.File(file_in, 'w') as fp:
+            for j in range(2):
+                path = f'/RESQML/{bu.new_uuid()}/values_patch0'
+                a = np.arange(20, dtype = np.float32).reshape((4, 5)) * (i + 1) + j
+                fp.create_dataset(path, data = a, chunks = (2, 5), compression = 'gzip')
+                expected[path] = a
+        path_lists[file_in] = list(expected.keys())[-2:]
+
+    file_out = str(tmp_path / 'combined.h5')
+    assert rqwh.copy_h5_path_lists(path_lists, file_out, mode = 'w') == 6
+    # paths already present are skipped
+    assert rqwh.copy_h5_path_lists(path_lists, file_out) == 0
+
+    with h5py.File(file_out, 'r') as fp:
+        for path, a in expected.items():
+            assert fp[path].compression == 'gzip'
+            assert fp[path].chunks == (2, 5)
+            assert_array_almost_equal(fp[path][()], a)
@@ -1,5 +1,8 @@
+import io
+
 import pytest
 import resqpy.olio.xml_et as rqet
+from resqpy.olio.xml_namespaces import curly_namespace as ns
 
 
 def test_list_obj_references(example_model_with_well):
@@ -49,3 +52,45 @@ def test_print_xml_tree(example_model_with_well):
                                 max_lines = 20,
                                 line_count = 0)
     assert lines == 21
+
+
+def test_xml_bytes():
+    root = rqet.Element(ns['resqml2'] + 'LocalDepth3dCrs')
+    root.set(ns['xsi'] + 'type', ns['resqml2'] + 'obj_LocalDepth3dCrs')
+    root.set('uuid', '5c2c6a2e-2f0e-11ef-8d4e-80e82cd5c9b1')
+    citation = rqet.SubElement(root, ns['eml'] + 'Citation')
+    rqet.SubElement(citation, ns['eml'] + 'Title')
+    description = rqet.SubElement(root, ns['resqml2'] + 'Description')
+    description.text = 'a<b & c>d'
+    expected = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<resqml2:LocalDepth3dCrs xmlns:resqml2="http://www.energistics.org/energyml/data/resqmlv2"'
+                ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:type="resqml2:obj_LocalDepth3dCrs"'
+                ' uuid="5c2c6a2e-2f0e-11ef-8d4e-80e82cd5c9b1">\n'
+                '   <eml:Citation xmlns:eml="http://www.energistics.org/energyml/data/commonv2">\n'
+                '      <eml:Title>untitled</eml:Title>\n'
+                '   </eml:Citation>\n'
+                '   <resqml2:Description>a&lt;b &amp; c&gt;d</resqml2:Description>\n'
+                '</resqml2:LocalDepth3dCrs>\n').encode()
+    tree = rqet.ElementTree(root)
+    assert rqet.xml_bytes(tree, standalone = 'yes') == expected
+    assert rqet.xml_bytes(root, standalone = 'yes') == expected
+    fp = io.BytesIO()
+    assert rqet.write_xml(fp, tree, standalone = 'yes') == 4
+    assert fp.getvalue() == expected
+    # namespaces declared by an ancestor are not repeated
+    fp = io.BytesIO()
+    rqet.write_xml_node(fp, citation, level = 1, namespace_keys = ['eml'])
+    assert fp.getvalue() == b'   <eml:Citation>\n      <eml:Title>untitled</eml:Title>\n   </eml:Citation>\n'
+
+
+def test_xml_bytes_content_types():
+    root = rqet.Element(ns['content_types'] + 'Types')
+    override = rqet.SubElement(root, ns['content_types'] + 'Override')
+    override.set('PartName', 'obj_LocalDepth3dCrs_5c2c6a2e-2f0e-11ef-8d4e-80e82cd5c9b1.xml')
+    override.set('ContentType', 'application/x-resqml+xml;version=2.0;type=obj_LocalDepth3dCrs')
+    expected = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+                '   <Override PartName="/obj_LocalDepth3dCrs_5c2c6a2e-2f0e-11ef-8d4e-80e82cd5c9b1.xml"'
+                ' ContentType="application/x-resqml+xml;version=2.0;type=obj_LocalDepth3dCrs"/>\n'
+                '</Types>\n').encode()
+    assert rqet.xml_bytes(rqet.ElementTree(root)) == expected
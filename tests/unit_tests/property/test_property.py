@@ -768,6 +768,43 @@ def test_h5_slice(example_model_with_properties):
     assert_array_almost_equal(slice, full[-1, -1])
 
 
+def test_cached_part_array_ref_memmap(example_model_with_properties):
+    # Arrange
+    model = example_model_with_properties
+    pc = model.grid().property_collection
+    parts = pc.parts()
+    expected = [np.array(pc.cached_part_array_ref(part)) for part in parts]
+    for part in parts:
+        pc.uncache_part_array(part)
+
+    # Act / Assert
+    for part, a in zip(parts, expected):
+        mm = pc.cached_part_array_ref(part, memmap = True)
+        if a.dtype == bool:
+            assert not isinstance(mm, np.memmap)
+        else:
+            assert isinstance(mm, np.memmap)
+            assert not mm.flags.writeable
+        assert mm.shape == a.shape
+        assert np.all(mm == a)
+        assert pc.cached_part_array_ref(part) is mm
+
+
+def test_grid_points_memmap(example_model_with_properties):
+    # Arrange
+    model = example_model_with_properties
+    grid = model.grid()
+    expected = np.array(grid.points_ref(masked = False))
+    grid.uncache_points()
+
+    # Act
+    points = grid.points_ref(masked = False, memmap = True)
+
+    # Assert
+    assert isinstance(points, np.memmap)
+    assert_array_almost_equal(points, expected)
+
+
 def test_h5_overwrite_slice(example_model_with_properties):
     # Arrange
     model = example_model_with_properties
@@ -3041,3 +3078,200 @@ def test_no_pack_unpack_bits_ni_one(example_model_and_crs):
     b = rqp.Property(model, uuid = bp.uuid).array_ref(dtype = bool)
     assert b is not None and b.shape == shape
     assert np.all(b == brray)
+
+
+def test_stacked_array_ref(tmp_path):
+    epc = os.path.join(tmp_path, 'stack.epc')
+    model = rq.new_model(epc)
+    grid = grr.RegularGrid(model, extent_kji = (3, 4, 5))
+    grid.create_xml()
+    rng = np.random.default_rng(42)
+    for r in (0, 1, 3, 5):
+        rqp.Property.from_array(model,
+                                rng.random((3, 4, 5)),
+                                source_info = 'random',
+                                keyword = 'NTG',
+                                support_uuid = grid.uuid,
+                                property_kind = 'net to gross ratio',
+                                indexable_element = 'cells',
+                                uom = 'm3/m3',
+                                realization = r)
+    rqp.Property.from_array(model,
+                            None,
+                            source_info = 'constant',
+                            keyword = 'NTG',
+                            support_uuid = grid.uuid,
+                            property_kind = 'net to gross ratio',
+                            indexable_element = 'cells',
+                            uom = 'm3/m3',
+                            realization = 4,
+                            const_value = 0.25)
+    pc = rqp.selective_version_of_collection(rqp.PropertyCollection(support = grid),
+                                             property_kind = 'net to gross ratio')
+    assert pc.number_of_parts() == 5
+
+    # rewrite one dataset as chunked and compressed, to be read through h5py
+    ext_uuid, h5_path = pc.h5_key_pair_for_part(pc.singleton(realization = 1))
+    h5_root = model.h5_access(ext_uuid, mode = 'a')
+    a = np.array(h5_root[h5_path])
+    del h5_root[h5_path]
+    h5_root.create_dataset(h5_path, data = a, chunks = (1, 4, 5), compression = 'gzip')
+    model.h5_release()
+
+    expected = pc.realizations_array_ref()
+    for p in pc.parts():
+        pc.uncache_part_array(p)
+    assert expected.shape == (6, 3, 4, 5)
+    assert np.all(np.isnan(expected[2])) and np.all(expected[4] == 0.25)
+    for threads in (1, 4):
+        stack = pc.stacked_array_ref(threads = threads)
+        assert stack.dtype == np.float64
+        np.testing.assert_array_equal(stack, expected)
+    assert not any(hasattr(pc, rqp.property_common._cache_name(p)) for p in pc.parts())
+
+    # without missing realizations, in 32 bit, for a box
+    box = np.array([[1, 0, 2], [2, 2, 4]], dtype = int)
+    stack = pc.stacked_array_ref(fill_missing = False, use_32_bit = True, box = box)
+    assert stack.dtype == np.float32 and stack.shape == (5, 2, 3, 3)
+    np.testing.assert_array_almost_equal(stack, expected[[0, 1, 3, 4, 5], 1:3, 0:3, 2:5])
+
+    # into a preallocated array and a memmap file
+    out = np.zeros((6, 3, 4, 5), dtype = np.float32)
+    assert pc.stacked_array_ref(out = out) is out
+    np.testing.assert_array_almost_equal(out, expected)
+    npy_file = os.path.join(tmp_path, 'stack.npy')
+    stack = pc.stacked_array_ref(memmap_file = npy_file, box = box[:, :1])
+    assert isinstance(stack, np.memmap)
+    stack.flush()
+    np.testing.assert_array_equal(np.load(npy_file), expected[:, 1:3])
+
+    # stacking by facet
+    for facet in 'KJI':
+        rqp.Property.from_array(model,
+                                rng.random((3, 4, 5)),
+                                source_info = 'random',
+                                keyword = 'PERM' + facet,
+                                support_uuid = grid.uuid,
+                                property_kind = 'rock permeability',
+                                facet_type = 'direction',
+                                facet = facet,
+                                indexable_element = 'cells',
+                                uom = 'mD')
+    perm_pc = rqp.selective_version_of_collection(rqp.PropertyCollection(support = grid),
+                                                  property_kind = 'rock permeability')
+    np.testing.assert_array_equal(perm_pc.stacked_array_ref(stack_by = 'facet'), perm_pc.facets_array_ref())
+
+
+def test_parts_table_selection(tmp_path):
+    epc = os.path.join(tmp_path, 'table.epc')
+    model = rq.new_model(epc)
+    grid = grr.RegularGrid(model, extent_kji = (2, 2, 2))
+    grid.create_xml(add_cell_length_properties = False)
+    for r in range(4):
+        for facet in ('I', 'J'):
+            rqp.Property.from_array(model,
+                                    None,
+                                    source_info = 'constant',
+                                    keyword = f'PERM{facet}',
+                                    support_uuid = grid.uuid,
+                                    property_kind = 'rock permeability',
+                                    facet_type = 'direction',
+                                    facet = facet,
+                                    indexable_element = 'cells',
+                                    uom = 'mD',
+                                    realization = r,
+                                    const_value = 100.0 * (r + 1))
+        rqp.Property.from_array(model,
+                                None,
+                                source_info = 'constant',
+                                keyword = 'ZONE',
+                                support_uuid = grid.uuid,
+                                property_kind = 'discrete',
+                                discrete = True,
+                                indexable_element = 'cells',
+                                realization = r,
+                                const_value = r)
+    pc = rqp.PropertyCollection(support = grid)
+    assert pc.number_of_parts() == 12
+    assert pc.parts_table is None
+
+    # selections are made from a columnar table which is reused whilst the collection is unchanged
+    perm_parts = pc.selective_parts_list(property_kind = 'permeability rock', facet = 'J')
+    assert len(perm_parts) == 4
+    assert perm_parts == [p for p in pc.parts() if pc.facet_for_part(p) == 'J']
+    table = pc.parts_table
+    assert table is not None
+    assert pc.singleton(realization = 2, facet = 'none') == pc.singleton(citation_title = 'ZONE', realization = 2)
+    assert pc.singleton(realization = '*', const_value = 300.0, facet = 'I', continuous = True) is not None
+    assert len(pc.selective_parts_list(continuous = False, realization = 3)) == 1
+    assert len(pc.selective_parts_list(title = 'PERM', title_mode = 'starts')) == 8
+    assert len(pc.selective_parts_list(categorical = False)) == 12
+    assert pc.realization_list() == [0, 1, 2, 3]
+    assert pc.facet_list() == ['I', 'J']
+    assert pc.parts_table is table
+
+    # modifying the collection invalidates the table
+    removed_metadata = pc.dict[perm_parts[0]]
+    pc.remove_part_from_dict(perm_parts[0])
+    assert pc.selective_parts_list(property_kind = 'rock permeability', facet = 'J') == perm_parts[1:]
+    assert pc.parts_table is not table
+    pc.patch_min_max_for_part(perm_parts[1], minimum = 1.0, maximum = 2.0)
+    assert pc.parts_table.version != pc.dict.version
+    table = pc.parts_table
+    pc.selective_parts_list(realization = 0)
+    assert pc.parts_table is not table
+    pc.dict |= {perm_parts[0]: removed_metadata}  # in place union is also tracked
+    assert pc.parts_table.version != pc.dict.version
+    assert len(pc.selective_parts_list(realization = 0)) == 3
+    pc.dict = dict(pc.dict)  # an untracked dictionary is still usable, without caching of the table
+    assert pc.time_index_list() == []
+    assert len(pc.selective_parts_list(realization = 0)) == 3
+    assert pc.parts_table is None
+
+
+def test_decoarsen_imported_list(tmp_path):
+    model = rq.new_model(os.path.join(tmp_path, 'decoarsen.epc'))
+    grid = grr.RegularGrid(model, extent_kji = (2, 2, 3))
+    # one coarse cell hosted at (0, 0, 0) covering a 2 x 2 x 2 box; cell (1, 1, 2) inactive for other reasons
+    kid = np.zeros((2, 2, 3), dtype = int)
+    kid[:, :, :2] = -3
+    kid[0, 0, 0] = 0
+    kid[1, 1, 2] = 2
+    grid.inactive = (kid != 0)
+    pv = np.arange(12, dtype = float).reshape((2, 2, 3)) + 8.0
+    dx = np.full((2, 2, 3), 10.0)
+    ntg = np.full((2, 2, 3), 0.5)
+    ntg[0, 0, 0] = 0.8
+    pc = rqp.GridPropertyCollection(grid = grid)
+    pc.add_cached_array_to_imported_list(pv, 'test', 'PV', property_kind = 'pore volume', uom = 'm3')
+    pc.add_cached_array_to_imported_list(dx,
+                                         'test',
+                                         'DX',
+                                         property_kind = 'cell length',
+                                         facet_type = 'direction',
+                                         facet = 'I',
+                                         uom = 'm')
+    pc.add_cached_array_to_imported_list(ntg, 'test', 'NTG', property_kind = 'net to gross ratio', uom = 'm3/m3')
+    pc.add_cached_array_to_imported_list(kid, 'test', 'KID', discrete = True, property_kind = 'discrete')
+
+    decoarsen_array = pc.decoarsen_imported_list()
+
+    expected_hosts = np.array([[[0, 0, 2], [0, 0, 5]], [[0, 0, 8], [0, 0, 11]]], dtype = int)
+    np.testing.assert_array_equal(decoarsen_array, expected_hosts)
+    imported = dict((item[2], pc.__dict__[item[3]]) for item in pc.imported_list)
+    coarse = np.zeros((2, 2, 3), dtype = bool)
+    coarse[:, :, :2] = True
+    np.testing.assert_array_almost_equal(imported['PV'][coarse], 1.0)  # 8.0 shared equally between 8 cells
+    np.testing.assert_array_almost_equal(imported['PV'][:, :, 2], pv[:, :, 2])
+    np.testing.assert_array_almost_equal(imported['DX'][coarse], 5.0)
+    np.testing.assert_array_almost_equal(imported['DX'][:, :, 2], 10.0)
+    np.testing.assert_array_almost_equal(imported['NTG'][coarse], 0.8)
+    np.testing.assert_array_equal(imported['KID'], kid)
+    np.testing.assert_array_equal(grid.inactive, kid == 2)
+
+    # the same redistribution follows from an ICOARS array, with shares derived from the mapping
+    pc = rqp.GridPropertyCollection(grid = grid)
+    pc.add_cached_array_to_imported_list(pv, 'test', 'PV', property_kind = 'pore volume', uom = 'm3')
+    pc.add_cached_array_to_imported_list(expected_hosts + 1, 'test', 'ICOARS', discrete = True)
+    np.testing.assert_array_equal(pc.decoarsen_imported_list(), expected_hosts)
+    np.testing.assert_array_almost_equal(pc.__dict__[pc.imported_list[0][3]][coarse], 1.0)
@@ -1,3 +1,4 @@
+import copy
 import math as maths
 import numpy as np
 from numpy.testing import assert_array_almost_equal
@@ -6,6 +7,7 @@ import resqpy.grid
 import resqpy.grid_surface as rqgs
 import resqpy.lines as rql
 import resqpy.model as rq
+import resqpy.olio.intersection as meet
 import resqpy.olio.uuid as bu
 import resqpy.organize
 import resqpy.surface
@@ -1034,3 +1036,77 @@ def test_resampling(tmp_path):
     assert resampled_name.citation_title == 'testing'
     assert resampled.extra_metadata == {'resampled from surface': str(surf.uuid)}
     assert resampled_name.extra_metadata == {'resampled from surface': str(surf.uuid)}
+
+
+@pytest.mark.parametrize('steep', [False, True])
+def test_line_set_intersections(tmp_model, steep):
+    # build a wavy surface, or a steep one resembling a fault, from an irregular mesh
+    rng = np.random.default_rng(1234)
+    nj, ni = 21, 31
+    mesh_xyz = np.zeros((nj, ni, 3))
+    mesh_xyz[..., 0] = np.arange(ni, dtype = float).reshape((1, ni)) * 50.0
+    mesh_xyz[..., 1] = np.arange(nj, dtype = float).reshape((nj, 1)) * 40.0
+    mesh_xyz[..., 2] = 1000.0 + 30.0 * np.sin(mesh_xyz[..., 0] / 200.0) + rng.random((nj, ni)) * 5.0
+    if steep:
+        # swap y and z, giving a near vertical surface
+        mesh_xyz = mesh_xyz[..., (0, 2, 1)]
+    surf = resqpy.surface.Surface(tmp_model, title = 'wavy')
+    surf.set_from_irregular_mesh(mesh_xyz)
+    t, p = surf.triangles_and_points()
+
+    n_lines = 200
+    line_ps = p[rng.integers(0, len(p), n_lines)] + rng.normal(0.0, 60.0, (n_lines, 3))
+    line_vs = rng.normal(0.0, 1.0, (n_lines, 3)) * np.array((100.0, 100.0, 200.0))
+    line_vs[:20, :2] = 0.0  # include some vertical lines
+    for line_segment in [True, False]:
+        lines, triangles, xyz = surf.line_set_intersections(line_ps, line_vs, line_segment = line_segment)
+        all_intersects = meet.line_set_triangles_intersects(line_ps, line_vs, p[t], line_segment = line_segment)
+        expected_lines, expected_triangles, expected_xyz = meet.distilled_intersects(all_intersects)
+        assert len(expected_lines) > 0
+        np.testing.assert_array_equal(lines, expected_lines)
+        np.testing.assert_array_equal(triangles, expected_triangles)
+        assert_array_almost_equal(xyz, expected_xyz)
+
+    # single line queries, using the same cached index
+    index = surf.xy_triangle_index()
+    for i in range(20):
+        xyz = surf.line_intersection(line_ps[i], line_vs[i])
+        expected = meet.line_triangles_intersects(line_ps[i], line_vs[i], p[t])
+        expected_indices = meet.intersects_indices(expected)
+        if len(expected_indices) == 0:
+            assert xyz is None
+        else:
+            assert_array_almost_equal(xyz, expected[expected_indices[0]])
+    assert surf.xy_triangle_index() is index
+
+
+def test_trajectory_intersections_with_indexed_surface(example_model_with_well):
+    model, _, _, traj = example_model_with_well
+    mesh_xyz = np.zeros((11, 11, 3))
+    mesh_xyz[..., 0] = np.linspace(-500.0, 500.0, 11).reshape((1, 11))
+    mesh_xyz[..., 1] = np.linspace(-500.0, 500.0, 11).reshape((11, 1))
+    mesh_xyz[..., 2] = 1000.0 + 0.1 * mesh_xyz[..., 0]
+    surf = resqpy.surface.Surface(model, title = 'tilted')
+    surf.set_from_irregular_mesh(mesh_xyz)
+
+    results = rqgs.find_intersections_of_trajectory_with_surface([traj, traj], surf)
+    assert len(results) == 2
+    for triangle_indices, xyz in results:
+        assert triangle_indices is not None
+        assert_array_almost_equal(xyz[0], (0.0, 0.0, 1000.0))
+
+    xyz, segment, tri = rqgs.find_first_intersection_of_trajectory_with_surface(traj, surf)
+    assert_array_almost_equal(xyz, (0.0, 0.0, 1000.0))
+    assert segment == 1
+    assert tri in results[0][0]
+
+    # empty list, and trajectories without any segments
+    assert rqgs.find_intersections_of_trajectory_with_surface([], surf) == []
+    stub = copy.copy(traj)
+    stub.control_points = traj.control_points[:1].copy()
+    stub.knot_count = 1
+    results = rqgs.find_intersections_of_trajectory_with_surface([stub, traj, stub], surf)
+    assert results[0] == (None, None) and results[2] == (None, None)
+    assert_array_almost_equal(results[1][1][0], (0.0, 0.0, 1000.0))
+    assert rqgs.find_intersections_of_trajectory_with_surface([stub], surf) == [(None, None)]
+    assert rqgs.find_intersections_of_trajectory_with_surface(stub, surf) == (None, None)
@@ -385,3 +385,106 @@ def test_shadow_from_faces_flat_surface_k_hole():
         [[2, 2, 2], [2, 0, 2], [3, 2, 2]],
         [[2, 2, 2], [2, 0, 2], [2, 2, 2]],
     ]))
+
+
+def test_blocked_wells_from_trajectories(example_model_and_crs):
+    import pandas as pd
+    import resqpy.grid as grr
+    import resqpy.well as rqw
+
+    # --------- Arrange ----------
+    model, crs = example_model_and_crs
+    grid = grr.RegularGrid(model,
+                           extent_kji = (5, 4, 4),
+                           dxyz = (50.0, -50.0, 50.0),
+                           origin = (0.0, 0.0, 100.0),
+                           crs_uuid = crs.uuid,
+                           as_irregular_grid = True)
+    grid.write_hdf5()
+    grid.create_xml(write_geometry = True)
+    trajectories = []
+    for well_index, (x, y) in enumerate([(0.0, 0.0), (60.0, -40.0), (5000.0, 5000.0)]):
+        location = (x, y, -100.0)
+        datum = rqw.MdDatum(parent_model = model, crs_uuid = crs.uuid, location = location)
+        mds = np.array([0.0, 100, 210, 230, 240, 250])
+        well_name = f'WELL_{well_index}'
+        source_dataframe = pd.DataFrame({
+            'MD': mds,
+            'X': [x, x + 25.0, x + 50, x + 75, x + 100, x + 100],
+            'Y': [y, y + 25.0, y - 50, y - 75, y - 100, y - 100],
+            'Z': mds * 1.03 - 100.0,
+            'WELL': [well_name] * 6
+        })
+        trajectory = rqw.Trajectory(parent_model = model,
+                                    data_frame = source_dataframe,
+                                    well_name = well_name,
+                                    md_datum = datum,
+                                    length_uom = 'm')
+        trajectory.write_hdf5()
+        trajectory.create_xml()
+        trajectories.append(trajectory)
+
+    # --------- Act ----------
+    blocked_wells, report = rqgs.blocked_wells_from_trajectories(grid, trajectories)
+
+    # --------- Assert ----------
+    assert len(blocked_wells) == len(report) == 3
+    assert list(report['SUCCESS']) == [True, True, False]
+    assert list(report['WELL']) == ['WELL_0', 'WELL_1', 'WELL_2']
+    assert blocked_wells[2] is None
+    assert np.all(report['SECONDS'] >= 0.0)
+    for bw, trajectory in zip(blocked_wells[:2], trajectories[:2]):
+        single_bw = rqw.BlockedWell(model, grid = grid, trajectory = trajectory)
+        assert bw.trajectory is trajectory
+        assert bw.cell_count == single_bw.cell_count > 0
+        assert np.all(bw.cell_indices == single_bw.cell_indices)
+        assert np.all(bw.grid_indices == single_bw.grid_indices)
+        assert np.all(bw.face_pair_indices == single_bw.face_pair_indices)
+        np.testing.assert_array_almost_equal(bw.node_mds, single_bw.node_mds)
+    assert list(report['CELLS'][:2]) == [bw.cell_count for bw in blocked_wells[:2]]
+
+
+def test_blocked_wells_from_trajectories_inclined_columns(example_model_and_crs):
+    import pandas as pd
+    import resqpy.grid as grr
+    import resqpy.well as rqw
+
+    # --------- Arrange ----------
+    model, crs = example_model_and_crs
+    grid = grr.RegularGrid(model,
+                           extent_kji = (3, 4, 4),
+                           dxyz = (50.0, 50.0, 50.0),
+                           origin = (0.0, 0.0, 100.0),
+                           crs_uuid = crs.uuid,
+                           as_irregular_grid = True)
+    # strongly inclined columns: the well passes through the middle layer only, away from top and base footprints
+    grid.points_cached[..., 0] += 300.0 * np.arange(4).reshape((4, 1, 1))
+    grid.write_hdf5()
+    grid.create_xml(write_geometry = True)
+    grid = grr.Grid(model, uuid = grid.uuid)
+    x = 550.0
+    datum = rqw.MdDatum(parent_model = model, crs_uuid = crs.uuid, location = (x, 100.0, 0.0))
+    source_dataframe = pd.DataFrame({
+        'MD': [0.0, 400.0],
+        'X': [x, x],
+        'Y': [100.0, 100.0],
+        'Z': [0.0, 400.0],
+        'WELL': ['INCLINED'] * 2
+    })
+    trajectory = rqw.Trajectory(parent_model = model,
+                                data_frame = source_dataframe,
+                                well_name = 'INCLINED',
+                                md_datum = datum,
+                                length_uom = 'm')
+    trajectory.write_hdf5()
+    trajectory.create_xml()
+
+    # --------- Act ----------
+    with_prefilter, report = rqgs.blocked_wells_from_trajectories(grid, [trajectory], column_prefilter = True)
+    without_prefilter, _ = rqgs.blocked_wells_from_trajectories(grid, [trajectory], column_prefilter = False)
+
+    # --------- Assert ----------
+    assert list(report['SUCCESS']) == [True]
+    assert with_prefilter[0] is not None and without_prefilter[0] is not None
+    np.testing.assert_array_equal(with_prefilter[0].cell_indices, without_prefilter[0].cell_indices)
+    assert np.all(with_prefilter[0].cell_indices // 16 == 1)  # all blocked cells in middle layer
@@ -1106,3 +1106,86 @@ def test_add_grid_properties(example_model_and_crs):
 
     assert bw_pc.single_array_ref(property_kind = 'example data continuous').dtype == float
     assert bw_pc.single_array_ref(property_kind = 'example data static').dtype == int
+
+
+def test_dataframe_cell_constraints(example_model_and_crs):
+    # --------- Arrange ----------
+    model, crs = example_model_and_crs
+    grid = grr.RegularGrid(model,
+                           extent_kji = (5, 3, 3),
+                           dxyz = (50.0, -50.0, 50.0),
+                           origin = (0.0, 0.0, 100.0),
+                           crs_uuid = crs.uuid,
+                           set_points_cached = True)
+    grid.write_hdf5()
+    grid.create_xml(write_geometry = True, use_lattice = False)
+    region = np.zeros(grid.extent_kji, dtype = int)
+    region[:, :2] = 1
+    satw = np.linspace(0.0, 1.0, grid.cell_count()).reshape(grid.extent_kji)
+    pc = grid.property_collection
+    pc.add_cached_array_to_imported_list(region, 'unit test', 'region', discrete = True, property_kind = 'region')
+    pc.add_cached_array_to_imported_list(satw,
+                                         'unit test',
+                                         'satw',
+                                         property_kind = 'saturation',
+                                         facet_type = 'what',
+                                         facet = 'water',
+                                         uom = 'm3/m3')
+    pc.write_hdf5_for_imported_list()
+    region_uuid, satw_uuid = pc.create_xml_for_imported_list_and_add_parts_to_model()
+    well_name = 'CONSTRAINED'
+    cell_kji0_list = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 1), (2, 1, 1), (3, 2, 2), (4, 2, 2)])
+    bw = rqw.BlockedWell(model, well_name = well_name, use_face_centres = True)
+    bw.derive_from_cell_list(cell_kji0_list = cell_kji0_list, well_name = well_name, grid = grid)
+    kji0 = grid.denaturalized_cell_indices(bw.cell_indices)
+    max_satw = 0.8
+    max_depth = 250.0
+    expected = np.logical_and(region[tuple(kji0.T)] == 1, satw[tuple(kji0.T)] <= max_satw)
+    expected = np.logical_and(expected, kji0[:, 0] != 0)
+    expected = np.logical_and(expected, grid.centre_point_list(kji0)[:, 2] <= max_depth)
+
+    # --------- Act ----------
+    df = bw.dataframe(extra_columns_list = ['X', 'Y', 'DEPTH'],
+                      region_uuid = region_uuid,
+                      region_list = [1],
+                      satw_uuid = satw_uuid,
+                      max_satw = max_satw,
+                      k0_list = [1, 2, 3, 4],
+                      max_depth = max_depth,
+                      one_based = False)
+    df_empty = bw.dataframe(k0_list = [])
+
+    # --------- Assert ----------
+    assert 0 < len(df) < len(kji0)
+    assert np.all(df[['IW', 'JW', 'L']].to_numpy() == kji0[expected][:, ::-1])
+    assert list(df.columns) == ['IW', 'JW', 'L', 'X', 'Y', 'DEPTH']
+    assert len(df_empty) == 0
+    assert all(df_empty[col].dtype == int for col in ['IW', 'JW', 'L'])
+
+
+def test_dataframe_active_only_float_inactive(example_model_and_crs):
+    # --------- Arrange ----------
+    model, crs = example_model_and_crs
+    grid = grr.RegularGrid(model,
+                           extent_kji = (3, 2, 2),
+                           dxyz = (50.0, -50.0, 50.0),
+                           origin = (0.0, 0.0, 100.0),
+                           crs_uuid = crs.uuid,
+                           set_points_cached = True)
+    grid.write_hdf5()
+    grid.create_xml(write_geometry = True, use_lattice = False)
+    # as established by extract_inactive_mask() for a grid with geometry defined everywhere
+    grid.inactive = np.zeros(tuple(grid.extent_kji))
+    grid.inactive[1, 0, 0] = 1.0
+    well_name = 'FLOAT_INACTIVE'
+    cell_kji0_list = np.array([(0, 0, 0), (1, 0, 0), (2, 0, 0)])
+    bw = rqw.BlockedWell(model, well_name = well_name, use_face_centres = True)
+    bw.derive_from_cell_list(cell_kji0_list = cell_kji0_list, well_name = well_name, grid = grid)
+
+    # --------- Act ----------
+    df_all = bw.dataframe(active_only = False, one_based = False)
+    df_active = bw.dataframe(active_only = True, one_based = False)
+
+    # --------- Assert ----------
+    assert list(df_all['L']) == [0, 1, 2]
+    assert list(df_active['L']) == [0, 2]
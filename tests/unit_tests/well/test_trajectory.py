@@ -296,6 +296,43 @@ def test_xyz_for_md(example_model_and_crs):
     assert (math.isclose(x, 1.5)) & (math.isclose(y, 1.5)) & (math.isclose(z, 205))
 
 
+def test_xyz_for_mds(example_model_and_crs):
+
+    # --------- Arrange ----------
+    model, crs = example_model_and_crs
+    datum = resqpy.well.MdDatum(parent_model = model, crs_uuid = crs.uuid, location = (0, 0, -100))
+    xyz = np.array([(0.0, 0.0, 200.0), (10.0, 0.0, 250.0), (40.0, 20.0, 290.0), (90.0, 60.0, 310.0)])
+    mds = np.concatenate(([300.0], 300.0 + np.cumsum(vec.naive_lengths(xyz[1:] - xyz[:-1]))))
+    source_dataframe = pd.DataFrame({'MD': mds, 'X': xyz[:, 0], 'Y': xyz[:, 1], 'Z': xyz[:, 2], 'WELL': ['CURVY'] * 4})
+    trajectory = resqpy.well.Trajectory(parent_model = model,
+                                        data_frame = source_dataframe,
+                                        well_name = 'CURVY',
+                                        md_datum = datum,
+                                        length_uom = 'm')
+    sample_mds = np.linspace(-10.0, mds[-1] + 10.0, 1001)
+
+    # --------- Act ----------
+    linear_xyz = trajectory.xyz_for_mds(sample_mds)
+    mid_mds = 0.5 * (mds[:-1] + mds[1:])
+    spline_xyz = trajectory.xyz_for_mds(mid_mds, spline = True, use_tangents_if_present = False)
+    splined = trajectory.splined_trajectory('CURVY', min_subdivisions = 2, max_degrees_per_knot = None)
+
+    # -------- Assert ---------
+    assert linear_xyz.shape == (1001, 3)
+    for md, p in zip(sample_mds, linear_xyz):
+        expected = trajectory.xyz_for_md(md)
+        if expected is None:
+            assert np.all(np.isnan(p))
+        else:
+            np.testing.assert_array_almost_equal(p, expected)
+    inside = np.logical_and(sample_mds >= mds[0], sample_mds <= mds[-1])
+    for axis in range(3):
+        np.testing.assert_array_almost_equal(linear_xyz[inside, axis], np.interp(sample_mds[inside], mds, xyz[:, axis]))
+    np.testing.assert_array_almost_equal(trajectory.xyz_for_mds(mds, spline = True), xyz)
+    np.testing.assert_array_almost_equal(spline_xyz, splined.control_points[1::2])
+    assert trajectory.xyz_for_mds(mds.reshape((2, 2))).shape == (2, 2, 3)
+
+
 def test_splined_trajectory(example_model_and_crs):
 
     # --------- Arrange ----------
@@ -75,6 +75,10 @@ def test_WellboreFrame(example_model_and_crs):
     i, f = wellbore_frame_2.interval_for_md(320.01)
     assert i == -1 and maths.isclose(f, 1.0)
 
+    # test node_xyz() method
+    np.testing.assert_array_almost_equal(wellbore_frame_2.node_xyz(), [(1.5, 1.5, 205.0), (2.25, 2.25, 215.0),
+                                                                       (2.5, 2.5, 220.0)])
+
 
 def test_create_feature_and_intrepretation(example_model_and_crs):
     # Test that WellboreFeature and WellboreInterpretation objects can be added to WellboreFrame object